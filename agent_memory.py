@@ -3,18 +3,25 @@
 Agent Memory - Persistent memory system for the Claude agent.
 
 This module provides text-file based persistence for:
-1. Conversation summary - Rolling summary of older context
-2. Recent messages - Last N messages with full content
+1. Conversation summary - Rolling summary of older context (size-capped)
+2. Recent messages - Append-only log, last N kept in an in-memory ring buffer
 3. Current project - Active script, slides, paths
 4. Insights - Learnings the agent notes for itself
 
 Memory Structure:
     memory/
         conversation_summary.txt    # Rolling summary of older context
-        recent_messages.json        # Last 20 messages (full content)
+        messages.jsonl              # Append-only message log (one JSON per line)
         current_project.json        # Active project state
         insights.txt                # Agent's self-improvement notes
 
+Writes are incremental: adding a message appends one line to the log and,
+once the ring buffer overflows, one line to the summary. Files are only
+rewritten when the summary or log is compacted. Reads are served from
+memory and get_context() is cached until the next write.
+
+An AgentMemory instance assumes it is the only writer for its memory_dir.
+
 Usage:
     from agent_memory import AgentMemory
     
@@ -30,10 +37,16 @@ Usage:
 
 import os
 import json
+from collections import deque
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
 
+SUMMARY_PLACEHOLDER = "(No conversation history yet)"
+INSIGHTS_PLACEHOLDER = "(None recorded yet)"
+SUMMARY_HEADER = "# Conversation Summary\n\n"
+
+
 class AgentMemory:
     """
     Text-file based memory system for the Claude agent.
@@ -47,6 +60,15 @@ class AgentMemory:
     
     DEFAULT_MAX_RECENT_MESSAGES = 20
     
+    # Summary is compacted (oldest lines dropped) once it exceeds this size,
+    # down to SUMMARY_COMPACT_RATIO of the cap so compaction is amortized.
+    MAX_SUMMARY_CHARS = 12000
+    SUMMARY_COMPACT_RATIO = 0.75
+    
+    # Message log is rewritten to just the ring buffer past this many lines.
+    # Everything older has already been folded into the summary.
+    MAX_LOG_MESSAGES = 500
+    
     def __init__(self, memory_dir: str = "memory"):
         """
         Initialize memory system.
@@ -58,7 +80,8 @@ class AgentMemory:
         
         # File paths
         self.summary_file = os.path.join(memory_dir, "conversation_summary.txt")
-        self.messages_file = os.path.join(memory_dir, "recent_messages.json")
+        self.log_file = os.path.join(memory_dir, "messages.jsonl")
+        self.messages_file = os.path.join(memory_dir, "recent_messages.json")  # legacy
         self.project_file = os.path.join(memory_dir, "current_project.json")
         self.insights_file = os.path.join(memory_dir, "insights.txt")
         
@@ -68,32 +91,90 @@ class AgentMemory:
         # Initialize files if they don't exist
         self._init_files()
         
+        # In-memory state (loaded once, kept in sync on writes)
+        self._recent: deque = deque(maxlen=self.DEFAULT_MAX_RECENT_MESSAGES)
+        self._total_count = 0
+        self._log_lines = 0
+        self._summary_size = os.path.getsize(self.summary_file)
+        self._summary_session_open = False
+        self._project: Optional[Dict] = None
+        self._insights: Optional[str] = None
+        self._context_cache: Dict[tuple, str] = {}
+        
+        self._load_messages()
+        self._project = self._read_project()
+        
         print(f"🧠 AgentMemory initialized at {memory_dir}/")
     
     def _init_files(self):
         """Initialize memory files if they don't exist."""
         if not os.path.exists(self.summary_file):
             with open(self.summary_file, 'w') as f:
-                f.write("# Conversation Summary\n\n(No conversation history yet)\n")
+                f.write(SUMMARY_HEADER + SUMMARY_PLACEHOLDER + "\n")
         
-        if not os.path.exists(self.messages_file):
-            with open(self.messages_file, 'w') as f:
-                json.dump({"messages": [], "total_count": 0}, f)
+        if not os.path.exists(self.log_file):
+            self._migrate_legacy_messages()
         
         if not os.path.exists(self.project_file):
             with open(self.project_file, 'w') as f:
                 json.dump({"active_project": None}, f)
         
         if not os.path.exists(self.insights_file):
-            with open(self.insights_file, 'w') as f:
-                f.write("# Agent Insights\n\n")
-                f.write("## User Preferences\n\n")
-                f.write("(None recorded yet)\n\n")
-                f.write("## Learnings\n\n")
-                f.write("(None recorded yet)\n")
+            self._write_atomic(self.insights_file, self._default_insights())
+    
+    def _migrate_legacy_messages(self) -> None:
+        """Seed the append-only log from an old recent_messages.json, if any."""
+        messages = []
+        if os.path.exists(self.messages_file):
+            try:
+                with open(self.messages_file, 'r') as f:
+                    messages = json.load(f).get("messages", [])
+            except (OSError, ValueError):
+                messages = []
+        
+        with open(self.log_file, 'w') as f:
+            for msg in messages:
+                f.write(json.dumps(msg) + "\n")
+    
+    @staticmethod
+    def _default_insights() -> str:
+        return (
+            "# Agent Insights\n\n"
+            "## User Preferences\n\n"
+            f"{INSIGHTS_PLACEHOLDER}\n\n"
+            "## Learnings\n\n"
+            f"{INSIGHTS_PLACEHOLDER}\n"
+        )
+    
+    @staticmethod
+    def _write_atomic(path: str, content: str) -> None:
+        """Write a file via temp file + rename so readers never see a partial file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    
+    def _invalidate_context(self) -> None:
+        self._context_cache.clear()
     
     # ==================== MESSAGE MANAGEMENT ====================
     
+    def _load_messages(self) -> None:
+        """Fill the ring buffer from the tail of the message log."""
+        with open(self.log_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-append
+                    continue
+                self._recent.append(msg)
+                self._log_lines += 1
+                self._total_count = max(self._total_count, msg.get("id", 0))
+    
     def add_message(
         self,
         role: str,
@@ -108,39 +189,33 @@ class AgentMemory:
             content: Message content
             metadata: Optional metadata (tool calls, etc.)
         """
-        # Load current messages
-        with open(self.messages_file, 'r') as f:
-            data = json.load(f)
-        
-        messages = data.get("messages", [])
-        total_count = data.get("total_count", 0)
-        
-        # Create new message
+        self._total_count += 1
         message = {
-            "id": total_count + 1,
+            "id": self._total_count,
             "role": role,
             "content": content,
             "timestamp": datetime.now().isoformat(),
             "metadata": metadata or {}
         }
         
-        messages.append(message)
-        total_count += 1
+        # Ring buffer is full: the oldest message falls out into the summary
+        if len(self._recent) == self._recent.maxlen:
+            self._add_to_summary([self._recent[0]])
         
-        # Check if we need to summarize
-        if len(messages) > self.DEFAULT_MAX_RECENT_MESSAGES:
-            # Summarize oldest messages
-            messages_to_summarize = messages[:-self.DEFAULT_MAX_RECENT_MESSAGES]
-            messages = messages[-self.DEFAULT_MAX_RECENT_MESSAGES:]
-            
-            self._add_to_summary(messages_to_summarize)
+        self._recent.append(message)
+        
+        with open(self.log_file, 'a') as f:
+            f.write(json.dumps(message) + "\n")
+        self._log_lines += 1
         
-        # Save
-        with open(self.messages_file, 'w') as f:
-            json.dump({
-                "messages": messages,
-                "total_count": total_count
-            }, f, indent=2)
+        if self._log_lines > self.MAX_LOG_MESSAGES:
+            self._compact_log()
+    
+    def _compact_log(self) -> None:
+        """Rewrite the message log so it only holds the ring buffer."""
+        content = "".join(json.dumps(msg) + "\n" for msg in self._recent)
+        self._write_atomic(self.log_file, content)
+        self._log_lines = len(self._recent)
     
     def get_recent_messages(self, limit: int = None) -> List[Dict]:
         """
@@ -152,10 +227,7 @@ class AgentMemory:
         Returns:
             List of message dictionaries
         """
-        with open(self.messages_file, 'r') as f:
-            data = json.load(f)
-        
-        messages = data.get("messages", [])
+        messages = list(self._recent)
         
         if limit and limit < len(messages):
             return messages[-limit:]
@@ -164,21 +236,21 @@ class AgentMemory:
     
     def _add_to_summary(self, messages: List[Dict]) -> None:
         """
-        Add summarized messages to the summary file.
+        Append summarized messages to the summary file.
         
         Args:
             messages: Messages to summarize
         """
-        with open(self.summary_file, 'r') as f:
-            current_summary = f.read()
+        summary_block = ""
         
-        # Remove placeholder if present
-        if "(No conversation history yet)" in current_summary:
-            current_summary = "# Conversation Summary\n\n"
-        
-        # Create summary of messages
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        summary_block = f"\n## Session: {timestamp}\n\n"
+        # One session header per AgentMemory instance, not per message
+        if not self._summary_session_open:
+            if self._summary_has_placeholder():
+                self._write_atomic(self.summary_file, SUMMARY_HEADER)
+                self._summary_size = len(SUMMARY_HEADER)
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+            summary_block += f"\n## Session: {timestamp}\n\n"
+            self._summary_session_open = True
         
         for msg in messages:
             role = msg.get("role", "unknown")
@@ -190,13 +262,58 @@ class AgentMemory:
             
             summary_block += f"- **{role}**: {content}\n"
         
-        current_summary += summary_block
+        with open(self.summary_file, 'a') as f:
+            f.write(summary_block)
+        self._summary_size += len(summary_block)
+        self._invalidate_context()
         
-        with open(self.summary_file, 'w') as f:
-            f.write(current_summary)
+        if self._summary_size > self.MAX_SUMMARY_CHARS:
+            self._compact_summary()
+    
+    def _summary_has_placeholder(self) -> bool:
+        # Placeholder only ever exists in a freshly-initialized (tiny) file
+        if self._summary_size > 256:
+            return False
+        with open(self.summary_file, 'r') as f:
+            return SUMMARY_PLACEHOLDER in f.read()
+    
+    def _compact_summary(self) -> None:
+        """Drop the oldest summary lines until the file is back under budget."""
+        with open(self.summary_file, 'r') as f:
+            lines = f.read().splitlines(keepends=True)
+        
+        body = lines[2:] if lines and lines[0].startswith("# Conversation Summary") else lines
+        target = int(self.MAX_SUMMARY_CHARS * self.SUMMARY_COMPACT_RATIO) - len(SUMMARY_HEADER)
+        
+        kept: List[str] = []
+        size = 0
+        for line in reversed(body):
+            if size + len(line) > target:
+                break
+            kept.append(line)
+            size += len(line)
+        kept.reverse()
+        
+        # Start at a session boundary when one survived the trim
+        for i, line in enumerate(kept):
+            if line.startswith("## Session"):
+                kept = ["\n"] + kept[i:]
+                break
+        
+        content = SUMMARY_HEADER + "(Older history compacted)\n" + "".join(kept)
+        self._write_atomic(self.summary_file, content)
+        self._summary_size = len(content)
     
     # ==================== PROJECT STATE ====================
     
+    def _read_project(self) -> Optional[Dict]:
+        try:
+            with open(self.project_file, 'r') as f:
+                data = json.load(f)
+            return data.get("active_project")
+        except:
+            return None
+    
     def save_project(self, project_data: Dict) -> None:
         """
         Save current project state.
@@ -204,11 +321,12 @@ class AgentMemory:
         Args:
             project_data: Project dictionary with script, slides, paths, etc.
         """
-        with open(self.project_file, 'w') as f:
-            json.dump({
-                "active_project": project_data,
-                "saved_at": datetime.now().isoformat()
-            }, f, indent=2)
+        self._write_atomic(self.project_file, json.dumps({
+            "active_project": project_data,
+            "saved_at": datetime.now().isoformat()
+        }, indent=2))
+        self._project = project_data
+        self._invalidate_context()
     
     def load_project(self) -> Optional[Dict]:
         """
@@ -217,17 +335,14 @@ class AgentMemory:
         Returns:
             Project dictionary or None
         """
-        try:
-            with open(self.project_file, 'r') as f:
-                data = json.load(f)
-            return data.get("active_project")
-        except:
-            return None
+        return self._project
     
     def clear_project(self) -> None:
         """Clear the current project."""
         with open(self.project_file, 'w') as f:
             json.dump({"active_project": None}, f)
+        self._project = None
+        self._invalidate_context()
     
     # ==================== INSIGHTS ====================
     
@@ -239,8 +354,7 @@ class AgentMemory:
             category: Category (e.g., "User Preferences", "Learnings")
             insight: The insight text
         """
-        with open(self.insights_file, 'r') as f:
-            content = f.read()
+        content = self.get_insights()
         
         # Find the category section
         category_header = f"## {category}"
@@ -249,7 +363,7 @@ class AgentMemory:
             content += f"\n{category_header}\n\n"
         
         # Remove placeholder if present
-        content = content.replace("(None recorded yet)", "")
+        content = content.replace(INSIGHTS_PLACEHOLDER, "")
         
         # Add insight with timestamp
         timestamp = datetime.now().strftime("%Y-%m-%d")
@@ -265,8 +379,9 @@ class AgentMemory:
                 parts[1] = header_and_rest[0] + "\n\n" + new_insight
             content = category_header.join(parts)
         
-        with open(self.insights_file, 'w') as f:
-            f.write(content)
+        self._write_atomic(self.insights_file, content)
+        self._insights = content
+        self._invalidate_context()
     
     def get_insights(self) -> str:
         """
@@ -275,8 +390,10 @@ class AgentMemory:
         Returns:
             Insights file content
         """
-        with open(self.insights_file, 'r') as f:
-            return f.read()
+        if self._insights is None:
+            with open(self.insights_file, 'r') as f:
+                self._insights = f.read()
+        return self._insights
     
     # ==================== CONTEXT BUILDER ====================
     
@@ -290,6 +407,9 @@ class AgentMemory:
         - Current project state
         - Insights/preferences
         
+        The result is cached per flag combination and invalidated whenever
+        the summary, project or insights change.
+        
         Args:
             include_summary: Include conversation summary
             include_insights: Include agent insights
@@ -297,13 +417,18 @@ class AgentMemory:
         Returns:
             Formatted context string
         """
+        cache_key = (include_summary, include_insights)
+        cached = self._context_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         context_parts = []
         
         # Add summary
         if include_summary:
             with open(self.summary_file, 'r') as f:
                 summary = f.read()
-            if "(No conversation history yet)" not in summary:
+            if SUMMARY_PLACEHOLDER not in summary:
                 context_parts.append("## Previous Context\n" + summary)
         
         # Add project state
@@ -315,10 +440,12 @@ class AgentMemory:
         # Add insights
         if include_insights:
             insights = self.get_insights()
-            if "(None recorded yet)" not in insights:
+            if INSIGHTS_PLACEHOLDER not in insights:
                 context_parts.append("## Agent Notes\n" + insights)
         
-        return "\n\n---\n\n".join(context_parts) if context_parts else ""
+        context = "\n\n---\n\n".join(context_parts) if context_parts else ""
+        self._context_cache[cache_key] = context
+        return context
     
     def _summarize_project(self, project: Dict) -> str:
         """Create a brief summary of the project state."""
@@ -347,34 +474,29 @@ class AgentMemory:
     
     def clear_recent_messages(self) -> None:
         """Clear recent messages (keeps summary)."""
-        with open(self.messages_file, 'w') as f:
-            json.dump({"messages": [], "total_count": 0}, f)
+        open(self.log_file, 'w').close()
+        self._recent.clear()
+        self._total_count = 0
+        self._log_lines = 0
     
     def clear_all(self) -> None:
         """Clear all memory (fresh start)."""
-        self._init_files()
-        with open(self.summary_file, 'w') as f:
-            f.write("# Conversation Summary\n\n(No conversation history yet)\n")
-        with open(self.messages_file, 'w') as f:
-            json.dump({"messages": [], "total_count": 0}, f)
-        with open(self.project_file, 'w') as f:
-            json.dump({"active_project": None}, f)
-        with open(self.insights_file, 'w') as f:
-            f.write("# Agent Insights\n\n")
-            f.write("## User Preferences\n\n")
-            f.write("(None recorded yet)\n\n")
-            f.write("## Learnings\n\n")
-            f.write("(None recorded yet)\n")
+        self._write_atomic(self.summary_file, SUMMARY_HEADER + SUMMARY_PLACEHOLDER + "\n")
+        self._summary_size = os.path.getsize(self.summary_file)
+        self._summary_session_open = False
+        self.clear_recent_messages()
+        self.clear_project()
+        self._write_atomic(self.insights_file, self._default_insights())
+        self._insights = None
+        self._invalidate_context()
     
     def get_stats(self) -> Dict:
         """Get memory statistics."""
-        with open(self.messages_file, 'r') as f:
-            data = json.load(f)
-        
         return {
-            "recent_messages": len(data.get("messages", [])),
-            "total_messages": data.get("total_count", 0),
+            "recent_messages": len(self._recent),
+            "total_messages": self._total_count,
             "has_project": self.load_project() is not None,
+            "summary_chars": self._summary_size,
             "memory_dir": self.memory_dir
         }
 
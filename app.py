@@ -9,6 +9,7 @@ from voice_generator import VoiceGenerator
 from video_assembler import VideoAssembler
 from tiktok_uploader import TikTokUploader
 from visual_templates import VisualTemplateManager, parse_template_from_description
+from image_writer import ensure_derivative
 
 # OpenAI image generation (optional)
 try:
@@ -1257,7 +1258,7 @@ with tab5:
                     cols = st.columns(min(len(selected_images), 6))
                     for idx, img_path in enumerate(selected_images[:6]):
                         with cols[idx]:
-                            st.image(img_path, caption=f"Scene {idx+1}", width=100)
+                            st.image(ensure_derivative(img_path, "thumb"), caption=f"Scene {idx+1}", width=100)
                     if len(selected_images) > 6:
                         st.caption(f"...and {len(selected_images) - 6} more")
                 else:
@@ -1311,7 +1312,7 @@ with tab5:
                         cols = st.columns(min(len(selected_images), 6))
                         for idx, img_path in enumerate(selected_images[:6]):
                             with cols[idx]:
-                                st.image(img_path, caption=f"Scene {idx+1}", width=100)
+                                st.image(ensure_derivative(img_path, "thumb"), caption=f"Scene {idx+1}", width=100)
                         if len(selected_images) > 6:
                             st.caption(f"...and {len(selected_images) - 6} more")
         
@@ -3134,8 +3135,7 @@ with tab8:
                         if slide_key in st.session_state.tiktok_individual_slides:
                             result = st.session_state.tiktok_individual_slides[slide_key]
                             if os.path.exists(result['image_path']):
-                                img = Image.open(result['image_path'])
-                                st.image(img, caption=f"Slide {i}", width=300)
+                                st.image(ensure_derivative(result['image_path'], "preview"), caption=f"Slide {i}", width=300)
                                 
                                 # Download button
                                 with open(result['image_path'], "rb") as f:
@@ -3179,14 +3179,8 @@ with tab8:
                 for i, path in enumerate(st.session_state.tiktok_image_paths):
                     with cols[i % 3]:
                         if os.path.exists(path):
-                            img = Image.open(path)
-                            # Resize for display
-                            display_width = 300
-                            ratio = display_width / img.width
-                            display_height = int(img.height * ratio)
-                            img_resized = img.resize((display_width, display_height))
-                            
-                            st.image(img_resized, caption=f"Slide {i}", use_container_width=True)
+                            # Small WebP preview instead of the full slide
+                            st.image(ensure_derivative(path, "preview"), caption=f"Slide {i}", use_container_width=True)
                             
                             # Download button
                             with open(path, "rb") as f:
@@ -3232,8 +3226,7 @@ with tab8:
                 
                 # Show thumbnail of selected image
                 if selected_bg and os.path.exists(selected_bg):
-                    img_preview = Image.open(selected_bg)
-                    st.image(img_preview, caption="Selected Background", width=200)
+                    st.image(ensure_derivative(selected_bg, "thumb"), caption="Selected Background", width=200)
             
             with col_text:
                 # Text inputs
@@ -3345,8 +3338,7 @@ with tab8:
                         for i, path in enumerate(sorted(paths)):
                             with cols[i % 4]:
                                 if os.path.exists(path):
-                                    img = Image.open(path)
-                                    st.image(img, caption=os.path.basename(path), use_container_width=True)
+                                    st.image(ensure_derivative(path, "preview"), caption=os.path.basename(path), use_container_width=True)
             else:
                 st.info("No slideshows found. Generate one above!")
         else:
@@ -3499,8 +3491,7 @@ with tab9:
                                         with preview_cols[i]:
                                             if os.path.exists(path):
                                                 try:
-                                                    img = Image.open(path)
-                                                    st.image(img, use_container_width=True)
+                                                    st.image(ensure_derivative(path, "preview"), use_container_width=True)
                                                 except:
                                                     st.caption(os.path.basename(path))
                         
@@ -3646,8 +3637,7 @@ with tab9:
                             slide_path = slideshow['slides'][slide_idx]
                             with cols[col_idx]:
                                 try:
-                                    img = Image.open(slide_path)
-                                    st.image(img, caption=f"Slide {slide_idx}", use_container_width=True)
+                                    st.image(ensure_derivative(slide_path, "preview"), caption=f"Slide {slide_idx}", use_container_width=True)
                                 except Exception as e:
                                     st.error(f"Error loading slide {slide_idx}: {e}")
                     
@@ -3672,8 +3662,7 @@ with tab9:
                                     bg_path = bg_files[bg_idx]
                                     with cols[col_idx]:
                                         try:
-                                            img = Image.open(bg_path)
-                                            st.image(img, caption=os.path.basename(bg_path), use_container_width=True)
+                                            st.image(ensure_derivative(bg_path, "preview"), caption=os.path.basename(bg_path), use_container_width=True)
                                         except:
                                             pass
         
@@ -385,6 +385,62 @@ def generate_video_flow(
         
     return video_path
 
+def run_automation_loop(smart: bool = False, once: bool = False, control=None, **flow_kwargs):
+    """
+    Pull topics from the queue and generate videos until stopped.
+    
+    Args:
+        smart: Only generate inside the posting windows (checks every 30 mins)
+        once: Process a single topic and return instead of looping
+        control: automation_worker.JobControl when run by the worker pool.
+            Pause/stop take effect between topics and during the sleeps.
+        **flow_kwargs: Passed through to generate_video_flow
+    """
+    produced = 0
+    while True:
+        if control:
+            control.checkpoint()
+        
+        should_run = False
+        
+        if smart:
+            # Check schedule
+            if is_within_schedule():
+                log_message("⏰ Time window open! Starting generation...")
+                should_run = True
+            else:
+                log_message("💤 Outside schedule window. Sleeping...")
+        else:
+            # Basic loop
+            should_run = True
+        
+        if should_run:
+            topic = get_next_topic()
+            if topic:
+                if control:
+                    control.report(current_topic=topic, items_produced=produced)
+                try:
+                    if generate_video_flow(topic, **flow_kwargs):
+                        produced += 1
+                except Exception as e:
+                    log_message(f"🔥 Critical Error: {e}")
+                if control:
+                    control.report(current_topic=None, items_produced=produced)
+            else:
+                log_message("⚠️ No more topics in queue!")
+        
+        if once:
+            return
+        
+        # Sleep logic
+        # Smart mode: Check every 30 mins
+        # Basic Loop: Check every 1 hour (default)
+        sleep_time = 1800 if smart else 3600
+        if control:
+            control.sleep(sleep_time)
+        else:
+            time.sleep(sleep_time)
+
 def main():
     parser = argparse.ArgumentParser(description="Philosophy Video Automation Pipeline")
     parser.add_argument("--loop", action="store_true", help="Run in continuous loop mode")
@@ -485,44 +541,16 @@ def main():
     log_message("🤖 Automation Agent Started")
     
     if args.loop or args.smart:
-        while True:
-            should_run = False
-            
-            if args.smart:
-                # Check schedule
-                if is_within_schedule():
-                    log_message("⏰ Time window open! Starting generation...")
-                    should_run = True
-                else:
-                    log_message("💤 Outside schedule window. Sleeping...")
-            else:
-                # Basic loop
-                should_run = True
-            
-            if should_run:
-                topic = get_next_topic()
-                if topic:
-                    try:
-                        generate_video_flow(
-                            topic,
-                            image_model=args.image_model,
-                            transition=args.transition,
-                            transition_duration=args.transition_duration,
-                            use_video_transitions=args.video_transitions,
-                            fal_resolution=args.fal_resolution,
-                            clip_duration=args.clip_duration,
-                            voice_id=args.voice_id
-                        )
-                    except Exception as e:
-                        log_message(f"🔥 Critical Error: {e}")
-                else:
-                    log_message("⚠️ No more topics in queue!")
-            
-            # Sleep logic
-            # Smart mode: Check every 30 mins
-            # Basic Loop: Check every 1 hour (default)
-            sleep_time = 1800 if args.smart else 3600
-            time.sleep(sleep_time)
+        run_automation_loop(
+            smart=args.smart,
+            image_model=args.image_model,
+            transition=args.transition,
+            transition_duration=args.transition_duration,
+            use_video_transitions=args.video_transitions,
+            fal_resolution=args.fal_resolution,
+            clip_duration=args.clip_duration,
+            voice_id=args.voice_id
+        )
 
 if __name__ == "__main__":
     main()
@@ -10,15 +10,14 @@ This module provides:
 
 import os
 import json
-import time
 import uuid
-import subprocess
-import signal
 from datetime import datetime
 from typing import Optional, Dict, List, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from automation_worker import AutomationPoolClient, PoolUnavailable
+
 
 # File paths
 AUTOMATIONS_STATE_FILE = "automations_state.json"
@@ -82,8 +81,9 @@ class AutomationConfig:
     
     # Runtime state
     status: str = AutomationStatus.STOPPED
-    pid: Optional[int] = None  # Process ID if running
+    pid: Optional[int] = None  # Worker process ID while a pool worker runs it
     items_produced: int = 0  # Slides/videos produced
+    items_at_start: int = 0  # items_produced when the current run started
     current_topic: Optional[str] = None
     last_activity: Optional[str] = None
     error_message: Optional[str] = None
@@ -100,6 +100,7 @@ class AutomationManager:
     
     def __init__(self):
         self.automations: Dict[str, AutomationConfig] = {}
+        self.pool = AutomationPoolClient()
         self._load_state()
     
     def _load_state(self):
@@ -128,25 +129,43 @@ class AutomationManager:
         except Exception as e:
             print(f"Error saving automations state: {e}")
     
-    def _check_process_running(self, pid: int) -> bool:
-        """Check if a process with given PID is still running."""
-        if pid is None:
-            return False
-        try:
-            os.kill(pid, 0)  # Signal 0 doesn't kill, just checks
-            return True
-        except (ProcessLookupError, PermissionError):
-            return False
-    
     def refresh_statuses(self):
-        """Check all automations and update their statuses based on actual process state."""
-        for auto_id, auto in self.automations.items():
-            if auto.status == AutomationStatus.RUNNING:
-                if auto.pid and not self._check_process_running(auto.pid):
-                    # Process died unexpectedly
-                    auto.status = AutomationStatus.STOPPED
-                    auto.error_message = "Process terminated unexpectedly"
-                    auto.last_activity = datetime.now().isoformat()
+        """Sync running/paused automations with the worker pool's live job state."""
+        active = [
+            auto for auto in self.automations.values()
+            if auto.status in [AutomationStatus.RUNNING, AutomationStatus.PAUSED]
+        ]
+        if not active:
+            return
+        
+        try:
+            jobs = self.pool.status()["jobs"]
+        except PoolUnavailable:
+            jobs = None
+        
+        for auto in active:
+            job = jobs.get(auto.id) if jobs is not None else None
+            if job is None:
+                auto.status = AutomationStatus.STOPPED
+                auto.pid = None
+                auto.current_topic = None
+                auto.error_message = "Worker pool is not running" if jobs is None else "Worker pool restarted"
+                auto.last_activity = datetime.now().isoformat()
+                continue
+            
+            auto.pid = job["pid"]
+            auto.current_topic = job["current_topic"]
+            auto.items_produced = auto.items_at_start + job["items_produced"]
+            auto.last_activity = job["updated_at"]
+            if job["state"] == "completed":
+                auto.status = AutomationStatus.COMPLETED
+            elif job["state"] == "stopped":
+                auto.status = AutomationStatus.STOPPED
+            elif job["state"] == "error":
+                auto.status = AutomationStatus.ERROR
+                auto.error_message = job["error"]
+            if job["state"] in ("completed", "stopped", "error"):
+                auto.pid = None
         self._save_state()
     
     def create_automation(
@@ -229,8 +248,41 @@ class AutomationManager:
         self._save_state()
         return automation
     
+    def _build_job(self, auto: AutomationConfig, topic_file: str) -> Dict[str, Any]:
+        """Job spec for the worker pool (see automation_worker.run_job)."""
+        if auto.automation_type in ["slideshow", "video_transitions", "slideshow_narration"]:
+            return {
+                "id": auto.id,
+                "name": auto.name,
+                "kind": "slideshow",
+                "options": {
+                    "model": auto.image_model,
+                    "automation_type": auto.automation_type,
+                    "font_name": auto.font_name,
+                    "topics_file": topic_file,
+                    "enable_voice": auto.enable_voice,
+                    "enable_video_transitions": auto.enable_video_transitions,
+                    "recycle_topics": auto.recycle_topics,
+                    "theme": auto.theme,
+                    "auto_theme": auto.auto_theme,
+                }
+            }
+        # full_video runs the auto_runner loop
+        return {
+            "id": auto.id,
+            "name": auto.name,
+            "kind": "full_video",
+            "options": {
+                "smart": auto.schedule_mode == "smart",
+                "once": auto.schedule_mode == "single",
+                "image_model": auto.image_model,
+                "transition": auto.transition,
+                "transition_duration": auto.transition_duration,
+            }
+        }
+    
     def start_automation(self, auto_id: str) -> bool:
-        """Start an automation process."""
+        """Start an automation on the worker pool (starting the pool if needed)."""
         if auto_id not in self.automations:
             return False
         
@@ -238,57 +290,11 @@ class AutomationManager:
         
         # If paused, we can resume
         if auto.status == AutomationStatus.PAUSED:
-            auto.status = AutomationStatus.RUNNING
-            auto.paused_at = None
-            auto.last_activity = datetime.now().isoformat()
-            self._save_state()
-            return True
+            return self.resume_automation(auto_id)
         
         # Determine which topic file to use
         topic_file = get_topic_file_path(auto.use_topic_file)
         
-        # Build command based on automation type
-        if auto.automation_type in ["slideshow", "video_transitions", "slideshow_narration"]:
-            # Use slideshow_automation.py
-            cmd = ["python", "slideshow_automation.py"]
-            cmd.extend(["--model", auto.image_model])
-            cmd.extend(["--type", auto.automation_type])
-            cmd.extend(["--font", auto.font_name])
-            cmd.extend(["--style", auto.visual_style])
-            cmd.extend(["--auto-id", auto_id])
-            cmd.extend(["--topics-file", topic_file])
-            
-            # Theme settings
-            cmd.extend(["--theme", auto.theme])
-            if auto.auto_theme:
-                cmd.append("--auto-theme")
-            
-            # Voice option
-            if auto.enable_voice:
-                cmd.append("--voice")
-            
-            # Video transitions option
-            if auto.enable_video_transitions:
-                cmd.append("--video-transitions")
-            
-            # Topic recycling
-            if auto.recycle_topics:
-                cmd.append("--recycle")
-            
-            if auto.schedule_mode == "loop":
-                cmd.append("--loop")
-        else:
-            # Use auto_runner.py for full_video
-            cmd = ["python", "auto_runner.py"]
-            cmd.extend(["--image-model", auto.image_model])
-            cmd.extend(["--transition", auto.transition])
-            cmd.extend(["--transition-duration", str(auto.transition_duration)])
-            
-            if auto.schedule_mode == "loop":
-                cmd.append("--loop")
-            elif auto.schedule_mode == "smart":
-                cmd.append("--smart")
-        
         # If automation has specific topics, write them to the appropriate topic file
         if auto.topics:
             with open(topic_file, 'a') as f:
@@ -296,16 +302,15 @@ class AutomationManager:
                     f.write(topic + "\n")
         
         try:
-            # Start the process in background
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                start_new_session=True  # Detach from parent
-            )
+            self.pool.ensure_running()
+            reply = self.pool.submit(self._build_job(auto, topic_file))
+            if not reply["ok"]:
+                raise RuntimeError(reply["error"])
             
-            auto.pid = process.pid
+            auto.pid = None  # Filled in once a worker picks the job up
             auto.status = AutomationStatus.RUNNING
+            auto.items_at_start = auto.items_produced
+            auto.current_topic = None
             auto.started_at = datetime.now().isoformat()
             auto.last_activity = datetime.now().isoformat()
             auto.error_message = None
@@ -319,71 +324,74 @@ class AutomationManager:
             self._save_state()
             return False
     
+    def _send_control(self, auto: AutomationConfig, action: str) -> bool:
+        """Send pause/resume/stop to the pool; records the error on failure."""
+        try:
+            reply = getattr(self.pool, action)(auto.id)
+        except PoolUnavailable as e:
+            auto.error_message = f"Failed to {action}: {e}"
+            return False
+        if not reply["ok"]:
+            auto.error_message = f"Failed to {action}: {reply['error']}"
+            return False
+        return True
+    
     def pause_automation(self, auto_id: str) -> bool:
-        """Pause an automation (sends SIGSTOP to process)."""
+        """Pause an automation (it finishes its current topic, then waits)."""
         if auto_id not in self.automations:
             return False
         
         auto = self.automations[auto_id]
         
-        if auto.status != AutomationStatus.RUNNING or not auto.pid:
+        if auto.status != AutomationStatus.RUNNING:
             return False
         
-        try:
-            os.kill(auto.pid, signal.SIGSTOP)
-            auto.status = AutomationStatus.PAUSED
-            auto.paused_at = datetime.now().isoformat()
-            auto.last_activity = datetime.now().isoformat()
-            self._save_state()
-            return True
-        except Exception as e:
-            auto.error_message = f"Failed to pause: {e}"
+        if not self._send_control(auto, "pause"):
             self._save_state()
             return False
+        
+        auto.status = AutomationStatus.PAUSED
+        auto.paused_at = datetime.now().isoformat()
+        auto.last_activity = datetime.now().isoformat()
+        self._save_state()
+        return True
     
     def resume_automation(self, auto_id: str) -> bool:
-        """Resume a paused automation (sends SIGCONT to process)."""
+        """Resume a paused automation."""
         if auto_id not in self.automations:
             return False
         
         auto = self.automations[auto_id]
         
-        if auto.status != AutomationStatus.PAUSED or not auto.pid:
+        if auto.status != AutomationStatus.PAUSED:
             return False
         
-        try:
-            os.kill(auto.pid, signal.SIGCONT)
-            auto.status = AutomationStatus.RUNNING
-            auto.paused_at = None
-            auto.last_activity = datetime.now().isoformat()
-            self._save_state()
-            return True
-        except Exception as e:
-            auto.error_message = f"Failed to resume: {e}"
+        if not self._send_control(auto, "resume"):
             self._save_state()
             return False
+        
+        auto.status = AutomationStatus.RUNNING
+        auto.paused_at = None
+        auto.last_activity = datetime.now().isoformat()
+        self._save_state()
+        return True
     
     def stop_automation(self, auto_id: str) -> bool:
-        """Stop an automation completely (kills process)."""
+        """
+        Stop an automation. The job stops at its next checkpoint; the pool
+        terminates its worker if it doesn't within the stop grace period.
+        """
         if auto_id not in self.automations:
             return False
         
         auto = self.automations[auto_id]
         
-        if auto.pid:
-            try:
-                # First try SIGTERM for graceful shutdown
-                os.kill(auto.pid, signal.SIGTERM)
-                time.sleep(1)
-                
-                # If still running, force kill
-                if self._check_process_running(auto.pid):
-                    os.kill(auto.pid, signal.SIGKILL)
-            except Exception:
-                pass  # Process might already be dead
+        if auto.status in [AutomationStatus.RUNNING, AutomationStatus.PAUSED]:
+            self._send_control(auto, "stop")  # Already finished/unknown to the pool is fine
         
         auto.status = AutomationStatus.STOPPED
         auto.pid = None
+        auto.current_topic = None
         auto.last_activity = datetime.now().isoformat()
         self._save_state()
         return True
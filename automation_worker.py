@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""
+Automation Worker Pool - long-lived workers that run automation jobs.
+
+Starting an automation used to launch a fresh `python slideshow_automation.py`
+per automation: every start re-imported moviepy, PIL, google-genai and fal,
+stdout/stderr went to pipes nobody read (so a chatty run blocked once the pipe
+filled), and pause/resume were SIGSTOP/SIGCONT.
+
+The pool pays the startup cost once. The supervisor imports the heavy modules
+and loads the fonts, then forks N workers that inherit all of it. Jobs arrive
+over a local control channel and are handed to idle workers:
+
+    supervisor ──pipe──▶ worker 0 ── run_automation_loop(..., control=JobControl)
+               ──pipe──▶ worker 1 ── ...
+
+- Each job's stdout/stderr stream to automation_logs/<job_id>.log
+- Pause/resume/stop are cooperative: the job calls control.checkpoint()
+  between topics. A job that ignores a stop for STOP_GRACE_SECONDS has its
+  worker terminated and replaced.
+- `status` returns live per-worker and per-job state (topic, items, pid)
+
+Provider limits (provider_limits.py) apply per worker process.
+
+Usage:
+    python automation_worker.py serve --workers 2   # Run the pool (foreground)
+    python automation_worker.py status              # Print live worker status
+    python automation_worker.py shutdown            # Stop the pool
+
+    from automation_worker import AutomationPoolClient
+    pool = AutomationPoolClient()
+    pool.ensure_running()
+    pool.submit({"id": "a1b2c3d4", "kind": "slideshow", "options": {...}})
+    pool.pause("a1b2c3d4")
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import secrets
+import argparse
+import importlib
+import threading
+import traceback
+import subprocess
+import multiprocessing as mp
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing.connection import Client, Listener, wait
+from typing import Any, Dict, List, Optional
+
+
+# Control channel (local only)
+POOL_HOST = "127.0.0.1"
+POOL_PORT = int(os.getenv("AUTOMATION_POOL_PORT", "6011"))
+POOL_AUTHKEY_FILE = ".automation_pool.key"
+POOL_LOG_FILE = "automation_pool.log"
+JOB_LOG_DIR = "automation_logs"
+
+DEFAULT_WORKERS = int(os.getenv("AUTOMATION_WORKERS", "2"))
+STOP_GRACE_SECONDS = float(os.getenv("AUTOMATION_STOP_GRACE", "30"))
+POOL_START_TIMEOUT = 15  # seconds to wait for a freshly spawned pool to answer
+
+# Imported by the supervisor before forking so workers start warm (the pipeline
+# modules defer their SDK imports via lazy_imports, so those are listed too)
+WARM_IMPORTS = [
+    "PIL.Image",
+    "moviepy.editor",
+    "google.genai",
+    "fal_client",
+    "elevenlabs",
+    "text_overlay",
+    "tiktok_slideshow",
+    "themed_slideshow",
+    "voice_generator",
+    "slideshow_automation",
+    "auto_runner",
+]
+
+# Per-worker control value, polled by JobControl.checkpoint()
+RUN, PAUSE, STOP = 0, 1, 2
+REQUESTS = {"run": RUN, "pause": PAUSE, "stop": STOP}
+
+TERMINAL_STATES = ("completed", "stopped", "error")
+
+
+class PoolUnavailable(Exception):
+    """The worker pool isn't running (or didn't come up in time)."""
+
+
+class JobStopped(Exception):
+    """Raised by JobControl.checkpoint() once the job has been asked to stop."""
+
+
+def log(message: str):
+    """Log a supervisor message with timestamp."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+def _authkey() -> bytes:
+    """Shared secret for the control channel (created on first use, mode 600)."""
+    try:
+        fd = os.open(POOL_AUTHKEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(16))
+    except FileExistsError:
+        pass
+    with open(POOL_AUTHKEY_FILE, "r") as f:
+        return f.read().strip().encode()
+
+
+def job_log_path(job_id: str) -> str:
+    return os.path.join(JOB_LOG_DIR, f"{job_id}.log")
+
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+class JobControl:
+    """
+    Handed to a job function. The job calls checkpoint() between units of
+    work (topics) and report() when its progress changes.
+    """
+
+    def __init__(self, job_id: str, worker_id: int, state, conn):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._state = state
+        self._conn = conn
+        self._send_lock = threading.Lock()
+
+    def checkpoint(self):
+        """Block while paused; raise JobStopped if a stop was requested."""
+        if self._state.value == PAUSE:
+            self.emit("paused")
+            while self._state.value == PAUSE:
+                time.sleep(0.5)
+            if self._state.value == RUN:
+                self.emit("resumed")
+        if self._state.value == STOP:
+            raise JobStopped(self.job_id)
+
+    def report(self, **fields):
+        """Publish progress (current_topic, items_produced, ...) to the supervisor."""
+        self.emit("progress", **fields)
+
+    def sleep(self, seconds: float):
+        """time.sleep() that still honours pause and stop."""
+        deadline = time.time() + seconds
+        while True:
+            self.checkpoint()
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            time.sleep(min(1.0, remaining))
+
+    def emit(self, event: str, **fields):
+        with self._send_lock:
+            self._conn.send({"event": event, "job_id": self.job_id, "time": time.time(), **fields})
+
+
+def run_job(job: Dict[str, Any], control: JobControl):
+    """Dispatch a job to its automation loop."""
+    options = job.get("options", {})
+    if job["kind"] == "slideshow":
+        from slideshow_automation import run_automation_loop
+        run_automation_loop(auto_id=job["id"], control=control, **options)
+    elif job["kind"] == "full_video":
+        from auto_runner import run_automation_loop
+        run_automation_loop(control=control, **options)
+    else:
+        raise ValueError(f"Unknown job kind: {job['kind']}")
+
+
+@contextmanager
+def _redirect_output(path: str):
+    """Point fds 1 and 2 at the job's log file (covers ffmpeg and other children too)."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = (os.dup(1), os.dup(2))
+    with open(path, "a", buffering=1) as log_file:
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+
+
+def _worker_main(worker_id: int, conn, state, supervisor_pid: int, inherited: List[Any]):
+    # Sockets the supervisor owns (control listener, other workers' pipes)
+    for obj in inherited:
+        try:
+            obj.close()
+        except OSError:
+            pass
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is the supervisor's to handle
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+    os.makedirs(JOB_LOG_DIR, exist_ok=True)
+
+    while True:
+        if not conn.poll(1.0):
+            if os.getppid() != supervisor_pid:
+                return  # Supervisor is gone
+            continue
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        control = JobControl(job["id"], worker_id, state, conn)
+        log_path = job_log_path(job["id"])
+        control.emit("started", pid=os.getpid(), log_path=log_path)
+        outcome, error = "completed", None
+        with _redirect_output(log_path):
+            print(f"\n===== {job['kind']} job {job['id']} on worker {worker_id} "
+                  f"({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) =====")
+            try:
+                run_job(job, control)
+            except JobStopped:
+                outcome = "stopped"
+                print("⏹️ Stopped")
+            except Exception as e:
+                outcome, error = "error", str(e)
+                traceback.print_exc()
+        control.emit(outcome, error=error)
+
+
+# =============================================================================
+# SUPERVISOR
+# =============================================================================
+
+class Supervisor:
+    """Owns the workers, the job table and the control channel."""
+
+    def __init__(self, num_workers: int = DEFAULT_WORKERS):
+        self.num_workers = num_workers
+        self._ctx = mp.get_context("fork")
+        self._lock = threading.Lock()
+        self._running = True
+        self.listener: Optional[Listener] = None
+        self.started_at = datetime.now().isoformat()
+        self.workers: Dict[int, Dict[str, Any]] = {}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.pending = deque()  # job ids waiting for an idle worker
+
+    # ----- lifecycle -----
+
+    def serve(self):
+        try:
+            self.listener = Listener((POOL_HOST, POOL_PORT), authkey=_authkey())
+        except OSError as e:
+            log(f"❌ Could not listen on {POOL_HOST}:{POOL_PORT}: {e}")
+            sys.exit(1)
+        threading.Thread(target=self._accept_loop, daemon=True, name="pool-control").start()
+        log(f"🎛️ Control channel on {POOL_HOST}:{POOL_PORT}")
+
+        self._warm_up()
+        for worker_id in range(self.num_workers):
+            self._spawn(worker_id)
+        log(f"👷 {self.num_workers} workers ready")
+
+        signal.signal(signal.SIGTERM, lambda *_: self._request_shutdown())
+        try:
+            while self._running:
+                self._poll_events(timeout=0.5)
+                with self._lock:
+                    self._reap_workers()
+                    self._enforce_stop_grace()
+                    self._dispatch()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._shutdown()
+
+    def _request_shutdown(self):
+        self._running = False
+
+    def _warm_up(self):
+        start = time.time()
+        for module in WARM_IMPORTS:
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                log(f"⚠️ Warm import of {module} failed: {e}")
+        try:
+            from text_overlay import TextOverlay
+            fonts = TextOverlay().preload_fonts()
+            log(f"🔤 Preloaded {fonts} fonts")
+        except Exception as e:
+            log(f"⚠️ Font preload failed: {e}")
+        log(f"🔥 Warm-up took {time.time() - start:.1f}s")
+
+    def _spawn(self, worker_id: int):
+        parent_conn, child_conn = self._ctx.Pipe()
+        state = self._ctx.Value("i", RUN)
+        inherited = [self.listener] + [w["conn"] for w in self.workers.values()]
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, child_conn, state, os.getpid(), inherited),
+            name=f"automation-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self.workers[worker_id] = {
+            "id": worker_id,
+            "process": process,
+            "conn": parent_conn,
+            "state": state,
+            "job_id": None,
+            "since": datetime.now().isoformat(),
+            "stop_deadline": None,
+        }
+
+    def _shutdown(self):
+        log("🛑 Shutting down worker pool...")
+        with self._lock:
+            for worker in self.workers.values():
+                worker["state"].value = STOP
+                if worker["job_id"] is None:
+                    try:
+                        worker["conn"].send(None)
+                    except OSError:
+                        pass
+        deadline = time.time() + STOP_GRACE_SECONDS
+        for worker in self.workers.values():
+            worker["process"].join(max(0.0, deadline - time.time()))
+            if worker["process"].is_alive():
+                worker["process"].terminate()
+                worker["process"].join(5)
+        if self.listener:
+            self.listener.close()
+
+    # ----- worker events -----
+
+    def _poll_events(self, timeout: float):
+        conns = {w["conn"]: w for w in self.workers.values()}
+        for conn in wait(list(conns), timeout=timeout):
+            worker = conns[conn]
+            try:
+                event = conn.recv()
+            except (EOFError, OSError):
+                continue  # Worker died; _reap_workers handles it
+            with self._lock:
+                self._apply_event(worker, event)
+
+    def _apply_event(self, worker: Dict[str, Any], event: Dict[str, Any]):
+        job = self.jobs.get(event["job_id"])
+        if job is None:
+            return
+        kind = event["event"]
+        job["updated_at"] = datetime.fromtimestamp(event["time"]).isoformat()
+        if kind == "started":
+            job.update(state="running", worker=worker["id"], pid=event["pid"],
+                       log_path=event["log_path"], started_at=job["updated_at"])
+        elif kind == "paused":
+            job["state"] = "paused"
+        elif kind == "resumed":
+            job["state"] = "running"
+        elif kind == "progress":
+            for field in ("current_topic", "items_produced"):
+                if field in event:
+                    job[field] = event[field]
+        elif kind in TERMINAL_STATES:
+            job.update(state=kind, error=event.get("error"), current_topic=None)
+            worker.update(job_id=None, stop_deadline=None, since=job["updated_at"])
+            log(f"{'✅' if kind == 'completed' else '⏹️' if kind == 'stopped' else '❌'} "
+                f"Job {job['id']} {kind} on worker {worker['id']}"
+                + (f": {job['error']}" if job["error"] else ""))
+
+    def _reap_workers(self):
+        """Replace workers that died or were terminated."""
+        for worker_id, worker in list(self.workers.items()):
+            if worker["process"].is_alive():
+                continue
+            job = self.jobs.get(worker["job_id"]) if worker["job_id"] else None
+            if job and job["state"] not in TERMINAL_STATES:
+                if job["requested"] == "stop":
+                    job.update(state="stopped", error=None)
+                else:
+                    job.update(state="error", error=f"Worker exited unexpectedly (code {worker['process'].exitcode})")
+                job.update(current_topic=None, updated_at=datetime.now().isoformat())
+            worker["conn"].close()
+            log(f"♻️ Respawning worker {worker_id}")
+            del self.workers[worker_id]
+            self._spawn(worker_id)
+
+    def _enforce_stop_grace(self):
+        now = time.time()
+        for worker in self.workers.values():
+            if worker["stop_deadline"] and now > worker["stop_deadline"]:
+                log(f"⏱️ Job {worker['job_id']} ignored stop for {STOP_GRACE_SECONDS:.0f}s, terminating worker {worker['id']}")
+                worker["stop_deadline"] = None
+                worker["process"].terminate()
+                worker["process"].join(5)
+                if worker["process"].is_alive():
+                    worker["process"].kill()
+                    worker["process"].join()
+
+    def _dispatch(self):
+        """Hand pending jobs (not paused) to idle workers."""
+        idle = [w for w in self.workers.values() if w["job_id"] is None and w["process"].is_alive()]
+        for job_id in list(self.pending):
+            if not idle:
+                return
+            job = self.jobs[job_id]
+            if job["requested"] == "pause":
+                continue
+            self.pending.remove(job_id)
+            worker = idle.pop(0)
+            worker["state"].value = RUN
+            worker["job_id"] = job_id
+            worker["since"] = datetime.now().isoformat()
+            job.update(state="starting", worker=worker["id"])
+            worker["conn"].send(job["spec"])
+
+    # ----- control channel -----
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                if not self._running:
+                    return
+                continue
+            except Exception as e:  # e.g. AuthenticationError
+                log(f"⚠️ Rejected control connection: {e}")
+                continue
+            with conn:
+                try:
+                    request = conn.recv()
+                    with self._lock:
+                        reply = self._handle(request)
+                    conn.send(reply)
+                except (EOFError, OSError):
+                    pass
+
+    def _handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        cmd = request.get("cmd")
+        if cmd == "status":
+            return {"ok": True, "status": self._snapshot()}
+        if cmd == "submit":
+            return self._submit(request["job"])
+        if cmd in ("pause", "resume", "stop"):
+            return self._control(request["job_id"], {"pause": "pause", "resume": "run", "stop": "stop"}[cmd])
+        if cmd == "shutdown":
+            self._running = False
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+    def _submit(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = spec["id"]
+        existing = self.jobs.get(job_id)
+        if existing and existing["state"] not in TERMINAL_STATES:
+            return {"ok": False, "error": f"Job {job_id} is already {existing['state']}"}
+        now = datetime.now().isoformat()
+        self.jobs[job_id] = {
+            "id": job_id,
+            "kind": spec["kind"],
+            "name": spec.get("name", job_id),
+            "spec": spec,
+            "state": "queued",
+            "requested": "run",
+            "worker": None,
+            "pid": None,
+            "current_topic": None,
+            "items_produced": 0,
+            "error": None,
+            "log_path": job_log_path(job_id),
+            "submitted_at": now,
+            "started_at": None,
+            "updated_at": now,
+        }
+        self.pending.append(job_id)
+        log(f"📥 Queued {spec['kind']} job {job_id}")
+        return {"ok": True, "job": self._public(self.jobs[job_id])}
+
+    def _control(self, job_id: str, requested: str) -> Dict[str, Any]:
+        job = self.jobs.get(job_id)
+        if job is None or job["state"] in TERMINAL_STATES:
+            return {"ok": False, "error": f"Job {job_id} is not active"}
+        if job["requested"] == "stop":
+            return {"ok": False, "error": f"Job {job_id} is stopping"}
+        job["requested"] = requested
+        job["updated_at"] = datetime.now().isoformat()
+
+        if job_id in self.pending:
+            if requested == "stop":
+                self.pending.remove(job_id)
+                job["state"] = "stopped"
+            return {"ok": True, "job": self._public(job)}
+
+        worker = self.workers.get(job["worker"])
+        if worker and worker["job_id"] == job_id:
+            worker["state"].value = REQUESTS[requested]
+            if requested == "stop":
+                worker["stop_deadline"] = time.time() + STOP_GRACE_SECONDS
+        return {"ok": True, "job": self._public(job)}
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if k != "spec"}
+
+    def _snapshot(self) -> Dict[str, Any]:
+        workers = []
+        for worker in sorted(self.workers.values(), key=lambda w: w["id"]):
+            job = self.jobs.get(worker["job_id"]) if worker["job_id"] else None
+            workers.append({
+                "id": worker["id"],
+                "pid": worker["process"].pid,
+                "alive": worker["process"].is_alive(),
+                "state": job["state"] if job else "idle",
+                "job_id": worker["job_id"],
+                "current_topic": job["current_topic"] if job else None,
+                "items_produced": job["items_produced"] if job else 0,
+                "since": worker["since"],
+                "stopping": worker["stop_deadline"] is not None,
+            })
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "workers": workers,
+            "pending": list(self.pending),
+            "jobs": {job_id: self._public(job) for job_id, job in self.jobs.items()},
+        }
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class AutomationPoolClient:
+    """Talks to the supervisor over the local control channel."""
+
+    def __init__(self, host: str = POOL_HOST, port: int = POOL_PORT):
+        self.address = (host, port)
+
+    def _call(self, cmd: str, **fields) -> Dict[str, Any]:
+        try:
+            with Client(self.address, authkey=_authkey()) as conn:
+                conn.send({"cmd": cmd, **fields})
+                return conn.recv()
+        except (ConnectionRefusedError, EOFError, OSError) as e:
+            raise PoolUnavailable(f"Automation worker pool not reachable at {self.address}: {e}")
+
+    def is_running(self) -> bool:
+        try:
+            self._call("status")
+            return True
+        except PoolUnavailable:
+            return False
+
+    def ensure_running(self, workers: int = DEFAULT_WORKERS, timeout: float = POOL_START_TIMEOUT):
+        """Start the pool in the background if it isn't up yet."""
+        if self.is_running():
+            return
+        log(f"🚀 Starting automation worker pool ({workers} workers), log: {POOL_LOG_FILE}")
+        with open(POOL_LOG_FILE, "a") as log_file:
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "serve", "--workers", str(workers)],
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                start_new_session=True  # Outlives the Streamlit session
+            )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.is_running():
+                return
+            time.sleep(0.2)
+        raise PoolUnavailable(f"Worker pool did not start within {timeout:.0f}s (see {POOL_LOG_FILE})")
+
+    def submit(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call("submit", job=job)
+
+    def pause(self, job_id: str) -> Dict[str, Any]:
+        return self._call("pause", job_id=job_id)
+
+    def resume(self, job_id: str) -> Dict[str, Any]:
+        return self._call("resume", job_id=job_id)
+
+    def stop(self, job_id: str) -> Dict[str, Any]:
+        return self._call("stop", job_id=job_id)
+
+    def status(self) -> Dict[str, Any]:
+        return self._call("status")["status"]
+
+    def shutdown(self) -> Dict[str, Any]:
+        return self._call("shutdown")
+
+
+def print_status(status: Dict[str, Any]):
+    print(f"\n👷 Automation worker pool (pid {status['pid']}, up since {status['started_at']})")
+    for worker in status["workers"]:
+        line = f"   worker {worker['id']} pid {worker['pid']:<7} {worker['state']:<9}"
+        if worker["job_id"]:
+            line += f" job {worker['job_id']}  items {worker['items_produced']}"
+            if worker["current_topic"]:
+                line += f"  topic: {worker['current_topic']}"
+            if worker["stopping"]:
+                line += "  (stopping)"
+        print(line)
+    if status["pending"]:
+        print(f"   pending: {', '.join(status['pending'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Automation worker pool")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Run the supervisor and workers (foreground)")
+    serve.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Worker processes (default: {DEFAULT_WORKERS})")
+    status = sub.add_parser("status", help="Print live worker status")
+    status.add_argument("--json", action="store_true", help="Raw JSON output")
+    sub.add_parser("shutdown", help="Stop the pool")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        Supervisor(args.workers).serve()
+        return
+
+    client = AutomationPoolClient()
+    try:
+        if args.command == "status":
+            pool_status = client.status()
+            if args.json:
+                print(json.dumps(pool_status, indent=2))
+            else:
+                print_status(pool_status)
+        elif args.command == "shutdown":
+            client.shutdown()
+            print("🛑 Shutdown requested")
+    except PoolUnavailable as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,41 @@ CLAUDE_MAX_TOKENS = 16384
 CLAUDE_MAX_ITERATIONS = 25
 
 
+# =============================================================================
+# AGENT SESSION STORE
+# =============================================================================
+# Sessions are persisted to the agent_sessions table and cached in-process.
+# The cache is bounded by count, idle time and approximate memory footprint.
+# =============================================================================
+AGENT_SESSION_CACHE_SIZE = 200                   # Max sessions held in memory
+AGENT_SESSION_IDLE_TTL_SECONDS = 30 * 60         # Evict from memory after idle
+AGENT_SESSION_MEMORY_BUDGET_BYTES = 64 * 1024 * 1024
+AGENT_SESSION_RETENTION_DAYS = 14                # Purge from disk after idle
+
+# Token budget for conversation history resent on each agent loop iteration.
+# Older turns beyond the budget are folded into a short summary message.
+AGENT_HISTORY_TOKEN_BUDGET = 60000
+
+# Tool results larger than this are truncated before being sent back to Claude
+AGENT_MAX_TOOL_RESULT_CHARS = 20000
+
+
+# =============================================================================
+# IMAGE DERIVATIVES
+# =============================================================================
+# Thumbnails/previews are WebP files written next to the original
+# (<dir>/derivatives/) and, in production, uploaded under a GCS prefix.
+# /api/images/resize serves other widths from an on-disk cache.
+# =============================================================================
+DERIVATIVES_GCS_PREFIX = "derivatives"
+
+# Widths the resize endpoint will produce (other widths are rejected)
+IMAGE_RESIZE_WIDTHS = (135, 270, 540, 720, 1080)
+
+# Cached resizes are pruned once the cache directory grows past this
+IMAGE_RESIZE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
 # =============================================================================
 # ENVIRONMENT DETECTION
 # =============================================================================
@@ -1,7 +1,8 @@
 """SQLite database configuration with SQLAlchemy."""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import get_settings
+from .services.tracing import begin_span, end_span
 
 settings = get_settings()
 
@@ -19,6 +20,27 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# Time every commit (flush included) as a db_commit span - see tracing.py
+@event.listens_for(SessionLocal, "before_commit")
+def _start_commit_span(session):
+    session.info["commit_span"] = begin_span("db_commit", provider=engine.dialect.name)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _end_commit_span(session):
+    node = session.info.pop("commit_span", None)
+    if node is not None:
+        end_span(node)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _fail_commit_span(session):
+    # A commit that raised rolls back instead of reaching after_commit
+    node = session.info.pop("commit_span", None)
+    if node is not None:
+        end_span(node, error="rollback")
+
+
 def get_db():
     """Dependency to get database session."""
     db = SessionLocal()
@@ -31,4 +53,6 @@ def get_db():
 def init_db():
     """Initialize database tables."""
     from . import models  # Import models to register them
+    from .services import gallery_stats  # noqa: F401 - keeps gallery_counters in step
+    from .services import asset_store  # noqa: F401 - keeps asset_blobs refcounts in step
     Base.metadata.create_all(bind=engine)
@@ -11,7 +11,7 @@ from slowapi.errors import RateLimitExceeded
 
 from .config import get_settings, IS_PRODUCTION
 from .database import init_db
-from .routers import projects, scripts, slides, images, automations, tiktok, agent, gallery, inspiration, storage, video
+from .routers import projects, scripts, slides, images, automations, tiktok, agent, gallery, inspiration, storage, video, metrics
 from .websocket.progress import router as ws_router
 from .middleware import (
     verify_api_key,
@@ -49,6 +49,13 @@ async def lifespan(app: FastAPI):
     settings.generated_videos_dir.mkdir(parents=True, exist_ok=True)
     settings.generated_slides_dir.mkdir(parents=True, exist_ok=True)
 
+    # Serialize agent tool definitions once so the first chat request doesn't pay for it
+    try:
+        from .services.prompt_cache import get_cached_tool_definitions
+        get_cached_tool_definitions()
+    except Exception as e:
+        logger.error(f"Failed to precompute agent tool definitions: {e}")
+
     # Start the automation scheduler
     try:
         from .services.scheduler import get_scheduler
@@ -172,6 +179,13 @@ app.include_router(
     tags=["slides"],
     dependencies=protected_routes
 )
+# Public resize endpoint - NO AUTH required (<img> tags can't send the API key).
+# Registered before images.router so /resize isn't captured by /{slide_id}.
+app.include_router(
+    images.public_router, 
+    prefix="/api/images", 
+    tags=["images-public"]
+)
 app.include_router(
     images.router, 
     prefix="/api/images", 
@@ -221,6 +235,11 @@ app.include_router(
     tags=["video"],
     dependencies=protected_routes
 )
+app.include_router(
+    metrics.router, 
+    tags=["metrics"],
+    dependencies=protected_routes
+)
 app.include_router(ws_router, tags=["websocket"])  # WebSocket doesn't use HTTP auth
 
 
@@ -3,7 +3,13 @@ from .slide import Slide
 from .slide_version import SlideVersion
 from .automation import Automation
 from .automation_run import AutomationRun
+from .automation_run_trace import AutomationRunTrace
 from .generation_log import GenerationLog
 from .gallery_item import GalleryItem
+from .gallery_counter import GalleryCounter
+from .asset_blob import AssetBlob
+from .agent_session import AgentSession
+from .tiktok_publish import TikTokPublish
+from .tiktok_limit_hit import TikTokLimitHit
 
-__all__ = ["Project", "Slide", "SlideVersion", "Automation", "AutomationRun", "GenerationLog", "GalleryItem"]
+__all__ = ["Project", "Slide", "SlideVersion", "Automation", "AutomationRun", "AutomationRunTrace", "GenerationLog", "GalleryItem", "GalleryCounter", "AssetBlob", "AgentSession", "TikTokPublish", "TikTokLimitHit"]
@@ -0,0 +1,43 @@
+"""Agent chat session model for persisting conversation history."""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, JSON, Integer
+from ..database import Base
+
+
+class AgentSession(Base):
+    """Persisted agent conversation.
+    
+    The in-process SessionManager keeps a bounded LRU cache of these rows;
+    this table is the source of truth so sessions survive restarts and are
+    shared between uvicorn workers.
+    """
+    
+    __tablename__ = "agent_sessions"
+    
+    id = Column(String(36), primary_key=True)
+    
+    # Conversation history (user/assistant text turns only)
+    messages = Column(JSON, default=list)
+    tool_calls = Column(JSON, default=list)
+    
+    # Bumped on every write: other workers detect a stale cache with it, and
+    # writes only apply to the version they read (optimistic locking)
+    version = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_active = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f"<AgentSession {self.id[:8]} - {len(self.messages or [])} messages>"
+    
+    def to_dict(self):
+        """Convert to the dict shape used by SessionManager."""
+        return {
+            "id": self.id,
+            "messages": list(self.messages or []),
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "last_active": self.last_active.isoformat() if self.last_active else None,
+            "tool_calls": list(self.tool_calls or []),
+            "version": self.version or 0,
+        }
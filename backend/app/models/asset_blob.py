@@ -0,0 +1,40 @@
+"""AssetBlob model - content-addressed slide images shared by slides and versions."""
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from ..database import Base
+
+
+class AssetBlob(Base):
+    """
+    One stored image, named by the hash of its pixels (see services/asset_store.py).
+
+    Slides and slide versions point at a blob through their image path
+    columns (the local path or its GCS URL); refcount is how many such
+    pointers exist. Blobs that drop to 0 are removed by the garbage collector.
+    """
+
+    __tablename__ = "asset_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    path = Column(String(500), nullable=False, unique=True)
+    url = Column(String(500), nullable=True, index=True)  # GCS copy, once published
+    size = Column(Integer, nullable=False, default=0)
+    refcount = Column(Integer, nullable=False, default=0)
+
+    # Also restarted whenever a blob is handed out for reuse, so the garbage
+    # collector's grace period covers slides that haven't committed yet
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AssetBlob {self.hash[:12]} refs={self.refcount}>"
+
+    def to_dict(self):
+        """Convert to dictionary for API responses."""
+        return {
+            "hash": self.hash,
+            "path": self.path,
+            "url": self.url,
+            "size": self.size,
+            "refcount": self.refcount,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -39,7 +39,7 @@ class AutomationRun(Base):
     # TikTok posting
     tiktok_posted = Column(Boolean, default=False)
     tiktok_publish_id = Column(String(100), nullable=True)
-    tiktok_post_status = Column(String(50), nullable=True)  # pending, processing, success, failed
+    tiktok_post_status = Column(String(50), nullable=True)  # pending, processing, success, failed, deferred
     tiktok_error = Column(Text, nullable=True)
     
     # Instagram posting
@@ -56,6 +56,9 @@ class AutomationRun(Base):
     settings_used = Column(JSON, default=dict)  # Snapshot of settings at run time
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Relationships
+    trace = relationship("AutomationRunTrace", back_populates="run", uselist=False, cascade="all, delete-orphan")
+    
     def __repr__(self):
         return f"<AutomationRun {self.id[:8]} - {self.status}>"
     
@@ -0,0 +1,43 @@
+"""Span tree recorded for one automation run."""
+from datetime import datetime
+from sqlalchemy import Column, String, Float, DateTime, JSON, ForeignKey
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+class AutomationRunTrace(Base):
+    """Per-stage timing for an AutomationRun (see tracing.py).
+    
+    Kept in its own table rather than as a column on automation_runs:
+    init_db only creates missing tables, it doesn't add columns to
+    existing ones.
+    """
+    
+    __tablename__ = "automation_run_traces"
+    
+    run_id = Column(String(36), ForeignKey("automation_runs.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Wall time of the whole run and seconds per stage name (parallel spans add up)
+    total_seconds = Column(Float, nullable=True)
+    stage_totals = Column(JSON, default=dict)
+    
+    # Nested span tree: {name, start, duration, status, provider, model, children}
+    spans = Column(JSON, default=dict)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    run = relationship("AutomationRun", back_populates="trace")
+    
+    def __repr__(self):
+        return f"<AutomationRunTrace {self.run_id[:8]} - {self.total_seconds or 0:.1f}s>"
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses."""
+        return {
+            "run_id": self.run_id,
+            "total_seconds": self.total_seconds,
+            "stage_totals": self.stage_totals or {},
+            "spans": self.spans or {},
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -0,0 +1,26 @@
+"""GalleryCounter model - running gallery item counts for the dashboard stats."""
+from sqlalchemy import Column, String, Integer
+from ..database import Base
+
+
+class GalleryCounter(Base):
+    """
+    One running count of gallery items, kept in step with gallery_items by
+    services/gallery_stats.py inside the same transaction as the change.
+
+    (dimension, value) pairs:
+    - ("total", "")             every item
+    - ("type", item_type)       items per type
+    - ("status", status)        items per status
+    - ("project", project_id)   items per project
+    - ("projects", "")          projects with at least one item
+    """
+
+    __tablename__ = "gallery_counters"
+
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(50), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<GalleryCounter {self.dimension}={self.value}: {self.count}>"
@@ -49,7 +49,7 @@ class Slide(Base):
         return f"<Slide {self.order_index}: {self.title[:30] if self.title else 'Untitled'}>"
     
     def create_version(self, db, change_type: str, change_description: str = None, font: str = None, theme: str = None):
-        """Create a new version snapshot of this slide."""
+        """Create a new version snapshot of this slide (call after updating it - images are shared, not copied)."""
         from .slide_version import SlideVersion
         
         self.current_version += 1
@@ -70,3 +70,28 @@ class Slide(Base):
         )
         db.add(version)
         return version
+
+    def restore_version(self, db, version):
+        """
+        Point the slide back at a version's content and images.
+
+        Images are content-addressed blobs shared with the version, so this
+        swaps pointers instead of copying files. Records the revert as a new
+        version and returns it.
+        """
+        self.title = version.title
+        self.subtitle = version.subtitle
+        self.visual_description = version.visual_description
+        self.narration = version.narration
+        self.current_font = version.font
+        self.current_theme = version.theme
+        self.final_image_path = version.final_image_path
+        self.background_image_path = version.background_image_path
+        self.image_status = "complete"
+        return self.create_version(
+            db=db,
+            change_type="revert",
+            change_description=f"Reverted to version {version.version_number}",
+            font=version.font,
+            theme=version.theme
+        )
@@ -0,0 +1,24 @@
+"""TikTokLimitHit model - times TikTok refused a post for too many pending drafts."""
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey
+from ..database import Base
+
+
+class TikTokLimitHit(Base):
+    """
+    One spam_risk_too_many_pending_share answer from TikTok.
+
+    services/publish_watcher.py pauses posting for LIMIT_COOLDOWN after the
+    latest one. Kept in the database so the pause holds across restarts and
+    every worker sees it.
+    """
+
+    __tablename__ = "tiktok_limit_hits"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String(36), ForeignKey("automation_runs.id", ondelete="SET NULL"), nullable=True)
+    error = Column(Text, nullable=True)
+    hit_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<TikTokLimitHit {self.hit_at:%Y-%m-%d %H:%M}>"
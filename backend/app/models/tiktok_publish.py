@@ -0,0 +1,59 @@
+"""TikTokPublish model - in-flight TikTok publish_ids watched for status changes."""
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey
+from ..database import Base
+
+
+class TikTokPublish(Base):
+    """
+    One post or upload sent to TikTok, polled by services/publish_watcher.py
+    until it settles.
+
+    state is the watcher's view of TikTok's status:
+    - processing   TikTok is still pulling/processing the media
+    - inbox        delivered to the creator's drafts; counts toward the
+                   pending-share limit until it is published
+    - published    the creator published it
+    - failed       TikTok rejected it (fail_reason says why)
+    - expired      stopped watching (older than the pending-share window)
+    """
+
+    __tablename__ = "tiktok_publishes"
+
+    publish_id = Column(String(100), primary_key=True)
+    run_id = Column(String(36), ForeignKey("automation_runs.id", ondelete="SET NULL"), nullable=True, index=True)
+    kind = Column(String(20), default="photo")  # photo, video
+
+    state = Column(String(20), nullable=False, default="processing", index=True)
+    tiktok_status = Column(String(50), nullable=True)  # Raw status from the status endpoint
+    fail_reason = Column(Text, nullable=True)
+    post_id = Column(String(100), nullable=True)
+
+    # Polling
+    checks = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)  # Consecutive failed status calls
+    next_check_at = Column(DateTime, nullable=True, index=True)  # None once settled
+    last_checked_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    settled_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<TikTokPublish {self.publish_id} - {self.state}>"
+
+    def to_dict(self):
+        """Convert to dictionary for API responses."""
+        return {
+            "publish_id": self.publish_id,
+            "run_id": self.run_id,
+            "kind": self.kind,
+            "state": self.state,
+            "tiktok_status": self.tiktok_status,
+            "fail_reason": self.fail_reason,
+            "post_id": self.post_id,
+            "checks": self.checks,
+            "next_check_at": self.next_check_at.isoformat() if self.next_check_at else None,
+            "last_checked_at": self.last_checked_at.isoformat() if self.last_checked_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "settled_at": self.settled_at.isoformat() if self.settled_at else None,
+        }
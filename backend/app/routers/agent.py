@@ -82,7 +82,8 @@ async def chat(request: AgentChatRequest):
                 )
                 for tc in result.get("tool_calls", [])
             ],
-            iterations=result.get("iterations", 0)
+            iterations=result.get("iterations", 0),
+            usage=result.get("usage")
         )
         
     except ValueError as e:
@@ -107,7 +108,7 @@ async def chat_stream(
     - text: {"text": "..."} - Streaming text chunks
     - tool_start: {"tool_name": "...", "tool_input": {...}} - Tool execution starting
     - tool_result: {"tool_name": "...", "result": {...}, "success": bool} - Tool completed
-    - done: {"iterations": N, "tool_count": M} - Response complete
+    - done: {"iterations": N, "tool_count": M, "usage": {...}} - Response complete
     - error: {"message": "..."} - Error occurred
     """
     # Verify API key for SSE endpoint
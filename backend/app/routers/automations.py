@@ -832,6 +832,28 @@ async def get_automation_run(
     return run.to_dict()
 
 
+@router.get("/{automation_id}/runs/{run_id}/trace")
+async def get_automation_run_trace(
+    automation_id: str,
+    run_id: str,
+    db: Session = Depends(get_db)
+):
+    """Get the per-stage span tree recorded for a run."""
+    from ..models import AutomationRun
+    
+    run = db.query(AutomationRun).filter(
+        AutomationRun.id == run_id,
+        AutomationRun.automation_id == automation_id
+    ).first()
+    
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if not run.trace:
+        raise HTTPException(status_code=404, detail="No trace recorded for this run")
+    
+    return run.trace.to_dict()
+
+
 @router.post("/{automation_id}/runs/{run_id}/post-now")
 async def post_run_now(
     automation_id: str,
@@ -851,7 +873,7 @@ async def post_run_now(
         platform: 'tiktok', 'instagram', or 'both'
     """
     from ..models import AutomationRun
-    from ..services.tiktok_poster import TikTokPoster
+    from ..services.publish_watcher import post_run
     from ..services.instagram_poster import InstagramPoster
     
     # Get the run
@@ -882,22 +904,13 @@ async def post_run_now(
     # Post to TikTok
     if platform in ("tiktok", "both"):
         try:
-            poster = TikTokPoster()
-            result = poster.post_photo_slideshow(
-                image_paths=run.image_paths,
-                caption=caption
-            )
+            result = post_run(db, run, caption=caption)
             
             if result.get("success"):
-                run.tiktok_posted = True
-                run.tiktok_publish_id = result.get("publish_id")
-                run.tiktok_post_status = "pending"
-                run.tiktok_error = None
                 results["tiktok"] = {"success": True, "publish_id": result.get("publish_id")}
             else:
-                run.tiktok_post_status = "failed"
-                run.tiktok_error = result.get("error", "Unknown error")
-                results["tiktok"] = {"success": False, "error": run.tiktok_error}
+                results["tiktok"] = {"success": False, "deferred": bool(result.get("deferred")),
+                                     "error": run.tiktok_error}
         except Exception as e:
             run.tiktok_post_status = "failed"
             run.tiktok_error = str(e)
@@ -954,11 +967,12 @@ async def retry_tiktok_post(
     Use this when a slideshow was generated successfully but TikTok posting failed
     (e.g., due to rate limiting like spam_risk_too_many_pending_share).
     
-    Note: TikTok allows max 5 pending drafts per 24 hours. If you get this error,
-    clear some drafts from your TikTok app first.
+    Note: TikTok allows max 5 pending drafts per 24 hours. While the drafts are
+    full the run is deferred instead, and the publish watcher posts it once
+    some drafts have been published or deleted.
     """
     from ..models import AutomationRun
-    from ..services.tiktok_poster import TikTokPoster
+    from ..services.publish_watcher import post_run
     
     # Get the run
     run = db.query(AutomationRun).filter(
@@ -991,23 +1005,10 @@ async def retry_tiktok_post(
         }
     
     try:
-        poster = TikTokPoster()
-        
-        # Generate caption from topic
-        caption = f"{run.topic} #philosophy #stoicism #wisdom #motivation"
-        
-        # Attempt to post
-        result = poster.post_photo_slideshow(
-            image_paths=run.image_paths,
-            caption=caption
-        )
+        # Attempt to post (caption from topic); deferred if the drafts are full
+        result = post_run(db, run)
         
         if result.get("success"):
-            run.tiktok_posted = True
-            run.tiktok_publish_id = result.get("publish_id")
-            run.tiktok_post_status = "pending"  # TikTok is processing
-            run.tiktok_error = None
-            run.status = "posted"
             db.commit()
             
             return {
@@ -1016,10 +1017,17 @@ async def retry_tiktok_post(
                 "publish_id": result.get("publish_id"),
                 "image_count": result.get("image_count")
             }
+        elif result.get("deferred"):
+            db.commit()
+            
+            return {
+                "success": False,
+                "deferred": True,
+                "error": run.tiktok_error,
+                "message": "TikTok drafts are full - the run will be posted once there is room"
+            }
         else:
-            error_msg = result.get("error", "Unknown error")
-            run.tiktok_post_status = "failed"
-            run.tiktok_error = error_msg
+            error_msg = run.tiktok_error
             db.commit()
             
             return {
@@ -1039,6 +1047,13 @@ async def retry_tiktok_post(
 # SCHEDULER STATUS
 # =============================================================================
 
+@router.get("/tiktok/publishes")
+async def get_tiktok_publishes(db: Session = Depends(get_db)):
+    """Pending TikTok drafts, deferred runs and the posts the publish watcher is following."""
+    from ..services.publish_watcher import watcher_status
+    return watcher_status(db)
+
+
 @router.get("/scheduler/status")
 async def get_scheduler_status():
     """Get the status of the background scheduler."""
@@ -7,6 +7,8 @@ from pydantic import BaseModel
 
 from ..database import get_db
 from ..models.gallery_item import GalleryItem
+from ..services.derivatives import derivative_url
+from ..services import gallery_stats
 
 router = APIRouter(prefix="/api/gallery", tags=["gallery"])
 
@@ -100,6 +102,15 @@ async def list_gallery_items(
     
     total = query.count()
     items = query.order_by(desc(GalleryItem.created_at)).offset(offset).limit(limit).all()
+
+    # Backfill thumbnails for items created before derivatives existed
+    backfilled = False
+    for item in items:
+        if item.image_url and not item.thumbnail_url:
+            item.thumbnail_url = derivative_url(item.image_url, "thumb")
+            backfilled = True
+    if backfilled:
+        db.commit()
     
     return GalleryListResponse(
         items=[GalleryItemResponse(**item.to_dict()) for item in items],
@@ -122,7 +133,7 @@ async def create_gallery_item(
         subtitle=item.subtitle,
         description=item.description,
         image_url=item.image_url,
-        thumbnail_url=item.thumbnail_url,
+        thumbnail_url=item.thumbnail_url or derivative_url(item.image_url, "thumb"),
         text_content=item.text_content,
         font=item.font,
         theme=item.theme,
@@ -202,25 +213,5 @@ async def clear_gallery(
 async def get_gallery_stats(
     db: Session = Depends(get_db),
 ):
-    """Get gallery statistics."""
-    total = db.query(GalleryItem).count()
-    
-    # Count by type
-    types = {}
-    for item_type in ["slide", "script", "prompt", "image", "project"]:
-        types[item_type] = db.query(GalleryItem).filter(GalleryItem.item_type == item_type).count()
-    
-    # Count by status
-    statuses = {}
-    for status in ["complete", "draft", "failed"]:
-        statuses[status] = db.query(GalleryItem).filter(GalleryItem.status == status).count()
-    
-    # Unique projects
-    projects = db.query(GalleryItem.project_id).filter(GalleryItem.project_id.isnot(None)).distinct().count()
-    
-    return {
-        "total": total,
-        "by_type": types,
-        "by_status": statuses,
-        "unique_projects": projects,
-    }
+    """Get gallery statistics (from the maintained counters - constant cost)."""
+    return gallery_stats.get_gallery_stats(db)
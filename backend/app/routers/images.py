@@ -1,24 +1,31 @@
 """Images API router - Image generation for slides."""
 import os
 import sys
+import logging
 import asyncio
 from pathlib import Path
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models import Project, Slide
 from ..schemas import ImageGenerateRequest, ImageGenerateResponse, ImageBatchGenerateRequest
-from ..config import get_settings
+from ..config import get_settings, IMAGE_RESIZE_WIDTHS
 from ..websocket.progress import manager
 from ..services.prompt_config import get_image_prompt, IMAGE_STYLES
 from ..services.cloud_storage import get_storage_service
+from ..services.derivatives import get_resized, publish_derivatives
+from ..services.asset_store import asset_exists, collect_garbage, is_stored, publish_asset, put_asset, touch_asset
 
 # Add parent dir to path for theme_config
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
+public_router = APIRouter()  # Resized previews - no auth required (used in <img> tags)
 settings = get_settings()
 
 
@@ -56,6 +63,46 @@ def get_text_overlay():
     return TextOverlay(fonts_dir=fonts_dir, default_style="modern")
 
 
+_background_index = None
+
+
+def get_background_index():
+    """Perceptual-hash index of stored backgrounds (shared by every request)."""
+    global _background_index
+    if _background_index is None:
+        from ..services.image_dedupe import PerceptualIndex
+        db_path = settings.base_dir / ".image_index" / "backgrounds.db"
+        _background_index = PerceptualIndex(db_path)
+    return _background_index
+
+
+def store_background(db: Session, blob, storage) -> str:
+    """
+    Persist a generated background (an asset store blob), reusing an already
+    stored near-duplicate (re-rolls of the same prompt often come back
+    practically identical).
+
+    Returns the GCS URL or local path the slide should point at.
+    """
+    index = get_background_index()
+    value = index.hash(blob.path)
+    for match in index.find(value):
+        # Touching the reused blob restarts its GC grace period until the slide commits
+        if match.meta.get("hash") and not touch_asset(db, match.meta["hash"]):
+            # Garbage-collected since it was indexed
+            index.remove(match.key)
+            continue
+        stored = match.meta.get("url") or match.meta.get("path")
+        if match.meta.get("url") or (stored and Path(stored).exists()):
+            logger.info(f"Background matches {match.key} ({match.distance} bits), reusing {stored}")
+            return stored
+
+    stored = publish_asset(blob, storage, "backgrounds")
+    meta = {"url": blob.url} if blob.url else {"path": blob.path}
+    index.add(Path(blob.path).name, value, hash=blob.hash, **meta)
+    return stored
+
+
 async def generate_single_image(
     slide: Slide,
     model: str,
@@ -112,6 +159,7 @@ async def generate_single_image(
 
         # Use the centralized get_image_prompt function
         # This prioritizes the visual description and applies the appropriate style
+        theme = None  # Only the legacy theme system below sets one
         if image_style in IMAGE_STYLES:
             visual_desc = get_image_prompt(
                 visual_description=base_visual,
@@ -153,13 +201,12 @@ AVOID: {image_config.negative_prompt}"""
         if not background_path:
             raise Exception("Background generation returned no result")
 
-        # Upload background to GCS for persistence
+        # Store the background by content, then upload it to GCS for
+        # persistence (or reuse a stored near-duplicate)
         storage = get_storage_service()
-        if storage.is_available:
-            bg_url = storage.upload_file(background_path, "backgrounds")
-            slide.background_image_path = bg_url if bg_url else background_path
-        else:
-            slide.background_image_path = background_path
+        background_blob = put_asset(db, background_path, settings.generated_images_dir)
+        background_path = background_blob.path
+        slide.background_image_path = store_background(db, background_blob, storage)
 
         # Apply programmatic text overlay using Pillow
         overlay = get_text_overlay()
@@ -210,7 +257,22 @@ AVOID: {image_config.negative_prompt}"""
         if is_regeneration:
             change_desc = f"Regenerated with {effective_font} font and {theme_id} theme"
         
-        # Create version snapshot
+        # Store the final image by content (unchanged pixels reuse the stored
+        # file and its GCS copy), then upload it to GCS for persistence
+        final_blob = put_asset(db, final_path)
+        final_path = final_blob.path
+        slide.final_image_path = publish_asset(final_blob, storage, "slides")
+
+        # Thumbnail + preview for galleries and lists
+        derivatives = await asyncio.to_thread(publish_derivatives, final_path, slide.final_image_path)
+        
+        # Update slide
+        slide.current_font = effective_font
+        slide.current_theme = theme_id
+        slide.image_status = "complete"
+        slide.error_message = None
+
+        # Version snapshot of the result (points at the same stored images)
         version = slide.create_version(
             db=db,
             change_type=change_type,
@@ -218,19 +280,6 @@ AVOID: {image_config.negative_prompt}"""
             font=effective_font,
             theme=theme_id
         )
-        
-        # Upload final image to GCS for persistence
-        if storage.is_available:
-            final_url = storage.upload_file(final_path, "slides")
-            slide.final_image_path = final_url if final_url else final_path
-        else:
-            slide.final_image_path = final_path
-        
-        # Update slide
-        slide.current_font = effective_font
-        slide.current_theme = theme_id
-        slide.image_status = "complete"
-        slide.error_message = None
         db.commit()
 
         # Broadcast success - use GCS URL if available
@@ -244,6 +293,8 @@ AVOID: {image_config.negative_prompt}"""
                 "slide_id": slide.id,
                 "slide_index": slide.order_index,
                 "image_url": image_url,
+                "thumbnail_url": derivatives.get("thumb"),
+                "preview_url": derivatives.get("preview"),
                 "version": version.version_number
             })
 
@@ -256,7 +307,9 @@ AVOID: {image_config.negative_prompt}"""
             slide_id=slide.id,
             status="success",
             background_image_url=bg_url,
-            final_image_url=image_url
+            final_image_url=image_url,
+            thumbnail_url=derivatives.get("thumb"),
+            preview_url=derivatives.get("preview")
         )
 
     except Exception as e:
@@ -492,7 +545,20 @@ async def reapply_text_overlay(
         # Store previous font for version description
         old_font = slide.current_font or "unknown"
         
-        # Create a version snapshot before updating
+        # Store by content (same pixels reuse the stored file) and upload to GCS for persistence
+        storage = get_storage_service()
+        final_blob = put_asset(db, final_path)
+        final_path = final_blob.path
+        slide.final_image_path = publish_asset(final_blob, storage, "slides")
+
+        derivatives = await asyncio.to_thread(publish_derivatives, final_path, slide.final_image_path)
+        
+        # Update slide with new values
+        slide.current_font = font
+        slide.image_status = "complete"
+        slide.error_message = None
+
+        # Version snapshot of the result
         version = slide.create_version(
             db=db,
             change_type="font_change",
@@ -500,19 +566,6 @@ async def reapply_text_overlay(
             font=font,
             theme=slide.current_theme
         )
-        
-        # Upload to GCS for persistence
-        storage = get_storage_service()
-        if storage.is_available:
-            final_url = storage.upload_file(final_path, "slides")
-            slide.final_image_path = final_url if final_url else final_path
-        else:
-            slide.final_image_path = final_path
-        
-        # Update slide with new values
-        slide.current_font = font
-        slide.image_status = "complete"
-        slide.error_message = None
         db.commit()
         
         # Return URL - use GCS URL if available
@@ -525,6 +578,8 @@ async def reapply_text_overlay(
             "slide_id": slide.id,
             "font": font,
             "final_image_url": image_url,
+            "thumbnail_url": derivatives.get("thumb"),
+            "preview_url": derivatives.get("preview"),
             "message": f"Text re-applied with {font} font",
             "version": version.version_number
         }
@@ -578,26 +633,9 @@ async def revert_to_version(
         raise HTTPException(status_code=404, detail=f"Version {version_number} not found")
     
     # Check if the version's image still exists
-    if version.final_image_path and os.path.exists(version.final_image_path):
-        # Create a new version marking the revert
-        revert_version = slide.create_version(
-            db=db,
-            change_type="revert",
-            change_description=f"Reverted to version {version_number}",
-            font=version.font,
-            theme=version.theme
-        )
-        
-        # Restore the slide content from the version
-        slide.title = version.title
-        slide.subtitle = version.subtitle
-        slide.visual_description = version.visual_description
-        slide.narration = version.narration
-        slide.current_font = version.font
-        slide.current_theme = version.theme
-        slide.final_image_path = version.final_image_path
-        slide.background_image_path = version.background_image_path
-        slide.image_status = "complete"
+    if asset_exists(version.final_image_path):
+        # Point the slide back at the version's images (no file copies)
+        revert_version = slide.restore_version(db, version)
         db.commit()
         
         return {
@@ -620,11 +658,11 @@ async def delete_slide_image(slide_id: str, db: Session = Depends(get_db)):
     if not slide:
         raise HTTPException(status_code=404, detail="Slide not found")
 
-    # Delete files if they exist
-    if slide.background_image_path and os.path.exists(slide.background_image_path):
-        os.remove(slide.background_image_path)
-    if slide.final_image_path and os.path.exists(slide.final_image_path):
-        os.remove(slide.final_image_path)
+    # Delete files if they exist (stored images may be shared with versions
+    # and other slides; the asset GC removes them once nothing points at them)
+    for path in (slide.background_image_path, slide.final_image_path):
+        if path and os.path.exists(path) and not is_stored(db, path):
+            os.remove(path)
 
     slide.background_image_path = None
     slide.final_image_path = None
@@ -633,3 +671,38 @@ async def delete_slide_image(slide_id: str, db: Session = Depends(get_db)):
     db.commit()
 
     return {"success": True, "message": "Image deleted, slide reset to pending"}
+
+
+@router.post("/assets/gc")
+async def collect_asset_garbage(
+    dry_run: bool = Query(False, description="Only report what would be deleted"),
+    db: Session = Depends(get_db)
+):
+    """Delete stored slide images that no slide or version points at any more."""
+    return await asyncio.to_thread(collect_garbage, db, get_storage_service(), dry_run=dry_run)
+
+
+@public_router.get("/resize")
+async def resize_image(
+    src: str = Query(..., description="/static URL, generated file path or GCS URL of the original"),
+    w: int = Query(270, description=f"Target width, one of {', '.join(map(str, IMAGE_RESIZE_WIDTHS))}")
+):
+    """Serve a WebP resize of one of our images, generated once and cached on disk."""
+    # Only the fixed widths, so the public endpoint can't be used to fill the cache
+    if w not in IMAGE_RESIZE_WIDTHS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"w must be one of {', '.join(map(str, IMAGE_RESIZE_WIDTHS))}"
+        )
+    try:
+        path = await asyncio.to_thread(get_resized, src, w)
+    except OSError as e:
+        raise HTTPException(status_code=422, detail=f"Could not resize image: {e}")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    return FileResponse(
+        str(path),
+        media_type="image/webp",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
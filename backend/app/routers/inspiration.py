@@ -9,9 +9,11 @@ from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form, Bac
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
+from ..services.lazy_imports import lazy_module
+
 # Add parent directory to path so we can import reference_scraper
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
-import reference_scraper
+reference_scraper = lazy_module("reference_scraper")  # imported on the first inspiration request
 
 router = APIRouter(prefix="/api/inspiration", tags=["inspiration"])
 
@@ -77,9 +79,11 @@ class ReferenceDetailResponse(ReferenceResponse):
 
 
 class ReferenceListResponse(BaseModel):
-    """Response for listing references."""
+    """Response for listing references (one page)."""
     references: List[ReferenceResponse]
     total: int
+    limit: int
+    offset: int
 
 
 # ============================================================================
@@ -90,14 +94,25 @@ class ReferenceListResponse(BaseModel):
 async def list_references(
     format_type: Optional[str] = Query(None, description="Filter by format type"),
     tags: Optional[str] = Query(None, description="Filter by tags (comma-separated)"),
+    q: Optional[str] = Query(None, description="Full-text search across title, notes and description"),
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    offset: int = Query(0, ge=0, description="Number of references to skip"),
 ):
-    """List all inspiration references."""
-    tag_list = tags.split(",") if tags else None
-    refs = reference_scraper.list_references(format_type=format_type, tags=tag_list)
+    """List inspiration references (newest first, or by relevance when searching)."""
+    tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else None
+    refs, total = reference_scraper.search_references(
+        query=q,
+        format_type=format_type,
+        tags=tag_list,
+        limit=limit,
+        offset=offset,
+    )
 
     return ReferenceListResponse(
-        references=[ReferenceResponse(**r, is_manual=r.get("is_manual", False)) for r in refs],
-        total=len(refs),
+        references=[ReferenceResponse(**r) for r in refs],
+        total=total,
+        limit=limit,
+        offset=offset,
     )
 
 
@@ -152,10 +167,10 @@ async def get_all_frame_urls(ref_id: str):
 async def scrape_tiktok(data: ReferenceCreate, background_tasks: BackgroundTasks):
     """
     Scrape a TikTok video and add it to the inspiration library.
-    Note: This runs in background as it may take time.
+    Note: yt-dlp + ffmpeg run on a worker thread so the event loop stays free.
     """
-    # Run synchronously for now (could be made async with background task)
-    ref = reference_scraper.add_reference(
+    ref = await asyncio.to_thread(
+        reference_scraper.add_reference,
         url=data.url,
         format_type=data.format_type,
         tags=data.tags,
@@ -182,7 +197,7 @@ async def create_manual_reference(data: ManualReferenceCreate):
         like_count=data.like_count,
     )
 
-    return ReferenceResponse(**ref, is_manual=True)
+    return ReferenceResponse(**ref)
 
 
 @router.post("/{ref_id}/frames")
@@ -226,7 +241,7 @@ async def update_reference(ref_id: str, data: ReferenceUpdate):
     if not ref:
         raise HTTPException(status_code=404, detail="Reference not found")
 
-    return ReferenceResponse(**ref, is_manual=ref.get("is_manual", False))
+    return ReferenceResponse(**ref)
 
 
 @router.delete("/{ref_id}")
@@ -257,22 +272,4 @@ async def list_format_types():
 @router.get("/stats/summary")
 async def get_inspiration_stats():
     """Get statistics about the inspiration library."""
-    refs = reference_scraper.list_references()
-
-    # Count by format type
-    by_format = {}
-    total_frames = 0
-    total_views = 0
-
-    for ref in refs:
-        fmt = ref.get("format_type", "unknown")
-        by_format[fmt] = by_format.get(fmt, 0) + 1
-        total_frames += ref.get("frame_count", 0)
-        total_views += ref.get("view_count", 0)
-
-    return {
-        "total_references": len(refs),
-        "total_frames": total_frames,
-        "total_views": total_views,
-        "by_format": by_format,
-    }
+    return reference_scraper.get_reference_stats()
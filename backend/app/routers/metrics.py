@@ -0,0 +1,22 @@
+"""Pipeline metrics - per-stage latency, in-flight and error counts (see tracing.py)."""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..services.tracing import get_registry, render_prometheus
+from ..websocket.progress import manager as ws_manager
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics for this API process in the Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/summary")
+async def get_metrics_summary():
+    """The same metrics as JSON: count, errors, in-flight and timings per stage/provider/model."""
+    return {"stages": get_registry().snapshot(), "websocket": ws_manager.stats()}
@@ -11,6 +11,8 @@ from ..models import Project, Slide
 from ..schemas import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectList
 from ..schemas.project import SlideResponse
 from ..services.tiktok_poster import TikTokPoster
+from ..services.publish_watcher import track_publish
+from ..services.derivatives import derivative_urls
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +40,7 @@ def project_to_response(project: Project) -> ProjectResponse:
             narration=s.narration,
             background_image_path=s.background_image_path,
             final_image_path=s.final_image_path,
+            **derivative_urls(s.final_image_path),
             image_status=s.image_status,
             created_at=s.created_at
         ) for s in slides],
@@ -216,6 +219,9 @@ async def post_project_to_tiktok(
         
         if result.get("success"):
             logger.info(f"Successfully posted to TikTok: publish_id={result.get('publish_id')}")
+            if result.get("publish_id"):
+                track_publish(db, result["publish_id"])
+                db.commit()
             return {
                 "success": True,
                 "publish_id": result.get("publish_id"),
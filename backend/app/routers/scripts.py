@@ -170,8 +170,8 @@ async def regenerate_slide_script(
             contents=prompt
         )
 
-        import json
-        result = json.loads(handler._clean_json_text(response.text))
+        from ..services.gemini_handler import extract_json
+        result = extract_json(response.text)
 
         slide.title = result.get("title", slide.title)
         slide.subtitle = result.get("subtitle", slide.subtitle)
@@ -283,10 +283,10 @@ async def regenerate_entire_script(
             result = handler.generate_mentor_slideshow(project.topic)
         elif content_type == "list":
             num_slides = len(project.slides) if project.slides else 7
-            result = handler._generate_list_content(project.topic, num_scenes=num_slides)
+            result = handler._generate_list_content(project.topic, num_scenes=num_slides, refresh=True)
         else:
             num_slides = len(project.slides) if project.slides else 10
-            result = handler._generate_narrative_story(project.topic, num_scenes=num_slides)
+            result = handler._generate_narrative_story(project.topic, num_scenes=num_slides, refresh=True)
         
         # Delete old slides
         for slide in project.slides:
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import Project, Slide
 from ..schemas import SlideCreate, SlideUpdate, SlideResponse, SlideReorder
+from ..services.derivatives import derivative_urls
 
 router = APIRouter()
 
@@ -22,6 +23,7 @@ def slide_to_response(slide: Slide) -> SlideResponse:
         narration=slide.narration,
         background_image_path=slide.background_image_path,
         final_image_path=slide.final_image_path,
+        **derivative_urls(slide.final_image_path),
         video_clip_path=slide.video_clip_path,
         image_status=slide.image_status,
         error_message=slide.error_message,
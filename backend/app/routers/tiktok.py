@@ -1,22 +1,29 @@
 """TikTok OAuth and Content Posting API router."""
 import os
 import io
+import asyncio
 import json
 import secrets
 import hashlib
 import base64
 import uuid
-import requests
+
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File, Form
 from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from PIL import Image
+from sqlalchemy.orm import Session
 
 from ..config import get_settings
+from ..database import get_db
+from ..services.http_client import get_session
+from ..services.image_writer import save_image
+from ..services.publish_watcher import track_publish
+from ..services.tiktok_video_upload import upload_video as upload_tiktok_video, TikTokUploadError
 
 settings = get_settings()
 
@@ -253,7 +260,7 @@ async def oauth_callback(
         "code_verifier": code_verifier
     }
     
-    response = requests.post(TOKEN_URL, headers=headers, data=data)
+    response = get_session().post(TOKEN_URL, headers=headers, data=data)
     
     if response.status_code == 200:
         result = response.json()
@@ -325,7 +332,7 @@ async def oauth_callback(
 
 
 @router.post("/upload")
-async def upload_video(req: UploadRequest):
+async def upload_video(req: UploadRequest, db: Session = Depends(get_db)):
     """Upload a video to TikTok drafts (inbox) or publish directly."""
     tokens = load_tokens()
     
@@ -336,82 +343,37 @@ async def upload_video(req: UploadRequest):
     if not video_path.exists():
         raise HTTPException(status_code=404, detail=f"Video file not found: {req.video_path}")
     
-    file_size = video_path.stat().st_size
-    access_token = tokens["access_token"]
-    
     # Choose endpoint
     init_url = INBOX_INIT_URL if req.to_inbox else PUBLISH_INIT_URL
-    
-    if req.to_inbox:
-        init_data = {
-            "source_info": {
-                "source": "FILE_UPLOAD",
-                "video_size": file_size,
-                "chunk_size": file_size,
-                "total_chunk_count": 1
-            }
-        }
-    else:
-        init_data = {
-            "post_info": {
-                "title": req.title,
-                "privacy_level": "SELF_ONLY",
-                "disable_duet": False,
-                "disable_comment": False,
-                "disable_stitch": False,
-                "video_cover_timestamp_ms": 1000
-            },
-            "source_info": {
-                "source": "FILE_UPLOAD",
-                "video_size": file_size,
-                "chunk_size": file_size,
-                "total_chunk_count": 1
-            }
-        }
-    
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json; charset=UTF-8"
+    post_info = None if req.to_inbox else {
+        "title": req.title,
+        "privacy_level": "SELF_ONLY",
+        "disable_duet": False,
+        "disable_comment": False,
+        "disable_stitch": False,
+        "video_cover_timestamp_ms": 1000
     }
     
-    # Step 1: Initialize upload
-    init_response = requests.post(init_url, headers=headers, json=init_data)
-    
-    if init_response.status_code != 200:
-        raise HTTPException(status_code=init_response.status_code, detail=f"Init failed: {init_response.text}")
-    
-    init_result = init_response.json()
-    
-    if "error" in init_result:
-        error_info = init_result.get("error", {})
-        if isinstance(error_info, dict) and error_info.get("code") != "ok":
-            raise HTTPException(status_code=400, detail=f"API Error: {error_info}")
-    
-    data = init_result.get("data", {})
-    upload_url = data.get("upload_url")
-    publish_id = data.get("publish_id")
-    
-    if not upload_url:
-        raise HTTPException(status_code=500, detail="No upload URL in response")
-    
-    # Step 2: Upload video file
-    with open(video_path, 'rb') as f:
-        video_data = f.read()
-    
-    upload_headers = {
-        "Content-Type": "video/mp4",
-        "Content-Length": str(file_size),
-        "Content-Range": f"bytes 0-{file_size - 1}/{file_size}"
-    }
-    
-    upload_response = requests.put(upload_url, headers=upload_headers, data=video_data)
+    # Init + chunked upload streamed from disk; an interrupted upload of the
+    # same file resumes from its last acknowledged chunk
+    try:
+        result = await asyncio.to_thread(
+            upload_tiktok_video, init_url, tokens["access_token"], str(video_path), post_info
+        )
+    except TikTokUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    publish_id = result["publish_id"]
     
-    if upload_response.status_code not in [200, 201, 202]:
-        raise HTTPException(status_code=upload_response.status_code, detail=f"Upload failed: {upload_response.text}")
+    # Drafts count toward TikTok's pending-share limit; the publish watcher follows them
+    if req.to_inbox and publish_id:
+        track_publish(db, publish_id, kind="video")
+        db.commit()
     
     return {
         "status": "success",
         "publish_id": publish_id,
+        "chunks": result["total_chunk_count"],
+        "resumed_from": result["resumed_from"],
         "destination": "inbox" if req.to_inbox else "publish",
         "message": "Video uploaded to TikTok drafts!" if req.to_inbox else "Video published!"
     }
@@ -430,7 +392,7 @@ async def get_upload_status(publish_id: str):
         "Content-Type": "application/json; charset=UTF-8"
     }
     
-    response = requests.post(STATUS_URL, headers=headers, json={"publish_id": publish_id})
+    response = get_session().post(STATUS_URL, headers=headers, json={"publish_id": publish_id})
     
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail=response.text)
@@ -459,7 +421,7 @@ async def refresh_access_token():
         "refresh_token": tokens["refresh_token"]
     }
     
-    response = requests.post(TOKEN_URL, headers=headers, data=data)
+    response = get_session().post(TOKEN_URL, headers=headers, data=data)
     
     if response.status_code == 200:
         result = response.json()
@@ -553,16 +515,6 @@ async def upload_tiktok_media(
         
         # Open with PIL and convert to JPEG
         with Image.open(io.BytesIO(contents)) as img:
-            # Convert to RGB if necessary (PNG might have alpha)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
             # Generate unique filename
             base_name = filename or file.filename or "image"
             base_name = Path(base_name).stem  # Remove extension
@@ -570,8 +522,13 @@ async def upload_tiktok_media(
             output_filename = f"{base_name}_{unique_id}.jpg"
             output_path = tiktok_media_dir / output_filename
             
-            # Save as JPEG
-            img.save(output_path, format='JPEG', quality=95)
+            if img.format == 'JPEG' and img.mode == 'RGB':
+                # Already encoded with the tiktok_jpeg profile by the client -
+                # store as-is instead of adding another generation of JPEG loss
+                output_path.write_bytes(contents)
+            else:
+                # tiktok_jpeg profile (flattens alpha onto white)
+                save_image(img, str(output_path), "tiktok_jpeg")
         
         # Return the public URL
         # This will be accessible at https://api.cofndrly.com/api/tiktok/media/{filename}
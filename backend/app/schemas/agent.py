@@ -27,6 +27,7 @@ class AgentChatResponse(BaseModel):
     response: str = Field(..., description="Agent's text response")
     tool_calls: List[ToolCall] = Field(default_factory=list, description="Tools called during this interaction")
     iterations: int = Field(default=0, description="Number of agentic loop iterations")
+    usage: Optional[Dict[str, Any]] = Field(default=None, description="Token usage incl. prompt-cache reads/writes")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -74,3 +75,5 @@ class AgentStatusResponse(BaseModel):
     max_iterations: int
     active_sessions: int
     available_tools: int
+    session_cache: Optional[Dict[str, Any]] = None
+    prompt_cache: Optional[Dict[str, Any]] = None
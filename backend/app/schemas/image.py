@@ -58,6 +58,8 @@ class ImageGenerateResponse(BaseModel):
     status: str  # 'success', 'error', 'pending'
     background_image_url: Optional[str] = None
     final_image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
     error_message: Optional[str] = None
 
 
@@ -22,6 +22,8 @@ class SlideResponse(BaseModel):
     narration: Optional[str] = None
     background_image_path: Optional[str] = None
     final_image_path: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
     image_status: str = "pending"
     created_at: datetime
 
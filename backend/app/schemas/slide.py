@@ -33,6 +33,8 @@ class SlideResponse(BaseModel):
     narration: Optional[str] = None
     background_image_path: Optional[str] = None
     final_image_path: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
     video_clip_path: Optional[str] = None
     image_status: str
     error_message: Optional[str] = None
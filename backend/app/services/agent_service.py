@@ -8,19 +8,28 @@ Features:
 - Claude Opus 4.5 model with extended thinking
 - Streaming responses for real-time UX
 - Tool calling with full executor integration
-- Session management for conversation history
+- Independent tool calls in one turn run concurrently (see tool_scheduler.py)
+- Persistent, bounded session store (see session_store.py)
+- Prompt caching of tools, system prompt and history (see prompt_cache.py)
 - Graceful error handling
 """
 
 import os
 import json
-import uuid
 from typing import Dict, List, Any, Optional, AsyncGenerator
 from datetime import datetime
-from anthropic import Anthropic
 
-from .agent_tools import TOOL_DEFINITIONS, ToolExecutor, get_tool_definitions
-from ..config import CLAUDE_MODEL, CLAUDE_MAX_TOKENS, CLAUDE_MAX_ITERATIONS
+from .agent_tools import TOOL_DEFINITIONS, ToolExecutor
+from .session_store import SessionManager, build_history_window
+from .prompt_cache import AgentRequestBuilder, CacheMetrics, global_cache_metrics
+from .tool_scheduler import ParallelToolRunner
+from ..config import (
+    CLAUDE_MODEL,
+    CLAUDE_MAX_TOKENS,
+    CLAUDE_MAX_ITERATIONS,
+    AGENT_HISTORY_TOKEN_BUDGET,
+    AGENT_MAX_TOOL_RESULT_CHARS,
+)
 
 
 # =============================================================================
@@ -328,65 +337,6 @@ The magic is in the collaboration. The tools just make it real."""
 # SESSION MANAGEMENT
 # =============================================================================
 
-class SessionManager:
-    """Manages conversation sessions for the agent."""
-    
-    def __init__(self):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
-    
-    def create_session(self) -> str:
-        """Create a new session and return its ID."""
-        session_id = str(uuid.uuid4())
-        self.sessions[session_id] = {
-            "id": session_id,
-            "messages": [],
-            "created_at": datetime.utcnow().isoformat(),
-            "last_active": datetime.utcnow().isoformat(),
-            "tool_calls": []
-        }
-        return session_id
-    
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get a session by ID."""
-        return self.sessions.get(session_id)
-    
-    def add_message(self, session_id: str, role: str, content: str, tool_calls: List[Dict] = None):
-        """Add a message to the session history."""
-        session = self.sessions.get(session_id)
-        if session:
-            session["messages"].append({
-                "role": role,
-                "content": content,
-                "timestamp": datetime.utcnow().isoformat(),
-                "tool_calls": tool_calls
-            })
-            session["last_active"] = datetime.utcnow().isoformat()
-    
-    def get_messages(self, session_id: str) -> List[Dict]:
-        """Get all messages for a session."""
-        session = self.sessions.get(session_id)
-        return session["messages"] if session else []
-    
-    def clear_session(self, session_id: str) -> bool:
-        """Clear a session's messages."""
-        if session_id in self.sessions:
-            self.sessions[session_id]["messages"] = []
-            self.sessions[session_id]["tool_calls"] = []
-            return True
-        return False
-    
-    def delete_session(self, session_id: str) -> bool:
-        """Delete a session entirely."""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
-    
-    def get_active_session_count(self) -> int:
-        """Get count of active sessions."""
-        return len(self.sessions)
-
-
 # Global session manager
 session_manager = SessionManager()
 
@@ -401,8 +351,8 @@ class AgentService:
     
     The agentic loop:
     1. Send user message + conversation history to Claude
-    2. If Claude responds with tool_use, execute the tool
-    3. Send tool result back to Claude
+    2. If Claude responds with tool_use, execute the tools (concurrently where safe)
+    3. Send tool results back to Claude, in tool_use order
     4. Repeat until Claude responds with just text (stop_reason: end_turn)
     """
     
@@ -411,21 +361,32 @@ class AgentService:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment")
         
+        from anthropic import Anthropic  # deferred until the agent is first used
         self.client = Anthropic(api_key=api_key)
         self.tool_executor = ToolExecutor()
-        self.tools = get_tool_definitions()
+        self.tool_runner = ParallelToolRunner(self.tool_executor)
+        
+        # Serializes tool definitions + system prompt once for all requests
+        self.request_builder = AgentRequestBuilder(MODEL_ID, MAX_TOKENS, SYSTEM_PROMPT)
+        self.tools = self.request_builder.tools
     
     def _format_messages_for_api(self, session_messages: List[Dict]) -> List[Dict]:
-        """Format session messages for Claude API."""
-        messages = []
-        for msg in session_messages:
-            # Only include user and assistant messages
-            if msg["role"] in ["user", "assistant"]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        return messages
+        """Format session messages for Claude API, trimmed to the history token budget."""
+        return build_history_window(session_messages, AGENT_HISTORY_TOKEN_BUDGET)
+    
+    @staticmethod
+    def _serialize_tool_result(result: Dict[str, Any]) -> str:
+        """JSON-encode a tool result, truncating oversized payloads."""
+        content = json.dumps(result)
+        if len(content) > AGENT_MAX_TOOL_RESULT_CHARS:
+            content = content[:AGENT_MAX_TOOL_RESULT_CHARS] + f"... [truncated {len(content) - AGENT_MAX_TOOL_RESULT_CHARS} chars]"
+        return content
+    
+    @staticmethod
+    def _finish_usage(request_metrics: CacheMetrics) -> Dict[str, Any]:
+        """Fold a request's token usage into the process totals and return it."""
+        global_cache_metrics.merge(request_metrics)
+        return request_metrics.to_dict()
     
     async def chat(
         self,
@@ -445,24 +406,24 @@ class AgentService:
                 "response": str,
                 "tool_calls": [{"tool_name", "tool_input", "result", "success"}],
                 "iterations": int,
+                "usage": {token counts incl. cache_read/cache_creation},
                 "timestamp": str
             }
         """
         # Get or create session
-        if session_id and session_manager.get_session(session_id):
-            session = session_manager.get_session(session_id)
-        else:
+        if not (session_id and session_manager.get_session(session_id)):
             session_id = session_manager.create_session()
-            session = session_manager.get_session(session_id)
         
-        # Add user message to history
-        session_manager.add_message(session_id, "user", message)
+        # Add user message to history (returns the updated session)
+        session = session_manager.add_message(session_id, "user", message)
         
         # Build messages for API
-        api_messages = self._format_messages_for_api(session["messages"])
+        api_messages = self._format_messages_for_api(session["messages"] if session else [])
+        history_len = len(api_messages)
         
-        # Track tool calls and iterations
+        # Track tool calls, iterations and prompt-cache usage
         tool_calls_made = []
+        request_metrics = CacheMetrics()
         iterations = 0
         
         # Agentic loop
@@ -472,12 +433,9 @@ class AgentService:
             try:
                 # Call Claude
                 response = self.client.messages.create(
-                    model=MODEL_ID,
-                    max_tokens=MAX_TOKENS,
-                    system=SYSTEM_PROMPT,
-                    tools=self.tools,
-                    messages=api_messages
+                    **self.request_builder.build(api_messages, history_len)
                 )
+                request_metrics.record(response.usage)
                 
                 # Check stop reason
                 if response.stop_reason == "end_turn":
@@ -500,6 +458,7 @@ class AgentService:
                         "response": final_text,
                         "tool_calls": tool_calls_made,
                         "iterations": iterations,
+                        "usage": self._finish_usage(request_metrics),
                         "timestamp": datetime.utcnow().isoformat()
                     }
                 
@@ -530,35 +489,26 @@ class AgentService:
                         "content": assistant_content
                     })
                     
-                    # Execute each tool and collect results
+                    # Execute the turn's tools (independent ones concurrently)
+                    tool_calls = [(block.name, block.input) for block in tool_use_blocks]
+                    outcomes = await self.tool_runner.run_all(tool_calls)
+                    
                     tool_results = []
                     
-                    for tool_block in tool_use_blocks:
-                        tool_name = tool_block.name
-                        tool_input = tool_block.input
-                        tool_id = tool_block.id
-                        
-                        # Execute the tool
-                        try:
-                            result = await self.tool_executor.execute(tool_name, tool_input)
-                            success = result.get("success", True)
-                        except Exception as e:
-                            result = {"success": False, "error": str(e)}
-                            success = False
-                        
+                    for tool_block, (result, success) in zip(tool_use_blocks, outcomes):
                         # Track the call
                         tool_calls_made.append({
-                            "tool_name": tool_name,
-                            "tool_input": tool_input,
+                            "tool_name": tool_block.name,
+                            "tool_input": tool_block.input,
                             "result": result,
                             "success": success
                         })
                         
-                        # Build result for API
+                        # Build result for API (same order as the tool_use blocks)
                         tool_results.append({
                             "type": "tool_result",
-                            "tool_use_id": tool_id,
-                            "content": json.dumps(result)
+                            "tool_use_id": tool_block.id,
+                            "content": self._serialize_tool_result(result)
                         })
                     
                     # Add tool results to messages
@@ -581,6 +531,7 @@ class AgentService:
                     "response": error_response,
                     "tool_calls": tool_calls_made,
                     "iterations": iterations,
+                    "usage": self._finish_usage(request_metrics),
                     "timestamp": datetime.utcnow().isoformat(),
                     "error": str(e)
                 }
@@ -594,6 +545,7 @@ class AgentService:
             "response": timeout_response,
             "tool_calls": tool_calls_made,
             "iterations": iterations,
+            "usage": self._finish_usage(request_metrics),
             "timestamp": datetime.utcnow().isoformat()
         }
     
@@ -611,26 +563,25 @@ class AgentService:
         - {"type": "text", "text": str}
         - {"type": "tool_start", "tool_name": str, "tool_input": dict}
         - {"type": "tool_result", "tool_name": str, "result": dict, "success": bool}
-        - {"type": "done", "iterations": int, "tool_count": int}
+        - {"type": "done", "iterations": int, "tool_count": int, "usage": dict}
         - {"type": "error", "message": str}
         """
         # Get or create session
-        if session_id and session_manager.get_session(session_id):
-            session = session_manager.get_session(session_id)
-        else:
+        if not (session_id and session_manager.get_session(session_id)):
             session_id = session_manager.create_session()
-            session = session_manager.get_session(session_id)
         
         yield {"type": "session", "session_id": session_id}
         
-        # Add user message to history
-        session_manager.add_message(session_id, "user", message)
+        # Add user message to history (returns the updated session)
+        session = session_manager.add_message(session_id, "user", message)
         
         # Build messages for API
-        api_messages = self._format_messages_for_api(session["messages"])
+        api_messages = self._format_messages_for_api(session["messages"] if session else [])
+        history_len = len(api_messages)
         
-        # Track tool calls and iterations
+        # Track tool calls, iterations and prompt-cache usage
         tool_calls_made = []
+        request_metrics = CacheMetrics()
         iterations = 0
         accumulated_text = ""
         
@@ -641,11 +592,7 @@ class AgentService:
             try:
                 # Stream response from Claude
                 with self.client.messages.stream(
-                    model=MODEL_ID,
-                    max_tokens=MAX_TOKENS,
-                    system=SYSTEM_PROMPT,
-                    tools=self.tools,
-                    messages=api_messages
+                    **self.request_builder.build(api_messages, history_len)
                 ) as stream:
                     
                     current_tool_use = None
@@ -681,12 +628,15 @@ class AgentService:
                                 yield {
                                     "type": "tool_start",
                                     "tool_name": current_tool_use["name"],
+                                    "tool_use_id": current_tool_use["id"],
                                     "tool_input": tool_input
                                 }
                     
                     # Get final message for processing
                     final_message = stream.get_final_message()
                 
+                request_metrics.record(final_message.usage)
+                
                 # Process the complete response
                 if final_message.stop_reason == "end_turn":
                     # Done - save and finish
@@ -700,7 +650,8 @@ class AgentService:
                     yield {
                         "type": "done",
                         "iterations": iterations,
-                        "tool_count": len(tool_calls_made)
+                        "tool_count": len(tool_calls_made),
+                        "usage": self._finish_usage(request_metrics)
                     }
                     return
                 
@@ -729,31 +680,18 @@ class AgentService:
                         "content": assistant_content
                     })
                     
-                    # Execute tools
-                    tool_results = []
+                    # Execute the turn's tools (independent ones concurrently),
+                    # streaming each result as soon as it finishes
+                    tool_calls = [(block.name, block.input) for block in tool_use_blocks]
+                    outcomes: List[Any] = [None] * len(tool_calls)
                     
-                    for tool_block in tool_use_blocks:
-                        tool_name = tool_block.name
-                        tool_input = tool_block.input
-                        tool_id = tool_block.id
-                        
-                        try:
-                            result = await self.tool_executor.execute(tool_name, tool_input)
-                            success = result.get("success", True)
-                        except Exception as e:
-                            result = {"success": False, "error": str(e)}
-                            success = False
-                        
-                        tool_calls_made.append({
-                            "tool_name": tool_name,
-                            "tool_input": tool_input,
-                            "result": result,
-                            "success": success
-                        })
+                    async for index, result, success in self.tool_runner.run(tool_calls):
+                        outcomes[index] = (result, success)
                         
                         yield {
                             "type": "tool_result",
-                            "tool_name": tool_name,
+                            "tool_name": tool_calls[index][0],
+                            "tool_use_id": tool_use_blocks[index].id,
                             "result": result,
                             "success": success
                         }
@@ -786,11 +724,22 @@ class AgentService:
                                         "settings": preview.get("settings", {}),
                                     }
                                 }
+                    
+                    # Results go back to Claude in tool_use order, not completion order
+                    tool_results = []
+                    
+                    for tool_block, (result, success) in zip(tool_use_blocks, outcomes):
+                        tool_calls_made.append({
+                            "tool_name": tool_block.name,
+                            "tool_input": tool_block.input,
+                            "result": result,
+                            "success": success
+                        })
                         
                         tool_results.append({
                             "type": "tool_result",
-                            "tool_use_id": tool_id,
-                            "content": json.dumps(result)
+                            "tool_use_id": tool_block.id,
+                            "content": self._serialize_tool_result(result)
                         })
                     
                     api_messages.append({
@@ -802,10 +751,12 @@ class AgentService:
                     accumulated_text = ""
                 
             except Exception as e:
+                self._finish_usage(request_metrics)
                 yield {"type": "error", "message": str(e)}
                 return
         
         # Max iterations
+        self._finish_usage(request_metrics)
         yield {
             "type": "error",
             "message": "Maximum iterations reached"
@@ -826,6 +777,8 @@ class AgentService:
             "max_tokens": MAX_TOKENS,
             "max_iterations": MAX_ITERATIONS,
             "active_sessions": session_manager.get_active_session_count(),
+            "session_cache": session_manager.get_cache_stats(),
+            "prompt_cache": global_cache_metrics.to_dict(),
             "available_tools": len(self.tools)
         }
     
@@ -11,7 +11,7 @@ Each tool has:
 """
 
 import json
-import os
+import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +21,7 @@ from sqlalchemy.orm import Session
 from ..database import SessionLocal
 from ..models import Project, Slide, Automation, AutomationRun
 from ..services.prompt_config import CONTENT_TYPES, IMAGE_STYLES, list_content_types, list_image_styles
+from ..services.tracing import span
 
 
 # =============================================================================
@@ -54,6 +55,11 @@ NOTE: Script must be approved before generating images.""",
                     "type": "string",
                     "description": "Visual style for images. Options: classical (oil paintings), cinematic (dramatic lighting), minimal (clean), golden_dust (particle effects)",
                     "default": "classical"
+                },
+                "regenerate": {
+                    "type": "boolean",
+                    "description": "Set true when the user wants a new/different script for a topic that was already generated (otherwise an identical earlier script may be reused)",
+                    "default": False
                 }
             },
             "required": ["topic"]
@@ -1426,9 +1432,10 @@ class ToolExecutor:
         self,
         topic: str,
         content_type: str = "wisdom_slideshow",
-        image_style: str = "classical"
+        image_style: str = "classical",
+        regenerate: bool = False
     ) -> Dict[str, Any]:
-        """Generate a script for a topic."""
+        """Generate a script for a topic (regenerate skips the script cache)."""
         from .gemini_handler import GeminiHandler
         
         db = self.get_db()
@@ -1442,9 +1449,9 @@ class ToolExecutor:
             # Generate script
             if content_type in CONTENT_TYPES:
                 enhanced_topic = handler.enhance_topic_prompt(topic)
-                result = handler.generate_script(enhanced_topic, content_type)
+                result = handler.generate_script(enhanced_topic, content_type, refresh=regenerate)
             else:
-                result = handler._generate_narrative_story(topic, num_scenes=7)
+                result = handler._generate_narrative_story(topic, num_scenes=7, refresh=regenerate)
             
             if not result:
                 return {"success": False, "error": "Script generation failed"}
@@ -1532,7 +1539,7 @@ class ToolExecutor:
         instruction: str = None
     ) -> Dict[str, Any]:
         """Regenerate script for a specific slide."""
-        from .gemini_handler import GeminiHandler
+        from .gemini_handler import GeminiHandler, extract_json
         
         db = self.get_db()
         try:
@@ -1563,12 +1570,13 @@ class ToolExecutor:
             Return JSON with: title, subtitle, visual_description
             """
             
-            response = handler.client.models.generate_content(
-                model=handler.text_model_name,
-                contents=prompt
-            )
+            with span("provider_call", provider="gemini", model=handler.text_model_name):
+                response = handler.client.models.generate_content(
+                    model=handler.text_model_name,
+                    contents=prompt
+                )
             
-            result = json.loads(handler._clean_json_text(response.text))
+            result = extract_json(response.text)
             
             slide.title = result.get("title", slide.title)
             slide.subtitle = result.get("subtitle", slide.subtitle)
@@ -1793,6 +1801,7 @@ class ToolExecutor:
     async def _change_slide_font(self, slide_id: str, font: str) -> Dict[str, Any]:
         """Re-apply text with a different font."""
         from ..routers.images import get_text_overlay
+        from .asset_store import put_asset
         from ..config import get_settings
         
         settings = get_settings()
@@ -1844,6 +1853,10 @@ class ToolExecutor:
                 )
             
             old_font = slide.current_font or "unknown"
+            final_path = put_asset(db, final_path).path
+            slide.final_image_path = final_path
+            slide.current_font = font
+            slide.image_status = "complete"
             version = slide.create_version(
                 db=db,
                 change_type="font_change",
@@ -1851,10 +1864,6 @@ class ToolExecutor:
                 font=font,
                 theme=slide.current_theme
             )
-            
-            slide.final_image_path = final_path
-            slide.current_font = font
-            slide.image_status = "complete"
             db.commit()
             
             return {
@@ -1895,6 +1904,7 @@ class ToolExecutor:
     async def _revert_slide_version(self, slide_id: str, version_number: int) -> Dict[str, Any]:
         """Revert slide to a previous version."""
         from ..models import SlideVersion
+        from .asset_store import asset_exists
         
         db = self.get_db()
         try:
@@ -1910,28 +1920,11 @@ class ToolExecutor:
             if not version:
                 return {"success": False, "error": f"Version {version_number} not found"}
             
-            if not version.final_image_path or not os.path.exists(version.final_image_path):
+            if not asset_exists(version.final_image_path):
                 return {"success": False, "error": "Version image file no longer exists"}
             
-            # Create revert version
-            revert_version = slide.create_version(
-                db=db,
-                change_type="revert",
-                change_description=f"Reverted to version {version_number}",
-                font=version.font,
-                theme=version.theme
-            )
-            
-            # Restore content
-            slide.title = version.title
-            slide.subtitle = version.subtitle
-            slide.visual_description = version.visual_description
-            slide.narration = version.narration
-            slide.current_font = version.font
-            slide.current_theme = version.theme
-            slide.final_image_path = version.final_image_path
-            slide.background_image_path = version.background_image_path
-            slide.image_status = "complete"
+            # Point the slide back at the version (records the revert as a new version)
+            revert_version = slide.restore_version(db, version)
             db.commit()
             
             return {
@@ -2122,8 +2115,8 @@ class ToolExecutor:
         to_inbox: bool = True
     ) -> Dict[str, Any]:
         """Upload video to TikTok."""
-        from ..routers.tiktok import load_tokens
-        import requests
+        from ..routers.tiktok import load_tokens, INBOX_INIT_URL, PUBLISH_INIT_URL
+        from .tiktok_video_upload import upload_video, TikTokUploadError
         
         tokens = load_tokens()
         
@@ -2134,69 +2127,23 @@ class ToolExecutor:
         if not video_file.exists():
             return {"success": False, "error": f"Video file not found: {video_path}"}
         
-        file_size = video_file.stat().st_size
-        access_token = tokens["access_token"]
-        
-        init_url = "https://open.tiktokapis.com/v2/post/publish/inbox/video/init/" if to_inbox else "https://open.tiktokapis.com/v2/post/publish/video/init/"
-        
-        if to_inbox:
-            init_data = {
-                "source_info": {
-                    "source": "FILE_UPLOAD",
-                    "video_size": file_size,
-                    "chunk_size": file_size,
-                    "total_chunk_count": 1
-                }
-            }
-        else:
-            init_data = {
-                "post_info": {
-                    "title": title,
-                    "privacy_level": "SELF_ONLY",
-                },
-                "source_info": {
-                    "source": "FILE_UPLOAD",
-                    "video_size": file_size,
-                    "chunk_size": file_size,
-                    "total_chunk_count": 1
-                }
-            }
-        
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json; charset=UTF-8"
-        }
-        
-        init_response = requests.post(init_url, headers=headers, json=init_data)
-        
-        if init_response.status_code != 200:
-            return {"success": False, "error": f"Init failed: {init_response.text}"}
-        
-        init_result = init_response.json()
-        data = init_result.get("data", {})
-        upload_url = data.get("upload_url")
-        publish_id = data.get("publish_id")
-        
-        if not upload_url:
-            return {"success": False, "error": "No upload URL in response"}
-        
-        with open(video_file, 'rb') as f:
-            video_data = f.read()
-        
-        upload_headers = {
-            "Content-Type": "video/mp4",
-            "Content-Length": str(file_size),
-            "Content-Range": f"bytes 0-{file_size - 1}/{file_size}"
+        init_url = INBOX_INIT_URL if to_inbox else PUBLISH_INIT_URL
+        post_info = None if to_inbox else {
+            "title": title,
+            "privacy_level": "SELF_ONLY",
         }
         
-        upload_response = requests.put(upload_url, headers=upload_headers, data=video_data)
-        
-        if upload_response.status_code not in [200, 201, 202]:
-            return {"success": False, "error": f"Upload failed: {upload_response.text}"}
+        # Chunked and streamed from disk; resumes an interrupted upload of the same file
+        try:
+            result = await asyncio.to_thread(
+                upload_video, init_url, tokens["access_token"], str(video_file), post_info
+            )
+        except TikTokUploadError as e:
+            return {"success": False, "error": str(e)}
         
         return {
             "success": True,
-            "publish_id": publish_id,
+            "publish_id": result["publish_id"],
             "destination": "inbox" if to_inbox else "publish",
             "message": "Video uploaded to TikTok drafts!" if to_inbox else "Video published!"
         }
@@ -2204,7 +2151,7 @@ class ToolExecutor:
     async def _get_upload_status(self, publish_id: str) -> Dict[str, Any]:
         """Check upload status."""
         from ..routers.tiktok import load_tokens
-        import requests
+        from .http_client import get_session
         
         tokens = load_tokens()
         
@@ -2217,7 +2164,7 @@ class ToolExecutor:
         }
         
         STATUS_URL = "https://open.tiktokapis.com/v2/post/publish/status/fetch/"
-        response = requests.post(STATUS_URL, headers=headers, json={"publish_id": publish_id})
+        response = get_session().post(STATUS_URL, headers=headers, json={"publish_id": publish_id})
         
         if response.status_code != 200:
             return {"success": False, "error": response.text}
@@ -2277,6 +2224,10 @@ class ToolExecutor:
             )
             
             if result.get("success"):
+                from .publish_watcher import track_publish
+                if result.get("publish_id"):
+                    track_publish(db, result["publish_id"])
+                    db.commit()
                 return {
                     "success": True,
                     "project_id": project_id,
@@ -0,0 +1,287 @@
+"""
+Content-addressed store for slide images.
+
+Every finished background and slide image is stored once, named by the
+SHA-256 of its pixels (<generated dir>/<hash>.png), and recorded in
+asset_blobs. Slides and slide versions point at a blob through their
+existing image path columns, so:
+
+- regenerating a slide whose pixels didn't change writes no new file (and
+  uploads nothing - the blob keeps its GCS URL)
+- a version is a row of pointers, never a copy of the image
+- restoring a version swaps the slide's pointers back (Slide.restore_version)
+
+Session events keep asset_blobs.refcount equal to the number of slide and
+version pointers at each blob, inside the transaction that changes them.
+collect_garbage() removes blobs nothing points at any more.
+
+Usage:
+    blob = put_asset(db, final_path, settings.generated_slides_dir)
+    slide.final_image_path = publish_asset(blob, storage, "slides")
+"""
+import os
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from PIL import Image
+from sqlalchemy import delete, event, inspect, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.asset_blob import AssetBlob
+from ..models.slide import Slide
+from ..models.slide_version import SlideVersion
+from .image_writer import DERIVATIVE_WIDTHS, derivative_path
+
+logger = logging.getLogger(__name__)
+
+# Unreferenced blobs younger than this are kept: a request may have stored
+# the blob but not yet committed the slide that points at it
+GC_GRACE_SECONDS = 3600
+
+# Slide/SlideVersion columns that point at blobs
+POINTER_COLUMNS = ("final_image_path", "background_image_path")
+
+_blobs = AssetBlob.__table__
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+def content_hash(path: Union[str, Path]) -> str:
+    """SHA-256 of an image's pixels (mode, size and data), or of the file bytes if it isn't one."""
+    digest = hashlib.sha256()
+    try:
+        with Image.open(path) as img:
+            img.load()
+            digest.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode())
+            digest.update(img.tobytes())
+    except (OSError, ValueError):
+        digest = hashlib.sha256(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def put_asset(db: Session, path: Union[str, Path], directory: Optional[Union[str, Path]] = None) -> AssetBlob:
+    """
+    Move a freshly written image into the store and return its blob.
+
+    If identical pixels are already stored, the new file is deleted and the
+    existing blob returned. directory defaults to the file's own directory.
+    The caller commits.
+    """
+    source = Path(path)
+    digest = content_hash(source)
+    blob = db.get(AssetBlob, digest)
+    if blob is not None and not touch_asset(db, digest):
+        # Garbage-collected since it was loaded; store this copy afresh
+        db.expunge(blob)
+        blob = None
+    if blob is not None and Path(blob.path).exists():
+        if source.resolve() != Path(blob.path).resolve():
+            source.unlink(missing_ok=True)
+        return blob
+
+    target = Path(directory or source.parent) / f"{digest}{source.suffix or '.png'}"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if source.resolve() != target.resolve():
+        os.replace(source, target)
+
+    if blob is not None:
+        # The row outlived its file; this copy takes its place
+        blob.path = str(target)
+        return blob
+
+    # Another request may store the same pixels at the same moment
+    db.execute(sqlite_insert(_blobs).values(
+        hash=digest, path=str(target), size=target.stat().st_size, refcount=0, created_at=datetime.utcnow()
+    ).on_conflict_do_nothing())
+    return db.get(AssetBlob, digest)
+
+
+def touch_asset(db: Session, digest: str) -> bool:
+    """
+    Restart a blob's GC grace period before handing it out again (the caller commits).
+
+    A reused blob may have no pointers yet and be older than the grace period;
+    this keeps collect_garbage() off it until the slide that reuses it is
+    committed. Returns False if the collector already removed it.
+    """
+    result = db.execute(update(_blobs).where(_blobs.c.hash == digest).values(created_at=datetime.utcnow()))
+    return bool(result.rowcount)
+
+
+def publish_asset(blob: AssetBlob, storage, folder: str) -> str:
+    """The pointer a slide should store: the blob's GCS URL (uploaded once) or its local path."""
+    if blob.url:
+        return blob.url
+    if storage.is_available:
+        url = storage.upload_file(blob.path, folder, custom_filename=Path(blob.path).name)
+        if url:
+            blob.url = url
+            return url
+    return blob.path
+
+
+def asset_exists(pointer: Optional[str]) -> bool:
+    """Whether a slide/version image pointer can still be shown (GCS URLs are assumed to be)."""
+    if not pointer:
+        return False
+    return pointer.startswith("http") or os.path.exists(pointer)
+
+
+def is_stored(db: Session, pointer: Optional[str]) -> bool:
+    """Whether a pointer refers to a store blob (whose file the store owns)."""
+    if not pointer:
+        return False
+    return db.query(AssetBlob.hash).filter(or_(AssetBlob.path == pointer, AssetBlob.url == pointer)).first() is not None
+
+
+# =============================================================================
+# REFERENCE COUNTING
+# =============================================================================
+
+def _stored_pointers(session: Session, model, ids: Iterable[str]) -> Dict[str, tuple]:
+    """Pointer columns as they are in the database (before this flush)."""
+    table = model.__table__
+    rows = session.connection().execute(
+        select(table.c.id, *[table.c[column] for column in POINTER_COLUMNS]).where(table.c.id.in_(list(ids)))
+    )
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def _apply_deltas(connection, deltas: Counter):
+    for pointer, delta in deltas.items():
+        if pointer and delta:
+            connection.execute(
+                update(_blobs)
+                .where(or_(_blobs.c.path == pointer, _blobs.c.url == pointer))
+                .values(refcount=_blobs.c.refcount + delta)
+            )
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _count_references(session: Session, flush_context, instances):
+    deltas: Counter = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, (Slide, SlideVersion)):
+            for column in POINTER_COLUMNS:
+                deltas[getattr(obj, column)] += 1
+
+    changed = {
+        obj.id: obj for obj in session.dirty
+        if isinstance(obj, Slide) and any(inspect(obj).attrs[c].history.added for c in POINTER_COLUMNS)
+    }
+    for model in (Slide, SlideVersion):
+        removed = {obj.id: obj for obj in session.deleted if isinstance(obj, model)}
+        ids = set(removed) | (set(changed) if model is Slide else set())
+        if not ids:
+            continue
+        for pointers in _stored_pointers(session, model, ids).values():
+            for pointer in pointers:
+                deltas[pointer] -= 1
+        if model is Slide:
+            for obj in changed.values():
+                for column in POINTER_COLUMNS:
+                    deltas[getattr(obj, column)] += 1
+
+    deltas.pop(None, None)
+    if any(deltas.values()):
+        _apply_deltas(session.connection(), deltas)
+
+
+def _pointer_counts(db: Session, pointers: Optional[Iterable[str]] = None) -> Counter:
+    """How many slide/version columns hold each pointer (all pointers, or just these)."""
+    counts: Counter = Counter()
+    wanted = set(pointers) if pointers is not None else None
+    for model in (Slide, SlideVersion):
+        for column_name in POINTER_COLUMNS:
+            column = getattr(model, column_name)
+            query = select(column).where(column.isnot(None))
+            if wanted is not None:
+                query = query.where(column.in_(wanted))
+            counts.update(value for (value,) in db.execute(query))
+    return counts
+
+
+def recount_references(db: Session) -> int:
+    """Recompute every blob's refcount from the slide and version tables (commits). Returns blobs fixed."""
+    counts = _pointer_counts(db)
+    fixed = 0
+    for blob in db.query(AssetBlob).all():
+        refcount = counts[blob.path] + (counts[blob.url] if blob.url else 0)
+        if blob.refcount != refcount:
+            blob.refcount = refcount
+            fixed += 1
+    db.commit()
+    return fixed
+
+
+# =============================================================================
+# GARBAGE COLLECTION
+# =============================================================================
+
+def _remove_files(blob: AssetBlob, storage) -> int:
+    freed = 0
+    for path in [blob.path] + [derivative_path(blob.path, size) for size in DERIVATIVE_WIDTHS]:
+        try:
+            freed += os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    if blob.url and storage is not None and storage.is_available:
+        storage.delete_file(blob.url)
+    return freed
+
+
+def collect_garbage(db: Session, storage=None, grace_seconds: float = GC_GRACE_SECONDS,
+                    dry_run: bool = False) -> Dict[str, int]:
+    """
+    Delete blobs with no slide or version pointing at them (commits).
+
+    Candidates come from refcount; each is checked against the tables before
+    its files (local, derivatives and GCS copy) are removed, and a miscounted
+    blob just has its refcount corrected. The row is deleted only if it is
+    still unreferenced and past the grace period, so a blob that put_asset()
+    or a reuse touched meanwhile is kept.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    candidates = db.query(AssetBlob).filter(AssetBlob.refcount <= 0, AssetBlob.created_at < cutoff).all()
+    pointers = [p for blob in candidates for p in (blob.path, blob.url) if p]
+    counts = _pointer_counts(db, pointers) if pointers else Counter()
+
+    deleted = freed = corrected = 0
+    for blob in candidates:
+        refcount = counts[blob.path] + (counts[blob.url] if blob.url else 0)
+        if refcount:
+            blob.refcount = refcount
+            corrected += 1
+            continue
+        if dry_run:
+            deleted += 1
+            freed += blob.size or 0
+            continue
+        # Re-checked at delete time: the row lock holds off a concurrent reuse
+        # until the files are gone and this commits
+        gone = db.execute(delete(_blobs).where(
+            _blobs.c.hash == blob.hash, _blobs.c.refcount <= 0, _blobs.c.created_at < cutoff
+        )).rowcount
+        if not gone:
+            continue
+        deleted += 1
+        freed += _remove_files(blob, storage)
+        db.expunge(blob)
+
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    if deleted:
+        logger.info(f"Asset GC: {'would delete' if dry_run else 'deleted'} {deleted} blobs ({freed / 1e6:.1f} MB)")
+    return {"deleted": deleted, "freed_bytes": freed, "corrected": corrected, "dry_run": dry_run}
@@ -19,15 +19,15 @@ from datetime import datetime
 
 # Import environment detection
 from ..config import IS_PRODUCTION
+from .lazy_imports import lazy_module, is_available
+from .tracing import span
 
-# Try to import google-cloud-storage, gracefully degrade if not available
-try:
-    from google.cloud import storage
-    GCS_AVAILABLE = True
-except ImportError:
-    GCS_AVAILABLE = False
-    if IS_PRODUCTION:
-        print("⚠️ google-cloud-storage not installed. Using local storage only.")
+# google-cloud-storage is imported when the client is first created, not at
+# startup; gracefully degrade if not available
+storage = lazy_module("google.cloud.storage")
+GCS_AVAILABLE = is_available("google.cloud.storage")
+if not GCS_AVAILABLE and IS_PRODUCTION:
+    print("⚠️ google-cloud-storage not installed. Using local storage only.")
 
 
 # Configuration
@@ -149,7 +149,8 @@ class CloudStorageService:
             blob.content_type = content_type
             
             # Upload file
-            blob.upload_from_filename(str(local_path))
+            with span("upload", provider="gcs", folder=destination_folder, bytes=local_path.stat().st_size):
+                blob.upload_from_filename(str(local_path))
             
             # Get public URL
             public_url = f"{self.public_url_base}/{blob_path}"
@@ -199,7 +200,8 @@ class CloudStorageService:
             blob.content_type = content_type
             
             # Upload bytes
-            blob.upload_from_string(data, content_type=content_type)
+            with span("upload", provider="gcs", folder=destination_folder, bytes=len(data)):
+                blob.upload_from_string(data, content_type=content_type)
             
             # Get public URL
             public_url = f"{self.public_url_base}/{blob_path}"
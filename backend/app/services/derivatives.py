@@ -0,0 +1,305 @@
+"""
+Image derivatives - thumbnails, previews and on-demand resizes.
+
+Slides are 1080x1920 PNGs of several MB. Lists and galleries only need a
+small WebP, so:
+
+- publish_derivatives() runs when a slide is finalized. It writes
+  <dir>/derivatives/<stem>_<size>.webp next to the original. When GCS is
+  available it also uploads those files under DERIVATIVES_GCS_PREFIX.
+- derivative_url() returns the URL of a derivative for an image URL or path.
+  It uses the static derivative if one exists and otherwise falls back to
+  /api/images/resize, which creates it lazily for older assets.
+- get_resized() backs that endpoint. It accepts only our own /static URLs,
+  local generated files and our GCS bucket, and keeps results in an
+  on-disk cache.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote, unquote
+
+from ..config import (
+    get_settings,
+    DERIVATIVES_GCS_PREFIX,
+    IMAGE_RESIZE_WIDTHS,
+    IMAGE_RESIZE_CACHE_MAX_BYTES,
+)
+from .cloud_storage import get_storage_service, GCS_PUBLIC_URL
+from .image_writer import (
+    DERIVATIVE_WIDTHS,
+    DERIVATIVES_DIRNAME,
+    derivative_path,
+    ensure_derivative,
+    make_derivative,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RESIZE_ENDPOINT = "/api/images/resize"
+
+# Serialises cache writes for the same key within this worker
+_cache_lock = threading.Lock()
+
+# Running size of the resize cache, so a miss doesn't walk the directory.
+# Re-read from disk at most every CACHE_RESYNC_SECONDS (and after a prune) to
+# pick up what other workers wrote.
+CACHE_RESYNC_SECONDS = 600
+_cache_bytes: Optional[int] = None
+_cache_synced_at = 0.0
+
+
+def _static_roots() -> Dict[str, Path]:
+    """Static URL prefix -> directory it is served from (mirrors main.py mounts)."""
+    base = settings.base_dir
+    return {
+        "/static/images/": settings.generated_images_dir,
+        "/static/slides/": settings.generated_slides_dir,
+        "/static/slideshows/": base / "generated_slideshows",
+        "/static/references/": base / "references" / "examples",
+    }
+
+
+def _cache_dir() -> Path:
+    path = settings.base_dir / "generated_derivatives"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _within(path: Path, root: Path) -> bool:
+    try:
+        path.resolve().relative_to(root.resolve())
+        return True
+    except ValueError:
+        return False
+
+
+def _static_url_for(local_path: Path) -> Optional[str]:
+    """Map a local file back to its /static URL, if it is under a mount."""
+    for prefix, root in _static_roots().items():
+        if _within(local_path, root):
+            relative = local_path.resolve().relative_to(root.resolve())
+            return prefix + quote(relative.as_posix())
+    return None
+
+
+# =============================================================================
+# EAGER DERIVATIVES (slide finalization)
+# =============================================================================
+
+def publish_derivatives(local_path: str, public_url: Optional[str] = None) -> Dict[str, str]:
+    """
+    Create thumb/preview derivatives for a finished image.
+
+    Args:
+        local_path: The image on disk
+        public_url: Where the original was published (GCS URL or None)
+
+    Returns:
+        {"thumb": url, "preview": url} - GCS URLs when the original lives in
+        GCS, /static URLs otherwise. Empty if the derivatives couldn't be made.
+    """
+    urls = {}
+    storage = get_storage_service()
+    upload = bool(public_url and public_url.startswith(GCS_PUBLIC_URL) and storage.is_available)
+
+    for size in DERIVATIVE_WIDTHS:
+        path = ensure_derivative(local_path, size)
+        if path == local_path:
+            # ensure_derivative already logged why
+            return {}
+
+        url = None
+        if upload:
+            # Name after the GCS object so every published version keeps its own derivatives
+            gcs_path = public_url[len(GCS_PUBLIC_URL) + 1:]
+            folder, filename = gcs_path.rsplit("/", 1)
+            url = storage.upload_file(
+                path,
+                f"{DERIVATIVES_GCS_PREFIX}/{folder}",
+                custom_filename=f"{Path(filename).stem}_{size}.webp",
+            )
+        urls[size] = url or _static_url_for(Path(path)) or resize_url(public_url or local_path, DERIVATIVE_WIDTHS[size])
+
+    return urls
+
+
+# =============================================================================
+# URL HELPERS
+# =============================================================================
+
+def resize_url(src: str, width: int) -> str:
+    """URL of the resize endpoint for an image URL or generated-file path."""
+    return f"{RESIZE_ENDPOINT}?src={quote(src, safe='')}&w={width}"
+
+
+def derivative_url(src: Optional[str], size: str = "thumb") -> Optional[str]:
+    """
+    Best URL for a derivative of an image URL or path.
+
+    Returns the static derivative URL if the file already exists next to the
+    original. Otherwise returns the resize endpoint URL, which creates the
+    derivative the first time it is requested. Returns None for images that
+    aren't ours.
+    """
+    if not src:
+        return None
+    if not src.startswith(GCS_PUBLIC_URL + "/"):
+        local = _resolve_local(src)
+        if local is None:
+            # Not one of our images - the resize endpoint would refuse it
+            return None
+        existing = Path(derivative_path(str(local), size))
+        if existing.exists():
+            url = _static_url_for(existing)
+            if url:
+                return url
+        src = _static_url_for(local) or src
+    return resize_url(src, DERIVATIVE_WIDTHS[size])
+
+
+def derivative_urls(src: Optional[str]) -> Dict[str, Optional[str]]:
+    """{"thumbnail_url": ..., "preview_url": ...} for API responses."""
+    return {
+        "thumbnail_url": derivative_url(src, "thumb"),
+        "preview_url": derivative_url(src, "preview"),
+    }
+
+
+# =============================================================================
+# ON-DEMAND RESIZE
+# =============================================================================
+
+def snap_width(width: int) -> int:
+    """Round a requested width up to the nearest allowed width."""
+    for allowed in IMAGE_RESIZE_WIDTHS:
+        if width <= allowed:
+            return allowed
+    return IMAGE_RESIZE_WIDTHS[-1]
+
+
+def _resolve_local(src: str) -> Optional[Path]:
+    """A /static URL or a path inside one of the static roots -> local file."""
+    roots = _static_roots()
+    for prefix, root in roots.items():
+        if src.startswith(prefix):
+            candidate = root / unquote(src[len(prefix):])
+            return candidate if _within(candidate, root) else None
+
+    candidate = Path(src)
+    if candidate.is_absolute() and any(_within(candidate, root) for root in roots.values()):
+        return candidate
+    return None
+
+
+def _fetch_gcs_source(src: str) -> Optional[Path]:
+    """Download a bucket object once into the cache (bucket objects are never rewritten)."""
+    gcs_path = src[len(GCS_PUBLIC_URL) + 1:]
+    if not gcs_path or ".." in gcs_path.split("/"):
+        return None
+
+    key = hashlib.sha1(src.encode()).hexdigest()[:20]
+    local = _cache_dir() / "sources" / f"{key}{Path(gcs_path).suffix.lower()}"
+    if local.exists():
+        return local
+    local.parent.mkdir(parents=True, exist_ok=True)
+
+    # Unique temp name: two workers may fetch the same object at once
+    with tempfile.NamedTemporaryFile(dir=local.parent, suffix=".tmp", delete=False) as handle:
+        tmp = Path(handle.name)
+    storage = get_storage_service()
+    try:
+        if storage.is_available:
+            storage.bucket.blob(gcs_path).download_to_filename(str(tmp))
+        else:
+            from .http_client import download
+            download(src, tmp, timeout=30)
+        os.replace(tmp, local)
+    except Exception as e:
+        logger.warning(f"Could not fetch {src} for resizing: {e}")
+        tmp.unlink(missing_ok=True)
+        return None
+    _track_cache_size(local.stat().st_size)
+    return local
+
+
+def resolve_source(src: str) -> Optional[Path]:
+    """Local file for a resize source, or None if it isn't one of ours."""
+    if src.startswith(GCS_PUBLIC_URL + "/"):
+        return _fetch_gcs_source(src)
+    local = _resolve_local(src)
+    if local is not None and local.is_file():
+        return local
+    return None
+
+
+def get_resized(src: str, width: int) -> Optional[Path]:
+    """
+    WebP of src at (snapped) width, from the on-disk cache when fresh.
+
+    Returns None if src can't be resolved to one of our images.
+    """
+    source = resolve_source(src)
+    if source is None:
+        return None
+    width = snap_width(width)
+
+    # The static derivatives double as cache entries for their widths
+    for size, size_width in DERIVATIVE_WIDTHS.items():
+        if size_width == width and DERIVATIVES_DIRNAME not in source.parts:
+            existing = Path(derivative_path(str(source), size))
+            if existing.exists() and existing.stat().st_mtime >= source.stat().st_mtime:
+                return existing
+
+    key = hashlib.sha1(str(source.resolve()).encode()).hexdigest()[:20]
+    cached = _cache_dir() / f"{key}_{width}.webp"
+    if cached.exists() and cached.stat().st_mtime >= source.stat().st_mtime:
+        return cached
+
+    replaced = cached.stat().st_size if cached.exists() else 0
+    with _cache_lock:
+        make_derivative(str(source), str(cached), width)
+    _track_cache_size(cached.stat().st_size - replaced)
+    return cached
+
+
+def _cache_files():
+    return [p for p in _cache_dir().rglob("*") if p.is_file()]
+
+
+def _track_cache_size(delta: int):
+    """Add a write to the running cache size and prune once it is over budget."""
+    global _cache_bytes, _cache_synced_at
+    with _cache_lock:
+        if _cache_bytes is None or time.monotonic() - _cache_synced_at > CACHE_RESYNC_SECONDS:
+            _cache_bytes = sum(p.stat().st_size for p in _cache_files())
+            _cache_synced_at = time.monotonic()
+        else:
+            _cache_bytes += delta
+        over_budget = _cache_bytes > IMAGE_RESIZE_CACHE_MAX_BYTES
+    if over_budget:
+        _prune_cache()
+
+
+def _prune_cache():
+    """Drop the least recently written resizes once the cache is over budget."""
+    global _cache_bytes, _cache_synced_at
+    with _cache_lock:
+        files = _cache_files()
+        total = sum(p.stat().st_size for p in files)
+        if total > IMAGE_RESIZE_CACHE_MAX_BYTES:
+            for path in sorted(files, key=lambda p: p.stat().st_mtime):
+                total -= path.stat().st_size
+                path.unlink(missing_ok=True)
+                if total <= IMAGE_RESIZE_CACHE_MAX_BYTES * 0.8:
+                    break
+            logger.info(f"Pruned resize cache to {total / 1024 / 1024:.0f} MB")
+        _cache_bytes = total
+        _cache_synced_at = time.monotonic()
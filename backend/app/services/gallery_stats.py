@@ -0,0 +1,221 @@
+"""
+Gallery statistics for the dashboard.
+
+compute_gallery_stats answers with one grouped aggregate query over
+gallery_items (a UNION ALL of per-type, per-status and distinct-project
+counts), however many types and statuses exist.
+
+get_gallery_stats reads the same numbers from the gallery_counters table
+instead, which session events keep in step with gallery_items inside the
+same transaction as every insert, update and delete. The read touches only
+the handful of total/type/status rows, so it costs the same with ten items
+or a million.
+
+Changes the events can't account for exactly (bulk UPDATE/DELETE statements,
+an update whose previous value was never loaded) mark the counters stale, and
+the next read rebuilds them with one pass over gallery_items.
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.gallery_item import GalleryItem
+from ..models.gallery_counter import GalleryCounter
+
+logger = logging.getLogger(__name__)
+
+# Always reported, with 0 when there are none
+ITEM_TYPES = ["slide", "script", "prompt", "image", "project"]
+ITEM_STATUSES = ["complete", "draft", "failed"]
+
+# Marker row: present while the counters match gallery_items
+READY = ("ready", "")
+
+# Rows a stats read needs (per-project rows are only for maintenance)
+SUMMARY_DIMENSIONS = ("ready", "total", "type", "status", "projects")
+
+_TRACKED = ("item_type", "status", "project_id")
+_UNKNOWN = object()
+
+_counters = GalleryCounter.__table__
+
+
+# =============================================================================
+# STATS
+# =============================================================================
+
+def _summary(counts: Iterable[Tuple[str, Optional[str], int]]) -> Dict:
+    """Stats response from (dimension, value, count) rows."""
+    by_type = dict.fromkeys(ITEM_TYPES, 0)
+    by_status = dict.fromkeys(ITEM_STATUSES, 0)
+    total = projects = 0
+    for dimension, value, count in counts:
+        if dimension == "type":
+            total += count
+            if value:
+                by_type[value] = count
+        elif dimension == "status" and value:
+            by_status[value] = count
+        elif dimension == "projects":
+            projects = count
+    return {
+        "total": total,
+        "by_type": by_type,
+        "by_status": by_status,
+        "unique_projects": projects,
+    }
+
+
+def _grouped_counts(db: Session) -> List[Tuple[str, Optional[str], int]]:
+    """(dimension, value, count) rows for types, statuses and distinct projects in one query."""
+    by_type = select(literal("type"), GalleryItem.item_type, func.count()).group_by(GalleryItem.item_type)
+    by_status = select(literal("status"), GalleryItem.status, func.count()).group_by(GalleryItem.status)
+    projects = select(literal("projects"), literal(""), func.count(func.distinct(GalleryItem.project_id)))
+    return [tuple(row) for row in db.execute(union_all(by_type, by_status, projects))]
+
+
+def compute_gallery_stats(db: Session) -> Dict:
+    """Stats straight from gallery_items (one query, cost grows with the table)."""
+    return _summary(_grouped_counts(db))
+
+
+def get_gallery_stats(db: Session) -> Dict:
+    """Stats from the maintained counters, rebuilding them first if stale."""
+    rows = db.execute(
+        select(GalleryCounter.dimension, GalleryCounter.value, GalleryCounter.count)
+        .where(GalleryCounter.dimension.in_(SUMMARY_DIMENSIONS))
+    ).all()
+    if not any((dimension, value) == READY for dimension, value, _ in rows):
+        return _summary(rebuild_gallery_counters(db))
+    return _summary(rows)
+
+
+def rebuild_gallery_counters(db: Session) -> List[Tuple[str, Optional[str], int]]:
+    """Recount gallery_items into gallery_counters (commits); returns the summary rows."""
+    counts = _grouped_counts(db)
+    per_project = db.execute(
+        select(GalleryItem.project_id, func.count())
+        .where(GalleryItem.project_id.isnot(None))
+        .group_by(GalleryItem.project_id)
+    ).all()
+
+    rows = [{"dimension": "total", "value": "", "count": sum(c for d, _, c in counts if d == "type")}]
+    rows += [{"dimension": d, "value": v or "", "count": c} for d, v, c in counts]
+    rows += [{"dimension": "project", "value": p, "count": c} for p, c in per_project]
+    rows.append({"dimension": READY[0], "value": READY[1], "count": 1})
+
+    connection = db.connection()
+    connection.execute(_counters.delete())
+    connection.execute(_counters.insert(), rows)
+    db.commit()
+    logger.info(f"Rebuilt gallery counters ({len(per_project)} projects)")
+    return counts
+
+
+# =============================================================================
+# COUNTER MAINTENANCE
+# =============================================================================
+
+def _keys(item_type, status, project_id) -> List[Tuple[str, str]]:
+    keys = [("total", ""), ("type", item_type or ""), ("status", status or "")]
+    if project_id:
+        keys.append(("project", project_id))
+    return keys
+
+
+def _stored_value(item: GalleryItem, attr: str):
+    """The value currently in the database, or _UNKNOWN if it was never loaded."""
+    history = inspect(item).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return _UNKNOWN
+
+
+def _bump(connection, dimension: str, value: str, delta: int) -> Tuple[int, int]:
+    """Add delta to one counter in the database; returns its (before, after) counts."""
+    where = (_counters.c.dimension == dimension) & (_counters.c.value == value)
+    # Increment in SQL so concurrent writers can't overwrite each other's counts
+    update = _counters.update().where(where).values(count=_counters.c.count + delta)
+    if connection.dialect.update_returning:
+        after = connection.execute(update.returning(_counters.c.count)).scalar()
+    else:
+        result = connection.execute(update)
+        after = connection.execute(select(_counters.c.count).where(where)).scalar() if result.rowcount else None
+    if after is None:
+        connection.execute(_counters.insert().values(dimension=dimension, value=value, count=delta))
+        return 0, delta
+    if dimension == "project" and after <= 0:
+        connection.execute(_counters.delete().where(where & (_counters.c.count <= 0)))
+    return after - delta, after
+
+
+def _mark_stale(connection):
+    connection.execute(_counters.delete().where(
+        (_counters.c.dimension == READY[0]) & (_counters.c.value == READY[1])
+    ))
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_gallery_changes(session: Session, flush_context):
+    deltas: Counter = Counter()
+    stale = False
+
+    for item in session.new:
+        if isinstance(item, GalleryItem):
+            for key in _keys(item.item_type, item.status, item.project_id):
+                deltas[key] += 1
+
+    for item in session.dirty:
+        if not isinstance(item, GalleryItem):
+            continue
+        if not any(inspect(item).attrs[attr].history.added for attr in _TRACKED):
+            continue
+        before = [_stored_value(item, attr) for attr in _TRACKED]
+        after = [getattr(item, attr) for attr in _TRACKED]
+        if _UNKNOWN in before:
+            stale = True
+        elif before != after:
+            for key in _keys(*before):
+                deltas[key] -= 1
+            for key in _keys(*after):
+                deltas[key] += 1
+
+    for item in session.deleted:
+        if isinstance(item, GalleryItem):
+            before = [_stored_value(item, attr) for attr in _TRACKED]
+            if _UNKNOWN in before:
+                stale = True
+                continue
+            for key in _keys(*before):
+                deltas[key] -= 1
+
+    if not stale and not any(deltas.values()):
+        return
+
+    connection = session.connection()
+    if stale:
+        _mark_stale(connection)
+        return
+    projects = 0
+    for (dimension, value), delta in deltas.items():
+        if not delta:
+            continue
+        before, after = _bump(connection, dimension, value, delta)
+        if dimension == "project" and (before > 0) != (after > 0):
+            projects += 1 if after > 0 else -1
+    if projects:
+        _bump(connection, "projects", "", projects)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state):
+    # Bulk UPDATE/DELETE bypass the flush, so recount on the next read
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if any(mapper.class_ is GalleryItem for mapper in orm_execute_state.all_mappers):
+            _mark_stale(orm_execute_state.session.connection())
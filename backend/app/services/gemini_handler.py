@@ -1,7 +1,7 @@
-from google import genai
-from google.genai import types
+from .lazy_imports import lazy_module
 import json
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 import re
@@ -11,9 +11,51 @@ from .prompt_config import (
     get_content_type_config,
     CONTENT_TYPES,
 )
+from .script_cache import ScriptCache, script_cache_key
+from .tracing import in_context, span, traced
+
+genai = lazy_module("google.genai")  # imported on first use
+types = lazy_module("google.genai.types")
 
 load_dotenv()
 
+_json_decoder = json.JSONDecoder()
+
+
+def extract_json(text: str, expect: Optional[type] = dict):
+    """
+    The first complete JSON object (or array, with expect=list) in a model response.
+
+    Tries each '{' (or '[') in turn and lets the json decoder parse from there,
+    so markdown fences, prose before or after the JSON and trailing commentary
+    are skipped without any regex clean-up. expect=None accepts either.
+
+    Raises:
+        ValueError: the text holds no complete JSON value of that kind
+    """
+    if not text:
+        raise ValueError("Empty response from model")
+    openers = {dict: "{", list: "[", None: "{["}[expect]
+    try:
+        value = json.loads(text)
+        if expect is None or isinstance(value, expect):
+            return value
+    except ValueError:
+        pass
+    index = 0
+    while True:
+        starts = [i for i in (text.find(opener, index) for opener in openers) if i != -1]
+        if not starts:
+            kind = {dict: "object", list: "array", None: "value"}[expect]
+            raise ValueError(f"No complete JSON {kind} in model response")
+        start = min(starts)
+        try:
+            value, _ = _json_decoder.raw_decode(text, start)
+            return value
+        except ValueError:
+            index = start + 1
+
+
 class GeminiHandler:
     def __init__(self):
         api_key = os.getenv('GOOGLE_API_KEY')
@@ -26,16 +68,21 @@ class GeminiHandler:
         # Actually, let's stick to what was there: 'gemini-3-pro-preview'
         self.text_model_name = 'gemini-3-pro-preview'
         self.image_model_name = 'gemini-3-pro-image-preview'
+        # Generated scripts by model, prompt, topic and slide count (see script_cache)
+        self.script_cache = ScriptCache()
     
-    def _clean_json_text(self, text: str) -> str:
-        """Clean markdown formatting from JSON string"""
-        if not text:
-            return ""
-        # Remove markdown code blocks
-        text = re.sub(r'```json\s*', '', text)
-        text = re.sub(r'```\s*$', '', text)
-        text = text.strip()
-        return text
+    def _generate_content(self, **kwargs):
+        """models.generate_content, timed as a provider_call span (see tracing)"""
+        with span("provider_call", provider="gemini", model=kwargs.get("model", "")):
+            return self.client.models.generate_content(**kwargs)
+    
+    def _cached_script(self, prompt: str, topic: str, slides: int, refresh: bool = False):
+        """(cache key, cached script or None) for a script request; refresh skips the read."""
+        key = script_cache_key(self.text_model_name, prompt, topic, slides)
+        script = None if refresh else self.script_cache.get(key)
+        if script is not None:
+            print(f"♻️  Using cached script for '{topic}'")
+        return key, script
 
     def _detect_content_type(self, topic: str) -> str:
         """
@@ -75,7 +122,8 @@ class GeminiHandler:
         
         return 'story'
 
-    def _generate_list_content(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15) -> Dict:
+    def _generate_list_content(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15,
+                               refresh: bool = False) -> Dict:
         """Generate list-style slideshow content (e.g., '5 philosophers with great quotes')
         
         Args:
@@ -171,8 +219,12 @@ class GeminiHandler:
         Remember: You're not reading Wikipedia. You're making someone stop scrolling because they NEED to hear what comes next.
         """
         
+        cache_key, cached = self._cached_script(prompt, topic, num_scenes, refresh)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -184,9 +236,9 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            story_data = json.loads(cleaned_text)
+            story_data = extract_json(response.text)
             story_data['content_type'] = 'list'
+            self.script_cache.put(cache_key, story_data, topic=topic, model=self.text_model_name, slides=num_scenes)
             return story_data
         except Exception as e:
             print(f"Error generating list content: {e}")
@@ -194,12 +246,13 @@ class GeminiHandler:
                 print("Model not found, trying gemini-2.0-flash-exp...")
                 try:
                     self.text_model_name = 'gemini-2.0-flash-exp'
-                    return self._generate_list_content(topic)
+                    return self._generate_list_content(topic, refresh=refresh)
                 except:
                     pass
             return None
 
-    def generate_philosophy_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15) -> Dict:
+    def generate_philosophy_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15,
+                                  refresh: bool = False) -> Dict:
         """Generate an engaging philosophy script optimized for TikTok.
         
         Automatically detects if the topic is:
@@ -212,6 +265,7 @@ class GeminiHandler:
             topic: The content topic
             num_scenes: Target number of scenes (default 10, produces ~60s video)
             words_per_scene: Target words per scene (default 15, ~6s of speech each)
+            refresh: Generate a new script even if one is cached (the new one replaces it)
         """
         # Detect content type and route to appropriate generator
         content_type = self._detect_content_type(topic)
@@ -219,11 +273,12 @@ class GeminiHandler:
         print(f"Generating {num_scenes} scenes × {words_per_scene} words = ~{num_scenes * 6}s video")
         
         if content_type == 'list':
-            return self._generate_list_content(topic, num_scenes, words_per_scene)
+            return self._generate_list_content(topic, num_scenes, words_per_scene, refresh)
         
         # Default: narrative story
-        return self._generate_narrative_story(topic, num_scenes, words_per_scene)
+        return self._generate_narrative_story(topic, num_scenes, words_per_scene, refresh)
     
+    @traced("script_generation", provider="gemini")
     def generate_timed_script(
         self, 
         topic: str, 
@@ -279,7 +334,8 @@ class GeminiHandler:
         
         return story_data
     
-    def _generate_narrative_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15) -> Dict:
+    def _generate_narrative_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15,
+                                  refresh: bool = False) -> Dict:
         """Generate a narrative story script with timing constraints.
         
         Args:
@@ -377,8 +433,12 @@ class GeminiHandler:
         Remember: You're not writing a Wikipedia article. You're telling a STORY that will make someone stop scrolling and FEEL something. Make every word count.
         """
         
+        cache_key, cached = self._cached_script(prompt, topic, num_scenes, refresh)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -390,9 +450,9 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            story_data = json.loads(cleaned_text)
+            story_data = extract_json(response.text)
             story_data['content_type'] = 'story'
+            self.script_cache.put(cache_key, story_data, topic=topic, model=self.text_model_name, slides=num_scenes)
             return story_data
         except Exception as e:
             print(f"Error generating story: {e}")
@@ -401,7 +461,7 @@ class GeminiHandler:
                 print("Model not found, trying gemini-2.0-flash-exp...")
                 try:
                     self.text_model_name = 'gemini-2.0-flash-exp'
-                    return self.generate_philosophy_story(topic)
+                    return self.generate_philosophy_story(topic, refresh=refresh)
                 except:
                     pass
             return None
@@ -427,7 +487,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.image_model_name,
                 contents=prompt
             )
@@ -436,6 +496,7 @@ class GeminiHandler:
             print(f"Error generating image prompt: {e}")
             return None
     
+    @traced("script_generation", provider="gemini")
     def generate_mentor_slideshow(self, topic: str) -> Dict:
         """
         Generate a philosophical mentor-style slideshow script.
@@ -623,7 +684,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -635,8 +696,7 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            slideshow_data = json.loads(cleaned_text)
+            slideshow_data = extract_json(response.text)
             slideshow_data['content_type'] = 'mentor_slideshow'
             return slideshow_data
             
@@ -651,6 +711,7 @@ class GeminiHandler:
                     pass
             return None
 
+    @traced("script_generation", provider="gemini")
     def generate_slideshow_script(self, topic: str) -> Dict:
         """
         Generate a slideshow script for children's-book-style slides.
@@ -905,7 +966,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -917,8 +978,7 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            slideshow_data = json.loads(cleaned_text)
+            slideshow_data = extract_json(response.text)
             slideshow_data['content_type'] = 'slideshow'
             return slideshow_data
             
@@ -933,6 +993,7 @@ class GeminiHandler:
                     pass
             return None
 
+    @traced("script_generation", provider="gemini")
     def generate_wisdom_slideshow(self, topic: str, user_prompt: str = None) -> Dict:
         """
         Generate a philosophical wisdom slideshow script with the PhilosophizeMe style.
@@ -1114,7 +1175,7 @@ class GeminiHandler:
         """
 
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -1126,8 +1187,7 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
 
-            cleaned_text = self._clean_json_text(response.text)
-            slideshow_data = json.loads(cleaned_text)
+            slideshow_data = extract_json(response.text)
             slideshow_data['content_type'] = 'wisdom_slideshow'
             return slideshow_data
 
@@ -1142,7 +1202,8 @@ class GeminiHandler:
                     pass
             return None
 
-    def generate_script(self, topic: str, content_type: str) -> Optional[Dict]:
+    @traced("script_generation", provider="gemini")
+    def generate_script(self, topic: str, content_type: str, refresh: bool = False) -> Optional[Dict]:
         """
         Generate a script using the centralized prompt configuration.
 
@@ -1152,6 +1213,7 @@ class GeminiHandler:
         Args:
             topic: The topic to generate content about
             content_type: One of: list_educational, list_existential, wisdom_slideshow, narrative_story
+            refresh: Generate a new script even if one is cached (the new one replaces it)
 
         Returns:
             Dict with script data including slides, or None on failure
@@ -1163,8 +1225,12 @@ class GeminiHandler:
         print(f"\n🎬 Generating {content_type} script for: {topic}")
         print(f"   Using {config.num_slides} slides, {config.slide_structure} structure")
 
+        cache_key, cached = self._cached_script(prompt, topic, config.num_slides, refresh)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -1176,12 +1242,13 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
 
-            cleaned_text = self._clean_json_text(response.text)
-            script_data = json.loads(cleaned_text)
+            script_data = extract_json(response.text)
 
             # Ensure content_type is set
             script_data['content_type'] = content_type
             script_data['default_image_style'] = config.default_image_style
+            self.script_cache.put(cache_key, script_data, topic=topic, model=self.text_model_name,
+                                  slides=config.num_slides)
 
             print(f"✅ Generated {len(script_data.get('slides', []))} slides")
             return script_data
@@ -1192,11 +1259,46 @@ class GeminiHandler:
                 print("Model not found, trying gemini-2.0-flash-exp...")
                 try:
                     self.text_model_name = 'gemini-2.0-flash-exp'
-                    return self.generate_script(topic, content_type)
+                    return self.generate_script(topic, content_type, refresh)
                 except:
                     pass
             return None
 
+    def generate_scripts_batch(
+        self,
+        topics: List[str],
+        content_type: str,
+        max_concurrency: int = 3
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Generate scripts for many topics concurrently (see generate_script).
+
+        At most max_concurrency requests run at once, a repeated topic is
+        generated once, and cached scripts are returned without calling the model.
+
+        Returns:
+            {topic: script or None on failure}, in the order of topics
+        """
+        return self._run_batch(topics, lambda topic: self.generate_script(topic, content_type), max_concurrency)
+
+    def _run_batch(self, topics: List[str], generate, max_concurrency: int) -> Dict[str, Optional[Dict]]:
+        unique = list(dict.fromkeys(topics))
+        if not unique:
+            return {}
+
+        def run(topic: str) -> Optional[Dict]:
+            try:
+                return generate(topic)
+            except Exception as e:
+                print(f"Error generating script for '{topic}': {e}")
+                return None
+
+        # The pool size is the concurrency bound
+        with ThreadPoolExecutor(max_workers=min(len(unique), max(1, max_concurrency)),
+                                thread_name_prefix="script-batch") as executor:
+            futures = {topic: executor.submit(in_context(run), topic) for topic in unique}
+            return {topic: futures[topic].result() for topic in unique}
+
     def enhance_topic_prompt(self, raw_topic: str) -> str:
         """
         Enhance a weak/basic topic into a more compelling prompt.
@@ -1235,7 +1337,7 @@ class GeminiHandler:
         """
 
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt
             )
@@ -1277,7 +1379,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -1285,8 +1387,7 @@ class GeminiHandler:
                 )
             )
             
-            cleaned_text = self._clean_json_text(response.text)
-            scenes = json.loads(cleaned_text)
+            scenes = extract_json(response.text, expect=list)
             return scenes
         except Exception as e:
             print(f"Error analyzing scenes: {e}")
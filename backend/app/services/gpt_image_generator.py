@@ -11,12 +11,17 @@ because:
 """
 
 import os
-import fal_client
-import requests
+from .lazy_imports import lazy_module
+import tempfile
 from PIL import Image, ImageOps
 import io
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
 from dotenv import load_dotenv
+from .image_writer import GeneratedImage, get_image_writer
+from .tracing import span
+from .http_client import download
+
+fal_client = lazy_module("fal_client")  # imported on first use
 
 load_dotenv()
 
@@ -85,8 +90,9 @@ Vertical 9:16 aspect ratio, mobile format."""
         scene_number: int,
         story_title: str,
         image_size: str = "1024x1536",  # Vertical format
-        output_format: str = "png"
-    ) -> Optional[str]:
+        output_format: str = "png",
+        return_image: bool = False
+    ) -> Optional[Union[str, GeneratedImage]]:
         """
         Generate a single image using GPT Image 1.5.
         
@@ -96,9 +102,11 @@ Vertical 9:16 aspect ratio, mobile format."""
             story_title: Story title for filename
             image_size: Image size (default 1024x1536 for vertical)
             output_format: Output format (png or jpg)
+            return_image: Return a GeneratedImage (decoded image, PNG saved in
+                the background) instead of waiting for the file
             
         Returns:
-            Local path to saved image, or None on failure
+            Local path to saved image (or GeneratedImage), or None on failure
         """
         print(f"\n🎨 Generating image for scene {scene_number}...")
         print(f"📝 Prompt: {prompt[:150]}...")
@@ -114,19 +122,20 @@ Vertical 9:16 aspect ratio, mobile format."""
                         msg = log.get('message', str(log)) if isinstance(log, dict) else str(log)
                         print(f"   [fal] {msg}")
             
-            result = fal_client.subscribe(
-                self.model_id,
-                arguments={
-                    "prompt": prompt,
-                    "image_size": image_size,
-                    "background": "auto",
-                    "quality": self.quality,
-                    "num_images": 1,
-                    "output_format": output_format
-                },
-                with_logs=True,
-                on_queue_update=on_queue_update,
-            )
+            with span("provider_call", provider="fal", model=self.model_id):
+                result = fal_client.subscribe(
+                    self.model_id,
+                    arguments={
+                        "prompt": prompt,
+                        "image_size": image_size,
+                        "background": "auto",
+                        "quality": self.quality,
+                        "num_images": 1,
+                        "output_format": output_format
+                    },
+                    with_logs=True,
+                    on_queue_update=on_queue_update,
+                )
             
             # Extract image URL or base64 data
             # Debug: log the response structure
@@ -169,9 +178,10 @@ Vertical 9:16 aspect ratio, mobile format."""
                     return None
             else:
                 # Regular HTTP URL - download the image
-                response = requests.get(image_url, stream=True)
-                response.raise_for_status()
-                image = Image.open(io.BytesIO(response.content))
+                # Stream to a temp file on the shared keep-alive session
+                with tempfile.TemporaryFile() as buffer:
+                    image = Image.open(download(image_url, buffer))
+                    image.load()
             
             # Resize to exact TikTok dimensions
             image = ImageOps.fit(image, (1080, 1920), method=Image.Resampling.LANCZOS)
@@ -179,6 +189,9 @@ Vertical 9:16 aspect ratio, mobile format."""
             # Save the image
             safe_title = "".join(c for c in story_title if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
             filename = f"{self.output_dir}/{safe_title}_scene_{scene_number}_gpt15.png"
+            if return_image:
+                print(f"✅ Image decoded, saving in background: {filename}")
+                return get_image_writer().save(image, filename, 'PNG')
             image.save(filename, 'PNG')
             
             print(f"✅ Image saved: {filename}")
@@ -309,8 +322,9 @@ Vertical 9:16 aspect ratio, mobile format."""
         visual_description: str,
         scene_number: int,
         story_title: str,
-        image_size: str = "1024x1536"
-    ) -> Optional[str]:
+        image_size: str = "1024x1536",
+        return_image: bool = False
+    ) -> Optional[Union[str, GeneratedImage]]:
         """
         Generate a BACKGROUND-ONLY image (no text).
         
@@ -322,9 +336,11 @@ Vertical 9:16 aspect ratio, mobile format."""
             scene_number: Scene number for filename
             story_title: Story title for filename
             image_size: Image size (default vertical)
+            return_image: Return a GeneratedImage that can be passed straight
+                to TextOverlay; the PNG is saved in the background
             
         Returns:
-            Path to saved background image, or None on failure
+            Path to saved background image (or GeneratedImage), or None on failure
         """
         print(f"\n🎨 Generating background for scene {scene_number}...")
         
@@ -336,17 +352,18 @@ Vertical 9:16 aspect ratio, mobile format."""
         print(f"📝 Prompt: {prompt[:120]}...")
         
         try:
-            result = fal_client.subscribe(
-                self.model_id,
-                arguments={
-                    "prompt": prompt,
-                    "image_size": image_size,
-                    "background": "auto",
-                    "quality": self.quality,
-                    "num_images": 1,
-                    "output_format": "png"
-                },
-            )
+            with span("provider_call", provider="fal", model=self.model_id):
+                result = fal_client.subscribe(
+                    self.model_id,
+                    arguments={
+                        "prompt": prompt,
+                        "image_size": image_size,
+                        "background": "auto",
+                        "quality": self.quality,
+                        "num_images": 1,
+                        "output_format": "png"
+                    },
+                )
             
             images = result.get('images', [])
             if not images:
@@ -366,9 +383,10 @@ Vertical 9:16 aspect ratio, mobile format."""
                 image_bytes = b64.b64decode(encoded_data)
                 image = Image.open(io.BytesIO(image_bytes))
             else:
-                response = requests.get(image_url, stream=True)
-                response.raise_for_status()
-                image = Image.open(io.BytesIO(response.content))
+                # Stream to a temp file on the shared keep-alive session
+                with tempfile.TemporaryFile() as buffer:
+                    image = Image.open(download(image_url, buffer))
+                    image.load()
             
             # Resize to TikTok dimensions
             image = ImageOps.fit(image, (1080, 1920), method=Image.Resampling.LANCZOS)
@@ -376,6 +394,9 @@ Vertical 9:16 aspect ratio, mobile format."""
             # Save with _bg suffix to distinguish from final images
             safe_title = "".join(c for c in story_title if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
             filename = f"{self.output_dir}/{safe_title}_scene_{scene_number}_bg.png"
+            if return_image:
+                print(f"✅ Background decoded, saving in background: {filename}")
+                return get_image_writer().save(image, filename, 'PNG')
             image.save(filename, 'PNG')
             
             print(f"✅ Background saved: {filename}")
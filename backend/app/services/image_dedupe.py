@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Image Dedupe - perceptual-hash index for near-duplicate images.
+
+Automation runs and the reference scraper keep producing backgrounds and
+frames that are visually the same image (re-rolls of one prompt, a slideshow
+slide captured twice). A 64-bit perceptual hash maps near-identical images to
+hashes a few bits apart, so a near-duplicate is any stored hash within
+max_distance bits (Hamming distance).
+
+Hashes:
+- phash: DCT of a 32x32 grayscale thumbnail, low frequencies vs. their median
+  (robust to resizing, recompression and small color shifts; the default)
+- dhash: brightness gradients of a 9x8 thumbnail (cheaper, no numpy)
+
+Lookup uses multi-index hashing: the 64 bits are split into CHUNKS 16-bit
+chunks, each with its own table. Two hashes within r bits must agree to within
+r // CHUNKS bits on at least one chunk, so a lookup probes only the chunk
+values that close to the query's and checks the few candidates found there.
+That stays well under a millisecond with hundreds of thousands of entries.
+
+Usage:
+    from image_dedupe import PerceptualIndex
+
+    index = PerceptualIndex("backgrounds.db")
+    match = index.match("new_background.png")
+    if match:
+        reuse(match.meta["url"])          # match.key, match.distance
+    else:
+        index.add("new_background.png", "new_background.png", url=uploaded_url)
+"""
+
+import json
+import sqlite3
+import threading
+from itertools import combinations
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+from PIL import Image
+
+from .lazy_imports import lazy_module
+
+np = lazy_module("numpy")  # imported on first use
+
+# Bits two images may differ by and still count as the same picture
+DEFAULT_MAX_DISTANCE = 6
+
+HASH_BITS = 64
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+ImageInput = Union[str, Path, Image.Image]
+
+
+# =============================================================================
+# HASHES
+# =============================================================================
+
+def _grayscale(image: ImageInput, size) -> Image.Image:
+    if isinstance(image, Image.Image):
+        img = image
+    else:
+        img = Image.open(image)
+        # JPEGs can decode straight at a fraction of their size
+        img.draft("L", (size[0] * 4, size[1] * 4))
+    return img.convert("L").resize(size, Image.Resampling.LANCZOS)
+
+
+def dhash(image: ImageInput) -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbor?"""
+    pixels = list(_grayscale(image, (9, 8)).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            value = (value << 1) | (left > pixels[row * 9 + col + 1])
+    return value
+
+
+_dct_matrix = None
+
+
+def _dct(size: int = 32):
+    global _dct_matrix
+    if _dct_matrix is None:
+        n = np.arange(size)
+        matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size)) * np.sqrt(2 / size)
+        matrix[0] /= np.sqrt(2)
+        _dct_matrix = matrix
+    return _dct_matrix
+
+
+def phash(image: ImageInput) -> int:
+    """64-bit perceptual hash: 8x8 lowest DCT frequencies above/below their median."""
+    pixels = np.asarray(_grayscale(image, (32, 32)), dtype=np.float64)
+    dct = _dct()
+    low = (dct @ pixels @ dct.T)[:8, :8].flatten()
+    # The DC term is overall brightness, not structure
+    bits = low > np.median(low[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class Match(NamedTuple):
+    key: str
+    distance: int
+    hash: int
+    meta: Dict
+
+
+def _chunks(value: int) -> List[int]:
+    return [(value >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(CHUNKS)]
+
+
+_flip_masks: Dict[int, List[int]] = {}
+
+
+def _masks_within(radius: int) -> List[int]:
+    """XOR masks of every chunk value within radius bits (0 first)."""
+    if radius not in _flip_masks:
+        masks = [0]
+        for r in range(1, radius + 1):
+            for positions in combinations(range(CHUNK_BITS), r):
+                mask = 0
+                for p in positions:
+                    mask |= 1 << p
+                masks.append(mask)
+        _flip_masks[radius] = masks
+    return _flip_masks[radius]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_hashes (
+    key TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}'
+)
+"""
+
+
+class PerceptualIndex:
+    """
+    Near-duplicate lookup over perceptual hashes, optionally persisted to SQLite.
+
+    With a db_path the index is loaded from disk on creation and every add/remove
+    is written through; without one it lives in memory only.
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None, max_distance: int = DEFAULT_MAX_DISTANCE,
+                 hash_fn: Callable[[ImageInput], int] = phash):
+        self.db_path = Path(db_path) if db_path else None
+        self.max_distance = max_distance
+        self.hash_fn = hash_fn
+        self._lock = threading.RLock()
+        self._hashes: Dict[str, int] = {}
+        self._meta: Dict[str, Dict] = {}
+        self._tables: List[Dict[int, List[str]]] = [{} for _ in range(CHUNKS)]
+        if self.db_path:
+            self._load()
+
+    # --- persistence ---------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.execute(_SCHEMA)
+        return conn
+
+    def _load(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            for key, value, meta in conn.execute("SELECT key, hash, meta FROM image_hashes"):
+                self._insert(key, int(value, 16), json.loads(meta))
+        finally:
+            conn.close()
+
+    def _write(self, sql: str, params):
+        if not self.db_path:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                if isinstance(params, list):
+                    conn.executemany(sql, params)
+                else:
+                    conn.execute(sql, params)
+        finally:
+            conn.close()
+
+    # --- in-memory tables ----------------------------------------------------
+
+    def _insert(self, key: str, value: int, meta: Dict):
+        if key in self._hashes:
+            self._discard(key)
+        self._hashes[key] = value
+        self._meta[key] = meta
+        for table, chunk in zip(self._tables, _chunks(value)):
+            table.setdefault(chunk, []).append(key)
+
+    def _discard(self, key: str):
+        value = self._hashes.pop(key)
+        self._meta.pop(key, None)
+        for table, chunk in zip(self._tables, _chunks(value)):
+            bucket = table[chunk]
+            bucket.remove(key)
+            if not bucket:
+                del table[chunk]
+
+    # --- public API ----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._hashes
+
+    def hash(self, image: Union[ImageInput, int]) -> int:
+        return image if isinstance(image, int) else self.hash_fn(image)
+
+    def find(self, image: Union[ImageInput, int], max_distance: Optional[int] = None) -> List[Match]:
+        """Every stored image within max_distance bits, closest first."""
+        value = self.hash(image)
+        radius = self.max_distance if max_distance is None else max_distance
+        masks = _masks_within(radius // CHUNKS)
+        seen = set()
+        matches = []
+        with self._lock:
+            for table, chunk in zip(self._tables, _chunks(value)):
+                for mask in masks:
+                    for key in table.get(chunk ^ mask, ()):
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        distance = hamming(value, self._hashes[key])
+                        if distance <= radius:
+                            matches.append(Match(key, distance, self._hashes[key], self._meta[key]))
+        matches.sort(key=lambda m: (m.distance, m.key))
+        return matches
+
+    def match(self, image: Union[ImageInput, int], max_distance: Optional[int] = None) -> Optional[Match]:
+        """The closest stored near-duplicate, or None."""
+        matches = self.find(image, max_distance)
+        return matches[0] if matches else None
+
+    def add(self, key: str, image: Union[ImageInput, int], **meta) -> int:
+        """Store an image's hash under key (replacing any previous entry); returns the hash."""
+        value = self.hash(image)
+        with self._lock:
+            self._insert(key, value, meta)
+            self._write("INSERT OR REPLACE INTO image_hashes (key, hash, meta) VALUES (?, ?, ?)",
+                        (key, f"{value:016x}", json.dumps(meta)))
+        return value
+
+    def add_unique(self, key: str, image: Union[ImageInput, int], **meta) -> Optional[Match]:
+        """Add the image unless a near-duplicate is stored; returns that duplicate (None if added)."""
+        value = self.hash(image)
+        with self._lock:
+            existing = self.match(value)
+            if existing is None:
+                self.add(key, value, **meta)
+            return existing
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._hashes:
+                return False
+            self._discard(key)
+            self._write("DELETE FROM image_hashes WHERE key = ?", (key,))
+            return True
+
+    def remove_prefix(self, prefix: str) -> int:
+        """Remove every key starting with prefix (e.g. all frames of one reference)."""
+        with self._lock:
+            keys = [key for key in self._hashes if key.startswith(prefix)]
+            for key in keys:
+                self._discard(key)
+            self._write("DELETE FROM image_hashes WHERE key = ?", [(key,) for key in keys])
+            return len(keys)
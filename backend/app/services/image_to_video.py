@@ -21,12 +21,16 @@ MODEL DETAILS:
 """
 
 import os
-import fal_client
-import requests
+from .lazy_imports import lazy_module
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 from datetime import datetime
 
+from .tracing import span, traced
+from .http_client import download
+
+fal_client = lazy_module("fal_client")  # imported on first use
+
 # Import cloud storage for uploading results
 try:
     from .cloud_storage import get_storage_service, upload_video_to_gcs
@@ -82,6 +86,7 @@ Photorealistic oil painting texture, epic historical atmosphere."""
         self.clips_dir = self.output_dir / "clips"
         self.clips_dir.mkdir(parents=True, exist_ok=True)
     
+    @traced("upload", provider="fal")
     def upload_image_to_fal(self, local_path: str) -> str:
         """Upload a local image to fal.ai storage and return the URL."""
         if not os.path.exists(local_path):
@@ -133,11 +138,12 @@ Photorealistic oil painting texture, epic historical atmosphere."""
                 "resolution": self.resolution,
             }
             
-            result = fal_client.subscribe(
-                self.MODEL_ID,
-                arguments=arguments,
-                with_logs=True,
-            )
+            with span("provider_call", provider="fal", model=self.MODEL_ID):
+                result = fal_client.subscribe(
+                    self.MODEL_ID,
+                    arguments=arguments,
+                    with_logs=True,
+                )
             
             # Get video URL
             video_url = result.get('video', {}).get('url')
@@ -149,12 +155,7 @@ Photorealistic oil painting texture, epic historical atmosphere."""
             filename = output_name or f"transition_{timestamp}.mp4"
             output_path = self.clips_dir / filename
             
-            response = requests.get(video_url, stream=True)
-            response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            download(video_url, output_path)
             
             # Upload to GCS if available
             gcs_url = None
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Image Writer - hand decoded images straight to the next stage.
+
+Generators used to download a background, fit it to 1080x1920, save a
+lossless PNG and return the path; TextOverlay then re-opened and re-decoded
+that PNG. With this module a generator returns a GeneratedImage instead: the
+decoded Pillow image plus the path it *will* be saved to. The PNG is written
+by a background thread, so the encode/decode round trip leaves the critical
+path while the file still ends up on disk for galleries, retries and audits.
+
+Usage:
+    bg = generator.generate_background(..., return_image=True)
+    overlay.create_slide(background_path=bg, ...)   # uses bg.image, no re-decode
+    bg.wait()                                       # only if you need the file now
+
+Anything that accepts a background (TextOverlay.create_slide & friends) can be
+given a path, a PIL Image or a GeneratedImage - see load_image().
+
+Output profiles
+---------------
+OUTPUT_PROFILES names every encoder setting we ship with, so format, quality,
+chroma subsampling and PNG compression are chosen in one place:
+
+    tiktok_jpeg       TikTok photo posts (PNG is rejected), 4:4:4 for crisp text
+    instagram_jpeg    Instagram/email attachments, smaller 4:2:0 progressive
+    archive_png_fast  Lossless slides on disk, zlib level 1 (PIL default is 6)
+    webp_preview      Thumbnails / previews
+
+    save_image(img, "slide.png", "archive_png_fast")
+    data, name, mime = encode_file("slide.png", "instagram_jpeg")
+
+Derivatives
+-----------
+Galleries and dashboards should never load a full 1080x1920 slide.
+ensure_derivative() makes (or reuses) a small WebP next to the original:
+
+    thumb = ensure_derivative("generated_slides/abc_final.png", "thumb")
+    # -> generated_slides/derivatives/abc_final_thumb.webp (270px wide)
+
+Benchmark (encode time and bytes per profile):
+    python image_writer.py benchmark [image ...]
+"""
+
+import io
+import os
+import sys
+import time
+import atexit
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple, Union
+
+from PIL import Image
+
+from .tracing import in_context, span, traced
+
+
+# =============================================================================
+# OUTPUT PROFILES
+# =============================================================================
+
+OUTPUT_PROFILES = {
+    "tiktok_jpeg": {
+        "format": "JPEG",
+        "ext": ".jpg",
+        "mime": "image/jpeg",
+        "params": {"quality": 92, "subsampling": 0},
+    },
+    "instagram_jpeg": {
+        "format": "JPEG",
+        "ext": ".jpg",
+        "mime": "image/jpeg",
+        "params": {"quality": 88, "subsampling": 2, "optimize": True, "progressive": True},
+    },
+    "archive_png_fast": {
+        "format": "PNG",
+        "ext": ".png",
+        "mime": "image/png",
+        "params": {"compress_level": 1},
+    },
+    "webp_preview": {
+        "format": "WEBP",
+        "ext": ".webp",
+        "mime": "image/webp",
+        "params": {"quality": 75, "method": 4},
+    },
+}
+
+# What finished slides are written as unless a caller asks for something else
+DEFAULT_SLIDE_PROFILE = "archive_png_fast"
+
+
+def get_profile(name: str) -> dict:
+    """Look up an output profile by name."""
+    if name not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile: {name} (options: {', '.join(OUTPUT_PROFILES)})")
+    return OUTPUT_PROFILES[name]
+
+
+def profile_for_path(path: str, preferred: str = DEFAULT_SLIDE_PROFILE) -> Optional[str]:
+    """
+    Profile to use when writing to path.
+
+    The preferred profile wins if its format matches the file extension;
+    otherwise the first profile with that extension (so "out.jpg" is still a
+    JPEG). None if no profile matches.
+    """
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext == ".jpeg":
+        ext = ".jpg"
+    if get_profile(preferred)["ext"] == ext:
+        return preferred
+    return next((name for name, p in OUTPUT_PROFILES.items() if p["ext"] == ext), None)
+
+
+def _prepare(image: Image.Image, image_format: str) -> Image.Image:
+    """Convert to a mode the encoder accepts (JPEG has no alpha)."""
+    if image_format == "JPEG" and image.mode != "RGB":
+        if image.mode in ("RGBA", "LA", "P"):
+            rgba = image.convert("RGBA")
+            flattened = Image.new("RGB", rgba.size, (255, 255, 255))
+            flattened.paste(rgba, mask=rgba.split()[-1])
+            return flattened
+        return image.convert("RGB")
+    if image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        return image.convert("RGB")
+    return image
+
+
+@traced("encode")
+def encode_image(image: Image.Image, profile: str) -> bytes:
+    """Encode an image with a named profile and return the bytes."""
+    p = get_profile(profile)
+    buffer = io.BytesIO()
+    _prepare(image, p["format"]).save(buffer, p["format"], **p["params"])
+    return buffer.getvalue()
+
+
+@traced("encode")
+def save_image(image: Image.Image, path: str, profile: str = DEFAULT_SLIDE_PROFILE) -> str:
+    """
+    Save an image with a named profile.
+
+    If the path's extension doesn't match the profile's format, the profile
+    for that extension is used instead (PIL picks the format for unknown ones).
+    """
+    name = profile_for_path(path, profile)
+    if name is None:
+        image.save(path)
+        return path
+    p = get_profile(name)
+    _prepare(image, p["format"]).save(path, p["format"], **p["params"])
+    return path
+
+
+def encode_file(path: str, profile: str) -> Tuple[bytes, str, str]:
+    """
+    Re-encode an image file for upload/attachment.
+
+    Files already in the profile's format are passed through untouched (no
+    second generation of JPEG loss).
+
+    Returns:
+        (data, filename, mime_type) - filename has the profile's extension
+    """
+    p = get_profile(profile)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with Image.open(path) as img:
+        if img.format == p["format"]:
+            with open(path, "rb") as f:
+                return f.read(), f"{stem}{p['ext']}", p["mime"]
+        return encode_image(img, profile), f"{stem}{p['ext']}", p["mime"]
+
+
+# =============================================================================
+# IN-MEMORY HAND-OFF + BACKGROUND WRITER
+# =============================================================================
+
+class GeneratedImage:
+    """A decoded image plus the path it is being persisted to."""
+
+    def __init__(self, image: Image.Image, path: str, future: Optional[Future] = None):
+        self.image = image
+        self.path = path
+        self._future = future
+
+    @property
+    def saved(self) -> bool:
+        """True once the file exists on disk."""
+        return self._future is None or self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """Block until the file is written; re-raises write errors. Returns the path."""
+        if self._future is not None:
+            self._future.result(timeout=timeout)
+        return self.path
+
+    def __fspath__(self) -> str:
+        # os.path/open() callers get a file that actually exists
+        return self.wait()
+
+    def __str__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        state = "saved" if self.saved else "pending"
+        return f"GeneratedImage({self.path!r}, {self.image.size}, {state})"
+
+
+# Anything load_image() accepts
+ImageSource = Union[str, Image.Image, GeneratedImage]
+
+
+class AsyncImageWriter:
+    """Saves images on background threads."""
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-writer")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _write(self, image: Image.Image, path: str, format: str, params: dict) -> str:
+        # Write to a temp file first so readers never see a half-written image;
+        # a unique name so two queued saves to the same path can't collide
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as tmp:
+            try:
+                with span("encode", format=format):
+                    image.save(tmp, format, **params)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+        return path
+
+    def submit(self, image: Image.Image, path: str, format: str = "PNG", **params) -> Future:
+        """Queue an image to be saved. The image must not be modified afterwards."""
+        future = self._executor.submit(in_context(self._write), image, path, format, params)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        if future.exception() is not None:
+            print(f"❌ Background image save failed: {future.exception()}")
+
+    def save(self, image: Image.Image, path: str, format: str = "PNG", **params) -> GeneratedImage:
+        """Queue a save and return a GeneratedImage handle for the next stage."""
+        return GeneratedImage(image, path, self.submit(image, path, format, **params))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait for every queued write to finish."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # already reported in _done
+
+
+_writer: Optional[AsyncImageWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_image_writer() -> AsyncImageWriter:
+    """Process-wide writer (flushed at interpreter exit)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AsyncImageWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+
+def load_image(source: ImageSource, mode: str = "RGBA") -> Image.Image:
+    """
+    Get a Pillow image in the given mode from a path, Image or GeneratedImage.
+
+    In-memory images are converted into a new image, so the caller's copy
+    (which may still be being written to disk) is never modified.
+    """
+    if isinstance(source, GeneratedImage):
+        source = source.image
+    if isinstance(source, Image.Image):
+        return source.convert(mode) if source.mode != mode else source.copy()
+    with Image.open(source) as img:
+        return img.convert(mode)
+
+
+# =============================================================================
+# DERIVATIVES (thumbnails / previews)
+# =============================================================================
+
+# Named derivative sizes (width in px; height follows the aspect ratio)
+DERIVATIVE_WIDTHS = {
+    "thumb": 270,
+    "preview": 540,
+}
+DERIVATIVES_DIRNAME = "derivatives"
+
+
+def derivative_path(source_path: str, size: str) -> str:
+    """Where the derivative of a file lives: <dir>/derivatives/<stem>_<size>.webp"""
+    directory, filename = os.path.split(str(source_path))
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, DERIVATIVES_DIRNAME, f"{stem}_{size}.webp")
+
+
+def make_derivative(source: ImageSource, dest_path: str, width: int, profile: str = "webp_preview") -> str:
+    """Downscale an image to the given width and save it with a profile."""
+    if isinstance(source, (str, os.PathLike)):
+        with Image.open(source) as img:
+            # JPEG sources can decode straight at a reduced scale
+            img.draft("RGB", (width, width * 4))
+            resized = _fit_width(img, width)
+    else:
+        resized = _fit_width(load_image(source, "RGB"), width)
+    directory = os.path.dirname(dest_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    p = get_profile(profile)
+    # Unique temp name: concurrent resizes of the same key must not share one
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as tmp:
+        try:
+            _prepare(resized, p["format"]).save(tmp, p["format"], **p["params"])
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, dest_path)
+    return dest_path
+
+
+def _fit_width(img: Image.Image, width: int) -> Image.Image:
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+    if img.width <= width:
+        return img.copy()
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+def ensure_derivative(source_path: str, size: str = "preview") -> str:
+    """
+    Path to an up-to-date derivative of source_path, creating it if needed.
+
+    Falls back to the original path if the derivative can't be written
+    (read-only directory, unreadable image, ...).
+    """
+    dest = derivative_path(source_path, size)
+    try:
+        if os.path.exists(dest) and os.path.getmtime(dest) >= os.path.getmtime(source_path):
+            return dest
+        return make_derivative(source_path, dest, DERIVATIVE_WIDTHS[size])
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not create {size} for {source_path}: {e}")
+        return source_path
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def _benchmark_image() -> Image.Image:
+    """Synthetic slide: gradient + noise background with text-like hard edges."""
+    from PIL import ImageDraw
+
+    gradient = Image.linear_gradient("L").resize((1080, 1920))
+    noise = Image.effect_noise((1080, 1920), 40)
+    img = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+    draw = ImageDraw.Draw(img)
+    for row in range(12):
+        y = 700 + row * 40
+        draw.rectangle([120, y, 960, y + 20], fill=(255, 255, 255), outline=(0, 0, 0), width=3)
+    return img
+
+
+def benchmark_profiles(images, repeat: int = 3):
+    """
+    Print encode time and bytes per profile (plus the old PNG default).
+
+    Args:
+        images: PIL images to encode
+        repeat: Encodes per image per profile (best time is reported)
+    """
+    cases = [("png_default (old)", "PNG", {})] + [
+        (name, p["format"], p["params"]) for name, p in OUTPUT_PROFILES.items()
+    ]
+    print(f"\n📊 Encoder benchmark ({len(images)} image(s), best of {repeat})")
+    print(f"   {'profile':<20} {'ms/image':>10} {'KB/image':>10}")
+    for label, image_format, params in cases:
+        best_total = 0.0
+        total_bytes = 0
+        for image in images:
+            prepared = _prepare(image, image_format)
+            best = float("inf")
+            for _ in range(repeat):
+                buffer = io.BytesIO()
+                start = time.perf_counter()
+                prepared.save(buffer, image_format, **params)
+                best = min(best, time.perf_counter() - start)
+            best_total += best
+            total_bytes += buffer.tell()
+        print(f"   {label:<20} {best_total / len(images) * 1000:>10.1f} {total_bytes / len(images) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "benchmark":
+        print("Usage: python image_writer.py benchmark [image ...]")
+        sys.exit(1)
+    paths = sys.argv[2:]
+    if paths:
+        bench_images = [load_image(path, "RGB") for path in paths]
+    else:
+        print("(no images given - using a synthetic 1080x1920 slide)")
+        bench_images = [_benchmark_image()]
+    benchmark_profiles(bench_images)
@@ -18,6 +18,10 @@ from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 
+from .image_writer import encode_file
+from .http_client import get_session
+from .tracing import traced
+
 logger = logging.getLogger(__name__)
 
 # Post Bridge API configuration
@@ -54,6 +58,7 @@ class InstagramPoster:
             "Content-Type": "application/json"
         }
     
+    @traced("upload", provider="instagram")
     def upload_media(self, file_path: str) -> Optional[str]:
         """Upload a media file to Post Bridge and return the media_id.
         
@@ -68,10 +73,6 @@ class InstagramPoster:
             logger.error(f"File not found: {file_path}")
             return None
         
-        # Get file info
-        file_size = path.stat().st_size
-        file_name = path.name
-        
         # Determine MIME type
         ext = path.suffix.lower()
         mime_types = {
@@ -84,6 +85,16 @@ class InstagramPoster:
         mime_type = mime_types.get(ext, "image/png")
         
         try:
+            if mime_type.startswith("image/"):
+                # Instagram re-compresses to JPEG anyway; upload the
+                # instagram_jpeg encode instead of a multi-MB PNG
+                file_data, file_name, mime_type = encode_file(file_path, "instagram_jpeg")
+            else:
+                with open(file_path, "rb") as f:
+                    file_data = f.read()
+                file_name = path.name
+            file_size = len(file_data)
+            
             # Step 1: Request upload URL
             create_url_payload = {
                 "name": file_name,
@@ -91,7 +102,7 @@ class InstagramPoster:
                 "size_bytes": file_size
             }
             
-            response = requests.post(
+            response = get_session().post(
                 f"{POST_BRIDGE_BASE_URL}/media/create-upload-url",
                 headers=self._get_headers(),
                 json=create_url_payload
@@ -112,13 +123,11 @@ class InstagramPoster:
             logger.info(f"Got upload URL for {file_name}, media_id: {media_id}")
             
             # Step 2: Upload file to signed URL
-            with open(file_path, "rb") as f:
-                file_data = f.read()
-            
-            upload_response = requests.put(
+            upload_response = get_session().put(
                 upload_url,
                 headers={"Content-Type": mime_type},
-                data=file_data
+                data=file_data,
+                timeout=(10, 300)
             )
             
             if upload_response.status_code not in (200, 201, 204):
@@ -212,7 +221,7 @@ class InstagramPoster:
             if platform:
                 params["platform"] = platform
             
-            response = requests.get(url, headers=self._get_headers(), params=params)
+            response = get_session().get(url, headers=self._get_headers(), params=params)
             result = response.json() if response.text else {}
             
             if response.status_code == 200:
@@ -293,6 +302,7 @@ class InstagramPoster:
         else:
             return result
     
+    @traced("publish", provider="instagram")
     def post_carousel(
         self,
         image_paths: List[str],
@@ -368,7 +378,7 @@ class InstagramPoster:
         logger.debug(f"Caption: {full_caption[:100]}...")
         
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{POST_BRIDGE_BASE_URL}/posts",
                 headers=self._get_headers(),
                 json=payload
@@ -406,6 +416,7 @@ class InstagramPoster:
             logger.exception(f"Unexpected error: {e}")
             return {"success": False, "error": str(e)}
     
+    @traced("publish", provider="instagram")
     def post_single_image(
         self,
         image_path: str,
@@ -448,7 +459,7 @@ class InstagramPoster:
         }
         
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{POST_BRIDGE_BASE_URL}/posts",
                 headers=self._get_headers(),
                 json=payload
@@ -490,7 +501,7 @@ class InstagramPoster:
             dict with status info
         """
         try:
-            response = requests.get(
+            response = get_session().get(
                 f"{POST_BRIDGE_BASE_URL}/posts/{post_id}",
                 headers=self._get_headers()
             )
@@ -525,7 +536,7 @@ class InstagramPoster:
             dict with results info
         """
         try:
-            response = requests.get(
+            response = get_session().get(
                 f"{POST_BRIDGE_BASE_URL}/post-results",
                 headers=self._get_headers(),
                 params={"post_id": post_id}
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports - defer heavy SDK imports until first use.
+
+moviepy (imageio, numpy, the ffmpeg probe), google-genai, google-cloud-storage,
+fal_client, anthropic and elevenlabs each cost tens to hundreds of ms to import.
+Modules that only need them inside a few methods bind a LazyModule instead, so
+the API, the CLIs and automation workers don't pay for SDKs a run never calls:
+
+    from .lazy_imports import lazy_module, is_available
+
+    genai = lazy_module("google.genai")       # nothing imported yet
+    GCS_AVAILABLE = is_available("google.cloud.storage")
+
+    client = genai.Client(api_key=key)        # google.genai imported here
+
+The first attribute access imports the real module (thread-safe; concurrent
+lanes may hit it at the same time). A missing package raises the usual
+ImportError at that point instead of at startup.
+
+Check what a module pulls in eagerly with import_audit.py at the repo root.
+"""
+
+import importlib
+import importlib.util
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module, imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Module proxy that imports `name` the first time an attribute is used."""
+    return LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """True if `name` can be imported, without importing it (parents are imported)."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
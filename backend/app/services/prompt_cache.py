@@ -0,0 +1,169 @@
+"""
+Prompt Cache - cache-aware request builder for the agent loop.
+
+Every agent loop iteration resends the system prompt, the full tool list and
+the conversation so far. Anthropic prompt caching lets us pay for that
+stable prefix once per ~5 minutes instead of once per iteration.
+
+Breakpoint layout (the API allows at most 4):
+1. Last tool definition   - caches the whole tool list
+2. System prompt          - caches system prompt on top of the tools
+3. End of prior history   - older turns, stable for the whole request
+4. Last message           - moves forward each iteration so iteration N+1
+                            reads everything iteration N wrote
+
+Tool definitions and system blocks are serialized once and memoized; the
+per-iteration work is just copying the two messages that carry a breakpoint.
+"""
+
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+
+from .agent_tools import get_tool_definitions
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+# =============================================================================
+# MEMOIZED STATIC PREFIX
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def get_cached_tool_definitions() -> tuple:
+    """
+    Tool definitions in API format with cache_control on the last tool.
+
+    Built once per process. Returned as a tuple so callers can't mutate the
+    shared copy; pass list(...) to the SDK.
+    """
+    tools = get_tool_definitions()
+    if tools:
+        tools[-1] = {**tools[-1], "cache_control": CACHE_CONTROL}
+    logger.info(f"Memoized {len(tools)} agent tool definitions for prompt caching")
+    return tuple(tools)
+
+
+@lru_cache(maxsize=8)
+def get_cached_system_blocks(system_prompt: str) -> tuple:
+    """System prompt as a single cached text block."""
+    return ({"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL},)
+
+
+def _with_cache_control(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a message with cache_control on its last content block."""
+    content = message["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [dict(block) for block in content]
+    if not blocks:
+        return message
+    blocks[-1]["cache_control"] = CACHE_CONTROL
+    return {"role": message["role"], "content": blocks}
+
+
+# =============================================================================
+# REQUEST BUILDER
+# =============================================================================
+
+class AgentRequestBuilder:
+    """
+    Builds messages.create()/messages.stream() kwargs with cache breakpoints.
+
+    Usage:
+        builder = AgentRequestBuilder(MODEL_ID, MAX_TOKENS, SYSTEM_PROMPT)
+        history_len = len(api_messages)        # before the loop starts
+        ...
+        response = client.messages.create(**builder.build(api_messages, history_len))
+        request_metrics.record(response.usage)
+    """
+
+    def __init__(self, model: str, max_tokens: int, system_prompt: str):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.system = list(get_cached_system_blocks(system_prompt))
+        self.tools = list(get_cached_tool_definitions())
+
+    def build(self, api_messages: List[Dict[str, Any]], history_len: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Args:
+            api_messages: Full message list for this iteration (not mutated)
+            history_len: Number of leading messages that came from stored
+                session history; gets its own breakpoint when the loop has
+                appended tool turns after it
+
+        Returns:
+            Keyword arguments for client.messages.create/stream
+        """
+        messages = list(api_messages)
+        if messages:
+            last = len(messages) - 1
+            messages[last] = _with_cache_control(messages[last])
+            if history_len and 0 < history_len - 1 < last:
+                messages[history_len - 1] = _with_cache_control(messages[history_len - 1])
+
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": self.system,
+            "tools": self.tools,
+            "messages": messages,
+        }
+
+
+class CacheMetrics:
+    """Accumulates prompt-cache token counts across API calls."""
+
+    FIELDS = (
+        "input_tokens",
+        "output_tokens",
+        "cache_read_input_tokens",
+        "cache_creation_input_tokens",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.totals = {field: 0 for field in self.FIELDS}
+
+    def record(self, usage: Any) -> Dict[str, int]:
+        call = {field: int(getattr(usage, field, 0) or 0) for field in self.FIELDS}
+        with self._lock:
+            self.calls += 1
+            for field, value in call.items():
+                self.totals[field] += value
+        if call["cache_read_input_tokens"] or call["cache_creation_input_tokens"]:
+            logger.info(
+                f"Prompt cache: read={call['cache_read_input_tokens']}, "
+                f"created={call['cache_creation_input_tokens']}, uncached={call['input_tokens']}"
+            )
+        return call
+
+    def merge(self, other: "CacheMetrics") -> None:
+        with self._lock:
+            self.calls += other.calls
+            for field in self.FIELDS:
+                self.totals[field] += other.totals[field]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = dict(self.totals)
+            calls = self.calls
+        prompt_tokens = (
+            totals["input_tokens"]
+            + totals["cache_read_input_tokens"]
+            + totals["cache_creation_input_tokens"]
+        )
+        return {
+            "calls": calls,
+            **totals,
+            "cache_hit_ratio": round(totals["cache_read_input_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0,
+        }
+
+
+# Process-wide totals (per-request metrics are merged in when a request ends)
+global_cache_metrics = CacheMetrics()
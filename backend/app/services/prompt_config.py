@@ -19,8 +19,11 @@ Image Styles:
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Optional
 
+from .prompt_templates import CompiledTemplate, compile_template
+
 
 # =============================================================================
 # CONTENT TYPE CONFIGURATIONS
@@ -485,19 +488,28 @@ def get_image_prompt(
     Returns:
         Complete prompt for image generation
     """
+    return _image_prompt(visual_description, image_style, _image_stage(slide_type))
+
+
+def _image_stage(slide_type: str) -> str:
+    if slide_type == "hook":
+        return "hook"
+    if slide_type in ["outro", "cta"]:
+        return "outro"
+    return "content"
+
+
+@lru_cache(maxsize=32)
+def _image_prompt_template(image_style: str, stage: str) -> CompiledTemplate:
+    """The fixed frame of an image prompt for a style and stage, compiled once."""
     style_config = IMAGE_STYLES.get(image_style, IMAGE_STYLES["classical"])
 
     # Select the appropriate style prompt based on slide type
-    if slide_type == "hook":
-        style_prompt = style_config.hook_prompt
-    elif slide_type in ["outro", "cta"]:
-        style_prompt = style_config.outro_prompt
-    else:
-        style_prompt = style_config.content_prompt
+    style_prompt = getattr(style_config, f"{stage}_prompt")
 
-    # Build the complete prompt with visual description FIRST
-    prompt = f"""PRIMARY SUBJECT (generate this exactly):
-{visual_description}
+    # The complete prompt with visual description FIRST
+    return compile_template(f"""PRIMARY SUBJECT (generate this exactly):
+[VISUAL_DESCRIPTION]
 
 {style_prompt}
 
@@ -506,9 +518,12 @@ TECHNICAL REQUIREMENTS:
 - Leave center area relatively clean for text overlay
 - Vertical 9:16 aspect ratio for mobile
 
-AVOID: {style_config.negative_prompt}"""
+AVOID: {style_config.negative_prompt}""")
+
 
-    return prompt
+@lru_cache(maxsize=512)
+def _image_prompt(visual_description: str, image_style: str, stage: str) -> str:
+    return _image_prompt_template(image_style, stage).render({"VISUAL_DESCRIPTION": visual_description})
 
 
 def get_script_prompt(topic: str, content_type: str) -> str:
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Prompt Templates - compiled [PLACEHOLDER] templates and memoized prompts.
+
+Image and scene prompts are long templates with [NAME] placeholders. Filling
+them with one str.replace per variable rescans the whole template every time,
+for every slide. A template is parsed once into a segment list instead
+(literal, name, literal, name, ..., literal) and rendering is a single join.
+
+    from prompt_templates import compile_template, PromptCache
+
+    template = compile_template("A bust of [FIGURE] in [SETTING].")
+    template.placeholders                 # ('FIGURE', 'SETTING')
+    template.render({"FIGURE": "Seneca"})  # 'A bust of Seneca in [SETTING].'
+
+    prompts = PromptCache()
+    prompt = prompts.get_or_render("stoic_marble", template, {"FIGURE": "Seneca"})
+    prompts.invalidate("stoic_marble")    # after the template is edited
+
+Placeholders missing from the values stay in the output as written, the same
+as an unmatched str.replace; values are inserted verbatim (brackets inside a
+value are never treated as placeholders).
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Hashable, Mapping, Optional, Tuple
+
+# Anything in single brackets on one line: [TITLE_TEXT], [EMOTION/QUALITY]
+PLACEHOLDER = re.compile(r"\[([^\[\]\n]+)\]")
+
+
+class CompiledTemplate:
+    """A template split into literal and placeholder segments."""
+
+    __slots__ = ("text", "segments", "placeholders")
+
+    def __init__(self, text: str):
+        self.text = text
+        # re.split with one group alternates literal, name, literal, ...
+        self.segments: Tuple[str, ...] = tuple(PLACEHOLDER.split(text))
+        self.placeholders: Tuple[str, ...] = tuple(dict.fromkeys(self.segments[1::2]))
+
+    def render(self, values: Mapping[str, str], default: Optional[str] = None) -> str:
+        """
+        Fill the placeholders from values.
+
+        Args:
+            values: Placeholder name (without brackets) to text
+            default: Text for placeholders not in values (None keeps "[NAME]")
+        """
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            value = values.get(name)
+            if value is None:
+                value = f"[{name}]" if default is None else default
+            parts[i] = value
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({len(self.text)} chars, placeholders={list(self.placeholders)})"
+
+
+@lru_cache(maxsize=256)
+def compile_template(text: str) -> CompiledTemplate:
+    """Parse a template once; the same text always returns the same object."""
+    return CompiledTemplate(text)
+
+
+def _values_key(values: Mapping[str, str]) -> Tuple:
+    # Call sites build their values in a fixed order, so no need to sort
+    return tuple(values.items())
+
+
+class PromptCache:
+    """
+    Fully built prompts keyed by template key and variables (LRU, thread-safe).
+
+    The template key is whatever identifies the template for the caller
+    (a template id, or (theme id, stage)). Entries are also tied to the text
+    they were rendered from, so a key whose template text changed is dropped
+    on the next lookup even if nobody called invalidate().
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._prompts: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._texts: Dict[Hashable, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: Hashable, template: CompiledTemplate, values: Mapping[str, str],
+                      default: Optional[str] = None) -> str:
+        entry = (key, default, _values_key(values))
+        with self._lock:
+            if self._texts.get(key) != template.text:
+                self._drop(key)
+                self._texts[key] = template.text
+            prompt = self._prompts.get(entry)
+            if prompt is not None:
+                self._prompts.move_to_end(entry)
+                self.hits += 1
+                return prompt
+            self.misses += 1
+
+        prompt = template.render(values, default)
+        with self._lock:
+            if self._texts.get(key) == template.text:
+                self._prompts[entry] = prompt
+                if len(self._prompts) > self.maxsize:
+                    self._prompts.popitem(last=False)
+        return prompt
+
+    def _drop(self, key: Hashable):
+        for entry in [entry for entry in self._prompts if entry[0] == key]:
+            del self._prompts[entry]
+        self._texts.pop(key, None)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Forget the prompts built from one template (or from all of them)."""
+        with self._lock:
+            if key is None:
+                self._prompts.clear()
+                self._texts.clear()
+            else:
+                self._drop(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._prompts), "hits": self.hits, "misses": self.misses}
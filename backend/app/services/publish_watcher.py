@@ -0,0 +1,332 @@
+"""
+Publish watcher - tracks every in-flight TikTok publish_id and polls it.
+
+Posting returns a publish_id straight away; TikTok then pulls the media and
+drops the post into the creator's drafts (or fails it). Instead of each
+caller checking check_post_status whenever it happens to think of it, every
+publish_id is recorded in tiktok_publishes and one background job polls them:
+
+- each check schedules the next with exponential backoff and jitter
+  (FIRST_CHECK_SECONDS doubling up to MAX_BACKOFF_SECONDS); drafts waiting in
+  the inbox are re-checked every INBOX_CHECK_SECONDS to see them published
+- a tick checks up to BATCH_SIZE due publishes with one poster (one token
+  check, one pooled connection)
+- state changes are written to the AutomationRun and pushed to /ws/global
+
+TikTok refuses new drafts while too many are waiting in the inbox
+(spam_risk_too_many_pending_share). post_run() counts the pending drafts
+first and defers the post instead of hitting the limit; the watcher posts
+deferred runs once drafts clear. If TikTok reports the limit anyway (drafts
+made elsewhere), the answer is recorded in tiktok_limit_hits and posting
+pauses for LIMIT_COOLDOWN, across restarts and workers.
+
+Usage:
+    result = post_run(db, run)         # post, track, or defer
+    db.commit()
+
+    track_publish(db, publish_id, kind="video")
+"""
+import random
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import AutomationRun, TikTokLimitHit, TikTokPublish
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# POLICY
+# =============================================================================
+
+# Backoff between status checks while TikTok is processing
+FIRST_CHECK_SECONDS = 5
+MAX_BACKOFF_SECONDS = 600
+
+# Drafts in the inbox only change when the creator acts
+INBOX_CHECK_SECONDS = 1800
+
+# Status checks per tick, and seconds between ticks
+BATCH_SIZE = 20
+TICK_SECONDS = 10
+
+# Consecutive failed status calls before a publish stops being watched
+MAX_ERRORS = 8
+
+# TikTok allows this many drafts pending per 24 hours. Drafts made outside
+# this app count too, so a limit error from TikTok also pauses posting
+PENDING_SHARE_LIMIT = 5
+PENDING_WINDOW = timedelta(hours=24)
+LIMIT_COOLDOWN = timedelta(hours=1)
+LIMIT_ERROR = "spam_risk_too_many_pending_share"
+
+# TikTok status -> watcher state
+TIKTOK_STATES = {
+    "PROCESSING_UPLOAD": "processing",
+    "PROCESSING_DOWNLOAD": "processing",
+    "SEND_TO_USER_INBOX": "inbox",
+    "PUBLISH_COMPLETE": "published",
+    "FAILED": "failed",
+}
+PENDING_STATES = ("processing", "inbox")
+
+# Watcher state -> AutomationRun.tiktok_post_status (drafts are the goal of MEDIA_UPLOAD)
+RUN_STATUSES = {"processing": "processing", "inbox": "success", "published": "success", "failed": "failed"}
+
+CAPTION_TAGS = "#philosophy #stoicism #wisdom #motivation"
+
+
+def backoff_delay(checks: int, rng=random) -> float:
+    """Seconds until the next check after `checks` checks: doubling, capped, half of it jittered."""
+    delay = min(MAX_BACKOFF_SECONDS, FIRST_CHECK_SECONDS * 2 ** min(checks, 16))
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+
+# =============================================================================
+# TRACKING AND CAPACITY
+# =============================================================================
+
+def track_publish(db: Session, publish_id: str, run: Optional[AutomationRun] = None,
+                  kind: str = "photo") -> TikTokPublish:
+    """Start watching a publish_id (the caller commits)."""
+    publish = db.get(TikTokPublish, publish_id)
+    if publish is None:
+        publish = TikTokPublish(publish_id=publish_id, kind=kind, created_at=datetime.utcnow())
+        db.add(publish)
+    publish.run_id = run.id if run is not None else publish.run_id
+    publish.state = "processing"
+    publish.checks = publish.errors = 0
+    publish.next_check_at = datetime.utcnow() + timedelta(seconds=backoff_delay(0))
+    publish.settled_at = None
+    return publish
+
+
+def pending_count(db: Session, now: Optional[datetime] = None) -> int:
+    """Drafts created in the pending-share window that are still processing or in the inbox."""
+    since = (now or datetime.utcnow()) - PENDING_WINDOW
+    return db.query(TikTokPublish).filter(
+        TikTokPublish.state.in_(PENDING_STATES),
+        TikTokPublish.created_at >= since,
+    ).count()
+
+
+def capacity(db: Session, now: Optional[datetime] = None) -> Dict:
+    """How many more drafts can be sent now, and why not if none."""
+    now = now or datetime.utcnow()
+    pending = pending_count(db, now)
+    limit_hit_at = db.query(func.max(TikTokLimitHit.hit_at)).scalar()
+    cooling = limit_hit_at is not None and now - limit_hit_at < LIMIT_COOLDOWN
+    available = 0 if cooling else max(0, PENDING_SHARE_LIMIT - pending)
+    reason = None
+    if cooling:
+        reason = f"TikTok reported too many pending drafts at {limit_hit_at:%H:%M} UTC"
+    elif not available:
+        reason = f"{pending} TikTok drafts pending (limit {PENDING_SHARE_LIMIT})"
+    return {"pending": pending, "limit": PENDING_SHARE_LIMIT, "available": available, "reason": reason}
+
+
+def deferred_runs(db: Session, limit: Optional[int] = None) -> List[AutomationRun]:
+    """Runs waiting for room in the drafts, oldest first."""
+    query = db.query(AutomationRun).filter(AutomationRun.tiktok_post_status == "deferred") \
+        .order_by(AutomationRun.created_at)
+    return query.limit(limit).all() if limit else query.all()
+
+
+# =============================================================================
+# POSTING
+# =============================================================================
+
+def _defer(run: AutomationRun, reason: str):
+    run.tiktok_post_status = "deferred"
+    run.tiktok_error = f"Deferred: {reason}"
+
+
+def post_run(db: Session, run: AutomationRun, image_paths: Optional[List[str]] = None,
+             caption: Optional[str] = None, poster=None) -> dict:
+    """
+    Post a run's slideshow to TikTok drafts and start watching it (the caller commits).
+
+    If the drafts are full the run is marked "deferred" and nothing is sent;
+    the watcher posts it once there is room. Returns the poster's result,
+    with "deferred": True when it was held back.
+    """
+    room = capacity(db)
+    if not room["available"]:
+        _defer(run, room["reason"])
+        logger.info(f"TikTok post for run {run.id[:8]} deferred: {room['reason']}")
+        return {"success": False, "deferred": True, "error": run.tiktok_error, "pending": room["pending"]}
+
+    if poster is None:
+        from .tiktok_poster import TikTokPoster
+        poster = TikTokPoster()
+    result = poster.post_photo_slideshow(
+        image_paths=image_paths or run.image_paths or [],
+        caption=caption or f"{run.topic} {CAPTION_TAGS}",
+    )
+
+    if result.get("success"):
+        run.mark_posted(result.get("publish_id", ""))
+        run.tiktok_error = None
+        if run.tiktok_publish_id:
+            track_publish(db, run.tiktok_publish_id, run)
+    elif LIMIT_ERROR in str(result.get("error", "")):
+        db.add(TikTokLimitHit(run_id=run.id, error=str(result.get("error")), hit_at=datetime.utcnow()))
+        _defer(run, "TikTok reported too many pending drafts")
+        result["deferred"] = True
+    else:
+        run.tiktok_post_status = "failed"
+        run.tiktok_error = result.get("error", "Unknown TikTok error")
+    return result
+
+
+def post_deferred(db: Session, poster=None) -> int:
+    """Post deferred runs while the drafts have room (commits). Returns how many were sent."""
+    room = capacity(db)["available"]
+    if not room:
+        return 0
+    sent = 0
+    for run in deferred_runs(db, limit=room):
+        result = post_run(db, run, poster=poster)
+        db.commit()
+        if result.get("deferred"):
+            break
+        sent += result.get("success", False)
+        publish = db.get(TikTokPublish, run.tiktok_publish_id) if result.get("success") else None
+        _notify(run, "deferred", publish)
+    return sent
+
+
+# =============================================================================
+# POLLING
+# =============================================================================
+
+def _settle(publish: TikTokPublish, state: str, now: datetime):
+    publish.state = state
+    publish.next_check_at = None
+    publish.settled_at = now
+
+
+def apply_status(db: Session, publish: TikTokPublish, result: dict,
+                 now: Optional[datetime] = None, rng=random) -> Optional[str]:
+    """
+    Record one check_post_status result and schedule the next check.
+
+    Returns the previous state if the state changed, else None.
+    """
+    now = now or datetime.utcnow()
+    previous = publish.state
+    publish.checks += 1
+    publish.last_checked_at = now
+
+    if not result.get("success"):
+        publish.errors += 1
+        if publish.errors >= MAX_ERRORS:
+            publish.fail_reason = result.get("error")
+            _settle(publish, "expired", now)
+        else:
+            publish.next_check_at = now + timedelta(seconds=backoff_delay(publish.errors, rng))
+    else:
+        publish.errors = 0
+        publish.tiktok_status = result.get("status")
+        post_ids = result.get("publicaly_available_post_id")  # a list of ids once published
+        if post_ids:
+            publish.post_id = ",".join(str(i) for i in post_ids) if isinstance(post_ids, list) else str(post_ids)
+        state = TIKTOK_STATES.get(publish.tiktok_status, publish.state)
+        if state == "failed":
+            publish.fail_reason = result.get("fail_reason")
+        if state not in PENDING_STATES:
+            _settle(publish, state, now)
+        elif now - publish.created_at > PENDING_WINDOW:
+            # Out of the window: no longer counts toward the limit
+            _settle(publish, "expired", now)
+        else:
+            publish.state = state
+            delay = INBOX_CHECK_SECONDS if state == "inbox" else backoff_delay(publish.checks, rng)
+            publish.next_check_at = now + timedelta(seconds=delay)
+
+    if publish.state == previous:
+        return None
+
+    run = db.get(AutomationRun, publish.run_id) if publish.run_id else None
+    if run is not None and run.tiktok_publish_id == publish.publish_id and publish.state in RUN_STATUSES:
+        run.tiktok_post_status = RUN_STATUSES[publish.state]
+        if publish.state == "failed":
+            run.tiktok_error = publish.fail_reason or publish.tiktok_status
+    return previous
+
+
+def poll_due(db: Session, poster=None, now: Optional[datetime] = None,
+             limit: int = BATCH_SIZE) -> List[TikTokPublish]:
+    """Check the publishes whose next check is due (commits). Returns those whose state changed."""
+    now = now or datetime.utcnow()
+    due = db.query(TikTokPublish).filter(TikTokPublish.next_check_at <= now) \
+        .order_by(TikTokPublish.next_check_at).limit(limit).all()
+    if not due:
+        return []
+
+    if poster is None:
+        from .tiktok_poster import TikTokPoster
+        poster = TikTokPoster()
+    if not poster.ensure_valid_token():
+        result = {"success": False, "error": "Not authenticated"}
+        for publish in due:
+            apply_status(db, publish, result, now)
+        db.commit()
+        return []
+
+    changed = []
+    for publish in due:
+        previous = apply_status(db, publish, poster.check_post_status(publish.publish_id), now)
+        if previous is not None:
+            changed.append((publish, previous))
+    db.commit()
+
+    for publish, previous in changed:
+        logger.info(f"TikTok publish {publish.publish_id}: {previous} -> {publish.state}")
+        run = db.get(AutomationRun, publish.run_id) if publish.run_id else None
+        _notify(run, previous, publish)
+    return [publish for publish, _ in changed]
+
+
+def _notify(run: Optional[AutomationRun], previous: str, publish: Optional[TikTokPublish] = None):
+    """Push a state change to /ws/global (a publish's, or a deferred run's that failed to post)."""
+    from ..websocket.progress import GLOBAL_CHANNEL, manager
+    event = {"type": "tiktok_publish", "previous_state": previous,
+             "run_id": None, "automation_id": None, "run_status": None}
+    if publish is not None:
+        event.update(publish_id=publish.publish_id, state=publish.state, fail_reason=publish.fail_reason)
+    else:
+        event.update(publish_id=None, state=run.tiktok_post_status, fail_reason=run.tiktok_error)
+    if run is not None:
+        event.update(run_id=run.id, automation_id=run.automation_id, run_status=run.tiktok_post_status)
+    manager.publish_threadsafe(GLOBAL_CHANNEL, event)
+
+
+def watch_once() -> Dict:
+    """One watcher tick: poll due publishes, then post deferred runs if drafts cleared."""
+    db = SessionLocal()
+    try:
+        changed = poll_due(db)
+        sent = post_deferred(db) if deferred_runs(db, limit=1) else 0
+        return {"changed": len(changed), "posted": sent}
+    except Exception as e:
+        db.rollback()
+        logger.exception(f"Publish watcher tick failed: {e}")
+        return {"changed": 0, "posted": 0, "error": str(e)}
+    finally:
+        db.close()
+
+
+def watcher_status(db: Session) -> Dict:
+    """Pending drafts, deferred runs and in-flight publishes (for the API)."""
+    in_flight = db.query(TikTokPublish).filter(TikTokPublish.next_check_at.isnot(None)) \
+        .order_by(TikTokPublish.next_check_at).all()
+    return {
+        **capacity(db),
+        "deferred_runs": [run.id for run in deferred_runs(db)],
+        "in_flight": [publish.to_dict() for publish in in_flight],
+    }
@@ -6,6 +6,7 @@ Uses APScheduler to:
 3. Run slideshow generation pipeline
 4. Post to TikTok if configured
 5. Track run history
+6. Watch in-flight TikTok posts (publish_watcher) on an interval
 """
 import os
 import sys
@@ -18,6 +19,7 @@ from threading import Thread
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.memory import MemoryJobStore
 from sqlalchemy.orm import Session
 
@@ -26,7 +28,9 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from ..database import SessionLocal
-from ..models import Automation, AutomationRun
+from ..models import Automation, AutomationRun, AutomationRunTrace
+from .publish_watcher import TICK_SECONDS, post_run, watch_once
+from .tracing import Trace, start_trace
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -74,6 +78,15 @@ class AutomationScheduler:
             # Load all active automations
             self.reload_all_automations()
             
+            # Poll in-flight TikTok posts and send deferred ones
+            self.scheduler.add_job(
+                watch_once,
+                trigger=IntervalTrigger(seconds=TICK_SECONDS),
+                id="tiktok_publish_watcher",
+                replace_existing=True,
+                name="TikTok publish watcher"
+            )
+            
         except Exception as e:
             logger.error(f"Failed to start scheduler: {e}")
     
@@ -218,13 +231,19 @@ class AutomationScheduler:
             
             settings = automation.settings or {}
             
-            # Check if we're in project queue mode or topic queue mode
-            if automation.has_projects_in_queue():
-                # PROJECT QUEUE MODE: Use pre-created project
-                self._run_with_project(automation, db, settings)
-            else:
-                # TOPIC QUEUE MODE: Original behavior
-                self._run_with_topic(automation, db, settings)
+            # Every span opened during the run (provider calls, text rendering,
+            # encodes, uploads, commits) is collected into one tree
+            with start_trace("automation_run", automation=automation.name) as trace:
+                # Check if we're in project queue mode or topic queue mode
+                if automation.has_projects_in_queue():
+                    # PROJECT QUEUE MODE: Use pre-created project
+                    run = self._run_with_project(automation, db, settings)
+                else:
+                    # TOPIC QUEUE MODE: Original behavior
+                    run = self._run_with_topic(automation, db, settings)
+            
+            if run is not None:
+                self._save_trace(run, trace)
             
             # Update automation timing
             automation.total_runs += 1
@@ -239,8 +258,19 @@ class AutomationScheduler:
         finally:
             db.close()
 
-    def _run_with_project(self, automation: Automation, db: Session, settings: dict):
-        """Run automation using a pre-created project (images only)."""
+    def _save_trace(self, run: AutomationRun, trace: Trace):
+        """Attach the run's span tree (committed with the automation stats)."""
+        totals = trace.stage_totals()
+        run.trace = AutomationRunTrace(
+            total_seconds=round(trace.root.duration, 3),
+            stage_totals=totals,
+            spans=trace.to_dict(),
+        )
+        slowest = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in list(totals.items())[:3])
+        logger.info(f"Run {run.id[:8]} took {trace.root.duration:.1f}s ({slowest})")
+
+    def _run_with_project(self, automation: Automation, db: Session, settings: dict) -> Optional[AutomationRun]:
+        """Run automation using a pre-created project (images only). Returns the run record."""
         from ..models import Project, Slide
         
         project_id = automation.get_next_project_id()
@@ -284,7 +314,7 @@ class AutomationScheduler:
                 run.mark_failed("No slides in project")
                 automation.failed_runs += 1
                 automation.advance_project()
-                return
+                return run
             
             # Generate images for slides that don't have them
             from ..services.image_generation import ImageGenerationService
@@ -344,9 +374,11 @@ class AutomationScheduler:
             automation.failed_runs += 1
             automation.advance_project()  # Move on even if failed
             logger.exception(f"Run {run.id[:8]} exception: {e}")
+        
+        return run
 
-    def _run_with_topic(self, automation: Automation, db: Session, settings: dict):
-        """Run automation using topic queue (original behavior - generate script and images)."""
+    def _run_with_topic(self, automation: Automation, db: Session, settings: dict) -> AutomationRun:
+        """Run automation using topic queue (original behavior - generate script and images). Returns the run record."""
         # Get the next topic
         topic = automation.get_next_topic()
         
@@ -411,14 +443,12 @@ class AutomationScheduler:
             run.mark_failed(str(e), {"traceback": str(e)})
             automation.failed_runs += 1
             logger.exception(f"Run {run.id[:8]} exception: {e}")
+        
+        return run
     
     def _post_to_tiktok(self, run: AutomationRun, result: dict, db: Session):
-        """Post the generated slideshow to TikTok."""
+        """Post the generated slideshow to TikTok (deferred while the drafts are full)."""
         try:
-            from ..services.tiktok_poster import TikTokPoster
-            
-            poster = TikTokPoster()
-            
             image_paths = result.get("image_paths", [])
             if not image_paths:
                 run.tiktok_error = "No images to post"
@@ -428,18 +458,14 @@ class AutomationScheduler:
             title = result.get("title", run.topic)
             caption = f"{title} #philosophy #stoicism #wisdom #motivation"
             
-            # Post as photo slideshow
-            post_result = poster.post_photo_slideshow(
-                image_paths=image_paths,
-                caption=caption
-            )
+            # Post as photo slideshow; the publish watcher follows it from here
+            post_result = post_run(db, run, image_paths=image_paths, caption=caption)
             
             if post_result.get("success"):
-                run.mark_posted(post_result.get("publish_id", ""))
                 logger.info(f"Posted to TikTok: {post_result.get('publish_id')}")
+            elif post_result.get("deferred"):
+                logger.info(f"TikTok post deferred: {run.tiktok_error}")
             else:
-                run.tiktok_error = post_result.get("error", "Unknown TikTok error")
-                run.tiktok_post_status = "failed"
                 logger.error(f"TikTok post failed: {run.tiktok_error}")
             
             db.commit()
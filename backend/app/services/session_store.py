@@ -0,0 +1,380 @@
+"""
+Agent Session Store - bounded, persistent conversation sessions.
+
+Sessions live in the agent_sessions table (shared by every uvicorn worker and
+kept across restarts). Each worker holds a small LRU cache in front of it:
+
+- At most AGENT_SESSION_CACHE_SIZE sessions are cached
+- Sessions idle for AGENT_SESSION_IDLE_TTL_SECONDS are evicted from memory
+- The cache is also bounded by an approximate byte budget
+- Sessions idle for AGENT_SESSION_RETENTION_DAYS are purged from disk
+
+Writes go straight through to the database and only land on the row version
+they were applied to, so concurrent workers never drop each other's messages.
+Reads check the row version so a worker never serves history that another
+worker has since extended.
+
+The module also provides build_history_window(), which keeps the history
+resent to Claude on every loop iteration within a token budget.
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional
+
+from ..database import SessionLocal
+from ..models.agent_session import AgentSession
+from ..config import (
+    AGENT_SESSION_CACHE_SIZE,
+    AGENT_SESSION_IDLE_TTL_SECONDS,
+    AGENT_SESSION_MEMORY_BUDGET_BYTES,
+    AGENT_SESSION_RETENTION_DAYS,
+    AGENT_HISTORY_TOKEN_BUDGET,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# TOKEN-AWARE HISTORY WINDOW
+# =============================================================================
+
+# Rough chars-per-token ratio for English text + JSON. Good enough for
+# budgeting; we never need exact counts here.
+CHARS_PER_TOKEN = 4
+
+# Each dropped turn contributes at most this many chars to the summary note
+SUMMARY_LINE_CHARS = 160
+
+# Share of the history budget held back for the recap of dropped turns
+RECAP_BUDGET_FRACTION = 0.1
+
+
+def estimate_tokens(content: Any) -> int:
+    """Cheap token estimate for a message content (str or content blocks)."""
+    if isinstance(content, str):
+        return len(content) // CHARS_PER_TOKEN + 1
+    return len(json.dumps(content, default=str)) // CHARS_PER_TOKEN + 1
+
+
+def _summarize_turns(messages: List[Dict], max_chars: int) -> str:
+    """Collapse dropped turns into one short recap, newest lines first to survive."""
+    header = f"[Earlier conversation summarized - {len(messages)} older messages omitted]"
+    lines: List[str] = []
+    used = len(header)
+    for msg in reversed(messages):
+        content = msg["content"]
+        if not isinstance(content, str):
+            content = json.dumps(content, default=str)
+        content = " ".join(content.split())
+        if len(content) > SUMMARY_LINE_CHARS:
+            content = content[:SUMMARY_LINE_CHARS] + "..."
+        line = f"- {msg['role']}: {content}"
+        if used + len(line) + 1 > max_chars:
+            break
+        lines.append(line)
+        used += len(line) + 1
+    lines.reverse()
+    return "\n".join([header] + lines)
+
+
+def build_history_window(
+    session_messages: List[Dict],
+    token_budget: int = AGENT_HISTORY_TOKEN_BUDGET
+) -> List[Dict]:
+    """
+    Format session messages for the Claude API within a token budget.
+
+    The newest turns are kept verbatim. Older turns that don't fit are folded
+    into a recap at the start of the window. The window always starts with a
+    user message so the API's role alternation holds.
+
+    Args:
+        session_messages: Stored session messages (oldest first)
+        token_budget: Approximate max tokens for the returned history
+
+    Returns:
+        List of {"role", "content"} dicts ready for messages.create()
+    """
+    messages = [
+        {"role": msg["role"], "content": msg["content"]}
+        for msg in session_messages
+        if msg["role"] in ["user", "assistant"]
+    ]
+
+    # Walk backwards keeping turns until the verbatim budget runs out
+    verbatim_budget = int(token_budget * (1 - RECAP_BUDGET_FRACTION))
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = estimate_tokens(messages[start - 1]["content"])
+        if used + cost > verbatim_budget and start < len(messages):
+            break
+        used += cost
+        start -= 1
+
+    # Don't open the window on an assistant turn
+    while start < len(messages) - 1 and messages[start]["role"] != "user":
+        start += 1
+
+    if start == 0:
+        return messages
+
+    kept = messages[start:]
+
+    # The recap gets whatever budget the kept turns left over
+    max_recap_chars = max(token_budget - used, 0) * CHARS_PER_TOKEN
+    recap = _summarize_turns(messages[:start], max_recap_chars)
+
+    # Merge the recap into the first kept user turn to preserve alternation
+    first = kept[0]
+    if isinstance(first["content"], str):
+        kept[0] = {"role": "user", "content": f"{recap}\n\n---\n\n{first['content']}"}
+    else:
+        kept[0] = {"role": "user", "content": [{"type": "text", "text": recap}] + list(first["content"])}
+
+    return kept
+
+
+# =============================================================================
+# SESSION MANAGER
+# =============================================================================
+
+# Reload-and-reapply rounds before a write that keeps losing races is dropped
+SAVE_ATTEMPTS = 5
+
+class SessionManager:
+    """
+    Manages conversation sessions for the agent.
+
+    Same interface as the original in-memory manager; sessions are now
+    persisted and the in-process cache is bounded.
+    """
+
+    def __init__(
+        self,
+        max_cached: int = AGENT_SESSION_CACHE_SIZE,
+        idle_ttl_seconds: int = AGENT_SESSION_IDLE_TTL_SECONDS,
+        memory_budget_bytes: int = AGENT_SESSION_MEMORY_BUDGET_BYTES,
+        retention_days: int = AGENT_SESSION_RETENTION_DAYS,
+    ):
+        self.max_cached = max_cached
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.memory_budget_bytes = memory_budget_bytes
+        self.retention_days = retention_days
+
+        # session_id -> {"session": dict, "size": int, "touched": float}
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.RLock()
+        self._last_purge = 0.0
+
+    # -------------------------------------------------------------------------
+    # Cache helpers
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _session_size(session: Dict[str, Any]) -> int:
+        return len(json.dumps(session["messages"], default=str)) + \
+            len(json.dumps(session["tool_calls"], default=str))
+
+    def _cache_put(self, session: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache_drop(session["id"])
+            size = self._session_size(session)
+            self._cache[session["id"]] = {"session": session, "size": size, "touched": time.monotonic()}
+            self._cache_bytes += size
+            self._evict()
+
+    def _cache_drop(self, session_id: str) -> None:
+        entry = self._cache.pop(session_id, None)
+        if entry:
+            self._cache_bytes -= entry["size"]
+
+    def _evict(self) -> None:
+        """Drop idle sessions, then least-recently-used ones over count/byte budget."""
+        now = time.monotonic()
+        for session_id in [
+            sid for sid, entry in self._cache.items()
+            if now - entry["touched"] > self.idle_ttl_seconds
+        ]:
+            self._cache_drop(session_id)
+
+        while self._cache and (
+            len(self._cache) > self.max_cached
+            or self._cache_bytes > self.memory_budget_bytes
+        ):
+            session_id, entry = self._cache.popitem(last=False)
+            self._cache_bytes -= entry["size"]
+
+    def _purge_expired(self, db) -> None:
+        """Delete sessions idle past the retention window (at most hourly)."""
+        if time.monotonic() - self._last_purge < 3600:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        deleted = db.query(AgentSession).filter(AgentSession.last_active < cutoff).delete()
+        if deleted:
+            logger.info(f"Purged {deleted} expired agent sessions")
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def create_session(self) -> str:
+        """Create a new session and return its ID."""
+        session_id = str(uuid.uuid4())
+        db = SessionLocal()
+        try:
+            self._purge_expired(db)
+            row = AgentSession(id=session_id, messages=[], tool_calls=[], version=0)
+            db.add(row)
+            db.commit()
+            self._cache_put(row.to_dict())
+        finally:
+            db.close()
+        return session_id
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session by ID (from cache if current, else from disk)."""
+        db = SessionLocal()
+        try:
+            with self._lock:
+                entry = self._cache.get(session_id)
+
+            if entry:
+                # One-column check so a stale cache (another worker wrote) reloads
+                version = db.query(AgentSession.version).filter(AgentSession.id == session_id).scalar()
+                if version is None:
+                    with self._lock:
+                        self._cache_drop(session_id)
+                    return None
+                if version == entry["session"]["version"]:
+                    with self._lock:
+                        entry["touched"] = time.monotonic()
+                        self._cache.move_to_end(session_id)
+                    return entry["session"]
+
+            row = db.query(AgentSession).filter(AgentSession.id == session_id).first()
+            if not row:
+                return None
+            session = row.to_dict()
+            self._cache_put(session)
+            return session
+        finally:
+            db.close()
+
+    def add_message(
+        self, session_id: str, role: str, content: str, tool_calls: List[Dict] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Add a message to the session history and return the updated session
+        (None if the session doesn't exist).
+
+        The messages column is one JSON document, so this rewrites the whole
+        history (there is no portable in-place JSON append across SQLite and
+        Postgres). Histories stay small enough for that to be cheap.
+        """
+        def append(session: Dict[str, Any]) -> None:
+            session["messages"].append({
+                "role": role,
+                "content": content,
+                "timestamp": session["last_active"],
+                "tool_calls": tool_calls
+            })
+
+        return self._save(session_id, append)
+
+    def _save(self, session_id: str, apply: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        """
+        Apply a change to the current session and write it back.
+
+        The write only lands if the row still has the version the change was
+        applied to (UPDATE ... WHERE id = ? AND version = ?). If another worker
+        wrote in between, the session is reloaded and the change reapplied,
+        so concurrent writers never overwrite each other's messages.
+        """
+        for _ in range(SAVE_ATTEMPTS):
+            current = self.get_session(session_id)
+            if not current:
+                return None
+
+            # Work on a copy so a lost race leaves the cached session untouched
+            session = dict(current, messages=list(current["messages"]), tool_calls=list(current["tool_calls"]))
+            now = datetime.utcnow()
+            session["last_active"] = now.isoformat()
+            apply(session)
+
+            db = SessionLocal()
+            try:
+                updated = db.query(AgentSession).filter(
+                    AgentSession.id == session_id,
+                    AgentSession.version == session["version"],
+                ).update({
+                    AgentSession.messages: session["messages"],
+                    AgentSession.tool_calls: session["tool_calls"],
+                    AgentSession.last_active: now,
+                    AgentSession.version: session["version"] + 1,
+                }, synchronize_session=False)
+                db.commit()
+            finally:
+                db.close()
+
+            if updated:
+                session["version"] += 1
+                self._cache_put(session)
+                return session
+            logger.info(f"Session {session_id[:8]} changed underneath us, reapplying")
+
+        logger.warning(f"Gave up saving session {session_id[:8]} after {SAVE_ATTEMPTS} conflicting writes")
+        return None
+
+    def get_messages(self, session_id: str) -> List[Dict]:
+        """Get all messages for a session."""
+        session = self.get_session(session_id)
+        return session["messages"] if session else []
+
+    def clear_session(self, session_id: str) -> bool:
+        """Clear a session's messages."""
+        def clear(session: Dict[str, Any]) -> None:
+            session["messages"] = []
+            session["tool_calls"] = []
+
+        return self._save(session_id, clear) is not None
+
+    def delete_session(self, session_id: str) -> bool:
+        """Delete a session entirely."""
+        with self._lock:
+            self._cache_drop(session_id)
+        db = SessionLocal()
+        try:
+            deleted = db.query(AgentSession).filter(AgentSession.id == session_id).delete()
+            db.commit()
+            return bool(deleted)
+        finally:
+            db.close()
+
+    def get_active_session_count(self) -> int:
+        """Get count of sessions active within the idle TTL (across all workers)."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.idle_ttl_seconds)
+        db = SessionLocal()
+        try:
+            return db.query(AgentSession).filter(AgentSession.last_active >= cutoff).count()
+        finally:
+            db.close()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """In-process cache occupancy for this worker."""
+        with self._lock:
+            self._evict()
+            return {
+                "cached_sessions": len(self._cache),
+                "cached_bytes": self._cache_bytes,
+                "max_cached": self.max_cached,
+                "memory_budget_bytes": self.memory_budget_bytes,
+            }
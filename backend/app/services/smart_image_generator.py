@@ -1,7 +1,6 @@
 
-from google import genai
-from google.genai import types
-import requests
+from .lazy_imports import lazy_module
+import tempfile
 import os
 from typing import List, Dict
 from dotenv import load_dotenv
@@ -10,6 +9,11 @@ import json
 from PIL import Image, ImageOps
 import io
 import re
+from .tracing import span
+from .http_client import download
+
+genai = lazy_module("google.genai")  # imported on first use
+types = lazy_module("google.genai.types")
 
 load_dotenv()
 
@@ -288,10 +292,11 @@ The text style should match Renaissance/Baroque aesthetics with ornate, classica
                 **model_config.get("extra_args", {})
             }
             
-            result = fal_client.subscribe(
-                model_id,
-                arguments=arguments,
-            )
+            with span("provider_call", provider="fal", model=model_id):
+                result = fal_client.subscribe(
+                    model_id,
+                    arguments=arguments,
+                )
             
             images = result.get('images', [])
             if not images:
@@ -310,9 +315,10 @@ The text style should match Renaissance/Baroque aesthetics with ornate, classica
                 image_bytes = b64.b64decode(encoded_data)
                 image = Image.open(io.BytesIO(image_bytes))
             else:
-                response = requests.get(image_url, stream=True)
-                response.raise_for_status()
-                image = Image.open(io.BytesIO(response.content))
+                # Stream to a temp file on the shared keep-alive session
+                with tempfile.TemporaryFile() as buffer:
+                    image = Image.open(download(image_url, buffer))
+                    image.load()
             
             # Resize to TikTok dimensions
             image = ImageOps.fit(image, (1080, 1920), method=Image.Resampling.LANCZOS)
@@ -419,10 +425,11 @@ CRITICAL REQUIREMENTS:
             print(f"🎨 Calling Gemini 3 Pro Image API...")
             print(f"📝 Prompt: {final_prompt[:100]}...")
             
-            response = self.client.models.generate_content(
-                model=self.image_model_name,
-                contents=final_prompt
-            )
+            with span("provider_call", provider="gemini", model=self.image_model_name):
+                response = self.client.models.generate_content(
+                    model=self.image_model_name,
+                    contents=final_prompt
+                )
             
             if response.candidates and response.candidates[0].content and response.candidates[0].content.parts:
                 for part in response.candidates[0].content.parts:
@@ -454,22 +461,28 @@ CRITICAL REQUIREMENTS:
     def create_enhanced_placeholder(self, prompt: str, scene_number: int, story_title: str) -> str:
         """Create sophisticated placeholder when Nano API fails"""
         
-        from PIL import ImageDraw, ImageFont
+        from PIL import ImageChops, ImageDraw, ImageFont
         import random
+        from .gradients import vertical_gradient
         
         # Enhanced placeholder that reflects the prompt
         width, height = 1080, 1920
-        img = Image.new('RGB', (width, height), color='#1a1a1a')
+        is_cave = "cave" in prompt.lower() or "shadow" in prompt.lower() or "chained" in prompt.lower()
+        if is_cave:
+            # Dark cave aesthetic with Caravaggio-style lighting: dark to gray,
+            # with a golden tint over the top 30%. Ramp and tint are separate
+            # gradients so each is truncated on its own, as the per-row loop did
+            ramp = vertical_gradient((width, height), [(0, (15, 15, 15)), (1, (65, 65, 65))])
+            tint = vertical_gradient((width, height), [
+                (0, (0, 0, 0)), (0.3, (9, 4.5, 0)), (0.3, (0, 0, 0)), (1, (0, 0, 0))
+            ])
+            img = ImageChops.add(ramp, tint)
+        else:
+            img = Image.new('RGB', (width, height), color='#1a1a1a')
         draw = ImageDraw.Draw(img)
         
-        # Create sophisticated gradient based on prompt content
-        if "cave" in prompt.lower() or "shadow" in prompt.lower() or "chained" in prompt.lower():
-            # Dark cave aesthetic with Caravaggio-style lighting
-            for y in range(height):
-                darkness = int(15 + (y / height) * 50)
-                golden = int((y / height) * 30) if y < height * 0.3 else 0
-                draw.line([(0, y), (width, y)], fill=(darkness + golden, darkness + golden//2, darkness))
-            
+        # Scene motif based on prompt content
+        if is_cave:
             # Add cave-like archway
             draw.arc([100, height//4, width-100, height//2], 0, 180, fill='#444444', width=8)
             
@@ -594,10 +607,11 @@ CRITICAL REQUIREMENTS:
         """
         
         try:
-            response = self.client.models.generate_content(
-                model='gemini-2.0-flash-exp',  # Use a reliable text model
-                contents=prompt
-            )
+            with span("provider_call", provider="gemini", model="gemini-2.0-flash-exp"):
+                response = self.client.models.generate_content(
+                    model='gemini-2.0-flash-exp',  # Use a reliable text model
+                    contents=prompt
+                )
             
             if response.text:
                 # Clean any markdown formatting
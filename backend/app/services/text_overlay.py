@@ -33,8 +33,11 @@ Usage:
 import os
 from typing import Optional, Tuple, List
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageOps
+from .image_writer import DEFAULT_SLIDE_PROFILE, ImageSource, load_image, save_image
 import textwrap
 import math
+from .gradients import vertical_gradient
+from .tracing import traced
 
 
 class TextOverlay:
@@ -57,6 +60,13 @@ class TextOverlay:
     TIKTOK_WIDTH = 1080
     TIKTOK_HEIGHT = 1920
     
+    # Sizes used by the slide renderers' defaults (see preload_fonts)
+    PRELOAD_FONT_SIZES = (40, 50, 60, 80, 85, 90)
+    
+    # Loaded fonts shared by every instance, per fonts_dir. Slideshows create
+    # a TextOverlay per slide, and a long-lived worker loads each face once.
+    _shared_font_caches = {}
+    
     # Available font options - each maps to specific font files
     # These can be selected in the UI for instant experimentation
     FONTS = {
@@ -181,7 +191,12 @@ class TextOverlay:
         }
     }
     
-    def __init__(self, fonts_dir: str = "fonts", default_style: str = "social"):
+    def __init__(
+        self,
+        fonts_dir: str = "fonts",
+        default_style: str = "social",
+        output_profile: str = DEFAULT_SLIDE_PROFILE
+    ):
         """
         Initialize TextOverlay with font settings.
         
@@ -191,9 +206,13 @@ class TextOverlay:
                 - "social": Clean sans-serif, sentence case (recommended for TikTok)
                 - "bold": Bold sans-serif, uppercase
                 - "italic"/"elegant": Italic serif
+            output_profile: Encoder profile for finished slides (see
+                image_writer.OUTPUT_PROFILES). A .jpg/.webp output_path gets
+                the matching JPEG/WebP profile instead.
         """
         self.fonts_dir = fonts_dir
-        self._font_cache = {}
+        self.output_profile = output_profile
+        self._font_cache = TextOverlay._shared_font_caches.setdefault(os.path.abspath(fonts_dir), {})
         self.default_style = default_style
         
         # System font paths by platform (fallbacks)
@@ -321,6 +340,23 @@ class TextOverlay:
         self._font_cache[cache_key] = font
         return font
     
+    def preload_fonts(self, sizes: tuple = None) -> int:
+        """
+        Load every configured font and style at the common sizes.
+        
+        Called once by long-lived workers before they fork so each process
+        starts with a warm font cache.
+        
+        Returns:
+            Number of cached font entries
+        """
+        for size in sizes or self.PRELOAD_FONT_SIZES:
+            for font_name in self.FONTS:
+                self._get_font(size, font_name=font_name)
+            for style in self.FONT_STYLES:
+                self._get_font(size, style=style)
+        return len(self._font_cache)
+    
     def get_available_fonts(self) -> dict:
         """
         Get list of all available fonts for UI selection.
@@ -513,9 +549,10 @@ class TextOverlay:
         # Step 3: Draw main text on top
         draw.text((x, y), text, font=font, fill=text_color)
     
+    @traced("text_render")
     def add_text_to_image(
         self,
-        image_path: str,
+        image_path: ImageSource,
         text: str,
         output_path: str,
         font_size: int = 80,
@@ -532,7 +569,7 @@ class TextOverlay:
         Add text overlay to an image.
         
         Args:
-            image_path: Path to the background image
+            image_path: Background image - path, PIL Image or GeneratedImage
             text: Text to overlay
             output_path: Path for the output image
             font_size: Font size in pixels
@@ -548,8 +585,8 @@ class TextOverlay:
         Returns:
             Path to the output image
         """
-        # Load the image
-        img = Image.open(image_path).convert("RGBA")
+        # Load the image (or take the decoded one from the generator)
+        img = load_image(image_path)
         
         # Create a transparent overlay for text
         txt_layer = Image.new("RGBA", img.size, (255, 255, 255, 0))
@@ -608,13 +645,14 @@ class TextOverlay:
         
         # Save
         result = result.convert("RGB")
-        result.save(output_path, quality=95)
+        save_image(result, output_path, self.output_profile)
         
         return output_path
     
+    @traced("text_render")
     def create_slide(
         self,
-        background_path: str,
+        background_path: ImageSource,
         output_path: str,
         title: Optional[str] = None,
         subtitle: Optional[str] = None,
@@ -636,7 +674,7 @@ class TextOverlay:
         - Smaller subtitle below
         
         Args:
-            background_path: Path to background image
+            background_path: Background image - path, PIL Image or GeneratedImage
             output_path: Path for output
             title: Main text (e.g., "MARCUS AURELIUS")
             subtitle: Secondary text (quote or explanation)
@@ -652,8 +690,8 @@ class TextOverlay:
         Returns:
             Path to output image
         """
-        # Load the image
-        img = Image.open(background_path).convert("RGBA")
+        # Load the image (or take the decoded one from the generator)
+        img = load_image(background_path)
         
         # Resize to TikTok dimensions if needed
         if img.size != (self.TIKTOK_WIDTH, self.TIKTOK_HEIGHT):
@@ -782,14 +820,14 @@ class TextOverlay:
         # Composite
         result = Image.alpha_composite(img, txt_layer)
         result = result.convert("RGB")
-        result.save(output_path, quality=95)
+        save_image(result, output_path, self.output_profile)
         
         print(f"  ✅ Created slide: {output_path}")
         return output_path
     
     def create_hook_slide(
         self,
-        background_path: str,
+        background_path: ImageSource,
         output_path: str,
         hook_text: str,
         font_size: int = 85,
@@ -801,7 +839,7 @@ class TextOverlay:
         Create a hook/intro slide (first slide that grabs attention).
         
         Args:
-            background_path: Path to background image
+            background_path: Background image - path, PIL Image or GeneratedImage
             output_path: Path for output
             hook_text: The attention-grabbing text
             font_size: Font size
@@ -834,7 +872,7 @@ class TextOverlay:
     
     def create_outro_slide(
         self,
-        background_path: str,
+        background_path: ImageSource,
         output_path: str,
         text: str,
         subtitle: Optional[str] = None,
@@ -847,7 +885,7 @@ class TextOverlay:
         Create an outro/CTA slide (final slide).
         
         Args:
-            background_path: Path to background image
+            background_path: Background image - path, PIL Image or GeneratedImage
             output_path: Path for output
             text: Main outro text
             subtitle: Optional secondary text
@@ -898,24 +936,13 @@ class TextOverlay:
         height = height or self.TIKTOK_HEIGHT
         
         if gradient:
-            # Create gradient from darker at bottom to lighter at top
-            img = Image.new("RGB", (width, height))
-            
-            for y in range(height):
-                # Calculate gradient factor (0 at bottom, 1 at top)
-                factor = 1 - (y / height)
-                
-                # Lighter at top, darker at bottom
-                r = int(color[0] + (40 * factor))
-                g = int(color[1] + (40 * factor))
-                b = int(color[2] + (50 * factor))
-                
-                for x in range(width):
-                    img.putpixel((x, y), (r, g, b))
+            # Create gradient from lighter at top to darker (the base color) at bottom
+            top = (color[0] + 40, color[1] + 40, color[2] + 50)
+            img = vertical_gradient((width, height), [(0, top), (1, tuple(color))])
         else:
             img = Image.new("RGB", (width, height), color)
         
-        img.save(output_path, quality=95)
+        save_image(img, output_path, self.output_profile)
         return output_path
 
 
@@ -17,6 +17,10 @@ from pathlib import Path
 from typing import List, Optional
 from datetime import datetime, timedelta
 
+from .image_writer import encode_file
+from .http_client import get_session
+from .tracing import traced
+
 logger = logging.getLogger(__name__)
 
 # Project root for token files
@@ -75,6 +79,7 @@ class TikTokPoster:
         # The endpoint is /api/tiktok/upload-media
         logger.info(f"TikTok poster will upload images to: {API_BASE_URL}/api/tiktok/upload-media")
     
+    @traced("upload", provider="tiktok")
     def _upload_image_to_server(self, local_path: str) -> Optional[str]:
         """Upload a local image to the production server and return public URL.
         
@@ -93,22 +98,22 @@ class TikTokPoster:
             return None
         
         try:
-            # Read the image file
-            with open(path, 'rb') as f:
-                file_data = f.read()
+            # Encode as the JPEG TikTok needs before uploading - a fraction of
+            # the PNG's size, and the server stores it without re-encoding
+            file_data, upload_name, mime_type = encode_file(str(path), "tiktok_jpeg")
             
             # Upload to production server
             upload_url = f"{API_BASE_URL}/api/tiktok/upload-media"
             
             files = {
-                'file': (path.name, file_data, 'image/png')
+                'file': (upload_name, file_data, mime_type)
             }
             data = {
                 'filename': path.stem
             }
             
             logger.info(f"Uploading {path.name} to {upload_url}...")
-            response = requests.post(upload_url, files=files, data=data, timeout=60)
+            response = get_session().post(upload_url, files=files, data=data, timeout=60)
             
             if response.status_code != 200:
                 logger.error(f"Upload failed: {response.status_code} - {response.text}")
@@ -247,6 +252,7 @@ class TikTokPoster:
         # Default: generated_images - use .jpg for TikTok compatibility
         return f"{API_BASE_URL}/static/images/{jpg_filename}"
     
+    @traced("publish", provider="tiktok")
     def post_photo_slideshow(
         self,
         image_paths: List[str],
@@ -313,7 +319,7 @@ class TikTokPoster:
         }
         
         try:
-            response = requests.post(PHOTO_INIT_URL, headers=headers, json=payload)
+            response = get_session().post(PHOTO_INIT_URL, headers=headers, json=payload)
             result = response.json()
             
             logger.info(f"TikTok API response: {result}")
@@ -373,7 +379,7 @@ class TikTokPoster:
         payload = {"publish_id": publish_id}
         
         try:
-            response = requests.post(STATUS_URL, headers=headers, json=payload)
+            response = get_session().post(STATUS_URL, headers=headers, json=payload)
             result = response.json()
             
             error = result.get("error", {})
@@ -423,7 +429,7 @@ class TikTokPoster:
         }
         
         try:
-            response = requests.post(
+            response = get_session().post(
                 "https://open.tiktokapis.com/v2/oauth/token/",
                 headers=headers,
                 data=data
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+TikTok Video Upload - chunked, streamed and resumable FILE_UPLOAD.
+
+The Content Posting API takes a video as a series of PUTs to the upload_url
+returned by the init call, one per chunk, each with a Content-Range header.
+Chunk rules (from the API docs):
+- videos under 5 MB go up whole (chunk_size = video_size, 1 chunk)
+- otherwise chunks are 5-64 MB, at most 1000 of them
+- the trailing remainder is merged into the last chunk (which may reach 128 MB)
+- chunks are sent in order; 206 acknowledges a chunk, 201 the whole file
+
+Chunks are read from disk READ_BLOCK_SIZE at a time while they are sent, so an
+upload never holds more than one block in memory. After every acknowledged
+chunk the byte offset is written to .tiktok_uploads/<publish_id>.json; if the
+upload is interrupted, the next upload_video() for the same file picks up the
+saved upload_url and continues from that offset instead of starting over
+(TikTok keeps an upload_url valid for an hour).
+
+Usage:
+    from .tiktok_video_upload import upload_video, TikTokUploadError
+
+    result = upload_video(INBOX_INIT_URL, access_token, "final.mp4")
+    result["publish_id"], result["resumed_from"]
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .http_client import get_session
+from .tracing import span
+
+MIN_CHUNK_SIZE = 5 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_FINAL_CHUNK_SIZE = 128 * 1024 * 1024
+MAX_CHUNKS = 1000
+DEFAULT_CHUNK_SIZE = 10 * 1024 * 1024
+
+# Bytes read from disk per send; bounds memory per upload
+READ_BLOCK_SIZE = 1024 * 1024
+
+# TikTok expires an upload_url an hour after init; resume only well inside that
+UPLOAD_URL_TTL = 55 * 60
+
+# Shared with the CLI (repo root, next to .tiktok_tokens.json)
+PROGRESS_DIR = Path(__file__).parent.parent.parent.parent / ".tiktok_uploads"
+
+# Transient failures worth resending a chunk for
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class TikTokUploadError(Exception):
+    """Init or a chunk failed; progress is kept so the upload can resume."""
+
+    def __init__(self, message: str, status_code: int = 502, publish_id: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.publish_id = publish_id
+
+
+def plan_chunks(file_size: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, int]:
+    """(chunk_size, total_chunk_count) that satisfy TikTok's chunk rules."""
+    if file_size <= 0:
+        raise ValueError("Video file is empty")
+    if file_size < MIN_CHUNK_SIZE:
+        return file_size, 1
+    chunk_size = max(MIN_CHUNK_SIZE, min(chunk_size, MAX_CHUNK_SIZE, file_size))
+    # Too many chunks: grow them until the count fits
+    if file_size // chunk_size > MAX_CHUNKS:
+        chunk_size = -(-file_size // MAX_CHUNKS)
+    total = file_size // chunk_size
+    # The remainder rides on the last chunk, which may not exceed 128 MB
+    if file_size - (total - 1) * chunk_size > MAX_FINAL_CHUNK_SIZE:
+        raise ValueError(f"Cannot split {file_size} bytes into TikTok-compliant chunks")
+    return chunk_size, total
+
+
+def chunk_ranges(file_size: int, chunk_size: int, total_chunk_count: int) -> List[Tuple[int, int]]:
+    """Inclusive (first_byte, last_byte) of every chunk."""
+    ranges = [(i * chunk_size, (i + 1) * chunk_size - 1) for i in range(total_chunk_count)]
+    ranges[-1] = (ranges[-1][0], file_size - 1)
+    return ranges
+
+
+def source_info(file_size: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """The source_info block for a FILE_UPLOAD init request."""
+    chunk_size, total = plan_chunks(file_size, chunk_size)
+    return {
+        "source": "FILE_UPLOAD",
+        "video_size": file_size,
+        "chunk_size": chunk_size,
+        "total_chunk_count": total,
+    }
+
+
+class ChunkReader:
+    """
+    File slice handed to requests as a streaming body.
+
+    requests takes the length from __len__ (so it sends Content-Length, not
+    chunked transfer encoding) and http.client pulls the data through read().
+    """
+
+    def __init__(self, path: str, offset: int, length: int, block_size: int = READ_BLOCK_SIZE):
+        self._file = open(path, "rb")
+        self._file.seek(offset)
+        self._remaining = length
+        self._length = length
+        self._block_size = block_size
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size is None or size < 0:
+            size = self._block_size
+        data = self._file.read(min(size, self._block_size, self._remaining))
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        while True:
+            block = self.read(self._block_size)
+            if not block:
+                return
+            yield block
+
+    def close(self):
+        self._file.close()
+
+
+# =============================================================================
+# PROGRESS
+# =============================================================================
+
+_progress_lock = threading.Lock()
+
+
+def _file_identity(file_path: str) -> Dict:
+    stat = os.stat(file_path)
+    return {"file_path": os.path.abspath(file_path), "file_size": stat.st_size, "file_mtime": stat.st_mtime}
+
+
+def _progress_path(progress_dir: Path, publish_id: str) -> Path:
+    return Path(progress_dir) / f"{publish_id}.json"
+
+
+def save_progress(progress_dir: Path, record: Dict):
+    """Write a progress record atomically (a crash mid-write keeps the old one)."""
+    path = _progress_path(progress_dir, record["publish_id"])
+    with _progress_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(record, indent=2))
+        os.replace(tmp, path)
+
+
+def find_resumable(file_path: str, progress_dir: Path = PROGRESS_DIR, init_url: Optional[str] = None) -> Optional[Dict]:
+    """The saved, unexpired progress for this exact file (same path, size and mtime), if any."""
+    progress_dir = Path(progress_dir)
+    if not progress_dir.exists():
+        return None
+    identity = _file_identity(file_path)
+    now = time.time()
+    with _progress_lock:
+        for path in sorted(progress_dir.glob("*.json")):
+            try:
+                record = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if now - record.get("created_at", 0) > UPLOAD_URL_TTL:
+                path.unlink(missing_ok=True)
+                continue
+            if all(record.get(k) == v for k, v in identity.items()) and (init_url is None or record.get("init_url") == init_url):
+                return record
+    return None
+
+
+def clear_progress(progress_dir: Path, publish_id: str):
+    with _progress_lock:
+        _progress_path(progress_dir, publish_id).unlink(missing_ok=True)
+
+
+# =============================================================================
+# UPLOAD
+# =============================================================================
+
+def init_upload(init_url: str, access_token: str, file_size: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                post_info: Optional[Dict] = None, timeout: float = 30) -> Dict:
+    """Call the init endpoint; returns {"publish_id", "upload_url", "chunk_size", "total_chunk_count"}."""
+    info = source_info(file_size, chunk_size)
+    payload = {"source_info": info}
+    if post_info:
+        payload["post_info"] = post_info
+    response = get_session().post(
+        init_url,
+        headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json; charset=UTF-8"},
+        json=payload,
+        timeout=timeout
+    )
+    if response.status_code != 200:
+        raise TikTokUploadError(f"Init failed: {response.text}", status_code=response.status_code)
+    result = response.json()
+    error = result.get("error", {})
+    if isinstance(error, dict) and error.get("code", "ok") != "ok":
+        raise TikTokUploadError(f"API Error: {error}", status_code=400)
+    data = result.get("data", {})
+    if not data.get("upload_url"):
+        raise TikTokUploadError("No upload URL in response", status_code=500)
+    return {
+        "publish_id": data.get("publish_id"),
+        "upload_url": data["upload_url"],
+        "chunk_size": info["chunk_size"],
+        "total_chunk_count": info["total_chunk_count"],
+    }
+
+
+def upload_chunks(record: Dict, progress_dir: Path = PROGRESS_DIR, max_retries: int = 5, backoff: float = 1.0,
+                  timeout: float = 120, on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    PUT the chunks that haven't been acknowledged yet, saving progress after each.
+
+    Args:
+        record: Progress record (publish_id, upload_url, file_path, file_size,
+            chunk_size, total_chunk_count, acknowledged_bytes)
+        max_retries: Resends per chunk for connection errors and 408/429/5xx
+        backoff: Seconds before the first resend; doubles each time
+        on_progress: Called with (acknowledged_bytes, file_size) after each chunk
+
+    Returns:
+        {"chunks_sent", "retries", "bytes_sent"}
+    """
+    file_size = record["file_size"]
+    ranges = chunk_ranges(file_size, record["chunk_size"], record["total_chunk_count"])
+    sent = retries = bytes_sent = 0
+
+    for index, (first, last) in enumerate(ranges):
+        if last < record["acknowledged_bytes"]:
+            continue
+        length = last - first + 1
+        attempt = 0
+        while True:
+            body = ChunkReader(record["file_path"], first, length)
+            try:
+                response = get_session().put(
+                    record["upload_url"],
+                    headers={
+                        "Content-Type": "video/mp4",
+                        "Content-Length": str(length),
+                        "Content-Range": f"bytes {first}-{last}/{file_size}",
+                    },
+                    data=body,
+                    timeout=timeout
+                )
+                status, detail = response.status_code, response.text[:200]
+            except (requests.ConnectionError, requests.Timeout) as e:
+                status, detail = None, str(e)
+            finally:
+                body.close()
+
+            if status in (200, 201, 206):
+                break
+            if (status is None or status in RETRY_STATUSES) and attempt < max_retries:
+                attempt += 1
+                retries += 1
+                time.sleep(backoff * 2 ** (attempt - 1))
+                continue
+            raise TikTokUploadError(
+                f"Chunk {index + 1}/{len(ranges)} failed ({status or 'connection error'}): {detail}",
+                status_code=status or 502,
+                publish_id=record["publish_id"]
+            )
+
+        sent += 1
+        bytes_sent += length
+        record["acknowledged_bytes"] = last + 1
+        save_progress(progress_dir, record)
+        if on_progress:
+            on_progress(record["acknowledged_bytes"], file_size)
+
+    return {"chunks_sent": sent, "retries": retries, "bytes_sent": bytes_sent}
+
+
+def upload_video(init_url: str, access_token: str, file_path: str, post_info: Optional[Dict] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, progress_dir: Path = PROGRESS_DIR, resume: bool = True,
+                 max_retries: int = 5, backoff: float = 1.0,
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Upload a video file, resuming an interrupted upload of the same file if one is saved.
+
+    Args:
+        init_url: Inbox or direct-post video init endpoint
+        post_info: post_info block for direct posts (None for inbox uploads)
+        resume: Continue a saved upload of this file instead of starting a new one
+
+    Returns:
+        {"publish_id", "total_chunk_count", "chunks_sent", "retries", "bytes_sent", "resumed_from"}
+
+    Raises:
+        TikTokUploadError: init failed, or a chunk still failed after max_retries
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Video file not found: {file_path}")
+
+    record = find_resumable(file_path, progress_dir, init_url) if resume else None
+    if record is None:
+        identity = _file_identity(file_path)
+        init = init_upload(init_url, access_token, identity["file_size"], chunk_size, post_info)
+        record = {**init, **identity, "init_url": init_url, "acknowledged_bytes": 0, "created_at": time.time()}
+        save_progress(progress_dir, record)
+    resumed_from = record["acknowledged_bytes"]
+
+    with span("upload", provider="tiktok", bytes=record["file_size"], chunks=record["total_chunk_count"],
+              resumed_from=resumed_from) as upload_span:
+        stats = upload_chunks(record, progress_dir, max_retries=max_retries, backoff=backoff, on_progress=on_progress)
+        upload_span.set(retries=stats["retries"])
+
+    clear_progress(progress_dir, record["publish_id"])
+    return {
+        "publish_id": record["publish_id"],
+        "total_chunk_count": record["total_chunk_count"],
+        "resumed_from": resumed_from,
+        **stats,
+    }
@@ -0,0 +1,207 @@
+"""
+Tool Scheduler - runs the tool calls from one agent turn concurrently.
+
+When Claude returns several tool_use blocks in one response they are usually
+independent (e.g. "generate slides 2, 3 and 4"). Running them one after
+another makes a multi-tool turn as slow as the sum of its tools.
+
+Each tool has a concurrency class:
+
+- local       Cheap, in-process lookups. Run inline on the event loop.
+- db          Database reads. Run on a worker thread.
+- network     External status checks / posting. Run on a worker thread.
+- generation  Image / video / voice generation. Run on a worker thread,
+              with a small global limit since these are heavy and paid.
+- serial      State-changing workflow steps (approve_script, create_automation,
+              ...). Act as a barrier: everything before finishes first, the
+              serial tool runs alone, then the rest of the turn continues.
+
+Limits are process-wide, so two concurrent chats share the same generation
+budget. Most tool implementations are `async def` but do blocking work
+(requests, SQLAlchemy, provider SDKs), so threaded classes run each tool's
+coroutine on its own event loop in a worker thread.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Any, AsyncGenerator, Tuple
+
+from .agent_tools import ToolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+# Max tools of each class running at once across the whole process
+CONCURRENCY_LIMITS = {
+    "local": 16,
+    "db": 8,
+    "network": 6,
+    "generation": 3,
+    "serial": 1,
+}
+
+TOOL_CONCURRENCY: Dict[str, str] = {
+    # Script tools
+    "generate_script": "serial",
+    "approve_script": "serial",
+    "regenerate_slide_script": "serial",
+    "update_slide_content": "serial",
+    # Image tools
+    "generate_slide_image": "generation",
+    "generate_all_images": "generation",
+    "change_slide_font": "serial",
+    "get_slide_versions": "db",
+    "revert_slide_version": "serial",
+    # Project tools
+    "list_projects": "db",
+    "get_project": "db",
+    "delete_project": "serial",
+    "get_project_stats": "db",
+    # TikTok tools
+    "check_tiktok_status": "local",
+    "get_tiktok_auth_url": "serial",
+    "upload_to_tiktok": "network",
+    "get_upload_status": "network",
+    "post_slideshow_to_tiktok": "network",
+    # Instagram tools
+    "check_instagram_status": "network",
+    "post_slideshow_to_instagram": "network",
+    "get_instagram_post_status": "network",
+    # Video tools
+    "generate_video_transition": "generation",
+    "generate_narration_video": "generation",
+    "get_video_capabilities": "local",
+    # Voice/Narration tools
+    "generate_voiceover": "generation",
+    "generate_voiceover_with_timestamps": "generation",
+    "list_available_voices": "network",
+    # Video assembly tools
+    "combine_video_with_audio": "generation",
+    "create_full_narration_video": "generation",
+    # Automation tools
+    "list_automations": "db",
+    "create_automation": "serial",
+    "start_automation": "serial",
+    "stop_automation": "serial",
+    "run_automation_now": "serial",
+    "add_topics_to_automation": "serial",
+    "get_automation_runs": "db",
+    "update_automation_social_settings": "serial",
+    "get_automation_social_settings": "db",
+    "queue_projects_for_automation": "serial",
+    "get_automation_queue_status": "db",
+    "skip_to_next_in_queue": "serial",
+    # Settings tools
+    "list_fonts": "local",
+    "list_content_types": "local",
+    "list_image_styles": "local",
+    "list_themes": "local",
+    "get_health_status": "local",
+    # Memory tools
+    "get_session_context": "local",
+    "save_session_context": "serial",
+    "add_agent_insight": "serial",
+}
+
+# Unknown tools are assumed to change state
+DEFAULT_CONCURRENCY = "serial"
+
+
+def get_tool_concurrency(tool_name: str) -> str:
+    """Concurrency class for a tool."""
+    return TOOL_CONCURRENCY.get(tool_name, DEFAULT_CONCURRENCY)
+
+
+def plan_tool_batches(tool_names: List[str]) -> List[List[int]]:
+    """
+    Split one turn's tool calls into batches that may run concurrently.
+
+    Consecutive non-serial tools share a batch; each serial tool gets a batch
+    of its own. Batches run in order.
+
+    Returns:
+        List of batches, each a list of indexes into tool_names
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index, name in enumerate(tool_names):
+        if get_tool_concurrency(name) == "serial":
+            if current:
+                batches.append(current)
+                current = []
+            batches.append([index])
+        else:
+            current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class ParallelToolRunner:
+    """Executes a turn's tool calls through ToolExecutor, concurrently where safe."""
+
+    def __init__(self, tool_executor: ToolExecutor):
+        self.tool_executor = tool_executor
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, concurrency: str) -> asyncio.Semaphore:
+        if concurrency not in self._semaphores:
+            self._semaphores[concurrency] = asyncio.Semaphore(CONCURRENCY_LIMITS[concurrency])
+        return self._semaphores[concurrency]
+
+    async def _execute_one(self, tool_name: str, tool_input: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        concurrency = get_tool_concurrency(tool_name)
+        async with self._semaphore(concurrency):
+            try:
+                if concurrency == "local":
+                    result = await self.tool_executor.execute(tool_name, tool_input)
+                else:
+                    result = await asyncio.to_thread(
+                        asyncio.run, self.tool_executor.execute(tool_name, tool_input)
+                    )
+                success = result.get("success", True)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+                success = False
+        return result, success
+
+    async def run(
+        self,
+        tool_calls: List[Tuple[str, Dict[str, Any]]]
+    ) -> AsyncGenerator[Tuple[int, Dict[str, Any], bool], None]:
+        """
+        Run tool calls, yielding (index, result, success) as each finishes.
+
+        Completion order may differ from request order; callers use the index
+        to put tool_result blocks back in request order.
+
+        Args:
+            tool_calls: [(tool_name, tool_input), ...] in the order Claude sent them
+        """
+        for batch in plan_tool_batches([name for name, _ in tool_calls]):
+            if len(batch) == 1:
+                index = batch[0]
+                result, success = await self._execute_one(*tool_calls[index])
+                yield index, result, success
+                continue
+
+            async def run_indexed(index: int):
+                result, success = await self._execute_one(*tool_calls[index])
+                return index, result, success
+
+            tasks = [asyncio.create_task(run_indexed(index)) for index in batch]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                # Consumer stopped early (client disconnected) - don't leak tasks
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+    async def run_all(self, tool_calls: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[Dict[str, Any], bool]]:
+        """Run tool calls and return [(result, success), ...] in request order."""
+        results: List[Tuple[Dict[str, Any], bool]] = [None] * len(tool_calls)
+        async for index, result, success in self.run(tool_calls):
+            results[index] = (result, success)
+        return results
@@ -0,0 +1,44 @@
+"""
+Tracing for the API process - re-exports the repo-root tracing module.
+
+The scheduler runs root pipeline modules (slideshow_automation, text_overlay,
+provider_limits, ...) inside the API process, so backend services must record
+into the same registry and span trees. Unlike the other services this module
+is not a copy; see tracing.py at the repo root.
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from tracing import (  # noqa: E402
+    Span,
+    Trace,
+    MetricsRegistry,
+    span,
+    traced,
+    begin_span,
+    end_span,
+    start_trace,
+    current_trace,
+    in_context,
+    get_registry,
+    render_prometheus,
+)
+
+__all__ = [
+    "Span",
+    "Trace",
+    "MetricsRegistry",
+    "span",
+    "traced",
+    "begin_span",
+    "end_span",
+    "start_trace",
+    "current_trace",
+    "in_context",
+    "get_registry",
+    "render_prometheus",
+]
@@ -1,14 +1,18 @@
-from moviepy.editor import *
 import os
 from typing import List, Dict, Optional, Tuple
 import json
-import numpy as np
+
+from .lazy_imports import lazy_module
+from .tracing import span
 
 # Fix for Pillow 10+ compatibility (ANTIALIAS was removed)
 import PIL.Image
 if not hasattr(PIL.Image, 'ANTIALIAS'):
     PIL.Image.ANTIALIAS = PIL.Image.Resampling.LANCZOS
 
+# moviepy pulls in imageio, numpy and an ffmpeg probe; import it on first use
+mpy = lazy_module("moviepy.editor")
+
 # Import cloud storage for video upload
 try:
     from .cloud_storage import upload_video_to_gcs
@@ -29,7 +33,7 @@ def crossfade_transition(clip1, clip2, duration=0.5):
     # Overlap clips
     clip2_faded = clip2_faded.set_start(clip1.duration - duration)
     
-    return CompositeVideoClip([clip1_faded, clip2_faded])
+    return mpy.CompositeVideoClip([clip1_faded, clip2_faded])
 
 
 def slide_transition(clip1, clip2, duration=0.5, direction="left"):
@@ -49,7 +53,7 @@ def slide_transition(clip1, clip2, duration=0.5, direction="left"):
     clip2_sliding = clip2.set_position(lambda t: slide_in(t, direction, 1080, duration))
     clip2_sliding = clip2_sliding.set_start(clip1.duration - duration)
     
-    return CompositeVideoClip([clip1, clip2_sliding], size=(1080, 1920))
+    return mpy.CompositeVideoClip([clip1, clip2_sliding], size=(1080, 1920))
 
 
 def fade_through_black(clip1, clip2, duration=0.3):
@@ -57,7 +61,7 @@ def fade_through_black(clip1, clip2, duration=0.3):
     clip1_faded = clip1.fadeout(duration)
     clip2_faded = clip2.fadein(duration).set_start(clip1.duration - duration/2)
     
-    return CompositeVideoClip([clip1_faded, clip2_faded])
+    return mpy.CompositeVideoClip([clip1_faded, clip2_faded])
 
 
 def zoom_transition(clip1, clip2, duration=0.5, zoom_type="in"):
@@ -126,7 +130,7 @@ class VideoAssembler:
         
         try:
             # Load the single continuous audio file
-            audio_clip = AudioFileClip(audio_path)
+            audio_clip = mpy.AudioFileClip(audio_path)
             total_duration = audio_clip.duration
             print(f"Audio duration: {total_duration} seconds")
             print(f"Transition: {transition} ({transition_duration}s)")
@@ -167,7 +171,7 @@ class VideoAssembler:
                     duration += transition_duration
                 
                 # Create image clip
-                img_clip = (ImageClip(image_path)
+                img_clip = (mpy.ImageClip(image_path)
                            .set_duration(duration)
                            .resize(height=self.height)
                            .set_position('center'))
@@ -205,10 +209,10 @@ class VideoAssembler:
                     # Next clip starts before this one ends (overlap)
                     current_start += clip.duration - transition_duration
                 
-                final_video = CompositeVideoClip(composite_clips, size=(self.width, self.height))
+                final_video = mpy.CompositeVideoClip(composite_clips, size=(self.width, self.height))
             else:
                 # No transitions - simple concatenation
-                final_video = concatenate_videoclips(video_clips, method="compose")
+                final_video = mpy.concatenate_videoclips(video_clips, method="compose")
             
             # Add audio
             final_video = final_video.set_audio(audio_clip)
@@ -225,16 +229,17 @@ class VideoAssembler:
             
             # Render video optimized for TikTok
             print("Rendering video...")
-            final_video.write_videofile(
-                output_path,
-                fps=self.fps,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True,
-                preset='medium',  # Good balance of speed and quality
-                ffmpeg_params=['-crf', '23']  # Good quality compression
-            )
+            with span("encode", format="mp4"):
+                final_video.write_videofile(
+                    output_path,
+                    fps=self.fps,
+                    codec='libx264',
+                    audio_codec='aac',
+                    temp_audiofile='temp-audio.m4a',
+                    remove_temp=True,
+                    preset='medium',  # Good balance of speed and quality
+                    ffmpeg_params=['-crf', '23']  # Good quality compression
+                )
             
             print(f"Video created successfully: {output_path}")
             
@@ -255,7 +260,7 @@ class VideoAssembler:
             print(f"Error creating video: {e}")
             return None
     
-    def add_text_overlays(self, video_clip: VideoClip, scenes: List[Dict]) -> VideoClip:
+    def add_text_overlays(self, video_clip: "mpy.VideoClip", scenes: List[Dict]) -> "mpy.VideoClip":
         """Add text overlays for key philosophical concepts"""
         
         text_clips = []
@@ -267,7 +272,7 @@ class VideoAssembler:
             
             if key_concept:
                 # Create text clip
-                txt_clip = (TextClip(key_concept.upper(), 
+                txt_clip = (mpy.TextClip(key_concept.upper(), 
                                    fontsize=40, 
                                    color='#FFD700',  # Gold color
                                    font='Arial-Bold',
@@ -283,21 +288,21 @@ class VideoAssembler:
             current_time += duration
         
         if text_clips:
-            video_clip = CompositeVideoClip([video_clip] + text_clips)
+            video_clip = mpy.CompositeVideoClip([video_clip] + text_clips)
         
         return video_clip
     
-    def create_intro_outro(self, duration: float = 2.0) -> VideoClip:
+    def create_intro_outro(self, duration: float = 2.0) -> "mpy.VideoClip":
         """Create intro/outro clip for philosophy app promotion"""
         
         # Create a simple dark background with golden text
-        intro_clip = (ColorClip(size=(self.width, self.height), 
+        intro_clip = (mpy.ColorClip(size=(self.width, self.height), 
                                color=(26, 26, 26), 
                                duration=duration)
                      .set_fps(self.fps))
         
         # Add app promotion text
-        title_text = (TextClip("Explore Philosophy", 
+        title_text = (mpy.TextClip("Explore Philosophy", 
                               fontsize=60, 
                               color='#FFD700',
                               font='Arial-Bold')
@@ -305,7 +310,7 @@ class VideoAssembler:
                      .set_duration(duration)
                      .fadeout(0.5))
         
-        subtitle_text = (TextClip("Download our app to dive deeper", 
+        subtitle_text = (mpy.TextClip("Download our app to dive deeper", 
                                 fontsize=30, 
                                 color='white',
                                 font='Arial')
@@ -313,14 +318,14 @@ class VideoAssembler:
                        .set_duration(duration)
                        .fadeout(0.5))
         
-        return CompositeVideoClip([intro_clip, title_text, subtitle_text])
+        return mpy.CompositeVideoClip([intro_clip, title_text, subtitle_text])
     
     def optimize_for_tiktok(self, video_path: str) -> str:
         """Additional optimizations for TikTok upload"""
         
         try:
             # Load the video
-            video = VideoFileClip(video_path)
+            video = mpy.VideoFileClip(video_path)
             
             # Ensure perfect TikTok dimensions and settings
             optimized_video = (video
@@ -330,14 +335,15 @@ class VideoAssembler:
             # Output optimized version
             optimized_path = video_path.replace('.mp4', '_tiktok_optimized.mp4')
             
-            optimized_video.write_videofile(
-                optimized_path,
-                fps=30,
-                codec='libx264',
-                audio_codec='aac',
-                bitrate="1000k",  # TikTok recommended
-                preset='fast'
-            )
+            with span("encode", format="mp4"):
+                optimized_video.write_videofile(
+                    optimized_path,
+                    fps=30,
+                    codec='libx264',
+                    audio_codec='aac',
+                    bitrate="1000k",  # TikTok recommended
+                    preset='fast'
+                )
             
             video.close()
             optimized_video.close()
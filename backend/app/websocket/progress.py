@@ -1,54 +1,206 @@
-"""WebSocket endpoint for real-time progress updates."""
+"""WebSocket endpoint for real-time progress updates.
+
+Each connection gets its own bounded outbound queue and writer task, so a
+broadcast only enqueues and one slow browser never holds up the others:
+- progress events for the same step replace the one still waiting to be
+  sent instead of queueing behind it (latest value wins)
+- a client that falls MAX_PENDING messages behind, or whose send takes longer
+  than SEND_TIMEOUT, is disconnected with close code 1013 (try again later)
+"""
 import asyncio
-from typing import Dict, Set
+import itertools
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Set
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import json
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Store active connections per project
-active_connections: Dict[str, Set[WebSocket]] = {}
+# =============================================================================
+# BROADCAST POLICY
+# =============================================================================
+
+# Messages a client may have waiting before it counts as fallen behind
+MAX_PENDING = 64
+
+# Seconds a single send may take before the client counts as stalled
+SEND_TIMEOUT = 5.0
+
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Channel for /ws/global clients (automations and other system events)
+GLOBAL_CHANNEL = "__global__"
+
+# Message types that supersede each other, and the field naming the stage
+COALESCE_FIELDS = {"progress": "step"}
+
+
+def coalesce_key(data: dict) -> Optional[tuple]:
+    """Key under which a newer message replaces a pending one (None = never)."""
+    field = COALESCE_FIELDS.get(data.get("type"))
+    if field is None:
+        return None
+    return (data["type"], data.get(field))
+
+
+class ClientConnection:
+    """One socket with its own bounded outbound queue and writer task."""
+
+    _sequence = itertools.count()
+
+    def __init__(self, websocket: WebSocket, channel: str,
+                 on_close: Callable[["ClientConnection", Optional[str]], None]):
+        self.websocket = websocket
+        self.channel = channel
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        self._pending: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._on_close = on_close
+        self._writer = asyncio.create_task(self._drain())
+        self._closer: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, data: dict) -> bool:
+        """Queue a message (never blocks). False if the client is gone or was dropped."""
+        if self.closed:
+            return False
+        key = coalesce_key(data)
+        if key is not None and key in self._pending:
+            self._pending[key] = data
+            self.coalesced += 1
+            return True
+        if len(self._pending) >= MAX_PENDING:
+            self.close(f"fell {MAX_PENDING} messages behind")
+            return False
+        self._pending[key if key is not None else next(self._sequence)] = data
+        self._ready.set()
+        return True
+
+    async def _drain(self):
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._pending:
+                    _, data = self._pending.popitem(last=False)
+                    await asyncio.wait_for(self.websocket.send_json(data), SEND_TIMEOUT)
+                    self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.close(f"send took over {SEND_TIMEOUT}s")
+        except Exception:
+            # The client went away; its receive loop sees the disconnect as well
+            self.close(None)
+
+    def close(self, reason: Optional[str] = None):
+        """Stop sending; with a reason the socket is closed as a slow consumer."""
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        if asyncio.current_task() is not self._writer:
+            self._writer.cancel()
+        self._on_close(self, reason)
+        if reason:
+            self._closer = asyncio.create_task(self._close_socket(reason))
+
+    async def _close_socket(self, reason: str):
+        try:
+            await asyncio.wait_for(
+                self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason=reason), SEND_TIMEOUT
+            )
+        except Exception:
+            pass
 
 
 class ConnectionManager:
     """Manage WebSocket connections for progress updates."""
 
     def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.active_connections: Dict[str, Set[ClientConnection]] = {}
+        # Event loop that owns the sockets (the server loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.slow_disconnects = 0
 
-    async def connect(self, websocket: WebSocket, project_id: str):
+    async def connect(self, websocket: WebSocket, project_id: str) -> ClientConnection:
         """Accept a new WebSocket connection."""
         await websocket.accept()
-        if project_id not in self.active_connections:
-            self.active_connections[project_id] = set()
-        self.active_connections[project_id].add(websocket)
+        self._loop = asyncio.get_running_loop()
+        connection = ClientConnection(websocket, project_id, self._closed)
+        self.active_connections.setdefault(project_id, set()).add(connection)
+        return connection
 
-    def disconnect(self, websocket: WebSocket, project_id: str):
+    def disconnect(self, connection: ClientConnection):
         """Remove a WebSocket connection."""
-        if project_id in self.active_connections:
-            self.active_connections[project_id].discard(websocket)
-            if not self.active_connections[project_id]:
-                del self.active_connections[project_id]
+        connection.close()
+
+    def _closed(self, connection: ClientConnection, reason: Optional[str]):
+        connections = self.active_connections.get(connection.channel)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.active_connections[connection.channel]
+        if reason:
+            self.slow_disconnects += 1
+            logger.warning(f"Dropped slow WebSocket client on {connection.channel}: {reason}")
+
+    def publish(self, project_id: str, data: dict) -> int:
+        """Queue data for every client of a project; returns how many took it.
+
+        Must run on the server loop (send_progress takes care of that).
+        """
+        delivered = 0
+        for connection in list(self.active_connections.get(project_id, ())):
+            delivered += connection.enqueue(data)
+        return delivered
 
     async def send_progress(self, project_id: str, data: dict):
-        """Send progress update to all connections for a project."""
-        if project_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[project_id]:
-                try:
-                    await connection.send_json(data)
-                except Exception:
-                    disconnected.append(connection)
-
-            # Clean up disconnected clients
-            for conn in disconnected:
-                self.active_connections[project_id].discard(conn)
+        """Send progress update to all connections for a project.
+
+        Returns once the update is queued; each client's writer sends it. Safe
+        to call from tools running on a worker thread's event loop: the
+        update is handed to the server loop that owns the sockets.
+        """
+        loop = self._loop
+        if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+            loop.call_soon_threadsafe(self.publish, project_id, data)
+            return
+        self.publish(project_id, data)
+
+    def publish_threadsafe(self, project_id: str, data: dict):
+        """Queue data from any thread, e.g. a scheduler job (dropped if no client ever connected)."""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+        loop.call_soon_threadsafe(self.publish, project_id, data)
+
+    async def send_global(self, data: dict):
+        """Send a system event to the /ws/global clients."""
+        await self.send_progress(GLOBAL_CHANNEL, data)
 
     async def broadcast(self, data: dict):
         """Broadcast to all connected clients."""
         for project_id in list(self.active_connections.keys()):
             await self.send_progress(project_id, data)
 
+    def stats(self) -> dict:
+        connections = [c for group in self.active_connections.values() for c in group]
+        return {
+            "connections": len(connections),
+            "channels": len(self.active_connections),
+            "pending": sum(c.pending for c in connections),
+            "slow_disconnects": self.slow_disconnects,
+        }
+
 
 # Global manager instance
 manager = ConnectionManager()
@@ -57,32 +209,30 @@ manager = ConnectionManager()
 @router.websocket("/ws/progress/{project_id}")
 async def websocket_progress(websocket: WebSocket, project_id: str):
     """WebSocket endpoint for project progress updates."""
-    await manager.connect(websocket, project_id)
+    connection = await manager.connect(websocket, project_id)
     try:
         while True:
             # Keep connection alive and handle any incoming messages
             data = await websocket.receive_text()
-            # Echo back acknowledgment
-            await websocket.send_json({"type": "ack", "data": data})
+            # Acknowledge through the queue so it never races a broadcast send
+            connection.enqueue({"type": "ack", "data": data})
     except WebSocketDisconnect:
-        manager.disconnect(websocket, project_id)
+        pass
+    finally:
+        manager.disconnect(connection)
 
 
 @router.websocket("/ws/global")
 async def websocket_global(websocket: WebSocket):
     """WebSocket for global system events (automations, etc.)."""
-    await websocket.accept()
-    global_connections: Set[WebSocket] = getattr(
-        websocket_global, '_connections', set()
-    )
-    global_connections.add(websocket)
-    websocket_global._connections = global_connections
-
+    connection = await manager.connect(websocket, GLOBAL_CHANNEL)
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
-        global_connections.discard(websocket)
+        pass
+    finally:
+        manager.disconnect(connection)
 
 
 async def send_progress_update(project_id: str, step: str, progress: int, message: str):
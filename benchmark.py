@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Benchmark - offline, repeatable performance runs of the content pipelines.
+
+Every paid provider is replaced by a local stand-in (see benchmark_providers.py):
+fal.ai, Gemini, ElevenLabs, GCS, TikTok and Post Bridge answer after a fixed,
+seeded latency with canned images, scripts and audio. Everything else is the
+real code: script parsing, image download and decode, text rendering, encoding,
+TaskGraph lanes, the API handlers and the database.
+
+Scenarios:
+- slideshow       slideshow_automation.generate_slideshow (TikTokSlideshow path)
+- themed          ThemedSlideshow.create
+- video_pipeline  VideoPipeline.run (needs moviepy for the canned clips)
+- api_batch       POST /api/scripts/generate, then /api/images/generate-batch
+- publish         TikTokPoster.post_photo_slideshow + InstagramPoster.post_carousel
+
+Each scenario runs in its own interpreter, in a scratch directory, so peak RSS
+is per scenario and nothing is written into the repo. The report shows
+throughput (runs and slides per minute), p50/p95 run latency, peak RSS and
+where the time went (tracing stage totals).
+
+Usage:
+    python benchmark.py                                  # All scenarios, 3 runs each
+    python benchmark.py slideshow themed --runs 10 --concurrency 2
+    python benchmark.py --latency fal_image=0.5 --latency gemini=0.2
+    python benchmark.py --save benchmark_baseline.json
+    python benchmark.py --compare benchmark_baseline.json --fail-over 15
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SCENARIOS = ["slideshow", "themed", "video_pipeline", "api_batch", "publish"]
+
+# Read-only asset directories the pipelines open with relative paths
+ASSET_DIRS = ["fonts", "templates", "references"]
+
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+# Fields compared against a baseline, and which direction is worse
+REGRESSION_FIELDS = {
+    "p50_seconds": "higher",
+    "p95_seconds": "higher",
+    "runs_per_minute": "lower",
+    "peak_rss_mb": "higher",
+}
+
+
+# =============================================================================
+# SCENARIOS (run inside the child interpreter)
+# =============================================================================
+
+def _scenario_slideshow(workdir: Path, options: Dict) -> Callable[[int], int]:
+    from slideshow_automation import generate_slideshow
+
+    def run(index: int) -> int:
+        result = generate_slideshow(
+            options["topic"],
+            model=options["model"],
+            theme="auto",
+            auto_theme=False,
+            output_dir=str(workdir / f"slideshow_{index}")
+        )
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "generate_slideshow failed"))
+        return result["slides_count"]
+    return run
+
+
+def _scenario_themed(workdir: Path, options: Dict) -> Callable[[int], int]:
+    from themed_slideshow import ThemedSlideshow
+
+    def run(index: int) -> int:
+        slideshow = ThemedSlideshow(theme=options["theme"], output_dir=str(workdir / f"themed_{index}"))
+        result = slideshow.create(options["topic"])
+        if not result.get("image_paths"):
+            raise RuntimeError("ThemedSlideshow.create produced no slides")
+        return len(result["image_paths"])
+    return run
+
+
+def _scenario_video_pipeline(workdir: Path, options: Dict) -> Callable[[int], int]:
+    from lazy_imports import is_available
+    if not is_available("moviepy"):
+        raise RuntimeError("skipped: moviepy is not installed")
+    from pipeline import VideoPipeline
+
+    def run(index: int) -> int:
+        pipeline = VideoPipeline(output_dir=str(workdir / f"video_{index}"))
+        result = pipeline.run(options["topic"], image_model=options["model"])
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "VideoPipeline.run failed"))
+        return len(result.get("image_paths", []))
+    return run
+
+
+def _scenario_api_batch(workdir: Path, options: Dict) -> Callable[[int], int]:
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'benchmark.db'}"
+    os.environ["API_KEY"] = "benchmark"
+
+    from backend.app import config
+    # Generated files go to the scratch directory, not the repo
+    config.Settings.base_dir = property(lambda self: workdir)
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+    from backend.app.database import init_db, SessionLocal
+    from backend.app.models import Slide
+    from backend.app.services.cloud_storage import get_storage_service
+
+    init_db()
+    # GCS is only enabled in production; point the service at the stand-in
+    storage_service = get_storage_service()
+    from google.cloud import storage
+    storage_service.client = storage.Client()
+    storage_service.bucket = storage_service.client.bucket(storage_service.bucket_name)
+    storage_service._enabled = True
+
+    client = TestClient(app, headers={"X-API-Key": "benchmark"})
+
+    def run(index: int) -> int:
+        response = client.post("/api/scripts/generate", json={"topic": options["topic"]})
+        response.raise_for_status()
+        project_id = response.json()["project_id"]
+        # TestClient returns once the background batch task has finished
+        response = client.post(
+            f"/api/images/generate-batch/{project_id}",
+            json={"model": options["model"], "theme": options["theme"]}
+        )
+        response.raise_for_status()
+        db = SessionLocal()
+        try:
+            slides = db.query(Slide).filter(Slide.project_id == project_id).all()
+            done = [s for s in slides if s.image_status == "complete"]
+            if len(done) < len(slides):
+                raise RuntimeError(f"{len(slides) - len(done)}/{len(slides)} slides not complete")
+            return len(done)
+        finally:
+            db.close()
+    return run
+
+
+def _scenario_publish(workdir: Path, options: Dict) -> Callable[[int], int]:
+    import io
+    from datetime import datetime
+    from PIL import Image
+    from backend.app.services.tiktok_poster import TikTokPoster
+    from backend.app.services.instagram_poster import InstagramPoster
+    import benchmark_providers
+
+    slides_dir = workdir / "publish_slides"
+    slides_dir.mkdir(exist_ok=True)
+    canned = Image.open(io.BytesIO(benchmark_providers.canned_png())).convert("RGB")
+    image_paths = []
+    for i in range(7):
+        path = slides_dir / f"slide_{i}.png"
+        canned.save(path)
+        image_paths.append(str(path))
+
+    def run(index: int) -> int:
+        tiktok = TikTokPoster()
+        tiktok.tokens = {"access_token": "benchmark", "open_id": "benchmark", "saved_at": datetime.now().isoformat(), "expires_in": 86400}
+        result = tiktok.post_photo_slideshow(image_paths, caption=options["topic"])
+        if not result.get("success"):
+            raise RuntimeError(f"TikTok: {result.get('error')}")
+        result = InstagramPoster(api_key="benchmark", username="benchmark").post_carousel(image_paths, caption=options["topic"])
+        if not result.get("success"):
+            raise RuntimeError(f"Instagram: {result.get('error')}")
+        return len(image_paths)
+    return run
+
+
+SCENARIOS = {
+    "slideshow": _scenario_slideshow,
+    "themed": _scenario_themed,
+    "video_pipeline": _scenario_video_pipeline,
+    "api_batch": _scenario_api_batch,
+    "publish": _scenario_publish,
+}
+
+
+def _child_main(scenario: str, workdir: Path, config: Dict):
+    """Run one scenario in this interpreter and print its raw measurements."""
+    import resource
+
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    for name in ASSET_DIRS:
+        source = Path(REPO_DIR) / name
+        if source.is_dir() and not (workdir / name).exists():
+            (workdir / name).symlink_to(source)
+
+    # Stand-ins must be in sys.modules before any pipeline module binds its SDKs
+    import benchmark_providers
+    benchmark_providers.install(str(workdir), latencies=config["latencies"], seed=config["seed"])
+    from tracing import get_registry
+
+    report = {"scenario": scenario, "ok": True, "runs": []}
+    try:
+        run = SCENARIOS[scenario](workdir, config["options"])
+    except Exception as e:
+        print(RESULT_MARKER + json.dumps({"scenario": scenario, "ok": False, "error": str(e)}))
+        return
+
+    def timed(index: int) -> Dict:
+        start = time.perf_counter()
+        try:
+            items = run(index)
+            return {"seconds": time.perf_counter() - start, "items": items, "ok": True}
+        except Exception as e:
+            return {"seconds": time.perf_counter() - start, "items": 0, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    for index in range(config["warmup"]):
+        timed(-1 - index)
+    get_registry().reset()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config["concurrency"]) as executor:
+        report["runs"] = list(executor.map(timed, range(config["runs"])))
+    report["wall_seconds"] = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux
+    report["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    stages: Dict[str, float] = {}
+    for row in get_registry().snapshot():
+        stages[row["stage"]] = stages.get(row["stage"], 0.0) + row["total_seconds"]
+    report["stages"] = stages
+    report["provider_calls"] = benchmark_providers.request_counts()
+    print(RESULT_MARKER + json.dumps(report))
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(raw: Dict) -> Dict:
+    """Turn a child's raw measurements into the reported numbers."""
+    if not raw.get("ok"):
+        return raw
+    runs = raw["runs"]
+    ok_runs = [r for r in runs if r["ok"]]
+    seconds = [r["seconds"] for r in ok_runs]
+    wall = raw["wall_seconds"] or 1e-9
+    return {
+        "scenario": raw["scenario"],
+        "ok": True,
+        "runs": len(runs),
+        "failed": len(runs) - len(ok_runs),
+        "errors": sorted({r["error"] for r in runs if not r["ok"]})[:3],
+        "wall_seconds": round(wall, 2),
+        "runs_per_minute": round(len(ok_runs) / wall * 60, 2),
+        "slides_per_minute": round(sum(r["items"] for r in ok_runs) / wall * 60, 1),
+        # No latency without a successful run (None, shown as N/A)
+        "p50_seconds": round(percentile(seconds, 50), 2) if seconds else None,
+        "p95_seconds": round(percentile(seconds, 95), 2) if seconds else None,
+        "mean_seconds": round(statistics.mean(seconds), 2) if seconds else None,
+        "peak_rss_mb": round(raw["peak_rss_mb"], 1),
+        "stages": {k: round(v, 2) for k, v in sorted(raw["stages"].items(), key=lambda kv: -kv[1])},
+        "provider_calls": raw["provider_calls"],
+    }
+
+
+def run_scenario(scenario: str, config: Dict, verbose: bool = False) -> Dict:
+    """Run a scenario in a fresh interpreter inside a scratch directory."""
+    workdir = Path(tempfile.mkdtemp(prefix=f"benchmark_{scenario}_"))
+    try:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", scenario,
+               "--workdir", str(workdir), "--child-config", json.dumps(config)]
+        env = {**os.environ, "PYTHONPATH": REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", "")}
+        result = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True)
+        if verbose:
+            sys.stdout.write(result.stdout)
+            sys.stderr.write(result.stderr)
+        lines = [line for line in result.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+        if not lines:
+            error = (result.stderr.strip().splitlines() or ["no result"])[-1]
+            return {"scenario": scenario, "ok": False, "error": error}
+        return summarize(json.loads(lines[-1][len(RESULT_MARKER):]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def regressions(report: Dict, previous: Optional[Dict], fail_over: float) -> List[str]:
+    """Fields that got worse than the baseline by more than fail_over percent."""
+    if not report.get("ok") or not previous or not previous.get("ok"):
+        return []
+    worse = []
+    for field, bad in REGRESSION_FIELDS.items():
+        before, after = previous.get(field), report.get(field)
+        if not before:
+            continue
+        if after is None:
+            worse.append(f"{field} {before} → N/A (no successful runs)")
+            continue
+        change = (after - before) / before * 100
+        if (bad == "higher" and change > fail_over) or (bad == "lower" and -change > fail_over):
+            worse.append(f"{field} {before} → {after} ({change:+.0f}%)")
+    return worse
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None, top: int = 5):
+    scenario = report["scenario"]
+    print(f"\n🏁 {scenario}")
+    if not report["ok"]:
+        icon = "⏭️" if report["error"].startswith("skipped") else "❌"
+        print(f"   {icon} {report['error']}")
+        return
+
+    previous = (baseline or {}).get(scenario, {})
+
+    def delta(field: str) -> str:
+        if not previous.get("ok") or not previous.get(field) or report[field] is None:
+            return ""
+        change = (report[field] - previous[field]) / previous[field] * 100
+        return f"  ({change:+.0f}% vs {previous[field]})"
+
+    print(f"   runs:        {report['runs'] - report['failed']}/{report['runs']} ok in {report['wall_seconds']:.1f}s")
+    print(f"   throughput:  {report['runs_per_minute']:.2f} runs/min, {report['slides_per_minute']:.1f} slides/min{delta('runs_per_minute')}")
+    def seconds(field: str) -> str:
+        return "N/A" if report[field] is None else f"{report[field]:.2f}s"
+
+    print(f"   latency:     p50 {seconds('p50_seconds')}{delta('p50_seconds')}, p95 {seconds('p95_seconds')}{delta('p95_seconds')}")
+    print(f"   peak RSS:    {report['peak_rss_mb']:.0f} MB{delta('peak_rss_mb')}")
+    if report["stages"]:
+        listed = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in list(report["stages"].items())[:top])
+        print(f"   stages:      {listed}")
+    for error in report["errors"]:
+        print(f"   ⚠️ {error}")
+
+
+def _parse_latencies(values: List[str]) -> Dict[str, float]:
+    import benchmark_providers
+    latencies = {}
+    for value in values:
+        name, _, seconds = value.partition("=")
+        if name not in benchmark_providers.DEFAULT_LATENCIES:
+            raise SystemExit(f"Unknown provider latency '{name}' (one of {', '.join(benchmark_providers.DEFAULT_LATENCIES)})")
+        latencies[name] = float(seconds)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark with local provider stand-ins")
+    parser.add_argument("scenarios", nargs="*", default=DEFAULT_SCENARIOS, help=f"Scenarios ({', '.join(SCENARIOS)})")
+    parser.add_argument("--runs", type=int, default=3, help="Measured runs per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs first (imports, font and asset caches)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs in flight at once")
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=SECONDS",
+                        help="Stand-in latency, e.g. fal_image=0.5 (repeatable)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency jitter")
+    parser.add_argument("--model", default="gpt15", help="Image model for slideshow, video and API runs")
+    parser.add_argument("--theme", default="golden_dust", help="Theme for themed and API runs")
+    parser.add_argument("--save", metavar="FILE", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Show deltas against a saved JSON run")
+    parser.add_argument("--fail-over", type=float, metavar="PCT", help="With --compare: exit 1 if a scenario regresses by more than PCT%%")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--child-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child_main(args.child, Path(args.workdir), json.loads(args.child_config))
+        return
+
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    import benchmark_providers
+    config = {
+        "runs": args.runs,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "latencies": {**benchmark_providers.DEFAULT_LATENCIES, **_parse_latencies(args.latency)},
+        "options": {"topic": benchmark_providers.CANNED_TOPIC, "model": args.model, "theme": args.theme},
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["scenarios"]
+
+    print(f"🧪 Offline benchmark: {args.runs} runs (+{args.warmup} warmup), concurrency {args.concurrency}, seed {args.seed}")
+    print("   latencies: " + ", ".join(f"{name} {seconds}s" for name, seconds in config["latencies"].items()))
+
+    reports = {}
+    failed = []
+    for scenario in args.scenarios:
+        reports[scenario] = run_scenario(scenario, config, verbose=args.verbose)
+        print_report(reports[scenario], baseline)
+        worse = regressions(reports[scenario], (baseline or {}).get(scenario), args.fail_over) if args.fail_over is not None else []
+        for line in worse:
+            print(f"   📉 {line}")
+        if worse:
+            failed.append(scenario)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "config": {k: v for k, v in config.items() if k != "options"},
+                "scenarios": reports,
+            }, f, indent=2)
+        print(f"\n💾 Saved to {args.save}")
+
+    if failed:
+        print(f"\n❌ Regressions over {args.fail_over:.0f}% in: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+Benchmark Providers - deterministic local stand-ins for every paid service.
+
+benchmark.py installs these before importing any pipeline code, so a benchmark
+run exercises the real generators, text rendering, encoding, TaskGraph lanes
+and API handlers without spending money:
+
+- fal_client            subscribe() sleeps, then points at a canned 1024x1536 PNG
+                        (or a short MP4 for video models); upload_file() too
+- google.genai          Client().models.generate_content() returns canned script
+                        JSON (or a PNG part for image models)
+- elevenlabs            ElevenLabs().text_to_speech.convert() yields a silent MP3
+- google.cloud.storage  blobs are copied into the run's served directory
+
+Everything the code fetches over HTTP (fal.media downloads, ElevenLabs
+with-timestamps, TikTok, our upload-media endpoint, Post Bridge, GCS) is sent
+to a local server instead. Any other external host raises ConnectionError, so
+a stand-in that is missing can't fall through to a live API.
+
+Latencies are per provider and jittered from a seeded RNG, so two runs with the
+same seed sleep for the same amounts:
+
+    import benchmark_providers as providers
+
+    providers.install(workdir, latencies={"fal_image": 2.0, "gemini": 1.0}, seed=7)
+    ...
+    providers.request_counts()   # {"fal.subscribe": 6, "gemini.generate_content": 1, ...}
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import types
+import random
+import itertools
+import struct
+import base64
+import threading
+import importlib.machinery
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+# Seconds each stand-in sleeps before answering (before jitter)
+DEFAULT_LATENCIES = {
+    "fal_image": 1.5,
+    "fal_video": 4.0,
+    "gemini": 1.0,
+    "gemini_image": 2.0,
+    "elevenlabs": 1.5,
+    "upload": 0.2,
+    "publish": 0.3,
+}
+
+# Each sleep is latency * (1 ± JITTER)
+JITTER = 0.2
+
+IMAGE_SIZE = (1024, 1536)
+
+# Hosts served by the local server; requests to them are rewritten
+STUB_HOSTS = {
+    "fal.media",
+    "v3.fal.media",
+    "storage.googleapis.com",
+    "api.elevenlabs.io",
+    "open.tiktokapis.com",
+    "api.cofndrly.com",
+    "api.post-bridge.com",
+}
+
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "testserver"}
+
+CANNED_TOPIC = "Five stoic rules for hard days"
+
+
+# =============================================================================
+# SHARED STATE
+# =============================================================================
+
+class _State:
+    def __init__(self):
+        self.latencies = dict(DEFAULT_LATENCIES)
+        self.rng = random.Random(0)
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.workdir: Optional[Path] = None
+        self.served_dir: Optional[Path] = None
+        self.base_url = ""
+        self.server: Optional[ThreadingHTTPServer] = None
+
+
+_state = _State()
+_ids = itertools.count(1)
+
+
+def _wait(provider: str):
+    """Sleep for the provider's latency with seeded jitter."""
+    with _state.lock:
+        factor = 1 + JITTER * (2 * _state.rng.random() - 1)
+    time.sleep(max(0.0, _state.latencies.get(provider, 0.0) * factor))
+
+
+def _count(name: str):
+    with _state.lock:
+        _state.counts[name] = _state.counts.get(name, 0) + 1
+
+
+def request_counts() -> Dict[str, int]:
+    """Calls each stand-in has answered since install()."""
+    with _state.lock:
+        return dict(sorted(_state.counts.items()))
+
+
+# =============================================================================
+# CANNED ASSETS
+# =============================================================================
+
+_assets: Dict[str, Optional[bytes]] = {}
+_assets_lock = threading.Lock()
+
+
+def canned_png() -> bytes:
+    """A deterministic 1024x1536 PNG with gradients and grain, so encoders do real work."""
+    with _assets_lock:
+        if "png" not in _assets:
+            from PIL import Image
+
+            width, height = IMAGE_SIZE
+            column = Image.linear_gradient("L").resize((1, height))
+            r = column.resize((width, height))
+            g = column.transpose(Image.FLIP_TOP_BOTTOM).resize((width, height))
+            b = Image.frombytes("L", (width, height), random.Random(0).randbytes(width * height))
+            buffer = io.BytesIO()
+            Image.merge("RGB", (r, g, b)).save(buffer, format="PNG")
+            _assets["png"] = buffer.getvalue()
+        return _assets["png"]
+
+
+def silent_mp3(seconds: float) -> bytes:
+    """Silent MPEG-1 Layer III at 128 kbps / 44.1 kHz (417-byte frames, 1152 samples each)."""
+    frames = max(1, int(seconds * 44100 / 1152))
+    frame = b"\xff\xfb\x90\x64" + b"\x00" * 413
+    return frame * frames
+
+
+def canned_mp4() -> Optional[bytes]:
+    """A 5s 720x1280 clip, rendered once with moviepy; None if moviepy is missing."""
+    with _assets_lock:
+        if "mp4" not in _assets:
+            _assets["mp4"] = None
+            try:
+                from moviepy.editor import ColorClip
+            except ImportError:
+                return None
+            path = _state.workdir / "canned_clip.mp4"
+            clip = ColorClip(size=(720, 1280), color=(40, 30, 20), duration=5)
+            clip.write_videofile(str(path), fps=24, codec="libx264", audio=False, logger=None)
+            clip.close()
+            _assets["mp4"] = path.read_bytes()
+        return _assets["mp4"]
+
+
+def _alignment(text: str, chars_per_second: float = 15.0) -> Dict:
+    starts = [round(i / chars_per_second, 3) for i in range(len(text))]
+    return {
+        "characters": list(text),
+        "character_start_times_seconds": starts,
+        "character_end_times_seconds": [round(s + 1 / chars_per_second, 3) for s in starts],
+    }
+
+
+def _speech_seconds(text: str) -> float:
+    return max(1.0, len(text) / 15.0)
+
+
+def canned_script(topic: str) -> Dict:
+    """Superset of the shapes GeminiHandler asks for (slides, scenes, list items)."""
+    words = "stillness teaches what noise never could so sit with the question until it answers".split()
+    scenes = []
+    for i in range(10):
+        text = " ".join(words[(i + j) % len(words)] for j in range(15))
+        scenes.append({
+            "scene_number": i + 1,
+            "text": text,
+            "narration": text,
+            "visual_description": f"Lone figure in a candlelit library, scene {i + 1}, dramatic chiaroscuro",
+            "key_concept": words[i % len(words)],
+            "duration": 6,
+        })
+    slides = [{
+        "slide_number": 0,
+        "slide_type": "hook",
+        "display_text": topic.upper()[:60],
+        "title": topic[:60],
+        "subtitle": "",
+        "visual_description": "Silhouette on a cliff at dusk, golden light rays, epic mood",
+    }]
+    for i in range(1, 6):
+        slides.append({
+            "slide_number": i,
+            "slide_type": "content",
+            "display_text": f"LESSON #{i}",
+            "title": f"Lesson {i}",
+            "subtitle": "Control what you can. Ignore what you can't.",
+            "visual_description": f"Marble statue in soft window light, detail {i}, minimalist",
+        })
+    slides.append({
+        "slide_number": 6,
+        "slide_type": "outro",
+        "display_text": "WHAT'S YOUR RULE?",
+        "title": "What's your rule?",
+        "subtitle": "Follow for more.",
+        "visual_description": "Person at sunrise on a mountaintop, hopeful",
+    })
+    return {
+        "title": f"Benchmark: {topic}"[:80],
+        "topic": topic,
+        "hook": topic,
+        "script": " ".join(scene["text"] for scene in scenes),
+        "total_slides": len(slides),
+        "slides": slides,
+        "scenes": scenes,
+        "list_items": [slide["display_text"] for slide in slides[1:-1]],
+        "caption": f"{topic} #philosophy #wisdom",
+        "hashtags": ["philosophy", "wisdom", "stoicism"],
+    }
+
+
+# =============================================================================
+# SDK STAND-INS
+# =============================================================================
+
+def _fake_module(name: str) -> types.ModuleType:
+    module = types.ModuleType(name)
+    # find_spec() (lazy_imports.is_available) reads __spec__ from sys.modules
+    module.__spec__ = importlib.machinery.ModuleSpec(name, None)
+    module.__benchmark_stub__ = True
+    sys.modules[name] = module
+    return module
+
+
+def _make_fal_client() -> types.ModuleType:
+    fal = _fake_module("fal_client")
+
+    class InProgress:
+        logs = []
+
+    def subscribe(model_id, arguments=None, with_logs=False, on_queue_update=None, **kwargs):
+        is_video = "video" in model_id or "kling" in model_id
+        _count("fal.subscribe")
+        _wait("fal_video" if is_video else "fal_image")
+        token = next(_ids)
+        if is_video:
+            return {"video": {"url": f"https://fal.media/video/{token}.mp4"}}
+        count = int((arguments or {}).get("num_images", 1) or 1)
+        return {"images": [
+            {"url": f"https://fal.media/image/{token}_{i}.png", "width": IMAGE_SIZE[0], "height": IMAGE_SIZE[1]}
+            for i in range(count)
+        ]}
+
+    def upload_file(path):
+        _count("fal.upload_file")
+        _wait("upload")
+        return f"https://fal.media/files/{Path(path).name}"
+
+    fal.InProgress = InProgress
+    fal.subscribe = subscribe
+    fal.upload_file = upload_file
+    return fal
+
+
+class _Record:
+    """Accepts any constructor kwargs as attributes (GenerateContentConfig etc.)."""
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.__dict__.update(kwargs)
+
+
+def _make_genai() -> types.ModuleType:
+    google = sys.modules.get("google") or _fake_module("google")
+    if not hasattr(google, "__path__"):
+        google.__path__ = []
+    genai = _fake_module("google.genai")
+    genai_types = _fake_module("google.genai.types")
+    genai_types.__getattr__ = lambda name: type(name, (_Record,), {})
+
+    class Response:
+        def __init__(self, text: Optional[str] = None, image: Optional[bytes] = None):
+            self.text = text
+            part = _Record(text=text, inline_data=_Record(data=image, mime_type="image/png") if image else None)
+            self.candidates = [_Record(content=_Record(parts=[part]))]
+            self.parts = [part]
+
+    class Models:
+        def generate_content(self, model="", contents="", config=None, **kwargs):
+            prompt = contents if isinstance(contents, str) else json.dumps(contents, default=str)
+            if "image" in model:
+                _count("gemini.generate_image")
+                _wait("gemini_image")
+                return Response(image=canned_png())
+            _count("gemini.generate_content")
+            _wait("gemini")
+            wants_json = getattr(config, "response_mime_type", "") == "application/json" or "json" in prompt.lower()
+            if not wants_json:
+                return Response(text="Why the quietest philosophers changed the loudest empires")
+            return Response(text=json.dumps(canned_script(CANNED_TOPIC)))
+
+    class Client:
+        def __init__(self, api_key=None, **kwargs):
+            self.models = Models()
+
+    genai.Client = Client
+    genai.types = genai_types
+    google.genai = genai
+    return genai
+
+
+def _make_elevenlabs() -> types.ModuleType:
+    elevenlabs = _fake_module("elevenlabs")
+
+    class TextToSpeech:
+        def convert(self, text="", voice_id=None, model_id=None, **kwargs):
+            _count("elevenlabs.convert")
+            _wait("elevenlabs")
+            audio = silent_mp3(_speech_seconds(text))
+            for i in range(0, len(audio), 4096):
+                yield audio[i:i + 4096]
+
+    class ElevenLabs:
+        def __init__(self, api_key=None, **kwargs):
+            self.text_to_speech = TextToSpeech()
+
+    elevenlabs.ElevenLabs = ElevenLabs
+    return elevenlabs
+
+
+def _make_storage() -> types.ModuleType:
+    google = sys.modules.get("google") or _fake_module("google")
+    if not hasattr(google, "__path__"):
+        google.__path__ = []
+    cloud = sys.modules.get("google.cloud") or _fake_module("google.cloud")
+    if not hasattr(cloud, "__path__"):
+        cloud.__path__ = []
+    storage = _fake_module("google.cloud.storage")
+
+    class Blob:
+        def __init__(self, bucket: str, name: str):
+            self.name = name
+            self.content_type = None
+            self._path = _state.served_dir / "storage.googleapis.com" / bucket / name
+
+        @property
+        def size(self) -> int:
+            return self._path.stat().st_size if self._path.exists() else 0
+
+        def _store(self, data: bytes):
+            _count("gcs.upload")
+            _wait("upload")
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._path.write_bytes(data)
+
+        def upload_from_filename(self, filename, **kwargs):
+            self._store(Path(filename).read_bytes())
+
+        def upload_from_string(self, data, content_type=None, **kwargs):
+            self.content_type = content_type or self.content_type
+            self._store(data.encode() if isinstance(data, str) else data)
+
+        def delete(self):
+            self._path.unlink(missing_ok=True)
+
+    class Bucket:
+        def __init__(self, name: str):
+            self.name = name
+
+        def blob(self, name: str) -> Blob:
+            return Blob(self.name, name)
+
+        def list_blobs(self, prefix: str = "", **kwargs):
+            root = _state.served_dir / "storage.googleapis.com" / self.name
+            for path in sorted(root.rglob("*")) if root.exists() else []:
+                name = path.relative_to(root).as_posix()
+                if path.is_file() and name.startswith(prefix):
+                    yield Blob(self.name, name)
+
+    class Client:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def bucket(self, name: str) -> Bucket:
+            return Bucket(name)
+
+    storage.Client = Client
+    storage.Bucket = Bucket
+    storage.Blob = Blob
+    cloud.storage = storage
+    google.cloud = cloud
+    return storage
+
+
+# =============================================================================
+# LOCAL HTTP SERVER
+# =============================================================================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, payload: Dict, status: int = 200):
+        self._send(status, json.dumps(payload).encode())
+
+    def _split(self):
+        # /<original host>/<original path>
+        _, host, *rest = self.path.split("?")[0].split("/")
+        return host, "/" + "/".join(rest)
+
+    def do_GET(self):
+        host, path = self._split()
+        if host in ("fal.media", "v3.fal.media"):
+            _count("fal.download")
+            if path.endswith(".mp4"):
+                video = canned_mp4()
+                return self._send(200, video, "video/mp4") if video else self._send(404, b"")
+            return self._send(200, canned_png(), "image/png")
+        if host == "storage.googleapis.com":
+            _count("gcs.download")
+            stored = _state.served_dir / host / path.lstrip("/")
+            if stored.is_file():
+                return self._send(200, stored.read_bytes(), "application/octet-stream")
+            return self._send(200, canned_png(), "image/png")
+        if host == "api.cofndrly.com" and path.startswith("/static/"):
+            return self._send(200, canned_png(), "image/png")
+        if host == "api.post-bridge.com" and path.startswith("/v1/social-accounts"):
+            _count("postbridge.accounts")
+            return self._json({"data": [{"id": 1, "username": "benchmark", "platform": "instagram"}], "meta": {"total": 1}})
+        self._send(404, b"{}")
+
+    def do_POST(self):
+        host, path = self._split()
+        body = self._body()
+        if host == "api.elevenlabs.io" and path.endswith("/with-timestamps"):
+            _count("elevenlabs.with_timestamps")
+            _wait("elevenlabs")
+            text = json.loads(body or b"{}").get("text", "")
+            audio = silent_mp3(_speech_seconds(text))
+            return self._json({"audio_base64": base64.b64encode(audio).decode(), "alignment": _alignment(text)})
+        if host == "api.cofndrly.com" and path.startswith("/api/tiktok/upload-media"):
+            _count("tiktok.upload_media")
+            _wait("upload")
+            name = f"bench_{struct.unpack('>I', os.urandom(4))[0]:08x}.jpg"
+            return self._json({"success": True, "full_url": f"https://api.cofndrly.com/static/benchmark/{name}"})
+        if host == "open.tiktokapis.com":
+            if path.startswith("/v2/post/publish/status"):
+                _count("tiktok.status")
+                return self._json({"data": {"status": "PUBLISH_COMPLETE"}, "error": {"code": "ok"}})
+            if path.startswith("/v2/post/publish"):
+                _count("tiktok.publish")
+                _wait("publish")
+                return self._json({"data": {"publish_id": f"v_pub_bench_{int(time.time() * 1000)}"}, "error": {"code": "ok"}})
+            if path.startswith("/v2/oauth/token"):
+                return self._json({"access_token": "bench", "refresh_token": "bench", "expires_in": 86400})
+        if host == "api.post-bridge.com":
+            if path.startswith("/v1/media/create-upload-url"):
+                _count("postbridge.upload_url")
+                media_id = f"media_{int(time.time() * 1e6)}"
+                return self._json({"media_id": media_id, "upload_url": f"https://api.post-bridge.com/upload/{media_id}"})
+            if path.startswith("/v1/posts"):
+                _count("postbridge.post")
+                _wait("publish")
+                return self._json({"id": f"post_{int(time.time() * 1000)}", "status": "processing"}, status=201)
+        self._send(404, b"{}")
+
+    def do_PUT(self):
+        host, path = self._split()
+        self._body()
+        _count(f"{host}.put")
+        _wait("upload")
+        self._send(200, b"")
+
+
+def _patch_requests():
+    """Send stubbed hosts to the local server; refuse every other external host."""
+    try:
+        import requests
+    except ImportError:
+        return
+
+    original = requests.sessions.Session.request
+    if getattr(original, "__benchmark_stub__", False):
+        return
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlsplit(url).hostname or ""
+        if host in STUB_HOSTS:
+            parts = urlsplit(url)
+            url = f"{_state.base_url}/{host}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        elif host not in LOCAL_HOSTS:
+            raise requests.exceptions.ConnectionError(f"benchmark: no stand-in for {host}, refusing live call")
+        return original(self, method, url, *args, **kwargs)
+
+    request.__benchmark_stub__ = True
+    requests.sessions.Session.request = request
+
+
+# =============================================================================
+# INSTALL
+# =============================================================================
+
+def install(workdir: str, latencies: Optional[Dict[str, float]] = None, seed: int = 0) -> str:
+    """
+    Install every stand-in and start the local server. Call before importing
+    pipeline modules (they bind their SDKs at import time).
+
+    Returns:
+        Base URL of the local server
+    """
+    _state.workdir = Path(workdir)
+    _state.served_dir = _state.workdir / "served"
+    _state.served_dir.mkdir(parents=True, exist_ok=True)
+    _state.latencies.update(latencies or {})
+    _state.rng = random.Random(seed)
+    _state.counts.clear()
+
+    _make_fal_client()
+    _make_genai()
+    _make_elevenlabs()
+    _make_storage()
+
+    if _state.server is None:
+        _state.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        _state.server.daemon_threads = True
+        threading.Thread(target=_state.server.serve_forever, name="benchmark-providers", daemon=True).start()
+        _state.base_url = f"http://127.0.0.1:{_state.server.server_address[1]}"
+    _patch_requests()
+
+    # Every client checks for a key before it calls its SDK
+    for key in ("FAL_KEY", "GOOGLE_API_KEY", "ELEVENLABS_API_KEY", "POST_BRIDGE_API_KEY", "OPENAI_API_KEY"):
+        os.environ[key] = "benchmark"
+
+    # Keep canned output out of the repo's caches and indexes: every run
+    # generates its script (repeatable timings), and the reference library
+    # and frame hashes live in the scratch directory (the background index
+    # follows Settings.base_dir, which the API scenario points there too)
+    os.environ["SCRIPT_CACHE"] = "off"
+    import reference_scraper
+    reference_scraper._store = reference_scraper.ReferenceStore(_state.workdir / "references.db")
+    reference_scraper.FRAME_HASHES_DB = _state.workdir / "frame_hashes.db"
+    return _state.base_url
+
+
+def shutdown():
+    if _state.server is not None:
+        _state.server.shutdown()
+        _state.server = None
@@ -28,6 +28,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 from dotenv import load_dotenv
 load_dotenv()
 
+from task_graph import TaskGraph
+
 
 # =============================================================================
 # AUTOMATION 1: MACHIAVELLI NARRATIVE VIDEOS
@@ -603,9 +605,11 @@ class ContentAutomationRunner:
         """
         Generate a narrative video with:
         1. AI-generated images for each slide
-        2. ElevenLabs narration
+        2. ElevenLabs narration (generated alongside the images)
         3. MoviePy transitions (crossfade)
         4. Final assembled video
+        
+        result['trace'] has per-stage timings (see task_graph.py).
         """
         from backend.app.services.gpt_image_generator import GPTImageGenerator
         from backend.app.services.text_overlay import TextOverlay
@@ -625,25 +629,27 @@ class ContentAutomationRunner:
         print(f"   📁 Output: {project_dir}")
         print(f"   🎴 Slides: {len(slides)}")
         
-        # Step 1: Generate background images
-        print("\n1️⃣  Generating background images...")
+        # Slides and narration only depend on the script, so they run as
+        # parallel tasks; assembly waits for all of them.
+        print("\n1️⃣  Generating background images + voice narration...")
         image_gen = GPTImageGenerator(quality="low")
         text_overlay = TextOverlay(fonts_dir="fonts", default_style="modern")
+        voice_gen = VoiceGenerator()
         
-        background_paths = []
-        final_image_paths = []
-        
-        for i, slide in enumerate(slides):
-            print(f"   🖼️  Slide {i+1}/{len(slides)}: Generating background...")
-            
-            bg_path = image_gen.generate_background(
-                visual_description=slide['visual_description'],
-                scene_number=i + 1,
-                story_title=safe_title
-            )
-            
-            if bg_path:
-                background_paths.append(bg_path)
+        def make_slide_task(i: int, slide: Dict):
+            def render_slide():
+                print(f"   🖼️  Slide {i+1}/{len(slides)}: Generating background...")
+                
+                bg_path = image_gen.generate_background(
+                    visual_description=slide['visual_description'],
+                    scene_number=i + 1,
+                    story_title=safe_title,
+                    return_image=True  # overlay reads the decoded image
+                )
+                
+                if not bg_path:
+                    print(f"   ❌ Slide {i+1} failed")
+                    return None
                 
                 # Apply text overlay
                 output_path = str(project_dir / f"slide_{i}.png")
@@ -667,14 +673,9 @@ class ContentAutomationRunner:
                         style="modern"
                     )
                 
-                final_image_paths.append(output_path)
                 print(f"   ✅ Slide {i+1} complete")
-            else:
-                print(f"   ❌ Slide {i+1} failed")
-        
-        # Step 2: Generate narration
-        print("\n2️⃣  Generating voice narration...")
-        voice_gen = VoiceGenerator()
+                return output_path
+            return render_slide
         
         # Build full narration text
         narration_text = ""
@@ -688,34 +689,51 @@ class ContentAutomationRunner:
                 "text": clean_text
             })
         
-        audio_result = voice_gen.generate_voiceover_with_timestamps(
-            script=narration_text.strip(),
-            scenes=scenes_for_timing,
-            filename=f"{safe_title}_narration.mp3"
-        )
-        
-        if not audio_result:
-            print("   ❌ Narration failed, trying simple generation...")
-            audio_path = voice_gen.generate_voiceover(
-                narration_text.strip(),
+        def generate_narration():
+            audio_result = voice_gen.generate_voiceover_with_timestamps(
+                script=narration_text.strip(),
+                scenes=scenes_for_timing,
                 filename=f"{safe_title}_narration.mp3"
             )
-        else:
-            audio_path = audio_result['audio_path']
+            
+            if not audio_result:
+                print("   ❌ Narration failed, trying simple generation...")
+                return voice_gen.generate_voiceover(
+                    narration_text.strip(),
+                    filename=f"{safe_title}_narration.mp3"
+                )
             print(f"   ✅ Narration: {audio_result.get('total_duration', 0):.1f}s")
+            return audio_result['audio_path']
         
-        # Step 3: Assemble video with transitions
-        print("\n3️⃣  Assembling video with crossfade transitions...")
-        assembler = VideoAssembler()
+        def assemble(audio_path, *slide_paths):
+            print("\n2️⃣  Assembling video with crossfade transitions...")
+            assembler = VideoAssembler()
+            
+            return assembler.create_philosophy_video(
+                scenes=scenes_for_timing,
+                audio_path=audio_path,
+                image_paths=[p for p in slide_paths if p],
+                story_title=safe_title,
+                transition="crossfade",
+                transition_duration=0.3
+            )
         
-        video_path = assembler.create_philosophy_video(
-            scenes=scenes_for_timing,
-            audio_path=audio_path,
-            image_paths=final_image_paths,
-            story_title=safe_title,
-            transition="crossfade",
-            transition_duration=0.3
-        )
+        graph = TaskGraph(f"narrative:{safe_title}", pools={"images": 4, "audio": 1})
+        slide_nodes = [
+            graph.add(f"slide_{i}", make_slide_task(i, slide), pool="images")
+            for i, slide in enumerate(slides)
+        ]
+        graph.add("narration", generate_narration, pool="audio")
+        graph.add("assembly", assemble, deps=["narration"] + slide_nodes)
+        
+        try:
+            results = graph.run()
+        finally:
+            graph.print_trace()
+        
+        audio_path = results["narration"]
+        final_image_paths = [results[node] for node in slide_nodes if results[node]]
+        video_path = results["assembly"]
         
         if video_path:
             print(f"\n✅ VIDEO COMPLETE: {video_path}")
@@ -731,7 +749,8 @@ class ContentAutomationRunner:
             "image_paths": final_image_paths,
             "slide_count": len(slides),
             "project_dir": str(project_dir),
-            "timestamp": timestamp
+            "timestamp": timestamp,
+            "trace": graph.trace
         }
         
         with open(project_dir / "metadata.json", "w") as f:
@@ -777,7 +796,8 @@ class ContentAutomationRunner:
             bg_path = image_gen.generate_background(
                 visual_description=slide['visual_description'],
                 scene_number=i + 1,
-                story_title=safe_title
+                story_title=safe_title,
+                return_image=True  # overlay reads the decoded image
             )
             
             if bg_path:
@@ -27,6 +27,8 @@ import sys
 import json
 import time
 import argparse
+import threading
+from contextlib import nullcontext
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
@@ -37,6 +39,7 @@ load_dotenv()
 
 # Import production history for tracking
 from production_history import log_production, get_production_history
+from task_graph import TaskGraph, TaskGraphError
 
 # =============================================================================
 # CONFIGURATION
@@ -50,6 +53,17 @@ DAILY_VIDEO_TRANSITIONS = 1   # Image-to-video with AI transitions
 # Image model to use
 IMAGE_MODEL = "gpt15"  # GPT Image 1.5
 
+# Slide images generated at the same time for one narration video
+NARRATION_IMAGE_WORKERS = 4
+
+# Content types run as concurrent lanes; this is how many items each lane
+# works on at once. Total provider load is capped by provider_limits.
+LANE_WORKERS = {
+    "slideshow": 2,
+    "narration": 1,
+    "video_transitions": 1,
+}
+
 # Topic files
 SLIDESHOW_TOPICS_FILE = "topics_list.txt"
 NARRATION_TOPICS_FILE = "topics_narration.txt"
@@ -91,14 +105,19 @@ COST_ESTIMATES = {
 # LOGGING & COST TRACKING
 # =============================================================================
 
+# Lanes log from several threads; keep lines whole
+_log_lock = threading.Lock()
+
+
 def log(message: str, level: str = "INFO"):
     """Log a message with timestamp."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_line = f"[{timestamp}] [{level}] {message}"
-    print(log_line)
     
-    with open(DAILY_LOG_FILE, 'a') as f:
-        f.write(log_line + "\n")
+    with _log_lock:
+        print(log_line)
+        with open(DAILY_LOG_FILE, 'a') as f:
+            f.write(log_line + "\n")
 
 
 @dataclass
@@ -113,10 +132,11 @@ class CostEntry:
 
 
 class CostTracker:
-    """Track API costs for all operations."""
+    """Track API costs for all operations. Safe to share between lane threads."""
     
     def __init__(self):
         self.entries: List[CostEntry] = []
+        self._lock = threading.RLock()
         self._load()
     
     def _load(self):
@@ -130,14 +150,17 @@ class CostTracker:
                 log(f"Could not load cost log: {e}", "WARN")
     
     def _save(self):
-        """Save cost data to file."""
+        """Save cost data to file (caller holds the lock)."""
         try:
             data = {
                 'entries': [asdict(e) for e in self.entries],
                 'last_updated': datetime.now().isoformat()
             }
-            with open(COST_LOG_FILE, 'w') as f:
+            # Write-then-rename so a crash mid-write can't truncate the log
+            tmp_path = f"{COST_LOG_FILE}.tmp"
+            with open(tmp_path, 'w') as f:
                 json.dump(data, f, indent=2)
+            os.replace(tmp_path, COST_LOG_FILE)
         except Exception as e:
             log(f"Could not save cost log: {e}", "WARN")
     
@@ -153,14 +176,16 @@ class CostTracker:
             total_cost=count * unit_cost,
             details=details
         )
-        self.entries.append(entry)
-        self._save()
+        with self._lock:
+            self.entries.append(entry)
+            self._save()
         log(f"💰 Cost: ${entry.total_cost:.4f} ({count}x {operation})")
     
     def get_today_costs(self) -> Tuple[float, Dict[str, float]]:
         """Get today's total and breakdown."""
         today = datetime.now().strftime("%Y-%m-%d")
-        today_entries = [e for e in self.entries if e.timestamp.startswith(today)]
+        with self._lock:
+            today_entries = [e for e in self.entries if e.timestamp.startswith(today)]
         
         total = sum(e.total_cost for e in today_entries)
         
@@ -175,7 +200,8 @@ class CostTracker:
     def get_month_costs(self) -> Tuple[float, Dict[str, float]]:
         """Get this month's total and breakdown."""
         month = datetime.now().strftime("%Y-%m")
-        month_entries = [e for e in self.entries if e.timestamp.startswith(month)]
+        with self._lock:
+            month_entries = [e for e in self.entries if e.timestamp.startswith(month)]
         
         total = sum(e.total_cost for e in month_entries)
         
@@ -217,8 +243,17 @@ cost_tracker = CostTracker()
 # TOPIC MANAGEMENT
 # =============================================================================
 
+# Narration and transitions lanes dequeue from the same file concurrently
+_topic_lock = threading.Lock()
+
+
 def get_next_topic(topics_file: str) -> Optional[str]:
     """Get the next topic from a file and remove it from the queue."""
+    with _topic_lock:
+        return _pop_topic(topics_file)
+
+
+def _pop_topic(topics_file: str) -> Optional[str]:
     if not os.path.exists(topics_file):
         return None
     
@@ -241,8 +276,10 @@ def get_next_topic(topics_file: str) -> Optional[str]:
     
     # Remove topic from file
     remaining = lines[:topic_index] + lines[topic_index + 1:]
-    with open(topics_file, 'w') as f:
+    tmp_path = f"{topics_file}.tmp"
+    with open(tmp_path, 'w') as f:
         f.writelines(remaining)
+    os.replace(tmp_path, topics_file)
     
     return topic
 
@@ -333,7 +370,7 @@ def generate_narration_video(topic: str) -> Optional[Dict]:
         cost_tracker.log_cost("narration", "gemini_script", 1,
                                COST_ESTIMATES["gemini_script"], topic)
         
-        # Step 2: Generate images using TikTokSlideshow pipeline
+        # Slides are rendered one per task with the TikTokSlideshow pipeline
         slideshow = TikTokSlideshow(
             output_dir=f"{NARRATION_OUTPUT_DIR}/slides",
             image_generator="fal",
@@ -356,17 +393,10 @@ def generate_narration_video(topic: str) -> Optional[Dict]:
             ]
         }
         
-        slide_result = slideshow.create_from_script(script, skip_image_generation=False)
-        
-        if not slide_result.get('image_paths'):
-            log(f"❌ Image generation failed for: {topic}", "ERROR")
-            return None
-        
-        num_images = len(slide_result['image_paths'])
-        cost_tracker.log_cost("narration", "fal_gpt15", num_images,
-                               COST_ESTIMATES["fal_gpt15"], topic)
-        
-        # Step 3: Generate voiceover
+        # Steps 2-4 as a task graph: the voiceover only needs the script, so
+        # it runs alongside the slide images instead of after the last one.
+        #   slide_0 .. slide_n -\
+        #   voiceover ----------+-> assembly
         voice_gen = VoiceGenerator()
         script_text = story_data.get('script', '')
         
@@ -377,32 +407,66 @@ def generate_narration_video(topic: str) -> Optional[Dict]:
         safe_title = "".join(c for c in story_data.get('title', topic) 
                              if c.isalnum() or c in (' ', '-', '_')).replace(' ', '_')[:50]
         
-        audio_path = voice_gen.generate_voiceover(
-            script_text,
-            filename=f"{safe_title}_narration.mp3"
-        )
-        
-        if not audio_path or not os.path.exists(audio_path):
-            log(f"❌ Voice generation failed for: {topic}", "ERROR")
-            return None
-        
-        cost_tracker.log_cost("narration", "elevenlabs_voice", 1,
-                               COST_ESTIMATES["elevenlabs_voice"], topic)
+        def generate_voiceover():
+            audio_path = voice_gen.generate_voiceover(
+                script_text,
+                filename=f"{safe_title}_narration.mp3"
+            )
+            if not audio_path or not os.path.exists(audio_path):
+                raise Exception("Voice generation failed")
+            cost_tracker.log_cost("narration", "elevenlabs_voice", 1,
+                                   COST_ESTIMATES["elevenlabs_voice"], topic)
+            return audio_path
+        
+        def render_slide(index):
+            # Log each image as it is paid for, so a failed voiceover or
+            # assembly still records the images already generated
+            outputs = slideshow.render_slide(script, index)
+            cost_tracker.log_cost("narration", "fal_gpt15", 1,
+                                   COST_ESTIMATES["fal_gpt15"], topic)
+            return outputs
         
-        # Step 4: Assemble video
-        assembler = VideoAssembler()
-        video_path = assembler.create_philosophy_video(
-            scenes=slides,
-            audio_path=audio_path,
-            image_paths=slide_result['image_paths'],
-            story_title=story_data.get('title', topic),
-            transition="crossfade",
-            transition_duration=0.3
-        )
+        def assemble(audio_path, *slide_outputs):
+            image_paths = [final_path for _, final_path in slide_outputs]
+            if not image_paths:
+                raise Exception("Image generation failed")
+            
+            assembler = VideoAssembler()
+            video_path = assembler.create_philosophy_video(
+                scenes=slides,
+                audio_path=audio_path,
+                image_paths=image_paths,
+                story_title=story_data.get('title', topic),
+                transition="crossfade",
+                transition_duration=0.3
+            )
+            if not video_path:
+                raise Exception("Video assembly failed")
+            return video_path
+        
+        graph = TaskGraph(f"narration:{safe_title}", pools={
+            "images": NARRATION_IMAGE_WORKERS,
+            "audio": 1,
+        })
+        slide_nodes = [
+            graph.add(f"slide_{i}", (lambda i=i: render_slide(i)), pool="images")
+            for i in range(len(script['slides']))
+        ]
+        graph.add("voiceover", generate_voiceover, pool="audio")
+        graph.add("assembly", assemble, deps=["voiceover"] + slide_nodes)
         
-        if not video_path:
-            log(f"❌ Video assembly failed for: {topic}", "ERROR")
+        try:
+            results = graph.run()
+        except TaskGraphError as e:
+            log(f"❌ {e.error} for: {topic}", "ERROR")
             return None
+        finally:
+            graph.print_trace()
+        
+        audio_path = results["voiceover"]
+        video_path = results["assembly"]
+        slide_result = {'image_paths': [results[node][1] for node in slide_nodes]}
+        log(f"⏱️ Narration stages finished in {graph.wall_time():.1f}s")
 
         # Calculate total cost
         num_images = len(slide_result['image_paths'])
@@ -438,7 +502,8 @@ def generate_narration_video(topic: str) -> Optional[Dict]:
             'audio_path': audio_path,
             'image_paths': slide_result['image_paths'],
             'title': story_data.get('title', topic),
-            'script': story_data
+            'script': story_data,
+            'trace': graph.trace
         }
 
     except Exception as e:
@@ -573,14 +638,15 @@ def generate_video_with_transitions(topic: str) -> Optional[Dict]:
 # EMAIL DELIVERY
 # =============================================================================
 
-def send_slideshow_email(result: Dict, topic: str) -> bool:
+def send_slideshow_email(result: Dict, topic: str, sender=None) -> bool:
     """Email slideshow images as attachments with caption."""
     try:
         from email_sender import EmailSender
         from caption_generator import CaptionGenerator
         import zipfile
 
-        sender = EmailSender()
+        # Callers sending several emails pass one sender to share its SMTP session
+        sender = sender or EmailSender()
         caption_gen = CaptionGenerator()
 
         # Create a zip of all slides
@@ -628,13 +694,14 @@ Generated by Philosophy Bot 🤖
         return False
 
 
-def send_narration_email(result: Dict, topic: str) -> bool:
+def send_narration_email(result: Dict, topic: str, sender=None) -> bool:
     """Email narration video with caption."""
     try:
         from email_sender import EmailSender
         from caption_generator import CaptionGenerator
 
-        sender = EmailSender()
+        # Callers sending several emails pass one sender to share its SMTP session
+        sender = sender or EmailSender()
         caption_gen = CaptionGenerator()
 
         title = result.get('title', topic)
@@ -675,13 +742,14 @@ Generated by Philosophy Bot 🤖
         return False
 
 
-def send_video_transitions_email(result: Dict, topic: str) -> bool:
+def send_video_transitions_email(result: Dict, topic: str, sender=None) -> bool:
     """Email video with transitions and caption."""
     try:
         from email_sender import EmailSender
         from caption_generator import CaptionGenerator
 
-        sender = EmailSender()
+        # Callers sending several emails pass one sender to share its SMTP session
+        sender = sender or EmailSender()
         caption_gen = CaptionGenerator()
 
         title = result.get('title', topic)
@@ -723,6 +791,96 @@ Generated by Philosophy Bot 🤖
         return False
 
 
+# =============================================================================
+# PRODUCTION LANES
+# =============================================================================
+
+# lane -> (topic file, generator, email sender, label)
+LANES = {
+    "slideshow": (SLIDESHOW_TOPICS_FILE, generate_slideshow, send_slideshow_email, "🎴 Slideshow"),
+    "narration": (NARRATION_TOPICS_FILE, generate_narration_video, send_narration_email, "🎙️ Narration"),
+    # Story-style topics work better for transitions too
+    "video_transitions": (NARRATION_TOPICS_FILE, generate_video_with_transitions,
+                          send_video_transitions_email, "🎬 Transitions"),
+}
+
+
+def run_lanes(
+    counts: Dict[str, int],
+    send_emails: bool = True,
+    sender=None,
+    lane_workers: Optional[Dict[str, int]] = None
+) -> Dict[str, List[Tuple[str, Dict]]]:
+    """
+    Produce every lane's items concurrently.
+
+    Each lane is a TaskGraph pool sized by LANE_WORKERS, so a slow lane never
+    holds up the others and the whole set takes about as long as the slowest
+    lane. Provider calls inside the lanes share provider_limits slots.
+
+    Args:
+        counts: {lane: number of items}
+        send_emails: Email each item as soon as it is finished
+        sender: Shared EmailSender (e.g. inside its session()); one is
+            created if emails are on and none is given
+        lane_workers: Override LANE_WORKERS
+
+    Returns:
+        {lane: [(topic, result), ...]} for the items that succeeded
+    """
+    from provider_limits import get_provider_limiter
+
+    workers = {**LANE_WORKERS, **(lane_workers or {})}
+    counts = {lane: count for lane, count in counts.items() if count > 0}
+    if send_emails and sender is None:
+        from email_sender import EmailSender
+        sender = EmailSender()
+
+    graph = TaskGraph("production", pools={lane: workers[lane] for lane in counts})
+
+    def make_item(lane: str, index: int):
+        topics_file, generate, send_email, label = LANES[lane]
+
+        def run_item():
+            topic = get_next_topic(topics_file)
+            if not topic:
+                log(f"⚠️ No more topics for the {lane} lane", "WARN")
+                return None
+            log(f"{label} [{index + 1}/{counts[lane]}] {topic}")
+            result = generate(topic)
+            if not result:
+                return None
+            if send_emails:
+                send_email(result, topic, sender=sender)
+            return (topic, result)
+
+        return run_item
+
+    for lane, count in counts.items():
+        for i in range(count):
+            graph.add(f"{lane}_{i + 1}", make_item(lane, i), pool=lane)
+
+    # One SMTP login for all lanes (EmailSender serialises sends on it)
+    with (sender.session() if sender else nullcontext()):
+        graph.run(raise_on_error=False)
+    for node, error in graph.errors.items():
+        log(f"❌ {node} crashed: {error}", "ERROR")
+
+    results = {lane: [] for lane in LANES}
+    for node, item in graph.results.items():
+        if item:
+            results[node.rsplit("_", 1)[0]].append(item)
+
+    # Per-lane timing - the set should land in about the slowest lane's time
+    log("\n⏱️ Lane wall times:")
+    for lane, seconds in sorted(graph.pool_wall_times().items(), key=lambda kv: -kv[1]):
+        log(f"   {LANES[lane][3]:<16} {seconds:8.1f}s ({len(results[lane])}/{counts[lane]} ok)")
+    log(f"   {'Whole set':<16} {graph.wall_time():8.1f}s")
+    get_provider_limiter().print_stats()
+
+    return results
+
+
 # =============================================================================
 # MAIN PRODUCTION LOOP
 # =============================================================================
@@ -743,70 +901,20 @@ def run_daily_production(
     log(f"   Email Delivery: {'ON' if send_emails else 'OFF'}")
     log("=" * 60)
     
+    lane_results = run_lanes(
+        {
+            "slideshow": num_slideshows,
+            "narration": num_narration,
+            "video_transitions": num_video_transitions,
+        },
+        send_emails=send_emails
+    )
     results = {
-        'slideshows': [],
-        'narration': [],
-        'video_transitions': []
+        'slideshows': lane_results['slideshow'],
+        'narration': lane_results['narration'],
+        'video_transitions': lane_results['video_transitions']
     }
     
-    # Generate slideshows
-    log("\n" + "=" * 40)
-    log("🎴 GENERATING SLIDESHOWS")
-    log("=" * 40)
-    
-    for i in range(num_slideshows):
-        topic = get_next_topic(SLIDESHOW_TOPICS_FILE)
-        if not topic:
-            log(f"⚠️ No more slideshow topics available")
-            break
-        
-        log(f"\n[{i+1}/{num_slideshows}] {topic}")
-        result = generate_slideshow(topic)
-        
-        if result:
-            results['slideshows'].append((topic, result))
-            if send_emails:
-                send_slideshow_email(result, topic)
-    
-    # Generate narration videos
-    log("\n" + "=" * 40)
-    log("🎙️ GENERATING NARRATION VIDEOS")
-    log("=" * 40)
-    
-    for i in range(num_narration):
-        topic = get_next_topic(NARRATION_TOPICS_FILE)
-        if not topic:
-            log(f"⚠️ No more narration topics available")
-            break
-        
-        log(f"\n[{i+1}/{num_narration}] {topic}")
-        result = generate_narration_video(topic)
-        
-        if result:
-            results['narration'].append((topic, result))
-            if send_emails:
-                send_narration_email(result, topic)
-    
-    # Generate video with transitions
-    log("\n" + "=" * 40)
-    log("🎬 GENERATING VIDEOS WITH TRANSITIONS")
-    log("=" * 40)
-    
-    for i in range(num_video_transitions):
-        # Use narration topics for video transitions (story-style works better)
-        topic = get_next_topic(NARRATION_TOPICS_FILE)
-        if not topic:
-            log(f"⚠️ No more topics for video transitions")
-            break
-        
-        log(f"\n[{i+1}/{num_video_transitions}] {topic}")
-        result = generate_video_with_transitions(topic)
-        
-        if result:
-            results['video_transitions'].append((topic, result))
-            if send_emails:
-                send_video_transitions_email(result, topic)
-    
     # Summary
     log("\n" + "=" * 60)
     log("📊 DAILY PRODUCTION SUMMARY")
@@ -1,23 +1,241 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
+"""
+Email delivery for finished videos and slideshows.
+
+Attachments are never loaded whole: StreamingMessage writes the MIME tree
+lazily and base64-encodes each file from disk in small chunks straight into
+the SMTP DATA command. A 50 MB video costs a few hundred KB of memory.
+
+Several emails can share one authenticated connection:
+
+    sender = EmailSender()
+    with sender.session():
+        sender.send_video(...)
+        sender.send_slideshow(...)
+
+Files bigger than EMAIL_LINK_THRESHOLD_MB are uploaded to GCS (when the
+backend storage service is configured) and linked in the body instead of
+attached.
+"""
+
 import os
+import re
 import ssl
+import base64
+import smtplib
+import mimetypes
+import threading
+from contextlib import contextmanager
+from email.header import Header
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+from email.policy import SMTP as SMTP_POLICY
+from email.utils import formatdate, make_msgid
+from typing import Iterator, List, Optional, Tuple, Union
+
+from image_writer import encode_file
+
+# Raw bytes read per step; a multiple of 57 so every base64 line is a full 76 chars
+ATTACHMENT_CHUNK_BYTES = 57 * 1024
+
+# Files above this size are sent as a GCS link when possible (Gmail rejects > 25 MB)
+EMAIL_LINK_THRESHOLD_MB = float(os.getenv("EMAIL_LINK_THRESHOLD_MB", "20"))
+
+
+class StreamingMessage:
+    """multipart/mixed message whose attachments are read from disk while sending."""
+
+    def __init__(self, sender: str, recipient: str, subject: str):
+        self.sender = sender
+        self.recipient = recipient
+        self.subject = subject
+        self.body_text = ""
+        self.boundary = f"=============={make_msgid()[1:-1].replace('@', '.')}=="
+        # (path-or-bytes, filename, mime type)
+        self.attachments: List[Tuple[Union[str, bytes], str, str]] = []
+
+    def attach_file(self, path: str, filename: Optional[str] = None, mime: Optional[str] = None):
+        """Attach a file by path - it is only read while the message is sent."""
+        filename = filename or os.path.basename(path)
+        mime = mime or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self.attachments.append((path, filename, mime))
+
+    def attach_bytes(self, data: bytes, filename: str, mime: str = "application/octet-stream"):
+        """Attach an in-memory payload (small encodes such as slide JPEGs)."""
+        self.attachments.append((data, filename, mime))
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """The message as CRLF-terminated byte chunks, ready for SMTP DATA."""
+        headers = [
+            f"From: {self.sender}",
+            f"To: {self.recipient}",
+            f"Subject: {Header(self.subject, 'utf-8').encode()}",
+            f"Date: {formatdate(localtime=True)}",
+            f"Message-ID: {make_msgid()}",
+            "MIME-Version: 1.0",
+            f'Content-Type: multipart/mixed; boundary="{self.boundary}"',
+        ]
+        yield ("\r\n".join(headers) + "\r\n\r\n").encode()
+
+        # The text part is small - let the stdlib encode it
+        text_part = MIMEText(self.body_text, "plain", "utf-8")
+        yield f"--{self.boundary}\r\n".encode() + text_part.as_bytes(policy=SMTP_POLICY) + b"\r\n"
+
+        for source, filename, mime in self.attachments:
+            yield f"--{self.boundary}\r\n".encode() + _attachment_headers(filename, mime)
+            yield from _base64_lines(source)
+
+        yield f"--{self.boundary}--\r\n".encode()
+
+
+def _attachment_headers(filename: str, mime: str) -> bytes:
+    """
+    Headers of one attachment part, ending with the blank line.
+
+    Built with the email package so names are quoted and non-ASCII ones
+    RFC 2231 encoded (filename*=utf-8''...), as MIMEApplication would.
+    """
+    part = MIMEBase(*mime.split("/", 1), name=filename)
+    del part["MIME-Version"]
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", "attachment", filename=filename)
+    return part.as_bytes(policy=SMTP_POLICY)
+
+
+def _base64_lines(source: Union[str, bytes]) -> Iterator[bytes]:
+    """Base64 body in 76-char CRLF lines, reading files ATTACHMENT_CHUNK_BYTES at a time."""
+    if isinstance(source, bytes):
+        for start in range(0, len(source), ATTACHMENT_CHUNK_BYTES):
+            yield _encode_chunk(source[start:start + ATTACHMENT_CHUNK_BYTES])
+        return
+    with open(source, "rb") as f:
+        while True:
+            chunk = f.read(ATTACHMENT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield _encode_chunk(chunk)
+
+
+def _encode_chunk(chunk: bytes) -> bytes:
+    encoded = base64.b64encode(chunk)
+    return b"".join(encoded[i:i + 76] + b"\r\n" for i in range(0, len(encoded), 76))
+
+
+def _dot_stuff(chunk: bytes) -> bytes:
+    """SMTP transparency: double a leading '.' on every line (RFC 5321 4.5.2)."""
+    return re.sub(rb"(?m)^\.", b"..", chunk)
+
 
 class EmailSender:
-    def __init__(self):
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 465
+    def __init__(
+        self,
+        smtp_server: str = "smtp.gmail.com",
+        smtp_port: int = 465,
+        use_ssl: bool = True,
+        link_threshold_mb: float = EMAIL_LINK_THRESHOLD_MB
+    ):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.use_ssl = use_ssl
+        self.link_threshold_mb = link_threshold_mb
         self.sender_email = os.getenv("EMAIL_USER")
         self.password = os.getenv("EMAIL_PASSWORD")
-        
+
         # Default recipient to sender if not specified
         self.default_recipient = os.getenv("RECIPIENT_EMAIL") or self.sender_email
 
+        # Connection shared by sends inside session(), opened on first use
+        self._server: Optional[smtplib.SMTP] = None
+        self._session_depth = 0
+        # Production lanes send from several threads; SMTP is one conversation at a time
+        self._send_lock = threading.RLock()
+
+    # =========================================================================
+    # CONNECTION
+    # =========================================================================
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context)
+        else:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        server.login(self.sender_email, self.password)
+        return server
+
+    @property
+    def _in_session(self) -> bool:
+        return self._session_depth > 0
+
+    @contextmanager
+    def session(self):
+        """Reuse one authenticated SMTP connection for every send inside the block."""
+        with self._send_lock:
+            self._session_depth += 1
+        try:
+            yield self
+        finally:
+            with self._send_lock:
+                self._session_depth -= 1
+                if self._session_depth == 0 and self._server is not None:
+                    try:
+                        self._server.quit()
+                    except (smtplib.SMTPException, OSError):
+                        pass
+                    self._server = None
+
+    def _deliver(self, recipient: str, message: StreamingMessage):
+        """Stream a message over the session connection (or a one-off one)."""
+        if not self._in_session:
+            server = self._connect()
+            try:
+                _send_streaming(server, self.sender_email, recipient, message)
+            finally:
+                try:
+                    server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+            return
+
+        # Session connections can idle out between content pieces - reconnect once
+        with self._send_lock:
+            for attempt in range(2):
+                if self._server is None:
+                    self._server = self._connect()
+                try:
+                    _send_streaming(self._server, self.sender_email, recipient, message)
+                    return
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    self._server = None
+                    if attempt == 1:
+                        raise
+
+    # =========================================================================
+    # LARGE FILES
+    # =========================================================================
+
+    def _link_for_large_file(self, path: str) -> Optional[str]:
+        """Upload a file over the threshold to GCS and return its public URL."""
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        if size_mb <= self.link_threshold_mb:
+            return None
+        try:
+            from backend.app.services.cloud_storage import get_storage_service
+            storage = get_storage_service()
+            if not storage.is_available:
+                print(f"⚠️ {os.path.basename(path)} is {size_mb:.1f} MB but GCS isn't available - attaching anyway")
+                return None
+            return storage.upload_file(path, "email")
+        except Exception as e:
+            print(f"⚠️ Could not upload {os.path.basename(path)} for a download link: {e}")
+            return None
+
+    # =========================================================================
+    # SENDING
+    # =========================================================================
+
     def send_video(self, video_path: str, recipient: str = None, subject: str = None, body: str = None, caption: str = None):
         """Send an email with the generated video attachment and optional TikTok caption"""
-        
+
         if not self.sender_email or not self.password:
             print("❌ Error: EMAIL_USER or EMAIL_PASSWORD not set in .env")
             return False
@@ -25,13 +243,14 @@ class EmailSender:
         if not recipient:
             recipient = self.default_recipient
 
-        msg = MIMEMultipart()
-        msg['From'] = self.sender_email
-        msg['To'] = recipient
-        msg['Subject'] = subject or "Your Generated Philosophy Video is Ready 🎥"
+        msg = StreamingMessage(
+            self.sender_email,
+            recipient,
+            subject or "Your Generated Philosophy Video is Ready 🎥"
+        )
 
         body_text = body or "Here is your fresh philosophy video! Enjoy.\n\nAutomated by your Agent."
-        
+
         # Add TikTok caption section if provided
         if caption:
             body_text += "\n\n" + "=" * 50
@@ -39,38 +258,29 @@ class EmailSender:
             body_text += "=" * 50
             body_text += f"\n\n{caption}\n"
             body_text += "\n" + "=" * 50
-        
-        msg.attach(MIMEText(body_text, 'plain'))
 
-        # Attach Video
+        # Attach Video (streamed from disk when sending)
         if video_path and os.path.exists(video_path):
-            try:
-                with open(video_path, "rb") as f:
-                    # Read the file
-                    video_data = f.read()
-                    name = os.path.basename(video_path)
-                    
-                    # Create attachment
-                    part = MIMEApplication(video_data, Name=name)
-                    part['Content-Disposition'] = f'attachment; filename="{name}"'
-                    msg.attach(part)
-                    print(f"📎 Attached video: {name} ({len(video_data)/1024/1024:.1f} MB)")
-            except Exception as e:
-                print(f"❌ Error attaching video: {e}")
-                return False
+            name = os.path.basename(video_path)
+            size_mb = os.path.getsize(video_path) / 1024 / 1024
+            link = self._link_for_large_file(video_path)
+            if link:
+                body_text += f"\n\n⬇️ DOWNLOAD ({size_mb:.1f} MB):\n{link}\n"
+                print(f"🔗 Linked video: {name} ({size_mb:.1f} MB)")
+            else:
+                msg.attach_file(video_path, name)
+                print(f"📎 Attached video: {name} ({size_mb:.1f} MB)")
         else:
             print(f"⚠️ Video path not found: {video_path}")
-            # Send anyway? Maybe just to notify failure? 
+            # Send anyway? Maybe just to notify failure?
             # For now, let's fail if we can't attach the video as that's the whole point.
             return False
 
+        msg.body_text = body_text
+
         # Send Email
         try:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context) as server:
-                server.login(self.sender_email, self.password)
-                server.sendmail(self.sender_email, recipient, msg.as_string())
-            
+            self._deliver(recipient, msg)
             print(f"✅ Email sent successfully to {recipient}!")
             return True
         except Exception as e:
@@ -78,16 +288,16 @@ class EmailSender:
             return False
 
     def send_slideshow(
-        self, 
-        image_paths: list, 
-        recipient: str = None, 
-        subject: str = None, 
-        body: str = None, 
+        self,
+        image_paths: list,
+        recipient: str = None,
+        subject: str = None,
+        body: str = None,
         caption: str = None,
         hashtags: list = None
     ):
         """Send an email with slideshow images as attachments for manual Instagram posting.
-        
+
         Args:
             image_paths: List of image file paths to attach
             recipient: Email recipient (defaults to RECIPIENT_EMAIL or sender)
@@ -96,7 +306,7 @@ class EmailSender:
             caption: Suggested Instagram caption
             hashtags: List of hashtags to include
         """
-        
+
         if not self.sender_email or not self.password:
             print("❌ Error: EMAIL_USER or EMAIL_PASSWORD not set in .env")
             return False
@@ -108,22 +318,23 @@ class EmailSender:
             print("❌ Error: No images provided")
             return False
 
-        msg = MIMEMultipart()
-        msg['From'] = self.sender_email
-        msg['To'] = recipient
-        msg['Subject'] = subject or f"📸 Instagram Slideshow Ready ({len(image_paths)} slides)"
+        msg = StreamingMessage(
+            self.sender_email,
+            recipient,
+            subject or f"📸 Instagram Slideshow Ready ({len(image_paths)} slides)"
+        )
 
         # Build the email body
         body_text = body or "Your Instagram slideshow is ready! Find the images attached below.\n\n"
         body_text += f"📊 Total slides: {len(image_paths)}\n"
-        
+
         # Add suggested caption
         if caption:
             body_text += "\n" + "=" * 50
             body_text += "\n📝 SUGGESTED CAPTION (Copy & Paste):\n"
             body_text += "=" * 50
             body_text += f"\n\n{caption}\n"
-        
+
         # Add hashtags
         if hashtags:
             hashtag_str = " ".join(f"#{tag}" for tag in hashtags)
@@ -131,7 +342,7 @@ class EmailSender:
             body_text += "\n🏷️ HASHTAGS:\n"
             body_text += "=" * 50
             body_text += f"\n\n{hashtag_str}\n"
-        
+
         body_text += "\n" + "=" * 50
         body_text += "\n\n📱 HOW TO POST:\n"
         body_text += "1. Save all attached images to your phone\n"
@@ -140,24 +351,19 @@ class EmailSender:
         body_text += "4. Add music, filters, and edit caption as desired\n"
         body_text += "5. Post when ready!\n"
         body_text += "\n" + "=" * 50
-        
-        msg.attach(MIMEText(body_text, 'plain'))
+
+        msg.body_text = body_text
 
         # Attach all images
         attached_count = 0
         for i, image_path in enumerate(image_paths, 1):
             if image_path and os.path.exists(image_path):
                 try:
-                    with open(image_path, "rb") as f:
-                        image_data = f.read()
-                        name = os.path.basename(image_path)
-                        
-                        # Create attachment
-                        part = MIMEApplication(image_data, Name=name)
-                        part['Content-Disposition'] = f'attachment; filename="slide_{i:02d}_{name}"'
-                        msg.attach(part)
-                        attached_count += 1
-                        print(f"📎 Attached slide {i}: {name} ({len(image_data)/1024:.1f} KB)")
+                    # Attach the instagram_jpeg encode, not the multi-MB PNG
+                    image_data, name, mime = encode_file(image_path, "instagram_jpeg")
+                    msg.attach_bytes(image_data, f"slide_{i:02d}_{name}", mime)
+                    attached_count += 1
+                    print(f"📎 Attached slide {i}: {name} ({len(image_data)/1024:.1f} KB)")
                 except Exception as e:
                     print(f"⚠️ Error attaching {image_path}: {e}")
             else:
@@ -169,22 +375,49 @@ class EmailSender:
 
         # Send Email
         try:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context) as server:
-                server.login(self.sender_email, self.password)
-                server.sendmail(self.sender_email, recipient, msg.as_string())
-            
+            self._deliver(recipient, msg)
             print(f"✅ Slideshow email sent to {recipient} with {attached_count} images!")
             return True
         except Exception as e:
             print(f"❌ Failed to send email: {e}")
             return False
 
+
+def _send_streaming(server: smtplib.SMTP, sender: str, recipient: str, message: StreamingMessage):
+    """
+    MAIL/RCPT/DATA by hand so the body can be written chunk by chunk.
+
+    smtplib.sendmail() needs the whole message as one string; this writes
+    each chunk to the socket as it is produced.
+    """
+    server.ehlo_or_helo_if_needed()
+    code, resp = server.mail(sender)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, resp, sender)
+    code, resp = server.rcpt(recipient)
+    if code not in (250, 251):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused({recipient: (code, resp)})
+    code, resp = server.docmd("DATA")
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, resp)
+
+    for chunk in message.iter_chunks():
+        server.send(_dot_stuff(chunk))
+    server.send(b".\r\n")
+
+    code, resp = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, resp)
+
+
 if __name__ == "__main__":
     # Test the sender
     from dotenv import load_dotenv
     load_dotenv()
-    
+
     sender = EmailSender()
     if sender.sender_email:
         print(f"Testing email creds for: {sender.sender_email}")
@@ -192,9 +425,9 @@ if __name__ == "__main__":
         dummy_path = "test_video.txt"
         with open(dummy_path, "w") as f:
             f.write("This is a dummy video file.")
-            
+
         sender.send_video(dummy_path, subject="Test Email from Agent", body="If you see this, the email automation is working!")
-        
+
         # cleanup
         if os.path.exists(dummy_path):
             os.remove(dummy_path)
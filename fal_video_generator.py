@@ -6,18 +6,24 @@ between consecutive scene images for documentary-style content.
 """
 
 import os
-import fal_client
 import requests
 from typing import List, Optional, Callable
 from pathlib import Path
-from moviepy.editor import VideoFileClip, AudioFileClip, concatenate_videoclips, CompositeVideoClip
 from dotenv import load_dotenv
 
+from lazy_imports import lazy_module
+from provider_limits import provider_slot
+from tracing import span, traced
+
 # Fix for Pillow 10+ compatibility
 import PIL.Image
 if not hasattr(PIL.Image, 'ANTIALIAS'):
     PIL.Image.ANTIALIAS = PIL.Image.Resampling.LANCZOS
 
+# Heavy SDKs, imported on first use
+fal_client = lazy_module("fal_client")
+mpy = lazy_module("moviepy.editor")
+
 load_dotenv()
 
 
@@ -58,6 +64,7 @@ deliberate and precise visual effects only."""
         # Model endpoint - MiniMax Hailuo-02 standard (supports start + end image)
         self.model_id = "fal-ai/minimax/hailuo-02/standard/image-to-video"
     
+    @traced("upload", provider="fal")
     def upload_image(self, local_path: str) -> str:
         """
         Upload a local image to fal.ai storage.
@@ -127,12 +134,13 @@ deliberate and precise visual effects only."""
                     for log in update.logs:
                         print(f"   [fal] {log.get('message', log)}")
             
-            result = fal_client.subscribe(
-                self.model_id,
-                arguments=arguments,
-                with_logs=True,
-                on_queue_update=on_queue_update,
-            )
+            with provider_slot("fal", model=self.model_id):
+                result = fal_client.subscribe(
+                    self.model_id,
+                    arguments=arguments,
+                    with_logs=True,
+                    on_queue_update=on_queue_update,
+                )
             
             # Get video URL from result
             video_url = result.get('video', {}).get('url')
@@ -299,7 +307,7 @@ deliberate and precise visual effects only."""
             clips = []
             for path in video_paths:
                 if os.path.exists(path):
-                    clip = VideoFileClip(path)
+                    clip = mpy.VideoFileClip(path)
                     clips.append(clip)
                 else:
                     print(f"Warning: Video not found: {path}")
@@ -326,23 +334,24 @@ deliberate and precise visual effects only."""
                 
                 # Calculate final size from first clip
                 size = (clips[0].w, clips[0].h)
-                final_video = CompositeVideoClip(processed_clips, size=size)
+                final_video = mpy.CompositeVideoClip(processed_clips, size=size)
             else:
-                final_video = concatenate_videoclips(clips, method="compose")
+                final_video = mpy.concatenate_videoclips(clips, method="compose")
             
             # Output path
             safe_title = "".join(c for c in story_title if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
             output_path = os.path.join(self.output_dir, f"{safe_title}_transitions.mp4")
             
             # Write video
-            final_video.write_videofile(
-                output_path,
-                fps=30,
-                codec='libx264',
-                audio_codec='aac',
-                preset='medium',
-                ffmpeg_params=['-crf', '23']
-            )
+            with span("encode", format="mp4"):
+                final_video.write_videofile(
+                    output_path,
+                    fps=30,
+                    codec='libx264',
+                    audio_codec='aac',
+                    preset='medium',
+                    ffmpeg_params=['-crf', '23']
+                )
             
             # Cleanup
             for clip in clips:
@@ -389,8 +398,8 @@ deliberate and precise visual effects only."""
                 return None
             
             # Load video and audio
-            video = VideoFileClip(concatenated_path)
-            audio = AudioFileClip(audio_path)
+            video = mpy.VideoFileClip(concatenated_path)
+            audio = mpy.AudioFileClip(audio_path)
             
             video_duration = video.duration
             audio_duration = audio.duration
@@ -439,14 +448,15 @@ deliberate and precise visual effects only."""
             output_path = os.path.join(self.output_dir, f"{safe_title}_final_with_audio.mp4")
             
             # Write final video
-            final.write_videofile(
-                output_path,
-                fps=30,
-                codec='libx264',
-                audio_codec='aac',
-                preset='medium',
-                ffmpeg_params=['-crf', '23']
-            )
+            with span("encode", format="mp4"):
+                final.write_videofile(
+                    output_path,
+                    fps=30,
+                    codec='libx264',
+                    audio_codec='aac',
+                    preset='medium',
+                    ffmpeg_params=['-crf', '23']
+                )
             
             # Cleanup
             video.close()
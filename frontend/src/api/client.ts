@@ -498,7 +498,7 @@ export interface AutomationRun {
   script_path: string | null;
   tiktok_posted: boolean;
   tiktok_publish_id: string | null;
-  tiktok_post_status: 'pending' | 'processing' | 'success' | 'failed' | null;
+  tiktok_post_status: 'pending' | 'processing' | 'success' | 'failed' | 'deferred' | null;
   tiktok_error: string | null;
   instagram_posted: boolean;
   instagram_post_id: string | null;
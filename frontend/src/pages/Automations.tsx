@@ -1470,6 +1470,10 @@ function RunsHistoryModal({ automation, onClose }: RunsHistoryModalProps) {
     if (run.tiktok_post_status === 'pending' || run.tiktok_post_status === 'processing') {
       return { label: 'Processing', color: '#f59e0b', bg: 'rgba(245, 158, 11, 0.15)' };
     }
+    // Held back until TikTok drafts clear; tiktok_error carries the reason
+    if (run.tiktok_post_status === 'deferred') {
+      return { label: 'Deferred', color: '#60a5fa', bg: 'rgba(96, 165, 250, 0.15)' };
+    }
     if (run.tiktok_post_status === 'failed' || run.tiktok_error) {
       return { label: 'Failed', color: '#ef4444', bg: 'rgba(239, 68, 68, 0.15)' };
     }
@@ -1497,10 +1501,12 @@ function RunsHistoryModal({ automation, onClose }: RunsHistoryModalProps) {
 
   const canRetry = (run: AutomationRun) => {
     // Can retry if completed/posted but TikTok failed or wasn't attempted
+    // (deferred runs are posted by the publish watcher once there is room)
     return (
       (run.status === 'completed' || run.status === 'posted') &&
       run.image_paths &&
       run.image_paths.length >= 2 &&
+      run.tiktok_post_status !== 'deferred' &&
       (run.tiktok_post_status === 'failed' || !run.tiktok_posted)
     );
   };
@@ -1852,19 +1858,19 @@ function RunsHistoryModal({ automation, onClose }: RunsHistoryModalProps) {
                     )}
                   </AnimatePresence>
 
-                  {/* Error message */}
+                  {/* Error message (or why a deferred post is waiting) */}
                   {run.tiktok_error && !messageForRun && (
                     <div style={{
                       marginTop: '12px',
                       padding: '8px 12px',
-                      background: 'rgba(239, 68, 68, 0.1)',
+                      background: run.tiktok_post_status === 'deferred' ? 'rgba(96, 165, 250, 0.1)' : 'rgba(239, 68, 68, 0.1)',
                       borderRadius: '6px',
                       display: 'flex',
                       alignItems: 'center',
                       gap: '8px',
                     }}>
                       <AlertIcon />
-                      <span style={{ fontSize: '12px', color: '#f87171' }}>
+                      <span style={{ fontSize: '12px', color: run.tiktok_post_status === 'deferred' ? '#93c5fd' : '#f87171' }}>
                         {run.tiktok_error}
                       </span>
                     </div>
@@ -1,13 +1,56 @@
-from google import genai
-from google.genai import types
+from lazy_imports import lazy_module
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from provider_limits import provider_slot
+from script_cache import ScriptCache, script_cache_key
+from tracing import in_context, traced
 import os
 import re
 
+genai = lazy_module("google.genai")  # imported on first use
+types = lazy_module("google.genai.types")
+
 load_dotenv()
 
+_json_decoder = json.JSONDecoder()
+
+
+def extract_json(text: str, expect: Optional[type] = dict):
+    """
+    The first complete JSON object (or array, with expect=list) in a model response.
+
+    Tries each '{' (or '[') in turn and lets the json decoder parse from there,
+    so markdown fences, prose before or after the JSON and trailing commentary
+    are skipped without any regex clean-up. expect=None accepts either.
+
+    Raises:
+        ValueError: the text holds no complete JSON value of that kind
+    """
+    if not text:
+        raise ValueError("Empty response from model")
+    openers = {dict: "{", list: "[", None: "{["}[expect]
+    try:
+        value = json.loads(text)
+        if expect is None or isinstance(value, expect):
+            return value
+    except ValueError:
+        pass
+    index = 0
+    while True:
+        starts = [i for i in (text.find(opener, index) for opener in openers) if i != -1]
+        if not starts:
+            kind = {dict: "object", list: "array", None: "value"}[expect]
+            raise ValueError(f"No complete JSON {kind} in model response")
+        start = min(starts)
+        try:
+            value, _ = _json_decoder.raw_decode(text, start)
+            return value
+        except ValueError:
+            index = start + 1
+
+
 class GeminiHandler:
     def __init__(self):
         api_key = os.getenv('GOOGLE_API_KEY')
@@ -20,16 +63,21 @@ class GeminiHandler:
         # Actually, let's stick to what was there: 'gemini-3-pro-preview'
         self.text_model_name = 'gemini-3-pro-preview'
         self.image_model_name = 'gemini-3-pro-image-preview'
+        # Generated scripts by model, prompt, topic and slide count (see script_cache)
+        self.script_cache = ScriptCache()
     
-    def _clean_json_text(self, text: str) -> str:
-        """Clean markdown formatting from JSON string"""
-        if not text:
-            return ""
-        # Remove markdown code blocks
-        text = re.sub(r'```json\s*', '', text)
-        text = re.sub(r'```\s*$', '', text)
-        text = text.strip()
-        return text
+    def _generate_content(self, **kwargs):
+        """models.generate_content, holding a shared Gemini slot (see provider_limits)"""
+        with provider_slot("gemini", model=kwargs.get("model", "")):
+            return self.client.models.generate_content(**kwargs)
+    
+    def _cached_script(self, prompt: str, topic: str, slides: int, refresh: bool = False):
+        """(cache key, cached script or None) for a script request; refresh skips the read."""
+        key = script_cache_key(self.text_model_name, prompt, topic, slides)
+        script = None if refresh else self.script_cache.get(key)
+        if script is not None:
+            print(f"♻️  Using cached script for '{topic}'")
+        return key, script
 
     def _detect_content_type(self, topic: str) -> str:
         """
@@ -69,7 +117,8 @@ class GeminiHandler:
         
         return 'story'
 
-    def _generate_list_content(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15) -> Dict:
+    def _generate_list_content(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15,
+                               refresh: bool = False) -> Dict:
         """Generate list-style slideshow content (e.g., '5 philosophers with great quotes')
         
         Args:
@@ -165,8 +214,12 @@ class GeminiHandler:
         Remember: You're not reading Wikipedia. You're making someone stop scrolling because they NEED to hear what comes next.
         """
         
+        cache_key, cached = self._cached_script(prompt, topic, num_scenes, refresh)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -178,9 +231,9 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            story_data = json.loads(cleaned_text)
+            story_data = extract_json(response.text)
             story_data['content_type'] = 'list'
+            self.script_cache.put(cache_key, story_data, topic=topic, model=self.text_model_name, slides=num_scenes)
             return story_data
         except Exception as e:
             print(f"Error generating list content: {e}")
@@ -188,12 +241,13 @@ class GeminiHandler:
                 print("Model not found, trying gemini-2.0-flash-exp...")
                 try:
                     self.text_model_name = 'gemini-2.0-flash-exp'
-                    return self._generate_list_content(topic)
+                    return self._generate_list_content(topic, refresh=refresh)
                 except:
                     pass
             return None
 
-    def generate_philosophy_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15) -> Dict:
+    def generate_philosophy_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15,
+                                  refresh: bool = False) -> Dict:
         """Generate an engaging philosophy script optimized for TikTok.
         
         Automatically detects if the topic is:
@@ -206,6 +260,7 @@ class GeminiHandler:
             topic: The content topic
             num_scenes: Target number of scenes (default 10, produces ~60s video)
             words_per_scene: Target words per scene (default 15, ~6s of speech each)
+            refresh: Generate a new script even if one is cached (the new one replaces it)
         """
         # Detect content type and route to appropriate generator
         content_type = self._detect_content_type(topic)
@@ -213,11 +268,50 @@ class GeminiHandler:
         print(f"Generating {num_scenes} scenes × {words_per_scene} words = ~{num_scenes * 6}s video")
         
         if content_type == 'list':
-            return self._generate_list_content(topic, num_scenes, words_per_scene)
+            return self._generate_list_content(topic, num_scenes, words_per_scene, refresh)
         
         # Default: narrative story
-        return self._generate_narrative_story(topic, num_scenes, words_per_scene)
+        return self._generate_narrative_story(topic, num_scenes, words_per_scene, refresh)
     
+    def generate_scripts_batch(
+        self,
+        topics: List[str],
+        num_scenes: int = 10,
+        words_per_scene: int = 15,
+        max_concurrency: int = 3
+    ) -> Dict[str, Optional[Dict]]:
+        """Generate scripts for many topics concurrently (see generate_philosophy_story).
+        
+        At most max_concurrency requests run at once (each still takes a shared
+        Gemini slot), a repeated topic is generated once, and cached scripts
+        are returned without calling the model.
+        
+        Returns:
+            {topic: script or None on failure}, in the order of topics
+        """
+        return self._run_batch(
+            topics, lambda topic: self.generate_philosophy_story(topic, num_scenes, words_per_scene), max_concurrency
+        )
+
+    def _run_batch(self, topics: List[str], generate, max_concurrency: int) -> Dict[str, Optional[Dict]]:
+        unique = list(dict.fromkeys(topics))
+        if not unique:
+            return {}
+
+        def run(topic: str) -> Optional[Dict]:
+            try:
+                return generate(topic)
+            except Exception as e:
+                print(f"Error generating script for '{topic}': {e}")
+                return None
+
+        # The pool size is the concurrency bound
+        with ThreadPoolExecutor(max_workers=min(len(unique), max(1, max_concurrency)),
+                                thread_name_prefix="script-batch") as executor:
+            futures = {topic: executor.submit(in_context(run), topic) for topic in unique}
+            return {topic: futures[topic].result() for topic in unique}
+
+    @traced("script_generation", provider="gemini")
     def generate_timed_script(
         self, 
         topic: str, 
@@ -273,7 +367,8 @@ class GeminiHandler:
         
         return story_data
     
-    def _generate_narrative_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15) -> Dict:
+    def _generate_narrative_story(self, topic: str, num_scenes: int = 10, words_per_scene: int = 15,
+                                  refresh: bool = False) -> Dict:
         """Generate a narrative story script with timing constraints.
         
         Args:
@@ -371,8 +466,12 @@ class GeminiHandler:
         Remember: You're not writing a Wikipedia article. You're telling a STORY that will make someone stop scrolling and FEEL something. Make every word count.
         """
         
+        cache_key, cached = self._cached_script(prompt, topic, num_scenes, refresh)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -384,9 +483,9 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            story_data = json.loads(cleaned_text)
+            story_data = extract_json(response.text)
             story_data['content_type'] = 'story'
+            self.script_cache.put(cache_key, story_data, topic=topic, model=self.text_model_name, slides=num_scenes)
             return story_data
         except Exception as e:
             print(f"Error generating story: {e}")
@@ -395,7 +494,7 @@ class GeminiHandler:
                 print("Model not found, trying gemini-2.0-flash-exp...")
                 try:
                     self.text_model_name = 'gemini-2.0-flash-exp'
-                    return self.generate_philosophy_story(topic)
+                    return self.generate_philosophy_story(topic, refresh=refresh)
                 except:
                     pass
             return None
@@ -421,7 +520,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.image_model_name,
                 contents=prompt
             )
@@ -430,6 +529,7 @@ class GeminiHandler:
             print(f"Error generating image prompt: {e}")
             return None
     
+    @traced("script_generation", provider="gemini")
     def generate_mentor_slideshow(self, topic: str) -> Dict:
         """
         Generate a philosophical mentor-style slideshow script.
@@ -617,7 +717,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -629,8 +729,7 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            slideshow_data = json.loads(cleaned_text)
+            slideshow_data = extract_json(response.text)
             slideshow_data['content_type'] = 'mentor_slideshow'
             return slideshow_data
             
@@ -645,6 +744,7 @@ class GeminiHandler:
                     pass
             return None
 
+    @traced("script_generation", provider="gemini")
     def generate_slideshow_script(self, topic: str) -> Dict:
         """
         Generate a slideshow script for children's-book-style slides.
@@ -899,7 +999,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -911,8 +1011,7 @@ class GeminiHandler:
                 print("Error: Empty response from model")
                 return None
                 
-            cleaned_text = self._clean_json_text(response.text)
-            slideshow_data = json.loads(cleaned_text)
+            slideshow_data = extract_json(response.text)
             slideshow_data['content_type'] = 'slideshow'
             return slideshow_data
             
@@ -956,7 +1055,7 @@ class GeminiHandler:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._generate_content(
                 model=self.text_model_name,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -964,8 +1063,7 @@ class GeminiHandler:
                 )
             )
             
-            cleaned_text = self._clean_json_text(response.text)
-            scenes = json.loads(cleaned_text)
+            scenes = extract_json(response.text, expect=list)
             return scenes
         except Exception as e:
             print(f"Error analyzing scenes: {e}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+HTTP Client - one pooled, keep-alive session shared by the provider integrations.
+
+A bare requests.get/post opens a new connection (and TLS handshake) for
+every call. The shared session keeps a connection pool per host, so
+repeated calls to fal.ai, TikTok, ElevenLabs or Post Bridge reuse warm
+connections. It also applies the same defaults everywhere:
+
+- timeout: DEFAULT_TIMEOUT (connect, read) unless the call passes its own
+- retries: failed connects, and 429/5xx answers to GET/HEAD, are retried
+  with exponential backoff. Read timeouts are raised, not retried. POST/PUT are never resent automatically,
+  because callers like the TikTok chunk upload have their own resume logic.
+
+download() streams a response straight to a file (or an open binary file),
+one chunk at a time, so large images and videos never sit in memory whole.
+
+Usage:
+    from http_client import get_session, download
+
+    response = get_session().post(url, json=payload)
+    download(video_url, "clips/transition.mp4")
+
+    with tempfile.TemporaryFile() as buffer:
+        download(image_url, buffer)
+        image = Image.open(buffer)
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (10, 60)
+
+# Hosts kept in the pool, and idle connections kept per host
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 16
+
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a default timeout and pooled, retrying adapters."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE):
+        super().__init__()
+        self.timeout = timeout
+        retry = Retry(
+            total=max_retries,
+            read=False,  # a read timeout may mean the server acted; surface it as requests.ReadTimeout
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False,  # hand back the last response; callers raise_for_status
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+_session: Optional[PooledSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """The process-wide session (connection pools are thread-safe; share it freely)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession()
+    return _session
+
+
+def download(url: str, dest: Union[str, Path, BinaryIO], session: Optional[requests.Session] = None,
+             chunk_size: int = DOWNLOAD_CHUNK_SIZE, **kwargs) -> Union[Path, BinaryIO]:
+    """
+    Stream url into dest without holding the body in memory.
+
+    dest is a path (written to a temp file, renamed into place when complete)
+    or a binary file object (written at its current position, then rewound).
+    Raises requests.HTTPError for error statuses.
+    """
+    session = session or get_session()
+    with session.get(url, stream=True, **kwargs) as response:
+        response.raise_for_status()
+        if not isinstance(dest, (str, Path)):
+            start = dest.tell()
+            for chunk in response.iter_content(chunk_size):
+                dest.write(chunk)
+            dest.seek(start)
+            return dest
+
+        path = Path(dest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return path
@@ -1,11 +1,15 @@
-import google.generativeai as genai
+from lazy_imports import lazy_module
 import requests
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw, ImageFont
 import io
 import os
 from typing import List, Dict
 from dotenv import load_dotenv
 
+from gradients import vertical_gradient
+
+genai = lazy_module("google.generativeai")  # imported on first use
+
 load_dotenv()
 
 class ImageGenerator:
@@ -77,16 +81,10 @@ class ImageGenerator:
         # Create a dark, classical-looking placeholder
         width, height = 1080, 1920  # TikTok vertical format
         
-        # Create gradient background
-        img = Image.new('RGB', (width, height), color='#1a1a1a')
+        # Create gradient background, from dark to slightly lighter
+        img = vertical_gradient((width, height), [(0, (26, 26, 26)), (1, (66, 66, 66))])
         draw = ImageDraw.Draw(img)
         
-        # Create gradient effect
-        for y in range(height):
-            darkness = int(26 + (y / height) * 40)  # Gradient from dark to slightly lighter
-            color = f"#{darkness:02x}{darkness:02x}{darkness:02x}"
-            draw.line([(0, y), (width, y)], fill=color)
-        
         # Add golden highlights
         draw.ellipse([width//4, height//3, 3*width//4, 2*height//3], 
                     outline='#FFD700', width=3)
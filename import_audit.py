@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Import Audit - measure cold-start import cost of the API, CLIs and pipelines.
+
+Each target is imported in a fresh interpreter under `python -X importtime`.
+The report shows:
+- wall time of `python -c "import <target>"` (median of --repeat runs)
+- cumulative import time of the target itself
+- the packages that cost the most (self time, grouped by top-level package)
+- heavy SDKs that were imported eagerly (these should go through lazy_imports)
+
+Usage:
+    python import_audit.py                          # Audit the default targets
+    python import_audit.py backend.app.main --top 20
+    python import_audit.py --save import_baseline.json
+    python import_audit.py --compare import_baseline.json
+    python import_audit.py --check                  # Exit 1 if a heavy SDK loads eagerly
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Optional
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Entry points whose startup we care about
+DEFAULT_TARGETS = [
+    "backend.app.main",
+    "tiktok_cli",
+    "instagram_cli",
+    "slideshow_automation",
+    "auto_runner",
+    "daily_production",
+]
+
+# Packages that should only be imported on first use (see lazy_imports.py)
+HEAVY_MODULES = [
+    "moviepy",
+    "imageio",
+    "numpy",
+    "google.genai",
+    "google.generativeai",
+    "google.cloud.storage",
+    "fal_client",
+    "anthropic",
+    "elevenlabs",
+    "openai",
+]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """[{name, self_us, cumulative_us, depth}] in the order Python printed them."""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append({
+            "name": name,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(indent) - 1) // 2,
+        })
+    return entries
+
+
+def _run_import(target: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", f"import {target}"]
+    return subprocess.run(cmd, cwd=REPO_DIR, capture_output=True, text=True)
+
+
+def _median_wall_ms(code: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def startup_modules() -> set:
+    """Modules every interpreter imports before running any code (site, encodings, ...)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], cwd=REPO_DIR, capture_output=True, text=True)
+    return {entry["name"] for entry in parse_importtime(result.stderr)}
+
+
+def audit_target(target: str, repeat: int = 5, top: int = 10, skip: Optional[set] = None) -> Dict:
+    """Import `target` in fresh interpreters and summarize where the time went."""
+    # First run also writes .pyc files so later runs measure a warm disk cache
+    result = _run_import(target, importtime=True)
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return {"target": target, "ok": False, "error": error}
+
+    skip = skip or set()
+    entries = [e for e in parse_importtime(_run_import(target, importtime=True).stderr) if e["name"] not in skip]
+
+    # `import a.b.c` reports a, a.b and a.b.c as separate top-level entries
+    parts = target.split(".")
+    own = {".".join(parts[:i]) for i in range(1, len(parts) + 1)}
+    import_us = sum(e["cumulative_us"] for e in entries if e["depth"] == 0 and e["name"] in own)
+
+    packages: Dict[str, int] = {}
+    for entry in entries:
+        root = entry["name"].split(".")[0]
+        packages[root] = packages.get(root, 0) + entry["self_us"]
+
+    heavy = {}
+    for module in HEAVY_MODULES:
+        hits = [e["cumulative_us"] for e in entries if e["name"] == module]
+        if hits:
+            heavy[module] = round(max(hits) / 1000, 1)
+
+    return {
+        "target": target,
+        "ok": True,
+        "wall_ms": round(_median_wall_ms(f"import {target}", repeat), 1),
+        "import_ms": round(import_us / 1000, 1),
+        "modules": len(entries),
+        "packages": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]
+        },
+        "heavy": heavy,
+    }
+
+
+def print_report(report: Dict, startup_ms: float, baseline: Optional[Dict] = None):
+    target = report["target"]
+    print(f"\n📦 {target}")
+    if not report["ok"]:
+        print(f"   ❌ import failed: {report['error']}")
+        return
+
+    def delta(field: str) -> str:
+        previous = (baseline or {}).get(target, {})
+        if not previous.get("ok"):
+            return ""
+        change = report[field] - previous[field]
+        return f"  ({change:+.0f} ms vs baseline {previous[field]:.0f} ms)"
+
+    print(f"   wall:   {report['wall_ms']:>7.1f} ms (interpreter startup {startup_ms:.0f} ms){delta('wall_ms')}")
+    print(f"   import: {report['import_ms']:>7.1f} ms across {report['modules']} modules{delta('import_ms')}")
+    print("   heaviest packages (self time):")
+    for name, ms in report["packages"].items():
+        print(f"      {name:<24} {ms:>7.1f} ms")
+    if report["heavy"]:
+        listed = ", ".join(f"{name} ({ms:.0f} ms)" for name, ms in report["heavy"].items())
+        print(f"   ⚠️ eager heavy imports: {listed}")
+    else:
+        print("   ✅ no heavy SDKs imported at startup")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time audit (python -X importtime)")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Wall-time runs per target (median)")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list per target")
+    parser.add_argument("--save", metavar="FILE", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Show deltas against a saved JSON run")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a heavy SDK is imported eagerly")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["targets"]
+
+    startup_ms = _median_wall_ms("pass", args.repeat)
+    skip = startup_modules()
+    print(f"🐍 {sys.version.split()[0]}, interpreter startup {startup_ms:.0f} ms")
+
+    reports = {}
+    for target in args.targets:
+        reports[target] = audit_target(target, repeat=args.repeat, top=args.top, skip=skip)
+        print_report(reports[target], startup_ms, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "startup_ms": round(startup_ms, 1),
+                "targets": reports,
+            }, f, indent=2)
+        print(f"\n💾 Saved to {args.save}")
+
+    if args.check:
+        offenders = [r["target"] for r in reports.values() if r["ok"] and r["heavy"]]
+        if offenders:
+            print(f"\n❌ Heavy SDKs imported at startup by: {', '.join(offenders)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
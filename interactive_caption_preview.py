@@ -22,6 +22,8 @@ from PIL import Image, ImageTk, ImageDraw, ImageFont
 from typing import List, Optional
 import threading
 
+from gradients import gradient_overlay
+
 
 class InteractiveCaptionPreview:
     """Interactive GUI for previewing TikTok captions on images."""
@@ -309,18 +311,12 @@ class InteractiveCaptionPreview:
         username: str
     ) -> Image.Image:
         """Add TikTok-style caption overlay to image."""
-        # Create overlay
-        overlay = Image.new("RGBA", img.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-        
         width, height = img.size
         
-        # Gradient at bottom
+        # Create overlay with a gradient at bottom
         gradient_height = 400
-        for y in range(gradient_height):
-            alpha = int(180 * (y / gradient_height))
-            y_pos = height - gradient_height + y
-            draw.line([(0, y_pos), (width, y_pos)], fill=(0, 0, 0, alpha))
+        overlay = gradient_overlay(img.size, [(1 - gradient_height / height, 0), (1, 180)])
+        draw = ImageDraw.Draw(overlay)
         
         # Caption area
         padding = 40
@@ -8,14 +8,19 @@ Pipeline Flow:
 1. Generate Script (with word count constraints)
 2. Generate Audio (with word-level timestamps)
 3. Validate Timing (ensure scenes match clip durations)
-4. Generate Images (parallel with audio)
+4. Generate Images (parallel with audio, several scenes at once)
 5. Generate Video Clips (fal.ai, sequential)
 6. Assemble Final Video (moviepy)
+
+Steps 2-6 run as a task graph (see task_graph.py); result['trace'] holds
+per-stage start/end times. result['spans'] is the tracing span tree for the
+run (provider calls, encodes, uploads - see tracing.py).
 """
 
 import os
 import json
 import time
+import threading
 from typing import Dict, List, Optional, Callable
 from datetime import datetime
 
@@ -24,6 +29,8 @@ from voice_generator import VoiceGenerator
 from smart_image_generator import SmartImageGenerator
 from gpt_image_generator import GPTImageGenerator, check_gpt_image_available
 from fal_video_generator import FalVideoGenerator
+from task_graph import TaskGraph
+from tracing import start_trace
 from timing_calculator import (
     calculate_scene_durations,
     validate_pipeline_timing,
@@ -48,7 +55,8 @@ class VideoPipeline:
         target_duration: int = 60,
         clip_duration: int = 6,
         voice_id: str = None,
-        output_dir: str = "generated_videos"
+        output_dir: str = "generated_videos",
+        image_workers: int = 4
     ):
         """
         Initialize the pipeline.
@@ -58,11 +66,13 @@ class VideoPipeline:
             clip_duration: Duration per clip in seconds (5 or 6, default 6)
             voice_id: ElevenLabs voice ID (optional, uses default if not provided)
             output_dir: Output directory for final videos
+            image_workers: Scene images generated at the same time
         """
         self.target_duration = target_duration
         self.clip_duration = clip_duration
         self.voice_id = voice_id
         self.output_dir = output_dir
+        self.image_workers = image_workers
         
         # Ensure output directories exist
         os.makedirs(output_dir, exist_ok=True)
@@ -83,7 +93,8 @@ class VideoPipeline:
         self._fal_gen = None
         
         # Callback for progress updates
-        self.progress_callback: Optional[Callable[[str, int, int], None]] = None
+        self.progress_callback: Optional[Callable[[str, int, int, float], None]] = None
+        self._started_at: Optional[float] = None
     
     @property
     def fal_gen(self) -> FalVideoGenerator:
@@ -99,15 +110,16 @@ class VideoPipeline:
             self._gpt_image_gen = GPTImageGenerator(quality="low")
         return self._gpt_image_gen
     
-    def set_progress_callback(self, callback: Callable[[str, int, int], None]):
-        """Set callback for progress updates. Callback receives (stage, current, total)."""
+    def set_progress_callback(self, callback: Callable[[str, int, int, float], None]):
+        """Set callback for progress updates. Callback receives (stage, current, total, elapsed_seconds)."""
         self.progress_callback = callback
     
     def _notify_progress(self, stage: str, current: int = 0, total: int = 0):
         """Notify progress callback if set."""
+        elapsed = time.time() - self._started_at if self._started_at else 0.0
         if self.progress_callback:
-            self.progress_callback(stage, current, total)
-        print(f"[{stage}] {current}/{total}" if total else f"[{stage}]")
+            self.progress_callback(stage, current, total, elapsed)
+        print((f"[{stage}] {current}/{total}" if total else f"[{stage}]") + f" +{elapsed:.1f}s")
     
     def run(
         self,
@@ -136,11 +148,23 @@ class VideoPipeline:
                 "video_clip_paths": [str],
                 "final_video_path": str,
                 "timing_report": dict,
+                "trace": [dict],  # per-stage timing
+                "spans": dict,  # span tree (see tracing.py)
+                "stage_totals": dict,  # seconds per span name
                 "duration": float,
                 "error": str (if failed)
             }
         """
+        with start_trace("video_pipeline", topic=topic) as trace:
+            result = self._run(topic, skip_video_clips, image_model)
+        result['spans'] = trace.to_dict()
+        result['stage_totals'] = trace.stage_totals()
+        trace.print_tree(min_seconds=0.5)
+        return result
+    
+    def _run(self, topic: str, skip_video_clips: bool, image_model: str) -> Dict:
         start_time = time.time()
+        self._started_at = start_time
         result = {
             "success": False,
             "topic": topic,
@@ -152,6 +176,7 @@ class VideoPipeline:
             # STEP 1: Generate Script
             # =====================
             self._notify_progress("SCRIPT_GENERATION")
+            script_start = time.time()
             
             script_data = self.gemini.generate_timed_script(
                 topic=topic,
@@ -177,65 +202,24 @@ class VideoPipeline:
             
             scenes = script_data.get('scenes', [])
             print(f"✅ Script generated: {len(scenes)} scenes")
+            script_trace = {
+                "node": "script",
+                "pool": "main",
+                "start": round(script_start - start_time, 3),
+                "end": round(time.time() - start_time, 3),
+                "duration": round(time.time() - script_start, 3),
+                "status": "ok",
+            }
             
             # =====================
-            # STEP 2: Generate Audio with Timestamps
-            # =====================
-            self._notify_progress("AUDIO_GENERATION")
-            
-            full_script = script_data.get('script', '')
-            audio_filename = f"{safe_title}_synced.mp3"
-            
-            audio_result = self.voice.generate_voiceover_with_timestamps(
-                script=full_script,
-                scenes=scenes,
-                voice_id=self.voice_id,
-                filename=audio_filename
-            )
-            
-            if not audio_result:
-                raise Exception("Failed to generate audio with timestamps")
-            
-            result['audio_path'] = audio_result['audio_path']
-            result['audio_duration'] = audio_result['total_duration']
-            
-            print(f"✅ Audio generated: {audio_result['total_duration']:.2f}s")
-            
-            # =====================
-            # STEP 3: Validate Timing
-            # =====================
-            self._notify_progress("TIMING_VALIDATION")
-            
-            scene_timings = audio_result.get('scene_timings', [])
-            
-            # Use the comprehensive validate_and_log function
-            enhanced_scenes, timing_report, is_valid = validate_and_log(
-                topic=topic,
-                scenes=scenes,
-                scene_timings=scene_timings,
-                audio_path=audio_result['audio_path']
-            )
-            
-            result['timing_report'] = timing_report
-            result['enhanced_scenes'] = enhanced_scenes
-            
-            if not is_valid:
-                print("⚠️ Warning: Timing validation failed, but continuing...")
-                suggestions = suggest_script_adjustments(enhanced_scenes)
-                if suggestions:
-                    print("Suggested adjustments:")
-                    for s in suggestions:
-                        print(f"  Scene {s['scene_number']}: {s['action']}")
-            
-            # =====================
-            # STEP 4: Generate Images (with themed text overlays)
+            # STEPS 2-6: Audio, images, clips and assembly as a task graph
             # =====================
-            self._notify_progress("IMAGE_GENERATION", 0, len(scenes))
-            
-            # Get list_items for person names
+            # Audio and every scene image only need the script, so they run
+            # side by side; clips wait for both images and timing.
+            #   audio -> timing --------------\
+            #   image_0 .. image_n -> images --> clips -> assembly
             list_items = script_data.get('list_items', [])
-            
-            image_paths = []
+            story_title = script_data.get('title', topic)
             
             # Determine which image generator to use
             use_gpt15 = image_model == "gpt15" and check_gpt_image_available()
@@ -246,72 +230,113 @@ class VideoPipeline:
                 print(f"⚠️ GPT Image 1.5 requested but FAL_KEY not set, falling back to nano")
                 image_model = "nano"
             
-            for i, scene in enumerate(scenes):
-                self._notify_progress("IMAGE_GENERATION", i + 1, len(scenes))
+            def generate_audio():
+                self._notify_progress("AUDIO_GENERATION")
+                audio_result = self.voice.generate_voiceover_with_timestamps(
+                    script=script_data.get('script', ''),
+                    scenes=scenes,
+                    voice_id=self.voice_id,
+                    filename=f"{safe_title}_synced.mp3"
+                )
+                if not audio_result:
+                    raise Exception("Failed to generate audio with timestamps")
+                
+                result['audio_path'] = audio_result['audio_path']
+                result['audio_duration'] = audio_result['total_duration']
+                print(f"✅ Audio generated: {audio_result['total_duration']:.2f}s")
+                return audio_result
+            
+            def validate_timing(audio_result):
+                self._notify_progress("TIMING_VALIDATION")
                 
-                scene_num = scene.get('scene_number', i + 1)
-                visual_desc = scene.get('visual_description', '')
+                # Use the comprehensive validate_and_log function
+                enhanced_scenes, timing_report, is_valid = validate_and_log(
+                    topic=topic,
+                    scenes=scenes,
+                    scene_timings=audio_result.get('scene_timings', []),
+                    audio_path=audio_result['audio_path']
+                )
                 
-                # Enrich scene with person name from list_items
-                enriched_scene = {**scene}
-                list_item_num = scene.get('list_item', 0)
-                if list_item_num and list_items:
-                    matching_item = next((item for item in list_items if item.get('number') == list_item_num), None)
-                    if matching_item:
-                        enriched_scene['person_name'] = matching_item.get('name', '')
+                result['timing_report'] = timing_report
+                result['enhanced_scenes'] = enhanced_scenes
                 
-                try:
-                    if use_gpt15:
-                        # GPT Image 1.5 - best for bold text overlays
-                        image_path = self.gpt_image_gen.generate_philosophy_image(
-                            scene_data=enriched_scene,
-                            story_title=script_data.get('title', topic),
-                            story_data=script_data
-                        )
-                    elif image_model == "nano":
-                        # Gemini 3 Pro Image (Nano)
-                        image_path = self.image_gen.generate_image_with_nano(
-                            prompt=visual_desc,
-                            scene_number=scene_num,
-                            story_title=script_data.get('title', topic),
-                            scene_data=enriched_scene
-                        )
-                    else:
-                        # Fallback to nano
-                        image_path = self.image_gen.generate_image_with_nano(
-                            prompt=visual_desc,
-                            scene_number=scene_num,
-                            story_title=script_data.get('title', topic),
-                            scene_data=enriched_scene
-                        )
+                if not is_valid:
+                    print("⚠️ Warning: Timing validation failed, but continuing...")
+                    suggestions = suggest_script_adjustments(enhanced_scenes)
+                    if suggestions:
+                        print("Suggested adjustments:")
+                        for s in suggestions:
+                            print(f"  Scene {s['scene_number']}: {s['action']}")
+                return enhanced_scenes
+            
+            images_done = []
+            images_lock = threading.Lock()
+            
+            def make_image_task(i: int, scene: Dict):
+                def generate_image():
+                    scene_num = scene.get('scene_number', i + 1)
                     
-                    if image_path and os.path.exists(image_path):
-                        image_paths.append(image_path)
-                    else:
-                        print(f"⚠️ Failed to generate image for scene {scene_num}")
-                except Exception as e:
-                    print(f"⚠️ Error generating image for scene {scene_num}: {e}")
-            
-            result['image_paths'] = image_paths
-            print(f"✅ Generated {len(image_paths)}/{len(scenes)} images")
-            
-            if len(image_paths) < 2:
-                raise Exception("Not enough images generated for video")
-            
-            # =====================
-            # STEP 5: Generate Video Clips (fal.ai)
-            # =====================
-            if skip_video_clips:
-                print("⏭️ Skipping video clip generation (skip_video_clips=True)")
-                result['video_clip_paths'] = []
-            else:
+                    # Enrich scene with person name from list_items
+                    enriched_scene = {**scene}
+                    list_item_num = scene.get('list_item', 0)
+                    if list_item_num and list_items:
+                        matching_item = next((item for item in list_items if item.get('number') == list_item_num), None)
+                        if matching_item:
+                            enriched_scene['person_name'] = matching_item.get('name', '')
+                    
+                    image_path = None
+                    try:
+                        if use_gpt15:
+                            # GPT Image 1.5 - best for bold text overlays
+                            image_path = self.gpt_image_gen.generate_philosophy_image(
+                                scene_data=enriched_scene,
+                                story_title=story_title,
+                                story_data=script_data
+                            )
+                        else:
+                            # Gemini 3 Pro Image (Nano)
+                            image_path = self.image_gen.generate_image_with_nano(
+                                prompt=scene.get('visual_description', ''),
+                                scene_number=scene_num,
+                                story_title=story_title,
+                                scene_data=enriched_scene
+                            )
+                        
+                        if not (image_path and os.path.exists(image_path)):
+                            print(f"⚠️ Failed to generate image for scene {scene_num}")
+                            image_path = None
+                    except Exception as e:
+                        print(f"⚠️ Error generating image for scene {scene_num}: {e}")
+                        image_path = None
+                    
+                    with images_lock:
+                        images_done.append(i)
+                        self._notify_progress("IMAGE_GENERATION", len(images_done), len(scenes))
+                    return image_path
+                return generate_image
+            
+            def collect_images(*paths):
+                # Scene order is preserved; failed scenes are dropped
+                image_paths = [p for p in paths if p]
+                result['image_paths'] = image_paths
+                print(f"✅ Generated {len(image_paths)}/{len(scenes)} images")
+                if len(image_paths) < 2:
+                    raise Exception("Not enough images generated for video")
+                return image_paths
+            
+            def generate_clips(image_paths, enhanced_scenes):
+                if skip_video_clips:
+                    print("⏭️ Skipping video clip generation (skip_video_clips=True)")
+                    result['video_clip_paths'] = []
+                    return []
+                
                 self._notify_progress("VIDEO_CLIP_GENERATION", 0, len(image_paths) - 1)
                 
                 # Get clip durations for each scene
-                clip_durations = []
-                for scene in enhanced_scenes:
-                    clip_dur = scene.get('clip_duration', self.clip_duration)
-                    clip_durations.append(str(clip_dur))
+                clip_durations = [
+                    str(scene.get('clip_duration', self.clip_duration))
+                    for scene in enhanced_scenes
+                ]
                 
                 # Generate transition videos
                 video_clip_paths = []
@@ -349,22 +374,25 @@ class VideoPipeline:
                         if video_path:
                             video_clip_paths.append(video_path)
                     
-                    result['video_clip_paths'] = video_clip_paths
                     print(f"✅ Generated {len(video_clip_paths)}/{num_transitions} video clips")
                     
                 except Exception as e:
                     print(f"⚠️ Error generating video clips: {e}")
-                    result['video_clip_paths'] = []
+                    video_clip_paths = []
+                
+                result['video_clip_paths'] = video_clip_paths
+                return video_clip_paths
             
-            # =====================
-            # STEP 6: Assemble Final Video
-            # =====================
-            if result.get('video_clip_paths'):
+            def assemble(video_clip_paths, audio_result):
+                if not video_clip_paths:
+                    print("⏭️ Skipping final assembly (no video clips)")
+                    return None
+                
                 self._notify_progress("FINAL_ASSEMBLY")
                 
                 final_video_path = self.fal_gen.create_final_video_with_audio(
-                    video_paths=result['video_clip_paths'],
-                    audio_path=result['audio_path'],
+                    video_paths=video_clip_paths,
+                    audio_path=audio_result['audio_path'],
                     story_title=safe_title,
                     crossfade_duration=0.5
                 )
@@ -374,8 +402,29 @@ class VideoPipeline:
                     print(f"✅ Final video: {final_video_path}")
                 else:
                     print("⚠️ Failed to create final video")
-            else:
-                print("⏭️ Skipping final assembly (no video clips)")
+                return final_video_path
+            
+            self._notify_progress("IMAGE_GENERATION", 0, len(scenes))
+            graph = TaskGraph(
+                f"pipeline:{safe_title}",
+                pools={"audio": 1, "images": self.image_workers},
+                t0=start_time
+            )
+            graph.add("audio", generate_audio, pool="audio")
+            graph.add("timing", validate_timing, deps=["audio"])
+            image_nodes = [
+                graph.add(f"image_{i}", make_image_task(i, scene), pool="images")
+                for i, scene in enumerate(scenes)
+            ]
+            graph.add("images", collect_images, deps=image_nodes)
+            graph.add("clips", generate_clips, deps=["images", "timing"])
+            graph.add("assembly", assemble, deps=["clips", "audio"])
+            
+            try:
+                graph.run()
+            finally:
+                result['trace'] = [script_trace] + graph.trace
+                graph.print_trace()
             
             # =====================
             # COMPLETE
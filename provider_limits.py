@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Provider Limits - process-wide caps on concurrent calls to paid APIs.
+
+Production lanes (slideshow, narration, transitions) run at the same time
+and each has its own worker budget. Without a shared cap they would together
+send more fal.ai / Gemini / ElevenLabs requests than the account allows, and
+the provider answers with 429s. Every call site that hits a provider takes a
+slot first:
+
+    from provider_limits import provider_slot
+
+    with provider_slot("fal", model=model_id):
+        result = fal_client.subscribe(model_id, arguments=arguments)
+
+Once the slot is held the call is timed as a "provider_call" span (see
+tracing.py); the wait for the slot is recorded on the span as slot_wait.
+
+Limits come from PROVIDER_LIMITS and can be overridden per provider with an
+environment variable, e.g. PROVIDER_LIMIT_FAL=8.
+
+Usage:
+    python provider_limits.py        # Print current limits and wait stats
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+from tracing import span
+
+# Max concurrent in-flight requests per provider (whole process)
+PROVIDER_LIMITS = {
+    "fal": 6,            # image + image-to-video queue requests
+    "gemini": 3,         # script generation
+    "elevenlabs": 2,     # voiceovers (free/creator tiers allow 2-3)
+}
+
+# Providers not listed above get this limit
+DEFAULT_PROVIDER_LIMIT = 4
+
+
+class ProviderLimiter:
+    """Bounded semaphore per provider, plus how long callers waited for a slot."""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = dict(limits)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _limit_for(self, provider: str) -> int:
+        override = os.getenv(f"PROVIDER_LIMIT_{provider.upper()}")
+        if override:
+            return max(1, int(override))
+        return self.limits.get(provider, DEFAULT_PROVIDER_LIMIT)
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if provider not in self._semaphores:
+                self._semaphores[provider] = threading.BoundedSemaphore(self._limit_for(provider))
+                self.stats[provider] = {"calls": 0, "waited": 0.0, "max_wait": 0.0}
+            return self._semaphores[provider]
+
+    @contextmanager
+    def slot(self, provider: str, model: str = ""):
+        """Hold one of the provider's slots for the duration of the block."""
+        semaphore = self._semaphore(provider)
+        start = time.time()
+        semaphore.acquire()
+        waited = time.time() - start
+        with self._lock:
+            stats = self.stats[provider]
+            stats["calls"] += 1
+            stats["waited"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+        try:
+            with span("provider_call", provider=provider, model=model, slot_wait=round(waited, 3)):
+                yield
+        finally:
+            semaphore.release()
+
+    def print_stats(self):
+        """Print calls and slot wait time per provider."""
+        print("\n🚦 Provider limits:")
+        for provider in sorted(set(self.limits) | set(self.stats)):
+            stats = self.stats.get(provider, {"calls": 0, "waited": 0.0, "max_wait": 0.0})
+            print(
+                f"   {provider:<12} limit {self._limit_for(provider):>2}  "
+                f"calls {stats['calls']:>4}  waited {stats['waited']:.1f}s "
+                f"(max {stats['max_wait']:.1f}s)"
+            )
+
+
+_limiter = ProviderLimiter(PROVIDER_LIMITS)
+
+
+def provider_slot(provider: str, model: str = ""):
+    """Context manager: wait for a free slot on the shared limiter."""
+    return _limiter.slot(provider, model)
+
+
+def get_provider_limiter() -> ProviderLimiter:
+    return _limiter
+
+
+if __name__ == "__main__":
+    _limiter.print_stats()
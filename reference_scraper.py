@@ -6,20 +6,36 @@ This tool allows you to:
 2. Extract individual frames (slides)
 3. Store metadata for agent lookup
 4. Feed visual examples to the AI agent
+
+The library index lives in SQLite (references/references.db): upserts are
+atomic, tags and format are indexed, and title/notes/description are
+full-text searchable. A legacy references/index.json is imported on first use.
 """
 
 import os
 import json
+import sqlite3
 import subprocess
 import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional, Tuple
 import hashlib
 
 # Use absolute paths based on this file's location
 _SCRIPT_DIR = Path(__file__).parent.resolve()
 REFERENCES_DIR = _SCRIPT_DIR / "references" / "examples"
-REFERENCES_INDEX = _SCRIPT_DIR / "references" / "index.json"
+REFERENCES_INDEX = _SCRIPT_DIR / "references" / "index.json"  # legacy, import-only
+REFERENCES_DB = _SCRIPT_DIR / "references" / "references.db"
+FRAME_HASHES_DB = _SCRIPT_DIR / "references" / "frame_hashes.db"
+
+# Fields returned by list/search (the old index.json entry shape)
+INDEX_FIELDS = [
+    "id", "url", "format_type", "tags", "notes", "title", "uploader",
+    "view_count", "like_count", "frame_count", "added_date", "is_manual",
+]
 
 
 def get_reference_id(url: str) -> str:
@@ -32,6 +48,366 @@ def get_reference_id(url: str) -> str:
     return f"ref_{hashlib.md5(url.encode()).hexdigest()[:8]}"
 
 
+# ============================================================================
+# Reference store (SQLite)
+# ============================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reference_library (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL DEFAULT '',
+    format_type TEXT NOT NULL DEFAULT 'unknown',
+    title TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    uploader TEXT NOT NULL DEFAULT '',
+    view_count INTEGER NOT NULL DEFAULT 0,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    frame_count INTEGER NOT NULL DEFAULT 0,
+    added_date TEXT NOT NULL DEFAULT '',
+    is_manual INTEGER NOT NULL DEFAULT 0,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reference_format ON reference_library(format_type);
+CREATE INDEX IF NOT EXISTS idx_reference_added ON reference_library(added_date);
+
+CREATE TABLE IF NOT EXISTS reference_tags (
+    ref_id TEXT NOT NULL REFERENCES reference_library(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ref_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_reference_tags_tag ON reference_tags(tag);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS reference_fts USING fts5(
+    id UNINDEXED, title, notes, description
+);
+"""
+
+
+class ReferenceStore:
+    """
+    SQLite-backed reference index.
+
+    Every write runs in its own IMMEDIATE transaction, so concurrent scrapes
+    (separate threads or processes) can't lose each other's entries. The
+    full metadata dict is stored alongside the indexed columns, so lookups
+    never have to open per-reference metadata.json files.
+    """
+
+    def __init__(self, db_path: Path = REFERENCES_DB, legacy_index: Path = REFERENCES_INDEX):
+        self.db_path = Path(db_path)
+        self.legacy_index = Path(legacy_index)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self.has_fts = False
+
+    @contextmanager
+    def _connect(self, write: bool = False):
+        self._ensure_schema()
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        try:
+            if write:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            else:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(_SCHEMA)
+                try:
+                    conn.executescript(_FTS_SCHEMA)
+                    self.has_fts = True
+                except sqlite3.OperationalError:
+                    # SQLite built without FTS5 - search falls back to LIKE
+                    self.has_fts = False
+                empty = conn.execute("SELECT COUNT(*) FROM reference_library").fetchone()[0] == 0
+            finally:
+                conn.close()
+            self._initialized = True
+            if empty:
+                self._import_legacy_index()
+
+    def _import_legacy_index(self):
+        """One-time import of index.json (+ per-reference metadata.json)."""
+        if not self.legacy_index.exists():
+            return
+        try:
+            with open(self.legacy_index) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in index:
+            reference = dict(entry)
+            metadata_path = REFERENCES_DIR / entry["id"] / "metadata.json"
+            if metadata_path.exists():
+                with open(metadata_path) as f:
+                    reference.update(json.load(f))
+            self.upsert(reference)
+        print(f"Imported {len(index)} references from {self.legacy_index.name}")
+
+    def upsert(self, reference: dict):
+        """Insert or replace a reference, its tags and its search text atomically."""
+        tags = list(dict.fromkeys(reference.get("tags") or []))
+        row = (
+            reference["id"],
+            reference.get("url") or "",
+            reference.get("format_type") or "unknown",
+            reference.get("title") or "",
+            reference.get("notes") or "",
+            reference.get("description") or "",
+            reference.get("uploader") or "",
+            int(reference.get("view_count") or 0),
+            int(reference.get("like_count") or 0),
+            int(reference.get("frame_count") or 0),
+            reference.get("added_date") or datetime.now().isoformat(),
+            1 if reference.get("is_manual") else 0,
+            json.dumps(reference),
+        )
+        with self._connect(write=True) as conn:
+            conn.execute(
+                """
+                INSERT INTO reference_library (
+                    id, url, format_type, title, notes, description, uploader,
+                    view_count, like_count, frame_count, added_date, is_manual, metadata
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    url = excluded.url,
+                    format_type = excluded.format_type,
+                    title = excluded.title,
+                    notes = excluded.notes,
+                    description = excluded.description,
+                    uploader = excluded.uploader,
+                    view_count = excluded.view_count,
+                    like_count = excluded.like_count,
+                    frame_count = excluded.frame_count,
+                    added_date = excluded.added_date,
+                    is_manual = excluded.is_manual,
+                    metadata = excluded.metadata
+                """,
+                row,
+            )
+            conn.execute("DELETE FROM reference_tags WHERE ref_id = ?", (reference["id"],))
+            conn.executemany(
+                "INSERT INTO reference_tags (ref_id, tag, position) VALUES (?, ?, ?)",
+                [(reference["id"], tag, position) for position, tag in enumerate(tags)],
+            )
+            if self.has_fts:
+                conn.execute("DELETE FROM reference_fts WHERE id = ?", (reference["id"],))
+                conn.execute(
+                    "INSERT INTO reference_fts (id, title, notes, description) VALUES (?, ?, ?, ?)",
+                    (reference["id"], row[3], row[4], row[5]),
+                )
+
+    def delete(self, ref_id: str) -> bool:
+        with self._connect(write=True) as conn:
+            deleted = conn.execute("DELETE FROM reference_library WHERE id = ?", (ref_id,)).rowcount
+            if self.has_fts:
+                conn.execute("DELETE FROM reference_fts WHERE id = ?", (ref_id,))
+        return deleted > 0
+
+    def get(self, ref_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT metadata FROM reference_library WHERE id = ?", (ref_id,)).fetchone()
+        return json.loads(row["metadata"]) if row else None
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """Turn free text into an FTS5 query: every word must prefix-match."""
+        words = re.findall(r"\w+", text)
+        return " ".join(f'"{word}"*' for word in words)
+
+    def query(
+        self,
+        format_type: str = None,
+        tags: list = None,
+        text: str = None,
+        limit: int = None,
+        offset: int = 0,
+    ) -> Tuple[List[dict], int]:
+        """
+        Filter by format, tags (any match) and full text.
+
+        Returns:
+            (page of index entries, total matching count)
+        """
+        where = []
+        params: list = []
+        order = "r.added_date DESC"
+        join = ""
+
+        if format_type:
+            where.append("r.format_type = ?")
+            params.append(format_type)
+
+        if tags:
+            where.append(
+                f"r.id IN (SELECT ref_id FROM reference_tags WHERE tag IN ({','.join('?' * len(tags))}))"
+            )
+            params.extend(tags)
+
+        if text and text.strip():
+            if self.has_fts:
+                fts_query = self._fts_query(text)
+                if fts_query:
+                    join = "JOIN reference_fts f ON f.id = r.id"
+                    where.append("reference_fts MATCH ?")
+                    params.append(fts_query)
+                    order = "bm25(reference_fts), r.added_date DESC"
+            else:
+                like = f"%{text.strip()}%"
+                where.append("(r.title LIKE ? OR r.notes LIKE ? OR r.description LIKE ?)")
+                params.extend([like, like, like])
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        page_sql = ""
+        page_params: list = []
+        if limit is not None:
+            page_sql = "LIMIT ? OFFSET ?"
+            page_params = [int(limit), int(offset or 0)]
+
+        with self._connect() as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM reference_library r {join} {where_sql}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT r.id, r.url, r.format_type, r.notes, r.title, r.uploader,
+                       r.view_count, r.like_count, r.frame_count, r.added_date, r.is_manual
+                FROM reference_library r {join} {where_sql}
+                ORDER BY {order} {page_sql}
+                """,
+                params + page_params,
+            ).fetchall()
+
+            ids = [row["id"] for row in rows]
+            tags_by_id = {ref_id: [] for ref_id in ids}
+            if ids:
+                for tag_row in conn.execute(
+                    f"SELECT ref_id, tag FROM reference_tags WHERE ref_id IN ({','.join('?' * len(ids))}) "
+                    "ORDER BY ref_id, position",
+                    ids,
+                ):
+                    tags_by_id[tag_row["ref_id"]].append(tag_row["tag"])
+
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            entry["tags"] = tags_by_id[entry["id"]]
+            entry["is_manual"] = bool(entry["is_manual"])
+            entries.append({field: entry[field] for field in INDEX_FIELDS})
+        return entries, total
+
+    def stats(self) -> dict:
+        """Aggregate counts computed in SQL."""
+        with self._connect() as conn:
+            totals = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(frame_count), 0), COALESCE(SUM(view_count), 0) FROM reference_library"
+            ).fetchone()
+            by_format = {
+                row[0]: row[1]
+                for row in conn.execute(
+                    "SELECT format_type, COUNT(*) FROM reference_library GROUP BY format_type"
+                )
+            }
+        return {
+            "total_references": totals[0],
+            "total_frames": totals[1],
+            "total_views": totals[2],
+            "by_format": by_format,
+        }
+
+
+_store: Optional[ReferenceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ReferenceStore:
+    """Get the process-wide reference store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReferenceStore()
+    return _store
+
+
+# =============================================================================
+# FRAME DEDUPE
+# =============================================================================
+
+_frame_index = None
+_frame_index_lock = threading.Lock()
+
+
+def get_frame_index():
+    """Perceptual-hash index of every stored frame, keyed "<ref_id>/<filename>"."""
+    global _frame_index
+    if _frame_index is None:
+        with _frame_index_lock:
+            if _frame_index is None:
+                from image_dedupe import PerceptualIndex
+                _frame_index = PerceptualIndex(FRAME_HASHES_DB)
+    return _frame_index
+
+
+def _duplicate_in_reference(ref_id: str, image) -> Optional[str]:
+    """Key of a near-identical frame already stored for this reference, if any."""
+    for match in get_frame_index().find(image):
+        if match.key.startswith(f"{ref_id}/"):
+            return match.key
+    return None
+
+
+def dedupe_frames(ref_id: str, frames: list) -> list:
+    """
+    Drop near-duplicate frames (a slide held for several seconds is captured
+    once per extracted frame) and index the rest.
+
+    Kept frames are renumbered slide_001, slide_002, ... so later manual
+    frames don't collide with them.
+    """
+    index = get_frame_index()
+    index.remove_prefix(f"{ref_id}/")
+
+    kept = []
+    for frame in frames:
+        path = Path(frame)
+        value = index.hash(path)
+        if _duplicate_in_reference(ref_id, value):
+            path.unlink(missing_ok=True)
+            continue
+        target = path.with_name(f"slide_{len(kept) + 1:03d}{path.suffix}")
+        if target != path:
+            os.replace(path, target)
+        index.add(f"{ref_id}/{target.name}", value)
+        kept.append(str(target))
+
+    if len(kept) < len(frames):
+        print(f"Dropped {len(frames) - len(kept)} duplicate frames")
+    return kept
+
+
 def download_tiktok(url: str, output_dir: Path) -> dict:
     """Download a TikTok video and return metadata"""
 
@@ -163,8 +539,8 @@ def add_reference(
         print("Failed to download video")
         return None
 
-    # Extract frames
-    frames = extract_frames(download_result["video_file"], ref_dir, fps=fps)
+    # Extract frames, keeping one per distinct slide
+    frames = dedupe_frames(ref_id, extract_frames(download_result["video_file"], ref_dir, fps=fps))
 
     # Build reference metadata
     reference = {
@@ -208,65 +584,42 @@ def add_reference(
 
 
 def update_index(reference: dict):
-    """Update the global references index"""
-
-    index = []
-    if REFERENCES_INDEX.exists():
-        with open(REFERENCES_INDEX) as f:
-            index = json.load(f)
-
-    # Remove existing entry with same ID
-    index = [r for r in index if r.get("id") != reference["id"]]
-
-    # Add new entry (summary only, not full paths)
-    index.append({
-        "id": reference["id"],
-        "url": reference["url"],
-        "format_type": reference["format_type"],
-        "tags": reference["tags"],
-        "notes": reference["notes"],
-        "title": reference["title"],
-        "uploader": reference["uploader"],
-        "view_count": reference["view_count"],
-        "like_count": reference["like_count"],
-        "frame_count": reference["frame_count"],
-        "added_date": reference["added_date"],
-    })
-
-    REFERENCES_INDEX.parent.mkdir(parents=True, exist_ok=True)
-    with open(REFERENCES_INDEX, "w") as f:
-        json.dump(index, f, indent=2)
+    """Upsert a reference into the library index (atomic)"""
+    get_store().upsert(reference)
 
 
 def get_reference(ref_id: str) -> dict:
     """Get a reference by ID with full metadata"""
-
-    ref_dir = REFERENCES_DIR / ref_id
-    metadata_path = ref_dir / "metadata.json"
-
-    if not metadata_path.exists():
-        return None
-
-    with open(metadata_path) as f:
-        return json.load(f)
+    return get_store().get(ref_id)
 
 
 def list_references(format_type: str = None, tags: list = None) -> list:
     """List all references, optionally filtered"""
+    references, _ = get_store().query(format_type=format_type, tags=tags)
+    return references
 
-    if not REFERENCES_INDEX.exists():
-        return []
 
-    with open(REFERENCES_INDEX) as f:
-        index = json.load(f)
+def search_references(
+    query: str = None,
+    format_type: str = None,
+    tags: list = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> Tuple[List[dict], int]:
+    """
+    Paginated search across title, notes and description.
 
-    if format_type:
-        index = [r for r in index if r.get("format_type") == format_type]
+    Returns:
+        (page of references, total matching count)
+    """
+    return get_store().query(
+        format_type=format_type, tags=tags, text=query, limit=limit, offset=offset
+    )
 
-    if tags:
-        index = [r for r in index if any(t in r.get("tags", []) for t in tags)]
 
-    return index
+def get_reference_stats() -> dict:
+    """Library-wide counts (total references, frames, views, per-format)."""
+    return get_store().stats()
 
 
 def get_reference_for_agent(ref_id: str) -> dict:
@@ -368,8 +721,10 @@ def add_frame_to_reference(ref_id: str, frame_data: bytes, frame_name: str = Non
         return None
 
     # Load existing metadata
-    with open(metadata_path) as f:
-        reference = json.load(f)
+    reference = get_reference(ref_id)
+    if not reference:
+        with open(metadata_path) as f:
+            reference = json.load(f)
 
     # Determine frame filename
     existing_frames = list(frames_dir.glob("*.jpg")) + list(frames_dir.glob("*.png"))
@@ -382,9 +737,20 @@ def add_frame_to_reference(ref_id: str, frame_data: bytes, frame_name: str = Non
 
     frame_path = frames_dir / filename
 
+    # Skip frames the reference already has (same screenshot uploaded twice)
+    from io import BytesIO
+    from PIL import Image
+    index = get_frame_index()
+    value = index.hash(Image.open(BytesIO(frame_data)))
+    duplicate = _duplicate_in_reference(ref_id, value)
+    if duplicate:
+        print(f"Frame matches existing {duplicate}, not added")
+        return reference
+
     # Save the frame
     with open(frame_path, "wb") as f:
         f.write(frame_data)
+    index.add(f"{ref_id}/{filename}", value)
 
     # Update reference metadata
     reference["frames"].append(str(frame_path))
@@ -408,12 +774,8 @@ def delete_reference(ref_id: str) -> bool:
         return False
 
     # Remove from index first
-    if REFERENCES_INDEX.exists():
-        with open(REFERENCES_INDEX) as f:
-            index = json.load(f)
-        index = [r for r in index if r.get("id") != ref_id]
-        with open(REFERENCES_INDEX, "w") as f:
-            json.dump(index, f, indent=2)
+    get_store().delete(ref_id)
+    get_frame_index().remove_prefix(f"{ref_id}/")
 
     # Delete directory and contents
     import shutil
@@ -431,8 +793,10 @@ def update_reference_metadata(ref_id: str, updates: dict) -> dict:
     if not metadata_path.exists():
         return None
 
-    with open(metadata_path) as f:
-        reference = json.load(f)
+    reference = get_reference(ref_id)
+    if not reference:
+        with open(metadata_path) as f:
+            reference = json.load(f)
 
     # Update allowed fields
     allowed_fields = ["title", "format_type", "tags", "notes", "url", "uploader", "view_count", "like_count"]
@@ -457,6 +821,7 @@ if __name__ == "__main__":
         print("  python reference_scraper.py add <url> [format_type] [tags] [notes]")
         print("  python reference_scraper.py add-manual <title> [format_type] [tags] [notes]")
         print("  python reference_scraper.py list [format_type]")
+        print("  python reference_scraper.py search <query> [format_type]")
         print("  python reference_scraper.py get <ref_id>")
         print("  python reference_scraper.py delete <ref_id>")
         sys.exit(1)
@@ -485,6 +850,12 @@ if __name__ == "__main__":
         refs = list_references(format_type)
         print(json.dumps(refs, indent=2))
 
+    elif command == "search":
+        query = sys.argv[2]
+        format_type = sys.argv[3] if len(sys.argv) > 3 else None
+        refs, total = search_references(query, format_type=format_type)
+        print(json.dumps({"total": total, "references": refs}, indent=2))
+
     elif command == "get":
         ref_id = sys.argv[2]
         ref = get_reference_for_agent(ref_id)
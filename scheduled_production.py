@@ -27,19 +27,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from email_sender import EmailSender
+
 # Import production functions
 from daily_production import (
-    generate_slideshow,
-    generate_narration_video,
-    generate_video_with_transitions,
-    send_slideshow_email,
-    send_narration_email,
-    send_video_transitions_email,
+    run_lanes,
     log,
-    cost_tracker,
-    get_next_topic,
-    SLIDESHOW_TOPICS_FILE,
-    NARRATION_TOPICS_FILE
+    cost_tracker
 )
 
 # Schedule times (24-hour format, PST)
@@ -90,67 +84,20 @@ def run_content_set(set_name: str = ""):
     log("   📋 1x Video with Transitions")
     log("=" * 60)
     
+    # The three lanes run concurrently; the set lands in about the slowest lane's time.
+    # One SMTP login for the whole set (reconnects if it idles out between pieces)
+    email_sender = EmailSender()
+    with email_sender.session():
+        lane_results = run_lanes(
+            {"slideshow": 1, "narration": 1, "video_transitions": 1},
+            sender=email_sender
+        )
+    
     results = {
-        'slideshow': None,
-        'narration': None,
-        'video_transitions': None
+        lane: (items[0][1] if items else None)
+        for lane, items in lane_results.items()
     }
     
-    # 1. Generate Slideshow
-    log("\n" + "-" * 40)
-    log("🎴 [1/3] GENERATING SLIDESHOW")
-    log("-" * 40)
-    
-    topic = get_next_topic(SLIDESHOW_TOPICS_FILE)
-    if topic:
-        log(f"📋 Topic: {topic}")
-        result = generate_slideshow(topic)
-        if result:
-            send_slideshow_email(result, topic)
-            results['slideshow'] = result
-            log("✅ Slideshow complete and emailed!")
-        else:
-            log("❌ Slideshow failed", "ERROR")
-    else:
-        log("⚠️ No slideshow topics available!", "WARN")
-    
-    # 2. Generate Narration Video
-    log("\n" + "-" * 40)
-    log("🎙️ [2/3] GENERATING NARRATION VIDEO")
-    log("-" * 40)
-    
-    topic = get_next_topic(NARRATION_TOPICS_FILE)
-    if topic:
-        log(f"📋 Topic: {topic}")
-        result = generate_narration_video(topic)
-        if result:
-            send_narration_email(result, topic)
-            results['narration'] = result
-            log("✅ Narration video complete and emailed!")
-        else:
-            log("❌ Narration video failed", "ERROR")
-    else:
-        log("⚠️ No narration topics available!", "WARN")
-    
-    # 3. Generate Video with Transitions
-    log("\n" + "-" * 40)
-    log("🎬 [3/3] GENERATING VIDEO WITH TRANSITIONS")
-    log("-" * 40)
-    
-    # Use narration topics for video transitions (story-style works better)
-    topic = get_next_topic(NARRATION_TOPICS_FILE)
-    if topic:
-        log(f"📋 Topic: {topic}")
-        result = generate_video_with_transitions(topic)
-        if result:
-            send_video_transitions_email(result, topic)
-            results['video_transitions'] = result
-            log("✅ Video with transitions complete and emailed!")
-        else:
-            log("❌ Video with transitions failed", "ERROR")
-    else:
-        log("⚠️ No topics available for video transitions!", "WARN")
-    
     # Summary
     log("\n" + "=" * 60)
     log(f"📊 SET COMPLETE: {set_name}")
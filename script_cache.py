@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Script Cache - persistent cache of generated scripts.
+
+Batch runs ask Gemini for the same scripts again after a retry or a restart.
+A generated script is stored as .script_cache/<key>.json, where the key hashes
+the model, the prompt (the template filled in with its parameters, so editing
+a template starts a fresh set of entries), the topic and the slide count.
+
+Entries expire after SCRIPT_CACHE_TTL. Set SCRIPT_CACHE=off to bypass the
+cache (nothing is read or written).
+
+Usage:
+    from script_cache import ScriptCache, script_cache_key
+
+    cache = ScriptCache()
+    key = script_cache_key(model, prompt, topic, num_slides)
+    script = cache.get(key)
+    if script is None:
+        script = generate(...)
+        cache.put(key, script, topic=topic)
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+SCRIPT_CACHE_DIR = Path(__file__).parent / ".script_cache"
+
+# A cached script is reused for a week, then generated fresh
+SCRIPT_CACHE_TTL = 7 * 24 * 3600
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def script_cache_key(model: str, prompt: str, topic: str, slides: int) -> str:
+    """Cache key for one script request."""
+    return _sha256(json.dumps([model, _sha256(prompt), topic.strip(), int(slides)]))
+
+
+class ScriptCache:
+    """Generated scripts on disk, one JSON file per key (safe across threads and processes)."""
+
+    def __init__(self, cache_dir: Path = SCRIPT_CACHE_DIR, ttl: float = SCRIPT_CACHE_TTL,
+                 enabled: Optional[bool] = None):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        if enabled is None:
+            enabled = os.getenv("SCRIPT_CACHE", "on").lower() not in ("0", "off", "false", "no")
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The cached script (a fresh copy) or None if missing, expired or unreadable."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            record = json.loads(path.read_text())
+        except (OSError, ValueError):
+            record = None
+        if record is not None and time.time() - record.get("stored_at", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            record = None
+        with self._lock:
+            if record is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return record["script"]
+
+    def put(self, key: str, script: Dict, **meta):
+        """Store a script atomically; meta (topic, model, ...) is kept alongside for inspection."""
+        if not self.enabled:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"stored_at": time.time(), "meta": meta, "script": script}, indent=2))
+        os.replace(tmp, path)
+
+    def clear(self):
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -361,7 +361,8 @@ def run_automation_loop(
     enable_video_transitions: bool = False,
     recycle_topics: bool = False,
     theme: str = "auto",
-    auto_theme: bool = True
+    auto_theme: bool = True,
+    control=None
 ):
     """
     Run continuous automation loop processing topics from file.
@@ -377,6 +378,9 @@ def run_automation_loop(
         recycle_topics: Whether to add completed topics back to queue
         theme: Visual theme for slideshows
         auto_theme: Whether to auto-select theme based on content
+        control: automation_worker.JobControl when run by the worker pool.
+            Pause/stop take effect between topics; progress is reported
+            after each one.
     """
     log(f"🚀 Starting automation loop", auto_id)
     log(f"   Model: {model}")
@@ -404,6 +408,10 @@ def run_automation_loop(
     
     processed = 0
     for i, topic in enumerate(topics):
+        if control:
+            control.checkpoint()
+            control.report(current_topic=topic, items_produced=processed)
+        
         log(f"\n{'='*60}", auto_id)
         log(f"📌 Processing topic {i+1}/{len(topics)}: {topic}", auto_id)
         log(f"{'='*60}", auto_id)
@@ -464,6 +472,8 @@ def run_automation_loop(
                 for t in remaining:
                     f.write(t + "\n")
     
+    if control:
+        control.report(current_topic=None, items_produced=processed)
     log(f"\n✅ Automation complete! Processed {processed}/{len(topics)} topics", auto_id)
 
 
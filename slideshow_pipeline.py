@@ -148,7 +148,8 @@ class SlideshowPipeline:
             bg_path = self.image_gen.generate_background(
                 visual_description=visual_desc,
                 scene_number=i + 1,
-                story_title=safe_topic
+                story_title=safe_topic,
+                return_image=True  # decoded image goes straight to the overlay
             )
             
             if bg_path:
@@ -167,7 +168,8 @@ class SlideshowPipeline:
             cta_bg_path = self.image_gen.generate_background(
                 visual_description=self.CTA_CONFIG["visual_description"],
                 scene_number=len(slides_data) + 1,
-                story_title="CTA_Philosophize_Me"
+                story_title="CTA_Philosophize_Me",
+                return_image=True
             )
             if not cta_bg_path:
                 # Fallback to solid dark background for CTA
@@ -249,7 +251,7 @@ class SlideshowPipeline:
             "total_slides": len(final_slides),
             "content_slides": len(slides_data),
             "slides": final_slides,
-            "backgrounds": backgrounds,
+            "backgrounds": [os.fspath(bg) for bg in backgrounds],
             "script": script,
             "elapsed_seconds": round(elapsed, 1)
         }
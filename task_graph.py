@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Task Graph - Small dependency-graph runner for the content pipelines.
+
+Pipeline stages declare what they depend on and independent stages run in
+parallel on thread pools. For a narration video that means the ElevenLabs
+voiceover and every slide image start as soon as the script exists, instead
+of the voiceover waiting for the last image:
+
+    script -> {audio, image_0 .. image_n} -> timing -> clips -> assembly
+
+Every node's start/end time is recorded so the critical path is visible.
+
+Usage:
+    from task_graph import TaskGraph
+
+    graph = TaskGraph("narration", pools={"images": 4, "audio": 1})
+    graph.add("script", generate_script)
+    graph.add("audio", make_audio, deps=["script"], pool="audio")
+    for i in range(7):
+        graph.add(f"image_{i}", make_image_fn(i), deps=["script"], pool="images")
+    graph.add("video", assemble, deps=["audio"] + [f"image_{i}" for i in range(7)])
+
+    results = graph.run()           # raises TaskGraphError if a node failed
+    graph.print_trace()
+
+Each node function is called with the results of its deps, in the order the
+deps were declared: assemble(audio_result, image_0_result, ...).
+"""
+
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional
+
+
+class TaskGraphError(Exception):
+    """A node failed; carries the node name and the original exception."""
+
+    def __init__(self, node: str, error: BaseException):
+        super().__init__(f"{node} failed: {error}")
+        self.node = node
+        self.error = error
+
+
+class TaskGraph:
+    """
+    Runs callables in dependency order, in parallel where the graph allows.
+
+    If a node raises, nodes that depend on it are skipped; unrelated nodes
+    still finish (so a failed voiceover doesn't throw away paid-for images).
+    """
+
+    DEFAULT_POOL = "default"
+
+    def __init__(
+        self,
+        name: str = "pipeline",
+        pools: Optional[Dict[str, int]] = None,
+        default_workers: int = 2,
+        t0: Optional[float] = None
+    ):
+        """
+        Args:
+            name: Label used in the printed trace
+            pools: {pool_name: max_workers}. Nodes choose a pool with pool=...
+            default_workers: Size of the pool used when a node names none
+            t0: time.time() that trace offsets are measured from (default:
+                when run() starts). Pass the pipeline start so stages that
+                ran before the graph line up with it.
+        """
+        self.name = name
+        self.pool_sizes = {self.DEFAULT_POOL: default_workers, **(pools or {})}
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.trace: List[Dict[str, Any]] = []
+        self._trace_lock = threading.Lock()
+        self._t0 = t0
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Optional[List[str]] = None, pool: str = DEFAULT_POOL) -> str:
+        """Declare a node. Deps must already have been added."""
+        if name in self._nodes:
+            raise ValueError(f"Duplicate task: {name}")
+        deps = list(deps or [])
+        for dep in deps:
+            if dep not in self._nodes:
+                raise ValueError(f"Task {name} depends on unknown task {dep}")
+        if pool not in self.pool_sizes:
+            raise ValueError(f"Unknown pool {pool} for task {name}")
+        self._nodes[name] = {"fn": fn, "deps": deps, "pool": pool}
+        return name
+
+    def _run_node(self, name: str) -> Any:
+        node = self._nodes[name]
+        args = [self.results[dep] for dep in node["deps"]]
+        start = time.time()
+        status = "ok"
+        try:
+            return node["fn"](*args)
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            end = time.time()
+            with self._trace_lock:
+                self.trace.append({
+                    "node": name,
+                    "pool": node["pool"],
+                    "start": round(start - self._t0, 3),
+                    "end": round(end - self._t0, 3),
+                    "duration": round(end - start, 3),
+                    "status": status,
+                })
+
+    def run(self, raise_on_error: bool = True) -> Dict[str, Any]:
+        """
+        Execute the graph.
+
+        Args:
+            raise_on_error: Raise TaskGraphError for the first failed node
+                (after everything runnable has finished)
+
+        Returns:
+            {node_name: result} for every node that completed
+        """
+        if self._t0 is None:
+            self._t0 = time.time()
+        executors = {
+            pool: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"{self.name}-{pool}")
+            for pool, size in self.pool_sizes.items()
+        }
+        remaining = {name: set(node["deps"]) for name, node in self._nodes.items()}
+        running = {}
+
+        try:
+            while remaining or running:
+                # Skip anything downstream of a failure (transitively)
+                blocked = set(self.errors) | self._skipped()
+                newly_blocked = True
+                while newly_blocked:
+                    newly_blocked = [n for n, deps in remaining.items() if deps & blocked]
+                    for name in newly_blocked:
+                        del remaining[name]
+                        blocked.add(name)
+                        with self._trace_lock:
+                            self.trace.append({"node": name, "pool": self._nodes[name]["pool"], "status": "skipped"})
+
+                for name in [n for n, deps in remaining.items() if deps <= set(self.results)]:
+                    del remaining[name]
+                    # Run in a copy of the caller's context so tracing spans nest under it
+                    future = executors[self._nodes[name]["pool"]].submit(
+                        contextvars.copy_context().run, self._run_node, name
+                    )
+                    running[future] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        self.errors[name] = e
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        if raise_on_error and self.errors:
+            first = min(self.errors, key=lambda n: self._trace_end(n))
+            raise TaskGraphError(first, self.errors[first])
+        return self.results
+
+    def _skipped(self) -> set:
+        return {entry["node"] for entry in self.trace if entry["status"] == "skipped"}
+
+    def _trace_end(self, name: str) -> float:
+        for entry in self.trace:
+            if entry["node"] == name and "end" in entry:
+                return entry["end"]
+        return float("inf")
+
+    def wall_time(self) -> float:
+        """Seconds from the first node starting to the last one finishing."""
+        ends = [entry["end"] for entry in self.trace if "end" in entry]
+        return max(ends) if ends else 0.0
+
+    def pool_wall_times(self) -> Dict[str, float]:
+        """Seconds from each pool's first node starting to its last one finishing."""
+        spans: Dict[str, List[float]] = {}
+        for entry in self.trace:
+            if "end" not in entry:
+                continue
+            span = spans.setdefault(entry["pool"], [entry["start"], entry["end"]])
+            span[0] = min(span[0], entry["start"])
+            span[1] = max(span[1], entry["end"])
+        return {pool: round(end - start, 3) for pool, (start, end) in spans.items()}
+
+    def print_trace(self):
+        """Print a per-node timeline (sorted by start time)."""
+        print(f"\n⏱️  {self.name} trace ({self.wall_time():.1f}s wall):")
+        for entry in sorted(self.trace, key=lambda e: e.get("start", float("inf"))):
+            if entry["status"] == "skipped":
+                print(f"   {entry['node']:<24} skipped")
+                continue
+            print(
+                f"   {entry['node']:<24} {entry['start']:>7.1f}s → {entry['end']:>7.1f}s "
+                f"({entry['duration']:.1f}s) [{entry['pool']}]"
+                + (" ❌" if entry["status"] == "failed" else "")
+            )
@@ -14,13 +14,15 @@ Templates define:
 """
 
 import os
-import fal_client
+from lazy_imports import lazy_module
 import requests
 from PIL import Image, ImageOps
 import io
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+fal_client = lazy_module("fal_client")  # imported on first use
+
 load_dotenv()
 
 
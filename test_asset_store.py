@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Content-addressed slide asset store test against a scratch SQLite database.
+
+Runs a slide through the same steps the image routes take (render to a
+working file, put_asset, point the slide at the blob, record a version) and
+checks that:
+1. Re-rendering identical pixels writes no new file and reuses the blob
+2. Many edits cycling through a few distinct images leave one file per
+   distinct image, however many versions exist
+3. Restoring a version only swaps pointers (no files written)
+4. Refcounts match a full recount after edits, reverts, blind updates of
+   expired rows and slide deletion
+5. The garbage collector removes exactly the unreferenced blobs
+6. Reusing an old unreferenced blob restarts its grace period, so the
+   collector keeps it for the slide about to point at it
+
+Usage:
+    python3 test_asset_store.py
+    python3 test_asset_store.py --edits 200
+"""
+
+import os
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+
+def render(path: Path, text: str, color=(30, 30, 60)) -> str:
+    """Stand-in for TextOverlay: a small slide with some text, written to the working path."""
+    img = Image.new("RGB", (270, 480), color)
+    ImageDraw.Draw(img).text((20, 200), text, fill=(255, 255, 255))
+    img.save(path, "PNG")
+    return str(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asset store test")
+    parser.add_argument("--edits", type=int, default=60, help="Font changes to apply")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/assets.db"
+    os.environ["DEBUG"] = "false"  # no SQL echo
+
+    from backend.app.database import init_db, SessionLocal
+    from backend.app.models import AssetBlob, Project, Slide
+    from backend.app.services.asset_store import collect_garbage, put_asset, recount_references
+
+    init_db()
+    slides_dir = workdir / "generated_slides"
+    slides_dir.mkdir()
+    failures = 0
+
+    def files() -> list:
+        return sorted(p.name for p in slides_dir.iterdir() if p.suffix == ".png")
+
+    def check_refcounts(label: str, db) -> None:
+        nonlocal failures
+        stored = {b.hash: b.refcount for b in db.query(AssetBlob).all()}
+        fixed = recount_references(db)
+        ok = fixed == 0
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {label}: refcounts {sorted(stored.values())}"
+              f"{'' if ok else f' ({fixed} wrong)'}")
+
+    db = SessionLocal()
+    try:
+        project = Project(name="Asset test")
+        db.add(project)
+        db.flush()
+        slide = Slide(project_id=project.id, order_index=1, title="Stoicism", current_font="social")
+        other = Slide(project_id=project.id, order_index=2, title="Stoicism", current_font="social")
+        db.add_all([slide, other])
+        db.commit()
+
+        def apply_font(target, font: str) -> str:
+            working = render(slides_dir / f"{target.id}_final.png", f"{target.title} / {font}")
+            target.final_image_path = put_asset(db, working).path
+            target.current_font = font
+            target.create_version(db=db, change_type="font_change", font=font)
+            db.commit()
+            return target.final_image_path
+
+        # 1: identical pixels
+        print("🖼️  Re-rendering identical pixels...")
+        first = apply_font(slide, "social")
+        second = apply_font(slide, "social")
+        same_on_other = apply_font(other, "social")
+        ok = first == second == same_on_other and len(files()) == 1
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} 3 renders -> {len(files())} file(s)")
+
+        # 2: many edits
+        fonts = ["social", "serif", "bold"]
+        print(f"\n✏️  {args.edits} font changes cycling through {len(fonts)} fonts...")
+        for i in range(args.edits):
+            apply_font(slide, fonts[i % len(fonts)])
+        versions = len(slide.versions)
+        ok = len(files()) == len(fonts)
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {versions} versions -> {len(files())} files")
+        check_refcounts("after edits", db)
+
+        # 3: restore is a pointer swap
+        print("\n⏪ Restoring version 1...")
+        before = {p: p.stat().st_mtime_ns for p in slides_dir.iterdir()}
+        version_1 = next(v for v in slide.versions if v.version_number == 1)
+        slide.restore_version(db, version_1)
+        db.commit()
+        after = {p: p.stat().st_mtime_ns for p in slides_dir.iterdir()}
+        ok = slide.final_image_path == first and before == after
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} slide points at version 1's blob, no files touched")
+        check_refcounts("after restore", db)
+
+        # 4: update of an expired row (previous pointer never loaded)
+        print("\n🙈 Pointer update on an expired row...")
+        slide_id = slide.id
+        db.expire_all()
+        db.get(Slide, slide_id).background_image_path = second
+        db.commit()
+        check_refcounts("after blind update", db)
+
+        # 5: deletion and GC
+        print("\n🗑️  Deleting the first slide and collecting garbage...")
+        db.delete(db.get(Slide, slide_id))
+        db.commit()
+        check_refcounts("after delete", db)
+        report = collect_garbage(db, grace_seconds=0, dry_run=True)
+        kept_files = files()
+        result = collect_garbage(db, grace_seconds=0)
+        remaining = files()
+        ok = (report["deleted"] == result["deleted"] == len(fonts) - 1
+              and len(kept_files) == len(fonts)
+              and remaining == [Path(other.final_image_path).name]
+              and db.query(AssetBlob).count() == 1)
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} dry run listed {report['deleted']}, GC deleted {result['deleted']} "
+              f"({result['freed_bytes']} bytes), {len(remaining)} file(s) left for the other slide")
+
+        # 6: reuse restarts the grace period
+        print("\n♻️  Reusing an unreferenced blob older than the grace period...")
+        orphan = put_asset(db, render(slides_dir / "orphan.png", "Orphan"))
+        db.commit()
+
+        def age(blob):
+            blob.created_at = datetime.utcnow() - timedelta(hours=2)
+            db.commit()
+
+        age(orphan)
+        reused = put_asset(db, render(slides_dir / "reuse.png", "Orphan"))
+        db.commit()  # the request is still rendering; its slide isn't committed yet
+        kept = collect_garbage(db)
+        ok = reused.hash == orphan.hash and kept["deleted"] == 0 and Path(reused.path).exists()
+        age(orphan)
+        swept = collect_garbage(db)
+        ok = ok and swept["deleted"] == 1 and not Path(orphan.path).exists()
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} kept while reused ({kept['deleted']} deleted), "
+              f"collected once old again ({swept['deleted']} deleted)")
+    finally:
+        db.close()
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All asset store checks passed")
+
+
+if __name__ == "__main__":
+    main()
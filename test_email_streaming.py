@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Streaming email test against a local SMTP sink (no network, no credentials).
+
+Checks that:
+1. A large video attachment arrives intact (parsed back with the email package)
+2. Peak Python memory while sending stays far below the attachment size
+3. Several sends inside EmailSender.session() share one SMTP login
+4. Slideshow attachments arrive as instagram_jpeg encodes
+5. Files above the link threshold fall back to attaching when GCS isn't set up
+6. A non-ASCII file name is RFC 2231 encoded (the message stays 7-bit) and
+   arrives intact
+
+Usage:
+    python3 test_email_streaming.py             # 50 MB video
+    python3 test_email_streaming.py --size 10   # smaller video
+"""
+
+import os
+import sys
+import email
+import hashlib
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import socketserver
+from email import policy
+
+from email_sender import EmailSender
+
+
+class SinkState:
+    def __init__(self, spool_dir: str):
+        self.spool_dir = spool_dir
+        self.connections = 0
+        self.logins = 0
+        self.messages = []   # paths of received messages (dot-unstuffed)
+        self.lock = threading.Lock()
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP (EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT)."""
+
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        state: SinkState = self.server.state
+        with state.lock:
+            state.connections += 1
+        self.reply("220 sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.wfile.write(b"250-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif verb == "HELO":
+                self.reply("250 sink")
+            elif verb == "AUTH":
+                with state.lock:
+                    state.logins += 1
+                self.reply("235 authenticated")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                # Spool to disk so the sink doesn't count towards the sender's memory
+                with state.lock:
+                    spool_path = os.path.join(state.spool_dir, f"message_{len(state.messages)}.eml")
+                    state.messages.append(spool_path)
+                with open(spool_path, "wb") as spool:
+                    while True:
+                        data_line = self.rfile.readline()
+                        if data_line in (b".\r\n", b""):
+                            break
+                        if data_line.startswith(b".."):
+                            data_line = data_line[1:]
+                        spool.write(data_line)
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+def start_sink(spool_dir: str):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPSinkHandler)
+    server.daemon_threads = True
+    server.state = SinkState(spool_dir)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_sender(port: int, link_threshold_mb: float = 1000) -> EmailSender:
+    os.environ.setdefault("EMAIL_USER", "bot@example.com")
+    os.environ.setdefault("EMAIL_PASSWORD", "sink-password")
+    return EmailSender(
+        smtp_server="127.0.0.1",
+        smtp_port=port,
+        use_ssl=False,
+        link_threshold_mb=link_threshold_mb
+    )
+
+
+def attachments_of(path: str):
+    with open(path, "rb") as f:
+        msg = email.message_from_binary_file(f, policy=policy.default)
+    return msg, [(part.get_filename(), part.get_payload(decode=True)) for part in msg.iter_attachments()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming email test")
+    parser.add_argument("--size", type=int, default=50, help="Video size in MB")
+    args = parser.parse_args()
+
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = start_sink(tmp)
+        port = sink.server_address[1]
+        print(f"📮 SMTP sink listening on 127.0.0.1:{port}")
+
+        video_path = os.path.join(tmp, "narration_video.mp4")
+        with open(video_path, "wb") as f:
+            for _ in range(args.size):
+                f.write(os.urandom(1024 * 1024))
+        with open(video_path, "rb") as f:
+            video_sha = hashlib.sha256(f.read()).hexdigest()
+
+        # 1 + 2: large attachment, memory
+        print(f"\n🎥 Sending {args.size} MB video...")
+        sender = make_sender(port)
+        tracemalloc.start()
+        ok = sender.send_video(video_path, subject="Streaming test 🎥", caption="Line one\n.line starting with a dot")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        msg, parts = attachments_of(sink.state.messages[-1])
+        received_sha = hashlib.sha256(parts[0][1]).hexdigest() if parts else None
+        print(f"   Sent: {ok}, peak traced memory: {peak / 1024 / 1024:.1f} MB")
+        if not ok or received_sha != video_sha:
+            print("   ❌ Attachment did not round-trip")
+            failures += 1
+        else:
+            print(f"   ✅ Attachment intact ({parts[0][0]})")
+        if ".line starting with a dot" not in msg.get_body(("plain",)).get_content():
+            print("   ❌ Body text was mangled")
+            failures += 1
+        if peak > 16 * 1024 * 1024:
+            print("   ❌ Peak memory grew with the attachment size")
+            failures += 1
+
+        # 3 + 4: session reuse with a slideshow in between
+        print("\n🔁 Three sends in one session...")
+        from PIL import Image
+        slide_paths = []
+        for i in range(3):
+            slide_path = os.path.join(tmp, f"slide_{i}.png")
+            Image.new("RGB", (1080, 1920), (30 * i, 60, 90)).save(slide_path)
+            slide_paths.append(slide_path)
+
+        connections_before = sink.state.connections
+        logins_before = sink.state.logins
+        messages_before = len(sink.state.messages)
+        sender = make_sender(port)
+        with sender.session():
+            sender.send_video(video_path, subject="Session 1")
+            sender.send_slideshow(slide_paths, subject="Session 2", hashtags=["philosophy"])
+            sender.send_video(video_path, subject="Session 3")
+
+        sent = len(sink.state.messages) - messages_before
+        logins = sink.state.logins - logins_before
+        connections = sink.state.connections - connections_before
+        print(f"   Messages: {sent}, connections: {connections}, logins: {logins}")
+        if sent != 3 or connections != 1 or logins != 1:
+            print("   ❌ Session was not reused")
+            failures += 1
+        else:
+            print("   ✅ One connection, one login")
+
+        _, slide_parts = attachments_of(sink.state.messages[messages_before + 1])
+        names = [name for name, _ in slide_parts]
+        if len(slide_parts) != 3 or not all(name.endswith(".jpg") for name in names):
+            print(f"   ❌ Unexpected slideshow attachments: {names}")
+            failures += 1
+        else:
+            print(f"   ✅ Slides attached as JPEG: {names}")
+
+        # 5: link threshold without GCS falls back to attaching
+        print("\n🔗 Threshold without GCS...")
+        sender = make_sender(port, link_threshold_mb=1)
+        ok = sender.send_video(video_path, subject="Threshold")
+        _, parts = attachments_of(sink.state.messages[-1])
+        if not ok or not parts:
+            print("   ❌ Large file was dropped instead of attached")
+            failures += 1
+        else:
+            print("   ✅ Attached (no GCS available for a link)")
+
+        # 6: non-ASCII attachment name
+        print("\n🔤 Non-ASCII file name...")
+        accented_path = os.path.join(tmp, "Épictète_et_la_liberté_intérieure.mp4")
+        with open(accented_path, "wb") as f:
+            f.write(os.urandom(4096))
+        ok = make_sender(port).send_video(accented_path, subject="Accents")
+        with open(sink.state.messages[-1], "rb") as f:
+            raw = f.read()
+        _, parts = attachments_of(sink.state.messages[-1])
+        name = parts[0][0] if parts else None
+        if not ok or name != os.path.basename(accented_path) or not raw.isascii():
+            print(f"   ❌ Name arrived as {name!r} (7-bit message: {raw.isascii()})")
+            failures += 1
+        else:
+            print(f"   ✅ {name} (encoded as filename*=utf-8'')")
+
+        sink.shutdown()
+
+    print("\n" + ("✅ All email streaming checks passed" if not failures else f"❌ {failures} check(s) failed"))
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
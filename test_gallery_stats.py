@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Gallery stats test against a scratch SQLite database.
+
+Fills gallery_items through ordinary ORM sessions (adds, status/type/project
+changes, deletes, a bulk clear) and checks that:
+1. compute_gallery_stats (one grouped query) matches a naive per-value count
+2. The maintained counters (get_gallery_stats) match it after every kind of
+   change, including ones that force a rebuild
+3. Each stats call issues a single SELECT, and reading the counters doesn't
+   get slower as items and projects grow
+
+Usage:
+    python3 test_gallery_stats.py
+    python3 test_gallery_stats.py --items 100000 --projects 20000
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+
+TYPES = ["slide", "script", "prompt", "image", "project", "video"]
+STATUSES = ["complete", "draft", "failed", "archived"]
+
+
+def naive_stats(db, GalleryItem) -> dict:
+    """The stats endpoint's original one-COUNT-per-value approach, over every value present."""
+    types = {t: db.query(GalleryItem).filter(GalleryItem.item_type == t).count() for t in TYPES}
+    statuses = {s: db.query(GalleryItem).filter(GalleryItem.status == s).count() for s in STATUSES}
+    projects = db.query(GalleryItem.project_id).filter(GalleryItem.project_id.isnot(None)).distinct().count()
+    return {
+        "total": db.query(GalleryItem).count(),
+        "by_type": {t: c for t, c in types.items() if c or t != "video"},
+        "by_status": {s: c for s, c in statuses.items() if c or s != "archived"},
+        "unique_projects": projects,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gallery stats test")
+    parser.add_argument("--items", type=int, default=20000, help="Gallery items to create")
+    parser.add_argument("--projects", type=int, default=4000, help="Distinct project ids")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/gallery.db"
+    os.environ["DEBUG"] = "false"  # no SQL echo
+
+    from sqlalchemy import event
+    from backend.app.database import engine, init_db, SessionLocal
+    from backend.app.models import GalleryItem
+    from backend.app.services.gallery_stats import compute_gallery_stats, get_gallery_stats
+
+    init_db()
+    rng = random.Random(3)
+    failures = 0
+
+    selects = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *rest: selects.append(statement)
+                 if statement.lstrip().upper().startswith("SELECT") else None)
+
+    def check(label: str, db):
+        nonlocal failures
+        expected = naive_stats(db, GalleryItem)
+        del selects[:]
+        grouped = compute_gallery_stats(db)
+        grouped_queries = len(selects)
+        del selects[:]
+        counted = get_gallery_stats(db)
+        counter_queries = len(selects)
+        ok = grouped == expected and counted == expected and grouped_queries == 1
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {label}: total {expected['total']}, "
+              f"{expected['unique_projects']} projects "
+              f"({grouped_queries} grouped query, {counter_queries} counter query)")
+        if not ok:
+            print(f"      expected {expected}\n      grouped  {grouped}\n      counters {counted}")
+
+    def random_item(i: int):
+        return GalleryItem(
+            item_type=rng.choice(TYPES),
+            status=rng.choice(STATUSES) if i % 5 else None if i % 10 else "complete",
+            project_id=f"project-{rng.randrange(args.projects)}" if i % 3 else None,
+            title=f"Item {i}",
+        )
+
+    print("🗂️  Counter maintenance...")
+    db = SessionLocal()
+    try:
+        check("empty (counters built)", db)
+
+        db.add_all(random_item(i) for i in range(200))
+        db.commit()
+        check("200 adds", db)
+
+        items = db.query(GalleryItem).all()
+        for item in rng.sample(items, 40):
+            item.status = rng.choice(STATUSES)
+        for item in rng.sample(items, 20):
+            item.item_type = rng.choice(TYPES)
+        for item in rng.sample(items, 20):
+            item.project_id = rng.choice([None, "project-new", f"project-{rng.randrange(args.projects)}"])
+        for item in rng.sample(items, 10):
+            item.title = "retitled only"
+        db.commit()
+        check("status/type/project edits", db)
+
+        for item in rng.sample(db.query(GalleryItem).all(), 50):
+            db.delete(item)
+        db.commit()
+        check("50 deletes", db)
+
+        # Expired after commit: the previous status was never loaded
+        db.query(GalleryItem).filter(GalleryItem.status == "draft").update({"status": "complete"})
+        item = db.query(GalleryItem).first()
+        db.commit()
+        item.status = "failed"
+        db.add(random_item(1))
+        db.commit()
+        check("bulk update + blind edit (rebuilt)", db)
+
+        db.query(GalleryItem).delete()
+        db.commit()
+        check("clear all (rebuilt)", db)
+    finally:
+        db.close()
+
+    print(f"\n⏱️  Stats cost as the gallery grows to {args.items:,} items...")
+    db = SessionLocal()
+    try:
+        timings = []
+        batch = args.items // 4
+        for step in range(4):
+            db.add_all(random_item(i) for i in range(step * batch, (step + 1) * batch))
+            db.commit()
+            get_gallery_stats(db)  # warm
+            started = time.perf_counter()
+            for _ in range(50):
+                get_gallery_stats(db)
+            counters_ms = (time.perf_counter() - started) / 50 * 1000
+            started = time.perf_counter()
+            compute_gallery_stats(db)
+            grouped_ms = (time.perf_counter() - started) * 1000
+            timings.append(counters_ms)
+            print(f"   {(step + 1) * batch:>8,} items: counters {counters_ms:.2f} ms, grouped query {grouped_ms:.1f} ms")
+        check("final", db)
+        if timings[-1] > max(timings[0] * 2, timings[0] + 1):
+            print("   ❌ Counter reads slowed down with the table")
+            failures += 1
+        else:
+            print("   ✅ Counter reads stay flat")
+    finally:
+        db.close()
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All gallery stats checks passed")
+
+
+if __name__ == "__main__":
+    main()
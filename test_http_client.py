@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP client test against a local HTTP/1.1 server that counts connections.
+
+Checks that:
+1. Repeated calls through the shared session reuse one keep-alive connection
+   (bare requests.get opens one per call)
+2. download() streams to disk: peak Python memory stays far below the body size
+3. Streaming into an open file works (the image generators' path)
+4. A 503 answer to a GET is retried; a POST is not resent
+5. The default timeout applies to calls that don't pass one
+
+Usage:
+    python3 test_http_client.py
+    python3 test_http_client.py --calls 200 --mb 64
+"""
+
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+
+def make_server(body_mb: int):
+    """Server with /ping, /big (body_mb of data), /flaky (503 then 200) and /slow endpoints."""
+    stats = {"connections": 0, "flaky": 0, "posts": 0}
+    lock = threading.Lock()
+    block = bytes(range(256)) * 4096  # 1 MB
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with lock:
+                stats["connections"] += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body: bytes = b"ok"):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/big":
+                self.send_response(200)
+                self.send_header("Content-Length", str(body_mb * len(block)))
+                self.end_headers()
+                for _ in range(body_mb):
+                    self.wfile.write(block)
+            elif self.path == "/flaky":
+                with lock:
+                    stats["flaky"] += 1
+                    first = stats["flaky"] == 1
+                self._reply(503 if first else 200)
+            elif self.path == "/slow":
+                time.sleep(1.5)
+                self._reply(200)
+            else:
+                self._reply(200)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                stats["posts"] += 1
+            self._reply(503)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, address: None  # clients that timed out hang up mid-reply
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled HTTP client test")
+    parser.add_argument("--calls", type=int, default=50, help="Requests per connection check")
+    parser.add_argument("--mb", type=int, default=32, help="Download size in MB")
+    args = parser.parse_args()
+
+    import http_client
+    from http_client import PooledSession, download, get_session
+
+    server, stats = make_server(args.mb)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    failures = 0
+
+    # 1: connection reuse
+    print(f"🔌 {args.calls} calls, bare requests vs shared session...")
+    stats["connections"] = 0
+    started = time.perf_counter()
+    for _ in range(args.calls):
+        requests.get(f"{base}/ping").raise_for_status()
+    bare_ms = (time.perf_counter() - started) * 1000
+    bare = stats["connections"]
+
+    stats["connections"] = 0
+    session = get_session()
+    started = time.perf_counter()
+    for _ in range(args.calls):
+        session.get(f"{base}/ping").raise_for_status()
+    pooled_ms = (time.perf_counter() - started) * 1000
+    pooled = stats["connections"]
+    ok = bare == args.calls and pooled == 1 and get_session() is session
+    failures += not ok
+    print(f"   {'✅' if ok else '❌'} bare: {bare} connections ({bare_ms:.0f} ms), "
+          f"session: {pooled} connection ({pooled_ms:.0f} ms)")
+
+    # 2: streaming download to disk
+    print(f"\n💾 Downloading {args.mb} MB to disk...")
+    workdir = Path(tempfile.mkdtemp())
+    target = workdir / "clips" / "video.mp4"
+    tracemalloc.start()
+    download(f"{base}/big", target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = target.stat().st_size
+    leftovers = [p.name for p in target.parent.iterdir() if p.name.endswith(".part")]
+    ok = size == args.mb * 1024 * 1024 and peak < size / 4 and not leftovers
+    failures += not ok
+    print(f"   {'✅' if ok else '❌'} {size / 1e6:.0f} MB written, peak Python memory {peak / 1e6:.1f} MB")
+
+    # 3: streaming into an open file
+    print("\n🖼️  Downloading into an open temporary file...")
+    with tempfile.TemporaryFile() as buffer:
+        returned = download(f"{base}/big", buffer)
+        ok = returned is buffer and buffer.tell() == 0 and len(buffer.read()) == size
+    failures += not ok
+    print(f"   {'✅' if ok else '❌'} buffer filled and rewound")
+
+    # 4: retries
+    print("\n🔁 Retries...")
+    response = session.get(f"{base}/flaky")
+    ok = response.status_code == 200 and stats["flaky"] == 2
+    failures += not ok
+    print(f"   {'✅' if ok else '❌'} GET 503 -> retried -> {response.status_code} ({stats['flaky']} attempts)")
+    response = session.post(f"{base}/post", json={"publish_id": "x"})
+    ok = response.status_code == 503 and stats["posts"] == 1
+    failures += not ok
+    print(f"   {'✅' if ok else '❌'} POST 503 returned as-is ({stats['posts']} attempt)")
+
+    # 5: default timeout
+    print("\n⏱️  Default timeout...")
+    impatient = PooledSession(timeout=(1, 0.5), max_retries=0)
+    try:
+        impatient.get(f"{base}/slow")
+        ok = False
+    except requests.Timeout:
+        ok = True
+    patient = impatient.get(f"{base}/slow", timeout=5).status_code == 200
+    ok = ok and patient and session.timeout == http_client.DEFAULT_TIMEOUT
+    failures += not ok
+    print(f"   {'✅' if ok else '❌'} calls without a timeout time out; an explicit timeout overrides it")
+
+    server.shutdown()
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All HTTP client checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash dedupe index test (no network, temporary databases only).
+
+Checks that:
+1. Resized and re-encoded (JPEG) copies of an image hash within max_distance
+   of the original, while different images do not
+2. Lookups stay under 1 ms with a few hundred thousand entries, and find the
+   same matches as a brute-force scan
+3. The SQLite-backed index reloads its entries and honours remove/remove_prefix
+4. Reference frame extraction keeps one frame per distinct slide
+
+Usage:
+    python3 test_image_dedupe.py
+    python3 test_image_dedupe.py --entries 500000 --queries 5000
+"""
+
+import io
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from image_dedupe import PerceptualIndex, dhash, phash, hamming, DEFAULT_MAX_DISTANCE
+
+
+def make_image(seed: int, size=(1080, 1920)) -> Image.Image:
+    """A smooth random 'painting' (blurred noise) so hashes see real structure."""
+    rng = np.random.RandomState(seed)
+    small = Image.fromarray((rng.rand(12, 8, 3) * 255).astype("uint8"))
+    return small.resize(size, Image.Resampling.BICUBIC).filter(ImageFilter.GaussianBlur(20))
+
+
+def jpeg_copy(image: Image.Image, quality: int = 70) -> Image.Image:
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+def random_near(rng: random.Random, value: int, bits: int) -> int:
+    for position in rng.sample(range(64), bits):
+        value ^= 1 << position
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceptual-hash dedupe index test")
+    parser.add_argument("--entries", type=int, default=300_000, help="Random hashes in the index")
+    parser.add_argument("--queries", type=int, default=2000, help="Lookups to time")
+    args = parser.parse_args()
+
+    failures = 0
+
+    # 1: hash robustness
+    print("🖼️  Hashing copies...")
+    originals = [make_image(seed) for seed in range(6)]
+    for name, fn in (("phash", phash), ("dhash", dhash)):
+        hashes = [fn(img) for img in originals]
+        copies = [max(hamming(h, fn(img.resize((540, 960)))), hamming(h, fn(jpeg_copy(img))))
+                  for h, img in zip(hashes, originals)]
+        others = [hamming(a, b) for i, a in enumerate(hashes) for b in hashes[i + 1:]]
+        ok = max(copies) <= DEFAULT_MAX_DISTANCE < min(others)
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {name}: copies within {max(copies)} bits, "
+              f"different images at least {min(others)} apart")
+
+    # 2: lookup speed and correctness
+    print(f"\n⚡ {args.queries} lookups in {args.entries:,} entries...")
+    rng = random.Random(7)
+    index = PerceptualIndex()
+    started = time.perf_counter()
+    stored = []
+    for i in range(args.entries):
+        value = rng.getrandbits(64)
+        stored.append(value)
+        index.add(f"bg_{i}", value)
+    print(f"   built in {time.perf_counter() - started:.1f}s")
+
+    queries = [random_near(rng, rng.choice(stored), rng.randint(0, DEFAULT_MAX_DISTANCE)) for _ in range(args.queries // 2)]
+    queries += [rng.getrandbits(64) for _ in range(args.queries - len(queries))]
+    started = time.perf_counter()
+    results = [index.find(q) for q in queries]
+    per_lookup = (time.perf_counter() - started) / len(queries) * 1000
+    print(f"   {per_lookup:.3f} ms per lookup")
+    if per_lookup >= 1.0:
+        print("   ❌ Lookups slower than 1 ms")
+        failures += 1
+
+    checked = queries[:20] + queries[-20:]
+    wrong = 0
+    for q, found in zip(checked, results[:20] + results[-20:]):
+        expected = sorted(f"bg_{i}" for i, v in enumerate(stored) if hamming(q, v) <= DEFAULT_MAX_DISTANCE)
+        wrong += sorted(m.key for m in found) != expected
+    if wrong or not all(results[: args.queries // 2]):
+        print(f"   ❌ {wrong} lookups disagree with a brute-force scan")
+        failures += 1
+    else:
+        print("   ✅ Matches agree with a brute-force scan")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 3: persistence
+        print("\n💾 Persistence...")
+        db_path = Path(tmp) / "index.db"
+        index = PerceptualIndex(db_path)
+        for i, img in enumerate(originals):
+            index.add(f"ref_{i % 2}/slide_{i:03d}.jpg", img, url=f"gs://bucket/{i}.png")
+        index.remove("ref_0/slide_000.jpg")
+        index.remove_prefix("ref_1/")
+        reloaded = PerceptualIndex(db_path)
+        match = reloaded.match(originals[2].resize((540, 960)))
+        if len(reloaded) != 2 or not match or match.key != "ref_0/slide_002.jpg" or match.meta["url"] != "gs://bucket/2.png":
+            print(f"   ❌ Reloaded index wrong ({len(reloaded)} entries, match {match})")
+            failures += 1
+        else:
+            print("   ✅ Entries, removals and meta survive a reload")
+
+        # 4: reference frames
+        print("\n🎞️  Reference frame dedupe...")
+        import reference_scraper
+        reference_scraper._frame_index = PerceptualIndex(Path(tmp) / "frames.db")
+        frames_dir = Path(tmp) / "ref" / "frames"
+        frames_dir.mkdir(parents=True)
+        # Three slides, each held long enough to be captured 2-3 times
+        sequence = [0, 0, 0, 1, 1, 2, 2, 2]
+        frames = []
+        for n, slide in enumerate(sequence, start=1):
+            path = frames_dir / f"slide_{n:03d}.jpg"
+            originals[slide].save(path, "JPEG", quality=85 + n)
+            frames.append(str(path))
+        kept = reference_scraper.dedupe_frames("ref", frames)
+        names = sorted(p.name for p in frames_dir.iterdir())
+        if [Path(k).name for k in kept] != ["slide_001.jpg", "slide_002.jpg", "slide_003.jpg"] or names != [Path(k).name for k in kept]:
+            print(f"   ❌ Expected 3 renumbered frames, got {names}")
+            failures += 1
+        else:
+            print(f"   ✅ {len(frames)} extracted frames -> {len(kept)} distinct slides")
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All dedupe checks passed")
+
+
+if __name__ == "__main__":
+    main()
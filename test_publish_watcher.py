@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+TikTok publish watcher test against a scratch SQLite database.
+
+A scripted stand-in for TikTokPoster plays TikTok's side: each publish goes
+PROCESSING_DOWNLOAD -> SEND_TO_USER_INBOX after a few checks, and the test
+"publishes" drafts from the inbox when it wants room. Checks that:
+1. Backoff delays double up to the cap, with jitter inside [delay/2, delay]
+2. Posting more runs than the pending-share limit defers the extra ones
+   without calling TikTok
+3. Polling on simulated time follows every publish to the inbox with far
+   fewer status calls than fixed-interval polling, one token check per tick,
+   and writes the transitions to the runs and the WebSocket channel
+4. Publishing drafts frees room and the deferred runs get posted
+5. A failed publish fails its run with TikTok's reason
+6. TikTok's own limit error defers the post and pauses posting, for every
+   session, until the cooldown ends
+
+Usage:
+    python3 test_publish_watcher.py
+    python3 test_publish_watcher.py --runs 12
+"""
+
+import os
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+
+class ScriptedTikTok:
+    """Stand-in for TikTokPoster: publishes reach the inbox after `processing_checks` checks."""
+
+    def __init__(self, processing_checks: int = 4):
+        self.processing_checks = processing_checks
+        self.checks = {}
+        self.published = set()
+        self.failing = set()
+        self.posts = self.status_calls = self.token_checks = 0
+        self.limit_error = False
+
+    def ensure_valid_token(self) -> bool:
+        self.token_checks += 1
+        return True
+
+    def post_photo_slideshow(self, image_paths, caption, **kwargs) -> dict:
+        if self.limit_error:
+            return {"success": False, "error": "spam_risk_too_many_pending_share: too many pending"}
+        self.posts += 1
+        return {"success": True, "publish_id": f"p_{self.posts:04d}", "status": "processing"}
+
+    def check_post_status(self, publish_id: str) -> dict:
+        self.status_calls += 1
+        self.checks[publish_id] = self.checks.get(publish_id, 0) + 1
+        if publish_id in self.failing:
+            return {"success": True, "status": "FAILED", "fail_reason": "picture_size_check_failed"}
+        if publish_id in self.published:
+            return {"success": True, "status": "PUBLISH_COMPLETE", "publicaly_available_post_id": [1]}
+        if self.checks[publish_id] <= self.processing_checks:
+            return {"success": True, "status": "PROCESSING_DOWNLOAD"}
+        return {"success": True, "status": "SEND_TO_USER_INBOX"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish watcher test")
+    parser.add_argument("--runs", type=int, default=8, help="Completed runs to post")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/watcher.db"
+    os.environ["DEBUG"] = "false"  # no SQL echo
+
+    from backend.app.database import init_db, SessionLocal
+    from backend.app.models import Automation, AutomationRun, TikTokPublish
+    from backend.app.services import publish_watcher as watcher
+    from backend.app.websocket.progress import manager
+
+    init_db()
+    failures = 0
+    events = []
+    manager.publish_threadsafe = lambda channel, data: events.append((channel, data))
+
+    def report(ok: bool, message: str):
+        nonlocal failures
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {message}")
+
+    # 1: backoff
+    print("⏳ Backoff delays...")
+    rng = random.Random(7)
+    delays = [watcher.backoff_delay(n, rng) for n in range(10)]
+    caps = [min(watcher.MAX_BACKOFF_SECONDS, watcher.FIRST_CHECK_SECONDS * 2 ** n) for n in range(10)]
+    ok = all(cap / 2 <= d <= cap for d, cap in zip(delays, caps)) and len(set(round(d, 3) for d in delays)) == 10
+    report(ok, "delays " + ", ".join(f"{d:.0f}s" for d in delays))
+
+    tiktok = ScriptedTikTok()
+    db = SessionLocal()
+    try:
+        automation = Automation(name="Watcher test", topics=[])
+        db.add(automation)
+        db.flush()
+        runs = [AutomationRun(automation_id=automation.id, topic=f"Topic {i}", status="completed",
+                              image_paths=["a.png", "b.png"]) for i in range(args.runs)]
+        db.add_all(runs)
+        db.commit()
+
+        # 2: deferral at the limit
+        print(f"\n📮 Posting {args.runs} runs (limit {watcher.PENDING_SHARE_LIMIT})...")
+        for run in runs:
+            watcher.post_run(db, run, poster=tiktok)
+            db.commit()
+        deferred = [r for r in runs if r.tiktok_post_status == "deferred"]
+        expected_posted = min(args.runs, watcher.PENDING_SHARE_LIMIT)
+        ok = tiktok.posts == expected_posted and len(deferred) == args.runs - expected_posted
+        report(ok, f"{tiktok.posts} sent, {len(deferred)} deferred, pending {watcher.pending_count(db)}")
+
+        # 3: polling on simulated time
+        print("\n🔁 Polling until every draft reaches the inbox...")
+        now = datetime.utcnow()
+        ticks = 0
+        while ticks < 400 and watcher.pending_count(db) and any(
+                p.state == "processing" for p in db.query(TikTokPublish).all()):
+            now += timedelta(seconds=watcher.TICK_SECONDS)
+            watcher.poll_due(db, poster=tiktok, now=now)
+            ticks += 1
+        publishes = db.query(TikTokPublish).all()
+        elapsed = (now - datetime.utcnow()).total_seconds()
+        fixed_interval_calls = len(publishes) * elapsed / watcher.FIRST_CHECK_SECONDS
+        posted_runs = [r for r in runs if r.tiktok_publish_id]
+        ok = (all(p.state == "inbox" for p in publishes)
+              and all(r.tiktok_post_status == "success" for r in posted_runs)
+              and tiktok.status_calls < fixed_interval_calls / 3
+              and tiktok.token_checks <= ticks)
+        report(ok, f"{len(publishes)} in the inbox after {elapsed:.0f}s simulated: {tiktok.status_calls} status "
+                   f"calls (every {watcher.FIRST_CHECK_SECONDS}s would be ~{fixed_interval_calls:.0f})")
+        inbox_events = [e for c, e in events if e["state"] == "inbox"]
+        ok = (len(inbox_events) == len(publishes) and all(c == "__global__" for c, _ in events)
+              and all(e["run_id"] and e["automation_id"] == automation.id for e in inbox_events))
+        report(ok, f"{len(events)} WebSocket events on the global channel")
+
+        # 4: drafts published -> deferred runs go out
+        print("\n📤 Creator publishes two drafts...")
+        tiktok.published.update(p.publish_id for p in publishes[:2])
+        for p in publishes[:2]:
+            p.next_check_at = now
+        db.commit()
+        watcher.poll_due(db, poster=tiktok, now=now)
+        sent = watcher.post_deferred(db, poster=tiktok)
+        still_deferred = len(watcher.deferred_runs(db))
+        ok = (sent == min(2, len(deferred)) and still_deferred == len(deferred) - sent
+              and watcher.pending_count(db) == watcher.PENDING_SHARE_LIMIT)
+        report(ok, f"{sent} deferred runs posted, {still_deferred} still waiting, "
+                   f"pending {watcher.pending_count(db)}")
+
+        # 5: a failed publish
+        print("\n💥 TikTok fails a publish...")
+        victim = next(r for r in runs if r.tiktok_publish_id and r.tiktok_post_status != "success")
+        tiktok.failing.add(victim.tiktok_publish_id)
+        db.get(TikTokPublish, victim.tiktok_publish_id).next_check_at = now
+        db.commit()
+        watcher.poll_due(db, poster=tiktok, now=now)
+        ok = victim.tiktok_post_status == "failed" and victim.tiktok_error == "picture_size_check_failed"
+        report(ok, f"run {victim.id[:8]} -> {victim.tiktok_post_status} ({victim.tiktok_error})")
+
+        # 6: TikTok's own limit error
+        print("\n🚧 TikTok reports the limit first (drafts made elsewhere)...")
+        tiktok.published.update(p.publish_id for p in db.query(TikTokPublish).all())
+        for p in db.query(TikTokPublish).filter(TikTokPublish.next_check_at.isnot(None)):
+            p.next_check_at = now
+        db.commit()
+        watcher.poll_due(db, poster=tiktok, now=now)
+        extra = AutomationRun(automation_id=automation.id, topic="Extra", status="completed",
+                              image_paths=["a.png", "b.png"])
+        db.add(extra)
+        db.commit()
+        tiktok.limit_error = True
+        result = watcher.post_run(db, extra, poster=tiktok)
+        db.commit()
+        posts_before = tiktok.posts
+        tiktok.limit_error = False
+        paused = watcher.capacity(db)
+        again = watcher.post_deferred(db, poster=tiktok)
+        ok = (result.get("deferred") and extra.tiktok_post_status == "deferred" and paused["available"] == 0
+              and again == 0 and tiktok.posts == posts_before)
+        report(ok, f"deferred with room for {watcher.PENDING_SHARE_LIMIT - paused['pending']} on our count; "
+                   f"posting paused: {paused['reason']}")
+        other = SessionLocal()  # another worker, or the app after a restart
+        try:
+            ok = watcher.capacity(other)["available"] == 0 and watcher.capacity(
+                other, now=datetime.utcnow() + watcher.LIMIT_COOLDOWN)["available"] > 0
+        finally:
+            other.close()
+        report(ok, f"the pause is stored and lifts after {watcher.LIMIT_COOLDOWN}")
+    finally:
+        db.close()
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All publish watcher checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Script cache and batch generation test against a stub Gemini client (no API key, no network).
+
+The stub client counts generate_content calls, tracks how many run at once
+and answers in the shapes models actually produce (fenced, with prose around
+the JSON, or broken). Checks that:
+1. extract_json finds the JSON in fenced / chatty / trailing-text responses
+2. A repeated request is served from the cache, also by a new handler
+   (a restart), while a different slide count or model calls the model again
+   refresh=True (regenerate) skips the read but replaces the cached script
+3. generate_scripts_batch runs topics concurrently, never more than
+   max_concurrency at once, and generates a repeated topic only once
+4. A failed topic returns None, isn't cached, and is retried on the next batch
+
+Usage:
+    python3 test_script_cache.py
+    python3 test_script_cache.py --topics 20 --concurrency 4
+"""
+
+import sys
+import json
+import time
+import types
+import argparse
+import tempfile
+import threading
+import importlib.machinery
+
+from lazy_imports import is_available
+
+
+def ensure_genai_types():
+    """Use the real SDK when installed; otherwise a stand-in for the config types the handler builds."""
+    if is_available("google.genai"):
+        return
+    for name in ("google", "google.genai", "google.genai.types"):
+        module = sys.modules.get(name) or types.ModuleType(name)
+        module.__spec__ = importlib.machinery.ModuleSpec(name, None)
+        module.__path__ = []
+        sys.modules[name] = module
+    genai, genai_types = sys.modules["google.genai"], sys.modules["google.genai.types"]
+    genai_types.GenerateContentConfig = lambda **kwargs: types.SimpleNamespace(**kwargs)
+    genai.Client = lambda **kwargs: None
+    genai.types = genai_types
+
+
+class StubModels:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.broken_topics = set()
+
+    def generate_content(self, model="", contents="", config=None, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            topic = next((t for t in self.broken_topics if t in contents), None)
+            if topic:
+                return types.SimpleNamespace(text="Sorry, I can't write about that {right now}.")
+            script = {"title": "Stub", "scenes": [{"text": "one two three", "visual_description": "[a cave]"}]}
+            return types.SimpleNamespace(text=f"Here is your script:\n```json\n{json.dumps(script)}\n```\nEnjoy!")
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class StubClient:
+    def __init__(self, delay: float = 0.0):
+        self.models = StubModels(delay)
+
+
+def make_handler(cache_dir: str, delay: float = 0.0):
+    import gemini_handler
+    from script_cache import ScriptCache
+    # The handler builds its client in __init__; hand it the stub instead so the
+    # test never touches the real SDK (which refuses to start without a key)
+    real_genai = gemini_handler.genai
+    gemini_handler.genai = types.SimpleNamespace(Client=lambda **kwargs: StubClient(delay))
+    try:
+        handler = gemini_handler.GeminiHandler()
+    finally:
+        gemini_handler.genai = real_genai
+    handler.script_cache = ScriptCache(cache_dir, enabled=True)
+    return handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Script cache and batch generation test")
+    parser.add_argument("--topics", type=int, default=12, help="Distinct topics in the batch")
+    parser.add_argument("--concurrency", type=int, default=3, help="max_concurrency for the batch")
+    parser.add_argument("--delay", type=float, default=0.2, help="Seconds per stub model call")
+    args = parser.parse_args()
+
+    ensure_genai_types()
+    from gemini_handler import extract_json
+
+    failures = 0
+
+    # 1: JSON extraction
+    print("🧩 JSON extraction...")
+    cases = [
+        ('{"a": 1}', dict, {"a": 1}),
+        ('```json\n{"a": {"b": "}"}}\n```', dict, {"a": {"b": "}"}}),
+        ('Sure! Here it is: {"a": [1, 2]} Let me know {if} you need more.', dict, {"a": [1, 2]}),
+        ('Note [1]: {"a": 1}', dict, {"a": 1}),
+        ('```\n[{"scene": 1}]\n```', list, [{"scene": 1}]),
+    ]
+    for text, expect, wanted in cases:
+        got = extract_json(text, expect=expect)
+        ok = got == wanted
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} {text[:40]!r}")
+    for bad in ("", "no json here", '{"truncated": [1, 2'):
+        try:
+            extract_json(bad)
+            print(f"   ❌ {bad!r} should not parse")
+            failures += 1
+        except ValueError:
+            print(f"   ✅ {bad!r} rejected")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 2: persistent cache
+        print("\n💾 Cache...")
+        handler = make_handler(cache_dir)
+        models = handler.client.models
+        first = handler.generate_philosophy_story("Plato's Cave Allegory", 8, 15)
+        first["scenes"].append({"text": "caller mutation"})
+        second = handler.generate_philosophy_story("Plato's Cave Allegory", 8, 15)
+        restarted = make_handler(cache_dir)
+        third = restarted.generate_philosophy_story("Plato's Cave Allegory", 8, 15)
+        print(f"   calls: first handler {models.calls}, after restart {restarted.client.models.calls}")
+        if models.calls != 1 or restarted.client.models.calls != 0 or second != third or len(second["scenes"]) != 1:
+            print("   ❌ Repeated request was not served (unchanged) from the cache")
+            failures += 1
+        else:
+            print("   ✅ Repeat and restart hit the cache")
+        handler.generate_philosophy_story("Plato's Cave Allegory", 10, 15)
+        handler.text_model_name = "gemini-2.0-flash-exp"
+        handler.generate_philosophy_story("Plato's Cave Allegory", 8, 15)
+        if models.calls != 3:
+            print(f"   ❌ Slide count / model not part of the key ({models.calls} calls)")
+            failures += 1
+        else:
+            print("   ✅ Different slide count and model miss the cache")
+        handler.generate_philosophy_story("Plato's Cave Allegory", 8, 15, refresh=True)
+        refreshed_calls = models.calls
+        handler.generate_philosophy_story("Plato's Cave Allegory", 8, 15)
+        if refreshed_calls != 4 or models.calls != 4:
+            print(f"   ❌ refresh=True should call the model once and store the result ({models.calls} calls)")
+            failures += 1
+        else:
+            print("   ✅ refresh=True regenerates and replaces the cached script")
+
+        # 3: concurrent batch
+        topics = [f"{n} philosophers who changed topic {n}" for n in range(args.topics)]
+        batch = topics + topics[:3]
+        print(f"\n🚀 Batch of {len(batch)} topics ({args.topics} distinct), max_concurrency={args.concurrency}...")
+        handler = make_handler(cache_dir, delay=args.delay)
+        models = handler.client.models
+        models.broken_topics = {topics[-1]}
+        started = time.perf_counter()
+        results = handler.generate_scripts_batch(batch, num_scenes=6, max_concurrency=args.concurrency)
+        elapsed = time.perf_counter() - started
+        serial = args.topics * args.delay
+        print(f"   {models.calls} calls, max {models.max_in_flight} at once, {elapsed:.2f}s (serial ≈ {serial:.2f}s)")
+        if models.calls != args.topics:
+            print("   ❌ Repeated topics were generated more than once")
+            failures += 1
+        if not 1 < models.max_in_flight <= args.concurrency:
+            print("   ❌ Concurrency not bounded by max_concurrency")
+            failures += 1
+        if list(results) != topics or results[topics[-1]] is not None or not all(results[t] for t in topics[:-1]):
+            print("   ❌ Results missing, out of order, or failure not reported as None")
+            failures += 1
+        if failures == 0:
+            print("   ✅ Concurrent, bounded, deduplicated")
+
+        # 4: retry after failure
+        print("\n♻️  Second batch run...")
+        models.broken_topics = set()
+        results = handler.generate_scripts_batch(batch, num_scenes=6, max_concurrency=args.concurrency)
+        new_calls = models.calls - args.topics
+        print(f"   {new_calls} new call(s)")
+        if new_calls != 1 or not results[topics[-1]]:
+            print("   ❌ Expected only the failed topic to be generated again")
+            failures += 1
+        else:
+            print("   ✅ Only the failed topic called the model")
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All script cache checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Chunked TikTok upload test against a local fake Content Posting API (no network, no tokens).
+
+The fake init endpoint hands out an upload_url on the same server; the upload
+endpoint checks every Content-Range against the declared chunk plan and can
+inject failures. Checks that:
+1. The chunk plan follows TikTok's rules (5-64 MB chunks, remainder merged into the last)
+2. A large video arrives byte-identical and peak Python memory stays far below its size
+3. A 503 and a dropped connection are retried without resending earlier chunks
+4. An upload that runs out of retries keeps its progress, and the next call
+   resumes from the last acknowledged byte without a new init
+5. A 4xx (e.g. an expired upload_url) fails immediately
+
+Usage:
+    python3 test_tiktok_chunked_upload.py             # 60 MB video
+    python3 test_tiktok_chunked_upload.py --size 20   # smaller video
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tiktok_video_upload import (
+    MIN_CHUNK_SIZE, MAX_CHUNK_SIZE, MAX_FINAL_CHUNK_SIZE, MAX_CHUNKS,
+    plan_chunks, upload_video, find_resumable, TikTokUploadError
+)
+
+MB = 1024 * 1024
+
+
+class FakeTikTok:
+    def __init__(self, spool_dir: str):
+        self.spool_dir = spool_dir
+        self.lock = threading.Lock()
+        self.inits = 0
+        self.uploads = {}       # publish_id -> {"plan", "received", "path"}
+        self.put_log = []       # (publish_id, first, last, status)
+        self.failures = []      # queued faults: "503", "drop", "403"
+
+
+_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class FakeTikTokHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        state: FakeTikTok = self.server.state
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        info = request["source_info"]
+        with state.lock:
+            state.inits += 1
+            publish_id = f"v_inbox_file~v2.{state.inits}"
+            path = os.path.join(state.spool_dir, f"received_{state.inits}.mp4")
+            state.uploads[publish_id] = {"plan": info, "received": 0, "path": path}
+        open(path, "wb").close()
+        host, port = self.server.server_address
+        self._json(200, {
+            "data": {"publish_id": publish_id, "upload_url": f"http://{host}:{port}/upload/{publish_id}"},
+            "error": {"code": "ok"}
+        })
+
+    def do_PUT(self):
+        state: FakeTikTok = self.server.state
+        publish_id = self.path.rsplit("/", 1)[-1]
+        upload = state.uploads[publish_id]
+        plan = upload["plan"]
+        first, last, total = map(int, _RANGE.match(self.headers["Content-Range"]).groups())
+        length = int(self.headers["Content-Length"])
+
+        with state.lock:
+            fault = state.failures.pop(0) if state.failures else None
+
+        if fault == "drop":
+            # Read half the chunk, then hang up without answering
+            self.rfile.read(length // 2)
+            self.close_connection = True
+            self.connection.shutdown(2)
+            state.put_log.append((publish_id, first, last, "drop"))
+            return
+
+        data = self.rfile.read(length)
+        if fault in ("503", "403"):
+            state.put_log.append((publish_id, first, last, int(fault)))
+            return self._json(int(fault), {"error": {"code": "injected"}})
+
+        # Chunks must arrive in order, on the declared boundaries
+        index = first // plan["chunk_size"]
+        expected_last = total - 1 if index == plan["total_chunk_count"] - 1 else first + plan["chunk_size"] - 1
+        if (total != plan["video_size"] or first != upload["received"] or last != expected_last
+                or len(data) != last - first + 1):
+            state.put_log.append((publish_id, first, last, 416))
+            return self._json(416, {"error": {"code": "range_mismatch"}})
+
+        with open(upload["path"], "ab") as f:
+            f.write(data)
+        upload["received"] = last + 1
+        status = 201 if upload["received"] == total else 206
+        state.put_log.append((publish_id, first, last, status))
+        self._json(status, {})
+
+
+def start_fake(spool_dir: str):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTikTokHandler)
+    server.daemon_threads = True
+    server.state = FakeTikTok(spool_dir)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def sha256_of(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(MB), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked TikTok upload test")
+    parser.add_argument("--size", type=int, default=60, help="Video size in MB")
+    args = parser.parse_args()
+
+    failures = 0
+
+    # 1: chunk plan
+    print("🧩 Chunk plans...")
+    for size in (MB, 5 * MB, 7 * MB, 23 * MB + 17, 640 * MB, 4000 * MB):
+        chunk_size, count = plan_chunks(size)
+        last = size - (count - 1) * chunk_size
+        ok = (count == 1 and chunk_size == size and size < MIN_CHUNK_SIZE + chunk_size) or (
+            MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE and count <= MAX_CHUNKS
+            and chunk_size <= last <= MAX_FINAL_CHUNK_SIZE
+        )
+        print(f"   {size / MB:>8.1f} MB → {count} × {chunk_size / MB:.2f} MB (last {last / MB:.2f} MB) {'✅' if ok else '❌'}")
+        failures += not ok
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = start_fake(tmp)
+        state = fake.state
+        host, port = fake.server_address
+        init_url = f"http://{host}:{port}/v2/post/publish/inbox/video/init/"
+        progress_dir = os.path.join(tmp, "progress")
+        print(f"\n📡 Fake TikTok API on {host}:{port}")
+
+        video_path = os.path.join(tmp, "final_video.mp4")
+        with open(video_path, "wb") as f:
+            for _ in range(args.size):
+                f.write(os.urandom(MB))
+        video_sha = sha256_of(video_path)
+
+        def received_sha(publish_id):
+            return sha256_of(state.uploads[publish_id]["path"])
+
+        # 2: clean upload, memory
+        print(f"\n🎥 Uploading {args.size} MB in 5 MB chunks...")
+        tracemalloc.start()
+        result = upload_video(init_url, "token", video_path, chunk_size=5 * MB, progress_dir=progress_dir, backoff=0.01)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   {result['chunks_sent']} chunks, peak traced memory {peak / MB:.1f} MB")
+        if received_sha(result["publish_id"]) != video_sha:
+            print("   ❌ Video did not round-trip")
+            failures += 1
+        else:
+            print("   ✅ Video intact")
+        # The fake server buffers one 5 MB chunk in this process; the uploader adds ~1 MB
+        if peak > 8 * MB:
+            print("   ❌ Peak memory grew with the video size")
+            failures += 1
+        if os.listdir(progress_dir):
+            print("   ❌ Progress file left behind after a finished upload")
+            failures += 1
+
+        # 3: transient faults are retried in place
+        print("\n🔁 503 + dropped connection mid-upload...")
+        state.failures = [None, None, "503", "drop"]
+        log_start = len(state.put_log)
+        result = upload_video(init_url, "token", video_path, chunk_size=5 * MB, progress_dir=progress_dir, backoff=0.01)
+        ranges = [(first, status) for pid, first, _, status in state.put_log[log_start:]]
+        accepted = [first for first, status in ranges if status in (201, 206)]
+        print(f"   retries: {result['retries']}, PUTs: {len(ranges)}")
+        if received_sha(result["publish_id"]) != video_sha or result["retries"] != 2:
+            print("   ❌ Faults were not retried cleanly")
+            failures += 1
+        elif accepted != sorted(set(accepted)):
+            print("   ❌ An acknowledged chunk was sent twice")
+            failures += 1
+        else:
+            print("   ✅ Retried the failed chunk only")
+
+        # 4: out of retries → progress kept → resume
+        print("\n♻️  Interrupted upload resumes...")
+        inits_before = state.inits
+        state.failures = [None, None, None, "503", "503", "503"]
+        try:
+            upload_video(init_url, "token", video_path, chunk_size=5 * MB, progress_dir=progress_dir,
+                         max_retries=2, backoff=0.01)
+            print("   ❌ Upload should have failed")
+            failures += 1
+        except TikTokUploadError as e:
+            print(f"   Interrupted: {e}")
+        saved = find_resumable(video_path, progress_dir, init_url)
+        if not saved or saved["acknowledged_bytes"] != 3 * 5 * MB:
+            print(f"   ❌ Progress not saved at the last acknowledged byte: {saved and saved['acknowledged_bytes']}")
+            failures += 1
+        state.failures = []
+        log_start = len(state.put_log)
+        result = upload_video(init_url, "token", video_path, chunk_size=5 * MB, progress_dir=progress_dir, backoff=0.01)
+        first_put = state.put_log[log_start][1]
+        print(f"   Resumed from byte {result['resumed_from']:,}, first PUT at {first_put:,}, inits +{state.inits - inits_before}")
+        if state.inits - inits_before != 1 or first_put != 3 * 5 * MB or received_sha(result["publish_id"]) != video_sha:
+            print("   ❌ Did not resume in place")
+            failures += 1
+        else:
+            print("   ✅ Resumed without re-init or resending acknowledged chunks")
+
+        # 5: client errors are not retried
+        print("\n⛔ 403 fails fast...")
+        state.failures = ["403"]
+        log_start = len(state.put_log)
+        try:
+            upload_video(init_url, "token", video_path, chunk_size=5 * MB, progress_dir=progress_dir,
+                         resume=False, backoff=0.01)
+            print("   ❌ Upload should have failed")
+            failures += 1
+        except TikTokUploadError as e:
+            puts = len(state.put_log) - log_start
+            if e.status_code != 403 or puts != 1:
+                print(f"   ❌ Expected one 403 PUT, got status {e.status_code} after {puts} PUTs")
+                failures += 1
+            else:
+                print("   ✅ No retries on 403")
+
+        fake.shutdown()
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All chunked upload checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+WebSocket progress broadcaster load test with in-process simulated clients (no server, no network).
+
+Simulated sockets stand in for browsers: fast ones answer every send at once,
+slow ones take a while per send and stalled ones never finish a send. Checks that:
+1. Per-event latency to the fast clients stays flat when slow and stalled
+   clients share the project
+2. Progress events for the same step coalesce for a client that lags (latest wins)
+3. A client that falls MAX_PENDING messages behind, or stalls past
+   SEND_TIMEOUT, is disconnected with code 1013 and forgotten
+4. send_progress from a worker thread's event loop reaches the clients
+5. /ws/global clients get send_global events; project clients don't
+
+Usage:
+    python3 test_ws_broadcast.py                     # 300 fast + 100 slow/stalled clients
+    python3 test_ws_broadcast.py --clients 1000 --events 100
+"""
+
+import time
+import asyncio
+import argparse
+import threading
+
+from backend.app.websocket import progress
+from backend.app.websocket.progress import ConnectionManager, GLOBAL_CHANNEL, MAX_PENDING
+
+
+class SimulatedWebSocket:
+    """The part of starlette's WebSocket the broadcaster uses."""
+
+    def __init__(self, delay: float = 0.0, stalled: bool = False):
+        self.delay = delay
+        self.stalled = stalled
+        self.received = []          # (perf_counter, message)
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data: dict):
+        if self.stalled:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received.append((time.perf_counter(), data))
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.close_code = code
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def measure_latency(fast: int, slow: int, stalled: int, events: int, interval: float):
+    """p50/p99 ms from send_progress to each fast client, per event."""
+    manager = ConnectionManager()
+    fast_sockets = [SimulatedWebSocket() for _ in range(fast)]
+    others = [SimulatedWebSocket(delay=0.5) for _ in range(slow)] + [SimulatedWebSocket(stalled=True) for _ in range(stalled)]
+    for ws in fast_sockets + others:
+        await manager.connect(ws, "project")
+
+    sent_at = {}
+    for i in range(events):
+        sent_at[i] = time.perf_counter()
+        await manager.send_progress("project", {"type": "slide_complete", "slide_index": i})
+        await asyncio.sleep(interval)
+    await asyncio.sleep(0.05)
+
+    latencies = []
+    for ws in fast_sockets:
+        for received, data in ws.received:
+            latencies.append((received - sent_at[data["slide_index"]]) * 1000)
+    delivered = len(latencies) == fast * events
+    stats = manager.stats()
+    for connection in [c for group in list(manager.active_connections.values()) for c in group]:
+        manager.disconnect(connection)
+    return percentile(latencies, 50), percentile(latencies, 99), delivered, stats
+
+
+async def main_async(args) -> int:
+    failures = 0
+
+    # 1: flat latency
+    print(f"⏱️  {args.events} events to {args.clients} fast clients...")
+    base_p50, base_p99, delivered, _ = await measure_latency(args.clients, 0, 0, args.events, args.interval)
+    print(f"   alone:             p50 {base_p50:.2f} ms, p99 {base_p99:.2f} ms")
+    failures += not delivered
+    p50, p99, delivered, stats = await measure_latency(args.clients, args.slow // 2, args.slow - args.slow // 2,
+                                                       args.events, args.interval)
+    print(f"   + {args.slow} slow/stalled: p50 {p50:.2f} ms, p99 {p99:.2f} ms "
+          f"({stats['slow_disconnects']} dropped, {stats['pending']} still queued)")
+    if not delivered:
+        print("   ❌ A fast client missed events")
+        failures += 1
+    if p99 > max(base_p99 * 3, base_p99 + 25):
+        print("   ❌ Slow clients held up the fast ones")
+        failures += 1
+    else:
+        print("   ✅ Latency stays flat")
+
+    # 2: coalescing
+    print("\n🧮 100 progress updates to a lagging client...")
+    manager = ConnectionManager()
+    lagging = SimulatedWebSocket(delay=0.02)
+    await manager.connect(lagging, "project")
+    for pct in range(1, 101):
+        await manager.send_progress("project", {"type": "progress", "step": "render", "progress": pct, "message": ""})
+        await asyncio.sleep(0.001)
+    await manager.send_progress("project", {"type": "complete", "result": {}})
+    await asyncio.sleep(0.3)
+    messages = [data for _, data in lagging.received]
+    values = [m["progress"] for m in messages if m["type"] == "progress"]
+    print(f"   received {len(values)} progress messages, last {values[-1] if values else None}")
+    if not values or values[-1] != 100 or len(values) >= 50 or messages[-1]["type"] != "complete":
+        print("   ❌ Progress did not coalesce to the latest value")
+        failures += 1
+    else:
+        print("   ✅ Superseded progress dropped, latest kept, order preserved")
+
+    # 3: slow consumers are cut off
+    print("\n🐢 Client that falls behind / stalls...")
+    manager = ConnectionManager()
+    behind = SimulatedWebSocket(stalled=True)
+    await manager.connect(behind, "project")
+    for i in range(MAX_PENDING + 5):
+        await manager.send_progress("project", {"type": "slide_complete", "slide_index": i})
+    await asyncio.sleep(0.01)
+    if behind.close_code != 1013 or manager.stats()["connections"]:
+        print(f"   ❌ Overflowing client not dropped (close code {behind.close_code})")
+        failures += 1
+    else:
+        print(f"   ✅ Dropped after {MAX_PENDING} queued messages (1013)")
+
+    progress.SEND_TIMEOUT, saved_timeout = 0.1, progress.SEND_TIMEOUT
+    stuck = SimulatedWebSocket(stalled=True)
+    await manager.connect(stuck, "project")
+    await manager.send_progress("project", {"type": "slide_complete", "slide_index": 0})
+    await asyncio.sleep(0.3)
+    progress.SEND_TIMEOUT = saved_timeout
+    if stuck.close_code != 1013 or manager.stats()["connections"]:
+        print("   ❌ Stalled send not timed out")
+        failures += 1
+    else:
+        print("   ✅ Dropped after a send stalled past SEND_TIMEOUT")
+
+    # 4: cross-loop send
+    print("\n🧵 send_progress from a worker thread's loop...")
+    manager = ConnectionManager()
+    client = SimulatedWebSocket()
+    await manager.connect(client, "project")
+    worker = threading.Thread(target=lambda: asyncio.run(
+        manager.send_progress("project", {"type": "progress", "step": "tool", "progress": 50, "message": ""})))
+    worker.start()
+    await asyncio.to_thread(worker.join)
+    await asyncio.sleep(0.01)
+    if [data["progress"] for _, data in client.received] != [50]:
+        print("   ❌ Update from another loop was lost")
+        failures += 1
+    else:
+        print("   ✅ Handed to the server loop")
+
+    # 5: global channel
+    print("\n🌐 /ws/global events...")
+    global_client = SimulatedWebSocket()
+    await manager.connect(global_client, GLOBAL_CHANNEL)
+    await manager.send_global({"type": "automation_run", "status": "completed"})
+    await asyncio.sleep(0.01)
+    if len(global_client.received) != 1 or len(client.received) != 1:
+        print("   ❌ Global event misrouted")
+        failures += 1
+    else:
+        print("   ✅ Delivered to global clients only")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket broadcaster load test")
+    parser.add_argument("--clients", type=int, default=300, help="Fast simulated clients")
+    parser.add_argument("--slow", type=int, default=100, help="Slow + stalled simulated clients")
+    parser.add_argument("--events", type=int, default=50, help="Events to broadcast")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between events")
+    args = parser.parse_args()
+
+    failures = asyncio.run(main_async(args))
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        raise SystemExit(1)
+    print("✅ All broadcaster checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 
+from prompt_templates import PromptCache, compile_template
+
 
 class ContentType(Enum):
     """Types of content a theme can produce"""
@@ -600,31 +602,32 @@ def get_philosopher_scene(philosopher_key: str) -> Optional[dict]:
     return PHILOSOPHER_SCENES.get(philosopher_key.lower().replace(" ", "_"))
 
 
+# Built theme prompts by (theme id, stage) + variables
+theme_prompt_cache = PromptCache()
+
+
 def build_scene_prompt(theme: Theme, philosopher_key: str, scene_index: int = 0) -> str:
     """Build a complete image prompt for a philosopher scene"""
     philosopher = get_philosopher_scene(philosopher_key)
     if not philosopher:
         return theme.image_config.content_prompt
 
-    prompt = theme.image_config.content_prompt
-
-    # Replace placeholders
-    replacements = {
-        "[PHILOSOPHER_NAME]": philosopher["name"],
-        "[PHILOSOPHER_DESCRIPTION]": philosopher["description"],
-        "[CLOTHING]": philosopher["clothing"],
-        "[SETTING]": philosopher["settings"][scene_index % len(philosopher["settings"])],
-        "[ENVIRONMENT_DETAILS]": philosopher["settings"][scene_index % len(philosopher["settings"])],
-        "[POSE]": philosopher["poses"][scene_index % len(philosopher["poses"])],
-        "[EMOTION/QUALITY]": philosopher["mood"],
-        "[EMOTIONAL_TONE]": philosopher["mood"],
-        "[DIRECTION]": "the side"
+    # Fill placeholders
+    setting = philosopher["settings"][scene_index % len(philosopher["settings"])]
+    values = {
+        "PHILOSOPHER_NAME": philosopher["name"],
+        "PHILOSOPHER_DESCRIPTION": philosopher["description"],
+        "CLOTHING": philosopher["clothing"],
+        "SETTING": setting,
+        "ENVIRONMENT_DETAILS": setting,
+        "POSE": philosopher["poses"][scene_index % len(philosopher["poses"])],
+        "EMOTION/QUALITY": philosopher["mood"],
+        "EMOTIONAL_TONE": philosopher["mood"],
+        "DIRECTION": "the side"
     }
 
-    for placeholder, value in replacements.items():
-        prompt = prompt.replace(placeholder, value)
-
-    return prompt
+    template = compile_template(theme.image_config.content_prompt)
+    return theme_prompt_cache.get_or_render((theme.id, "content"), template, values)
 
 
 def list_all_themes() -> None:
@@ -24,7 +24,7 @@ Usage:
 
 import os
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,8 +33,10 @@ load_dotenv()
 from theme_config import (
     THEMES, Theme, get_theme, get_enabled_themes,
     ContentType, TextOverlayMode, PHILOSOPHER_SCENES,
-    build_scene_prompt, get_philosopher_scene
+    build_scene_prompt, get_philosopher_scene, theme_prompt_cache
 )
+from prompt_templates import compile_template
+from provider_limits import provider_slot
 
 
 class ThemedSlideshow:
@@ -138,23 +140,22 @@ class ThemedSlideshow:
         
         # Select base prompt based on slide type
         if slide_type == "hook":
-            base_prompt = image_config.hook_prompt
+            stage, base_prompt = "hook", image_config.hook_prompt
         elif slide_type == "outro":
-            base_prompt = image_config.outro_prompt
+            stage, base_prompt = "outro", image_config.outro_prompt
         else:
-            base_prompt = image_config.content_prompt
+            stage, base_prompt = "content", image_config.content_prompt
         
-        # Replace placeholders
+        # Placeholder values
         person_name = slide.get('person_name', '')
         display_text = slide.get('display_text', '')
         visual_desc = slide.get('visual_description', '')
-        subtitle = slide.get('subtitle', '')
-        
-        prompt = base_prompt
         
         # Standard replacements
-        prompt = prompt.replace("[PHILOSOPHER_NAME]", person_name or display_text)
-        prompt = prompt.replace("[SCENE_DESCRIPTION]", visual_desc or f"philosophical scene featuring {person_name or display_text}")
+        values = {
+            "PHILOSOPHER_NAME": person_name or display_text,
+            "SCENE_DESCRIPTION": visual_desc or f"philosophical scene featuring {person_name or display_text}",
+        }
         
         # For scene_portrait theme, use detailed philosopher data
         if self.theme_id == "scene_portrait" and person_name:
@@ -162,29 +163,32 @@ class ThemedSlideshow:
             philosopher = get_philosopher_scene(philosopher_key)
             
             if philosopher:
-                prompt = prompt.replace("[PHILOSOPHER_DESCRIPTION]", philosopher.get("description", "wise philosopher"))
-                prompt = prompt.replace("[CLOTHING]", philosopher.get("clothing", "ancient robes"))
-                
                 settings = philosopher.get("settings", ["ancient temple"])
-                prompt = prompt.replace("[SETTING]", settings[0])
-                prompt = prompt.replace("[ENVIRONMENT_DETAILS]", settings[0])
-                
                 poses = philosopher.get("poses", ["contemplating"])
-                prompt = prompt.replace("[POSE]", poses[0])
-                
                 mood = philosopher.get("mood", "wise, contemplative")
-                prompt = prompt.replace("[EMOTION/QUALITY]", mood)
-                prompt = prompt.replace("[EMOTIONAL_TONE]", mood)
-                prompt = prompt.replace("[DIRECTION]", "the side")
-        
-        # Clean up any remaining placeholders
-        import re
-        prompt = re.sub(r'\[[\w/]+\]', '', prompt)
-        
+                values.update({
+                    "PHILOSOPHER_DESCRIPTION": philosopher.get("description", "wise philosopher"),
+                    "CLOTHING": philosopher.get("clothing", "ancient robes"),
+                    "SETTING": settings[0],
+                    "ENVIRONMENT_DETAILS": settings[0],
+                    "POSE": poses[0],
+                    "EMOTION/QUALITY": mood,
+                    "EMOTIONAL_TONE": mood,
+                    "DIRECTION": "the side",
+                })
+        
+        # Any remaining placeholders are cleared
+        template = compile_template(base_prompt)
+        prompt = theme_prompt_cache.get_or_render((self.theme_id, stage), template, values, default="")
         return prompt.strip()
     
-    def _generate_background(self, prompt: str, output_path: str) -> Optional[str]:
-        """Generate background image using fal.ai with theme's model."""
+    def _generate_background(self, prompt: str, output_path: str):
+        """
+        Generate background image using fal.ai with theme's model.
+        
+        Returns a GeneratedImage (see image_writer.py): the decoded image goes
+        straight to the text overlay while the PNG is written in the background.
+        """
         try:
             import fal_client
             import requests
@@ -218,16 +222,17 @@ class ThemedSlideshow:
             
             print(f"   🎨 Generating with {model}...")
             
-            result = fal_client.subscribe(
-                model_config["id"],
-                arguments={
-                    "prompt": prompt,
-                    "image_size": model_config["image_size"],
-                    "num_images": 1,
-                    "output_format": "png",
-                    **model_config.get("extra_args", {})
-                },
-            )
+            with provider_slot("fal", model=model_config["id"]):
+                result = fal_client.subscribe(
+                    model_config["id"],
+                    arguments={
+                        "prompt": prompt,
+                        "image_size": model_config["image_size"],
+                        "num_images": 1,
+                        "output_format": "png",
+                        **model_config.get("extra_args", {})
+                    },
+                )
             
             images = result.get('images', [])
             if not images:
@@ -250,10 +255,10 @@ class ThemedSlideshow:
             
             # Resize to TikTok dimensions
             img = ImageOps.fit(img, (1080, 1920), method=Image.Resampling.LANCZOS)
-            img.save(output_path, 'PNG')
             
-            print(f"   ✅ Saved: {output_path}")
-            return output_path
+            from image_writer import get_image_writer
+            print(f"   ✅ Generated: {output_path}")
+            return get_image_writer().save(img, output_path, 'PNG')
             
         except Exception as e:
             print(f"   ❌ Image generation error: {e}")
@@ -263,12 +268,12 @@ class ThemedSlideshow:
     
     def _burn_text_onto_slide(
         self,
-        background_path: str,
+        background_path,
         slide: Dict,
         output_path: str,
         slide_type: str = "content"
     ) -> str:
-        """Apply themed text overlay to a slide."""
+        """Apply themed text overlay to a slide (background: path or GeneratedImage)."""
         from text_overlay import TextOverlay
         
         text_config = self.theme.text_config
@@ -384,6 +389,9 @@ class ThemedSlideshow:
             final_path = self._burn_text_onto_slide(bg_path, slide, output_path, slide_type)
             image_paths.append(final_path)
         
+        # Backgrounds are saved in the background; make sure they're on disk
+        background_paths = [os.fspath(bg) for bg in background_paths]
+        
         # Save script
         script_path = os.path.join(self.output_dir, f"{safe_name}_script.json")
         script['theme'] = self.theme_id
@@ -486,6 +494,8 @@ class ThemedSlideshow:
             final_path = self._burn_text_onto_slide(background_paths[-1], slide, output_path, slide_type)
             image_paths.append(final_path)
         
+        background_paths = [os.fspath(bg) for bg in background_paths]
+        
         print("\n" + "=" * 60)
         print(f"✅ Sample generated!")
         print(f"   🎨 Theme: {self.theme.name}")
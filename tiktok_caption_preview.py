@@ -19,6 +19,8 @@ from typing import Optional, List, Tuple
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import textwrap
 
+from gradients import gradient_overlay
+
 
 class TikTokCaptionPreview:
     """Simulates TikTok caption overlay for preview purposes."""
@@ -136,16 +138,11 @@ class TikTokCaptionPreview:
             from PIL import ImageOps
             img = ImageOps.fit(img, (self.TIKTOK_WIDTH, self.TIKTOK_HEIGHT), method=Image.Resampling.LANCZOS)
         
-        # Create overlay layer
-        overlay = Image.new("RGBA", img.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-        
-        # Add gradient at bottom for caption readability
+        # Overlay layer with a gradient at bottom for caption readability
+        # (fades from transparent to semi-opaque over the last 400 rows)
         gradient_height = 400
-        for y in range(gradient_height):
-            alpha = int(180 * (y / gradient_height))  # Fade from transparent to semi-opaque
-            y_pos = self.TIKTOK_HEIGHT - gradient_height + y
-            draw.line([(0, y_pos), (self.TIKTOK_WIDTH, y_pos)], fill=(0, 0, 0, alpha))
+        overlay = gradient_overlay(img.size, [(1 - gradient_height / self.TIKTOK_HEIGHT, 0), (1, 180)])
+        draw = ImageDraw.Draw(overlay)
         
         # Calculate caption area
         caption_y = self.TIKTOK_HEIGHT - self.CAPTION_BOTTOM_MARGIN - self.CAPTION_AREA_HEIGHT
@@ -33,6 +33,8 @@ import webbrowser
 from datetime import datetime
 from pathlib import Path
 
+from tiktok_video_upload import upload_video, source_info, find_resumable, TikTokUploadError
+
 
 class TikTokCLI:
     """TikTok API client for sandbox testing."""
@@ -317,95 +319,49 @@ class TikTokCLI:
         if to_inbox:
             init_url = self.inbox_init_url
             # Inbox endpoint doesn't include post_info
-            init_data = {
-                "source_info": {
-                    "source": "FILE_UPLOAD",
-                    "video_size": file_size,
-                    "chunk_size": file_size,
-                    "total_chunk_count": 1
-                }
-            }
+            post_info = None
         else:
             init_url = self.publish_init_url
-            init_data = {
-                "post_info": {
-                    "title": title or "",
-                    "privacy_level": "SELF_ONLY",  # Sandbox often requires private
-                    "disable_duet": False,
-                    "disable_comment": False,
-                    "disable_stitch": False,
-                    "video_cover_timestamp_ms": 1000
-                },
-                "source_info": {
-                    "source": "FILE_UPLOAD",
-                    "video_size": file_size,
-                    "chunk_size": file_size,
-                    "total_chunk_count": 1
-                }
+            post_info = {
+                "title": title or "",
+                "privacy_level": "SELF_ONLY",  # Sandbox often requires private
+                "disable_duet": False,
+                "disable_comment": False,
+                "disable_stitch": False,
+                "video_cover_timestamp_ms": 1000
             }
         
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json; charset=UTF-8"
-        }
-        
-        # Step 1: Initialize upload
-        print("\n📡 Step 1: Initializing upload...")
-        print(f"   URL: {init_url}")
-        
-        init_response = requests.post(init_url, headers=headers, json=init_data)
+        info = source_info(file_size)
+        print(f"🧩 Chunks: {info['total_chunk_count']} × {info['chunk_size'] / 1024 / 1024:.1f} MB")
         
-        print(f"   Status: {init_response.status_code}")
-        
-        if init_response.status_code != 200:
-            print(f"❌ Failed to initialize: {init_response.text}")
-            return
-        
-        init_result = init_response.json()
-        print(f"   Response: {json.dumps(init_result, indent=2)}")
-        
-        if "error" in init_result:
-            error_info = init_result.get("error", {})
-            if error_info.get("code") != "ok":
-                print(f"❌ API Error: {error_info}")
-                return
-        
-        data = init_result.get("data", {})
-        upload_url = data.get("upload_url")
-        publish_id = data.get("publish_id")
-        
-        if not upload_url:
-            print("❌ No upload URL in response")
+        resumable = find_resumable(str(video_path), init_url=init_url)
+        if resumable:
+            print(f"\n♻️  Resuming upload {resumable['publish_id']} from byte {resumable['acknowledged_bytes']:,}")
+        else:
+            print("\n📡 Initializing upload...")
+            print(f"   URL: {init_url}")
+        
+        def show_progress(acknowledged: int, total: int):
+            print(f"   ⬆️  {acknowledged:,}/{total:,} bytes ({acknowledged / total:.0%})")
+        
+        try:
+            result = upload_video(init_url, access_token, str(video_path), post_info=post_info, on_progress=show_progress)
+        except TikTokUploadError as e:
+            print(f"❌ Upload failed: {e}")
+            if e.publish_id:
+                print("   Progress saved - run the same command again to resume.")
             return
         
-        print(f"\n✅ Got upload URL and publish_id: {publish_id}")
-        
-        # Step 2: Upload video file
-        print("\n📡 Step 2: Uploading video file...")
+        publish_id = result["publish_id"]
+        print("\n✅ Upload successful!")
+        print(f"   Publish ID: {publish_id}")
+        if result["retries"]:
+            print(f"   Chunk retries: {result['retries']}")
+        print("\n📝 Check status with:")
+        print(f'   python tiktok_cli.py status --publish-id "{publish_id}"')
         
-        with open(video_path, 'rb') as f:
-            video_data = f.read()
-        
-        upload_headers = {
-            "Content-Type": "video/mp4",
-            "Content-Length": str(file_size),
-            "Content-Range": f"bytes 0-{file_size - 1}/{file_size}"
-        }
-        
-        upload_response = requests.put(upload_url, headers=upload_headers, data=video_data)
-        
-        print(f"   Status: {upload_response.status_code}")
-        
-        if upload_response.status_code in [200, 201, 202]:
-            print("\n✅ Upload successful!")
-            print(f"   Publish ID: {publish_id}")
-            print("\n📝 Check status with:")
-            print(f'   python tiktok_cli.py status --publish-id "{publish_id}"')
-            
-            if to_inbox:
-                print("\n📱 The video should appear in your TikTok app drafts!")
-        else:
-            print(f"❌ Upload failed: {upload_response.text}")
+        if to_inbox:
+            print("\n📱 The video should appear in your TikTok app drafts!")
     
     def cmd_slideshow(self, image_paths, title=None, auto_music=True):
         """Upload photo slideshow (carousel) to TikTok."""
@@ -26,9 +26,11 @@ Usage:
 
 import os
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
+from provider_limits import provider_slot
+
 load_dotenv()
 
 
@@ -266,7 +268,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
         
         return prompt.strip()
     
-    def _generate_background_fal(self, prompt: str, output_path: str) -> Optional[str]:
+    def _generate_background_fal(self, prompt: str, output_path: str, return_image: bool = False):
         """Generate background image using fal.ai.
         
         Supports multiple models:
@@ -301,10 +303,11 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
                 **model_config.get("extra_args", {})
             }
             
-            result = fal_client.subscribe(
-                model_id,
-                arguments=arguments,
-            )
+            with provider_slot("fal", model=model_id):
+                result = fal_client.subscribe(
+                    model_id,
+                    arguments=arguments,
+                )
             
             images = result.get('images', [])
             if not images:
@@ -330,8 +333,13 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
             
             # Resize to exact TikTok dimensions (1080x1920)
             img = ImageOps.fit(img, (1080, 1920), method=Image.Resampling.LANCZOS)
-            img.save(output_path, 'PNG')
             
+            if return_image:
+                from image_writer import get_image_writer
+                print(f"   ✅ Background ready (saving in background): {output_path}")
+                return get_image_writer().save(img, output_path, 'PNG')
+            
+            img.save(output_path, 'PNG')
             print(f"   ✅ Background saved: {output_path}")
             return output_path
             
@@ -341,7 +349,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
             traceback.print_exc()
             return None
     
-    def _generate_background_openai(self, prompt: str, output_path: str) -> Optional[str]:
+    def _generate_background_openai(self, prompt: str, output_path: str, return_image: bool = False):
         """Generate background image using OpenAI DALL-E."""
         try:
             from openai import OpenAI
@@ -371,16 +379,26 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
             img_response.raise_for_status()
             
             img = Image.open(io.BytesIO(img_response.content))
-            img.save(output_path, 'PNG')
             
+            if return_image:
+                from image_writer import get_image_writer
+                img.load()
+                return get_image_writer().save(img, output_path, 'PNG')
+            
+            img.save(output_path, 'PNG')
             return output_path
             
         except Exception as e:
             print(f"   ❌ OpenAI error: {e}")
             return None
     
-    def _generate_background(self, slide: Dict, slideshow_name: str, slide_index: int) -> Optional[str]:
-        """Generate a background image for a slide."""
+    def _generate_background(self, slide: Dict, slideshow_name: str, slide_index: int, return_image: bool = False):
+        """Generate a background image for a slide.
+        
+        Returns the saved path, or with return_image=True a GeneratedImage
+        (decoded image, PNG written in the background - see image_writer.py)
+        that _burn_text_onto_slide can use without re-reading the file.
+        """
         prompt = self._generate_background_prompt(slide)
         
         safe_name = "".join(c for c in slideshow_name if c.isalnum() or c in (' ', '-', '_')).strip()
@@ -390,9 +408,9 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
         print(f"   🎨 Generating background for slide {slide_index}...")
         
         if self.image_generator == "fal":
-            return self._generate_background_fal(prompt, output_path)
+            return self._generate_background_fal(prompt, output_path, return_image)
         elif self.image_generator in ["openai", "dalle"]:
-            return self._generate_background_openai(prompt, output_path)
+            return self._generate_background_openai(prompt, output_path, return_image)
         else:
             print(f"   ❌ Unknown image generator: {self.image_generator}")
             return None
@@ -407,7 +425,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
     
     def _burn_text_onto_slide(
         self,
-        background_path: str,
+        background_path,
         slide: Dict,
         output_path: str,
         font_style: str = None,
@@ -417,7 +435,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
         """Burn text onto a background image.
         
         Args:
-            background_path: Path to background image
+            background_path: Background path or GeneratedImage
             slide: Slide data dictionary
             output_path: Output path for final image
             font_style: Font style ("bold", "italic", "elegant")
@@ -503,7 +521,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
                 self._create_fallback_background(bg_path)
                 background_paths.append(bg_path)
             else:
-                bg_path = self._generate_background(slide, safe_name, i)
+                bg_path = self._generate_background(slide, safe_name, i, return_image=True)
                 if bg_path:
                     background_paths.append(bg_path)
                 else:
@@ -512,7 +530,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
                     self._create_fallback_background(fallback_path)
                     background_paths.append(fallback_path)
         
-        # Step 3: Burn text onto images
+        # Step 3: Burn text onto images (straight from the decoded backgrounds)
         print(f"\n📝 Step 3: Burning text onto slides...")
         image_paths = []
         
@@ -523,6 +541,9 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
             final_path = self._burn_text_onto_slide(bg_path, slide, output_path)
             image_paths.append(final_path)
         
+        # Backgrounds are saved in the background; make sure they're on disk
+        background_paths = [os.fspath(bg) for bg in background_paths]
+        
         # Save script for reference
         script_path = os.path.join(self.output_dir, f"{safe_name}_script.json")
         with open(script_path, 'w') as f:
@@ -558,52 +579,23 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
         slides = script.get('slides', [])
         title = script.get('title', 'slideshow')
         
-        # Get style settings from script (can be set by UI)
-        font_name = script.get('font_name', None)  # Specific font: "inter", "playfair", "bebas", etc.
-        font_style = script.get('font_style', None)  # Legacy: "bold", "italic", "elegant"
-        visual_style = script.get('visual_style', 'modern')  # "modern", "elegant", "philosophaire"
-        
-        safe_name = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_name = safe_name.replace(' ', '_')[:50]
-        
         print(f"\n🎴 Creating slideshow from script: {title}")
         print(f"   📊 Slides: {len(slides)}")
-        print(f"   🎨 Font: {font_name or 'auto'}, Style: {visual_style}")
+        print(f"   🎨 Font: {script.get('font_name') or 'auto'}, Style: {script.get('visual_style', 'modern')}")
         
-        # Generate backgrounds
-        print(f"\n🎨 Generating {len(slides)} background images...")
+        print(f"\n🎨 Generating {len(slides)} slides...")
         background_paths = []
-        
-        for i, slide in enumerate(slides):
-            if skip_image_generation:
-                bg_path = os.path.join(self.backgrounds_dir, f"{safe_name}_bg_{i}.png")
-                self._create_fallback_background(bg_path)
-                background_paths.append(bg_path)
-            else:
-                bg_path = self._generate_background(slide, safe_name, i)
-                if bg_path:
-                    background_paths.append(bg_path)
-                else:
-                    fallback_path = os.path.join(self.backgrounds_dir, f"{safe_name}_bg_{i}.png")
-                    self._create_fallback_background(fallback_path)
-                    background_paths.append(fallback_path)
-        
-        # Burn text with specified styles
-        print(f"\n📝 Burning text onto slides...")
         image_paths = []
         
-        for i, slide in enumerate(slides):
-            bg_path = background_paths[i] if i < len(background_paths) else background_paths[-1]
-            output_path = os.path.join(self.output_dir, f"{safe_name}_slide_{i}.png")
-            
-            final_path = self._burn_text_onto_slide(
-                bg_path, slide, output_path,
-                font_style=font_style,
-                font_name=font_name,
-                visual_style=visual_style
-            )
+        for i in range(len(slides)):
+            bg_path, final_path = self.render_slide(script, i, skip_image_generation)
+            background_paths.append(bg_path)
             image_paths.append(final_path)
         
+        # render_slide leaves background PNGs saving in the background
+        from image_writer import get_image_writer
+        get_image_writer().flush()
+        
         print(f"\n✅ Created {len(image_paths)} slides")
         
         return {
@@ -613,6 +605,48 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
             'image_paths': image_paths
         }
     
+    def render_slide(self, script: Dict, index: int, skip_image_generation: bool = False) -> Tuple[str, str]:
+        """
+        Generate the background for one slide of a script and burn its text.
+        
+        Slides are independent, so callers can run several of these at once
+        (see task_graph.py); create_from_script() calls it for each slide in turn.
+        
+        Args:
+            script: Slideshow script dictionary (as for create_from_script)
+            index: Slide index within script['slides']
+            skip_image_generation: Use a solid background if True
+        
+        Returns:
+            (background_path, slide_path) - the background PNG may still be
+            being written; image_writer.get_image_writer().flush() waits for it
+        """
+        slide = script['slides'][index]
+        
+        # Get style settings from script (can be set by UI)
+        font_name = script.get('font_name', None)  # Specific font: "inter", "playfair", "bebas", etc.
+        font_style = script.get('font_style', None)  # Legacy: "bold", "italic", "elegant"
+        visual_style = script.get('visual_style', 'modern')  # "modern", "elegant", "philosophaire"
+        
+        safe_name = "".join(c for c in script.get('title', 'slideshow') if c.isalnum() or c in (' ', '-', '_')).strip()
+        safe_name = safe_name.replace(' ', '_')[:50]
+        
+        bg_path = None
+        if not skip_image_generation:
+            bg_path = self._generate_background(slide, safe_name, index, return_image=True)
+        if not bg_path:
+            bg_path = os.path.join(self.backgrounds_dir, f"{safe_name}_bg_{index}.png")
+            self._create_fallback_background(bg_path)
+        
+        output_path = os.path.join(self.output_dir, f"{safe_name}_slide_{index}.png")
+        final_path = self._burn_text_onto_slide(
+            bg_path, slide, output_path,
+            font_style=font_style,
+            font_name=font_name,
+            visual_style=visual_style
+        )
+        return str(bg_path), final_path
+    
     def preview_script(self, topic: str) -> Optional[Dict]:
         """
         Generate and preview a script without generating images.
@@ -703,7 +737,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
             self._create_fallback_background(bg_path)
             print(f"   📷 Created fallback background")
         else:
-            bg_path = self._generate_background(slide, safe_name, slide_index)
+            bg_path = self._generate_background(slide, safe_name, slide_index, return_image=True)
             if not bg_path:
                 # Fallback to solid background
                 bg_path = os.path.join(self.backgrounds_dir, f"{safe_name}_bg_{slide_index}.png")
@@ -725,7 +759,7 @@ VISUAL: {visual_description if visual_description else f"Atmospheric, visually i
         print(f"   ✅ Slide {slide_index} complete: {final_path}")
         
         return {
-            'background_path': bg_path,
+            'background_path': os.fspath(bg_path),
             'image_path': final_path,
             'slide_index': slide_index,
             'success': True
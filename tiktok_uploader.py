@@ -2,6 +2,8 @@ import requests
 import os
 import urllib.parse
 
+from tiktok_video_upload import upload_video, TikTokUploadError
+
 class TikTokUploader:
     def __init__(self):
         self._load_env()
@@ -111,63 +113,23 @@ class TikTokUploader:
         """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Video file not found: {file_path}")
-            
-        file_size = os.path.getsize(file_path)
-        
-        # 1. Initialize Upload
-        init_headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json; charset=UTF-8"
-        }
         
         # Note: TikTok Sandbox often requires SELF_ONLY (Private) or MUTUAL_FOLLOW_FRIENDS. 
         # PUBLIC might be restricted depending on app status.
-        init_data = {
-            "post_info": {
-                "title": title,
-                "privacy_level": privacy_level,
-                "disable_duet": False,
-                "disable_comment": True,
-                "disable_stitch": False,
-                "video_cover_timestamp_ms": 1000
-            },
-            "source_info": {
-                "source": "FILE_UPLOAD",
-                "video_size": file_size,
-                "chunk_size": file_size, # Uploading in one chunk for simplicity
-                "total_chunk_count": 1
-            }
+        post_info = {
+            "title": title,
+            "privacy_level": privacy_level,
+            "disable_duet": False,
+            "disable_comment": True,
+            "disable_stitch": False,
+            "video_cover_timestamp_ms": 1000
         }
         
-        print("Initializing upload...")
-        init_response = requests.post(self.init_upload_url, headers=init_headers, json=init_data)
-        
-        if init_response.status_code != 200:
-            raise Exception(f"Failed to initialize upload: {init_response.text}")
-            
-        init_json = init_response.json()
-        
-        # Check for error in body
-        if "error" in init_json and init_json["error"]["code"] != "ok":
-             raise Exception(f"API Error during init: {init_json['error']}")
-
-        upload_url = init_json["data"]["upload_url"]
-        publish_id = init_json["data"]["publish_id"]
-        
-        # 2. Upload Video Content (PUT)
-        print(f"Uploading file ({file_size} bytes) to {upload_url[:50]}...")
-        
-        with open(file_path, 'rb') as f:
-            video_data = f.read()
-            
-        upload_headers = {
-            "Content-Type": "video/mp4",
-            "Content-Range": f"bytes 0-{file_size-1}/{file_size}"
-        }
-        
-        upload_response = requests.put(upload_url, headers=upload_headers, data=video_data)
-        
-        if upload_response.status_code not in [200, 201]: # Verify successful upload codes
-             raise Exception(f"Failed to upload video data: {upload_response.text}")
+        # Init, then chunks streamed from disk (resumes an interrupted upload of this file)
+        print(f"Uploading {file_path} ({os.path.getsize(file_path)} bytes)...")
+        try:
+            result = upload_video(self.init_upload_url, access_token, file_path, post_info=post_info)
+        except TikTokUploadError as e:
+            raise Exception(f"Failed to upload video: {e}")
              
-        return {"status": "success", "publish_id": publish_id}
+        return {"status": "success", "publish_id": result["publish_id"]}
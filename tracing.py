@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Tracing - per-stage spans and Prometheus metrics for the content pipelines.
+
+A run's wall time is spread over script generation, provider calls (Gemini,
+fal.ai, ElevenLabs), text rendering, image encoding, uploads and DB commits.
+Each of those is wrapped in a span:
+
+    from tracing import span, traced
+
+    with span("provider_call", provider="fal", model=model_id):
+        result = fal_client.subscribe(model_id, arguments=arguments)
+
+    @traced("text_render")
+    def create_slide(...): ...
+
+Every span feeds process-wide metrics, labelled by stage, provider and model:
+- pipeline_stage_duration_seconds   histogram
+- pipeline_stage_in_flight          gauge
+- pipeline_stage_errors_total       counter (also labelled by error type)
+
+render_prometheus() returns them in the Prometheus text format; the API
+serves it at /api/metrics.
+
+Inside start_trace() spans also build a tree for that run. Worker threads
+only join the tree if they run in a copy of the caller's context (TaskGraph
+does this for its nodes; use in_context() for other executors):
+
+    with start_trace("automation_run", automation="daily") as trace:
+        generate_slideshow(...)
+
+    trace.to_dict()         # {"name", "start", "duration", "children": [...]}
+    trace.stage_totals()    # {"provider_call": 212.4, "text_render": 3.1, ...}
+"""
+
+import time
+import threading
+import contextvars
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds (encodes take ms, video clips minutes)
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+METRIC_PREFIX = "pipeline_stage"
+
+# (stage, provider, model)
+LabelKey = Tuple[str, str, str]
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+class MetricsRegistry:
+    """Latency histograms, in-flight gauges and error counters per label set."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[LabelKey, Dict[str, Any]] = {}
+        self._in_flight: Dict[LabelKey, int] = {}
+        self._errors: Dict[Tuple[str, str, str, str], int] = {}
+
+    def start(self, key: LabelKey):
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def finish(self, key: LabelKey, seconds: float, error: Optional[str] = None):
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 1) - 1
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {
+                    "buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0, "max": 0.0
+                }
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist["buckets"][i] += 1
+                    break
+            hist["sum"] += seconds
+            hist["count"] += 1
+            hist["max"] = max(hist["max"], seconds)
+            if error:
+                error_key = key + (error,)
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+            # In-flight spans will still call finish(); keep their gauges
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """One JSON-friendly row per (stage, provider, model)."""
+        with self._lock:
+            keys = set(self._histograms) | {k for k, v in self._in_flight.items() if v}
+            rows = []
+            for key in sorted(keys):
+                hist = self._histograms.get(key, {"sum": 0.0, "count": 0, "max": 0.0})
+                errors = sum(n for error_key, n in self._errors.items() if error_key[:3] == key)
+                rows.append({
+                    "stage": key[0],
+                    "provider": key[1],
+                    "model": key[2],
+                    "count": hist["count"],
+                    "errors": errors,
+                    "in_flight": self._in_flight.get(key, 0),
+                    "total_seconds": round(hist["sum"], 3),
+                    "avg_seconds": round(hist["sum"] / hist["count"], 3) if hist["count"] else 0.0,
+                    "max_seconds": round(hist["max"], 3),
+                })
+            return rows
+
+    def render_prometheus(self) -> str:
+        """Text exposition format (version 0.0.4)."""
+        with self._lock:
+            histograms = {k: {**v, "buckets": list(v["buckets"])} for k, v in self._histograms.items()}
+            in_flight = dict(self._in_flight)
+            errors = dict(self._errors)
+
+        lines = [
+            f"# HELP {METRIC_PREFIX}_duration_seconds Time spent in a pipeline stage.",
+            f"# TYPE {METRIC_PREFIX}_duration_seconds histogram",
+        ]
+        for key in sorted(histograms):
+            hist = histograms[key]
+            labels = _labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, hist["buckets"]):
+                cumulative += count
+                lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+            lines.append(f"{METRIC_PREFIX}_duration_seconds_sum{{{labels}}} {hist['sum']:.6f}")
+            lines.append(f"{METRIC_PREFIX}_duration_seconds_count{{{labels}}} {hist['count']}")
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_in_flight Pipeline stages currently running.",
+            f"# TYPE {METRIC_PREFIX}_in_flight gauge",
+        ]
+        for key in sorted(in_flight):
+            lines.append(f"{METRIC_PREFIX}_in_flight{{{_labels(key)}}} {in_flight[key]}")
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_errors_total Pipeline stages that raised or reported failure.",
+            f"# TYPE {METRIC_PREFIX}_errors_total counter",
+        ]
+        for error_key in sorted(errors):
+            labels = _labels(error_key[:3]) + f',error="{_escape(error_key[3])}"'
+            lines.append(f"{METRIC_PREFIX}_errors_total{{{labels}}} {errors[error_key]}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: LabelKey) -> str:
+    stage, provider, model = key
+    return f'stage="{_escape(stage)}",provider="{_escape(provider)}",model="{_escape(model)}"'
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def render_prometheus() -> str:
+    """Current metrics for this process in the Prometheus text format."""
+    return _registry.render_prometheus()
+
+
+# =============================================================================
+# SPANS AND TRACES
+# =============================================================================
+
+class Span:
+    """One timed stage. Children are spans opened while this one was current."""
+
+    __slots__ = ("name", "provider", "model", "attrs", "start", "end", "error", "children")
+
+    def __init__(self, name: str, provider: str = "", model: str = "", attrs: Optional[Dict] = None):
+        self.name = name
+        self.provider = provider or ""
+        self.model = model or ""
+        self.attrs = dict(attrs or {})
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+
+    @property
+    def key(self) -> LabelKey:
+        return (self.name, self.provider, self.model)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def set(self, **attrs):
+        """Attach extra attributes (slide index, bytes uploaded, ...)."""
+        self.attrs.update(attrs)
+
+    def fail(self, error: str):
+        """Count the span as an error without raising (for calls that return failure)."""
+        self.error = error
+
+    def to_dict(self, t0: float) -> Dict[str, Any]:
+        entry = {
+            "name": self.name,
+            "start": round(self.start - t0, 3),
+            "duration": round(self.duration, 3),
+            "status": "error" if self.error else "ok",
+        }
+        if self.provider:
+            entry["provider"] = self.provider
+        if self.model:
+            entry["model"] = self.model
+        if self.error:
+            entry["error"] = self.error
+        if self.attrs:
+            entry["attrs"] = {k: v if isinstance(v, (int, float, bool)) or v is None else str(v)
+                              for k, v in self.attrs.items()}
+        if self.children:
+            entry["children"] = [c.to_dict(t0) for c in sorted(self.children, key=lambda c: c.start)]
+        return entry
+
+
+class Trace:
+    """Span tree for one run."""
+
+    def __init__(self, root: Span):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _attach(self, parent: Span, child: Span):
+        # Sibling spans may be opened from several worker threads at once
+        with self._lock:
+            parent.children.append(child)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.root.to_dict(self.root.start)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Seconds per stage name, summed over the tree (parallel spans add up)."""
+        totals: Dict[str, float] = {}
+
+        def visit(node: Span):
+            for child in node.children:
+                totals[child.name] = totals.get(child.name, 0.0) + child.duration
+                visit(child)
+
+        with self._lock:
+            visit(self.root)
+        return {name: round(seconds, 3) for name, seconds in sorted(totals.items(), key=lambda kv: -kv[1])}
+
+    def print_tree(self, min_seconds: float = 0.0):
+        """Print the span tree with offsets from the start of the run."""
+        def show(entry: Dict, depth: int):
+            if depth and entry["duration"] < min_seconds:
+                return
+            label = entry["name"]
+            if entry.get("provider"):
+                label += f" [{entry['provider']}{'/' + entry['model'] if entry.get('model') else ''}]"
+            print(
+                f"   {'  ' * depth}{label:<{max(1, 44 - 2 * depth)}} {entry['start']:>7.1f}s "
+                f"+{entry['duration']:.2f}s" + (f" ❌ {entry['error']}" if entry.get("error") else "")
+            )
+            for child in entry.get("children", []):
+                show(child, depth + 1)
+
+        print(f"\n🧭 Trace {self.root.name}:")
+        show(self.to_dict(), 0)
+
+
+# (trace, current span) for the running context; None outside start_trace()
+_current: contextvars.ContextVar = contextvars.ContextVar("tracing_current", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    current = _current.get()
+    return current[0] if current else None
+
+
+def begin_span(name: str, provider: str = "", model: str = "", **attrs) -> Span:
+    """
+    Open a span without making it the parent of later spans.
+
+    For hooks that see the start and end of a stage in different callbacks
+    (e.g. SQLAlchemy commit events). Close it with end_span().
+    """
+    node = Span(name, provider, model, attrs)
+    current = _current.get()
+    if current:
+        trace, parent = current
+        trace._attach(parent, node)
+    _registry.start(node.key)
+    return node
+
+
+def end_span(node: Span, error: Optional[str] = None):
+    if error:
+        node.error = error
+    node.end = time.time()
+    _registry.finish(node.key, node.end - node.start, node.error)
+
+
+@contextmanager
+def span(name: str, provider: str = "", model: str = "", **attrs):
+    """Time the block as one stage; nests under the current span if tracing."""
+    node = begin_span(name, provider, model, **attrs)
+    current = _current.get()
+    token = _current.set((current[0], node)) if current else None
+    try:
+        yield node
+    except Exception as e:
+        node.error = type(e).__name__
+        raise
+    finally:
+        if token is not None:
+            _current.reset(token)
+        end_span(node)
+
+
+@contextmanager
+def start_trace(name: str, **attrs):
+    """Collect every span opened inside the block (this context) into a Trace."""
+    root = Span(name, attrs=attrs)
+    trace = Trace(root)
+    token = _current.set((trace, root))
+    _registry.start(root.key)
+    try:
+        yield trace
+    except Exception as e:
+        root.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        end_span(root)
+
+
+def traced(name: str, provider: str = "", model: str = ""):
+    """Decorator form of span()."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, provider, model):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def in_context(fn: Callable) -> Callable:
+    """Bind fn to a copy of the caller's context, so spans it opens on another thread join the trace."""
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # A Context can only be entered by one thread at a time
+        return ctx.copy().run(fn, *args, **kwargs)
+    return wrapper
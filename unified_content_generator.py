@@ -8,14 +8,16 @@ The model chooses the best approach based on the topic.
 This replaces the separate prompts in gemini_handler.py with a single, versatile prompt.
 """
 
-from google import genai
-from google.genai import types
+from lazy_imports import lazy_module
 import json
 import os
 import re
 from typing import Dict, Optional
 from dotenv import load_dotenv
 
+genai = lazy_module("google.genai")  # imported on first use
+types = lazy_module("google.genai.types")
+
 load_dotenv()
 
 
@@ -14,6 +14,8 @@ import os
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from prompt_templates import PromptCache, compile_template
+
 # Default templates directory
 TEMPLATES_DIR = "visual_templates"
 
@@ -240,6 +242,9 @@ class VisualTemplateManager:
         
         # Merge with builtin templates
         self.all_templates = {**BUILTIN_TEMPLATES, **self.custom_templates}
+        
+        # Built prompts by template id + replacements (dropped when a template changes)
+        self._prompts = PromptCache()
     
     def _load_custom_templates(self) -> Dict:
         """Load custom templates from disk"""
@@ -323,6 +328,7 @@ class VisualTemplateManager:
         
         self.custom_templates[template_id] = template
         self.all_templates[template_id] = template
+        self._prompts.invalidate(template_id)
         self._save_custom_templates()
         
         return template
@@ -339,6 +345,7 @@ class VisualTemplateManager:
         template['updated_at'] = datetime.now().isoformat()
         
         self.all_templates[template_id] = template
+        self._prompts.invalidate(template_id)
         self._save_custom_templates()
         
         return template
@@ -352,6 +359,7 @@ class VisualTemplateManager:
         if template_id in self.custom_templates:
             del self.custom_templates[template_id]
             del self.all_templates[template_id]
+            self._prompts.invalidate(template_id)
             self._save_custom_templates()
             return True
         
@@ -392,18 +400,15 @@ class VisualTemplateManager:
         if not template:
             return ""
         
-        prompt = template['base_prompt']
-        
-        # Replace all placeholders
-        for placeholder, value in replacements.items():
-            prompt = prompt.replace(f"[{placeholder}]", value)
-        
-        # Remove any unreplaced optional placeholders (replace with empty)
-        for ph_name, ph_info in template.get('placeholders', {}).items():
-            if not ph_info.get('required', True):
-                prompt = prompt.replace(f"[{ph_name}]", "")
+        # Unreplaced optional placeholders become empty; required ones stay as [NAME]
+        values = {
+            ph_name: ""
+            for ph_name, ph_info in template.get('placeholders', {}).items()
+            if not ph_info.get('required', True)
+        }
+        values.update(replacements)
         
-        return prompt
+        return self._prompts.get_or_render(template_id, compile_template(template['base_prompt']), values)
     
     def generate_prompt_for_scene(self, 
                                    template_id: str,
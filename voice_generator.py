@@ -1,4 +1,3 @@
-from elevenlabs import ElevenLabs
 import os
 import json
 import base64
@@ -6,6 +5,9 @@ import requests
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from provider_limits import provider_slot
+from http_client import get_session
+
 load_dotenv()
 
 class VoiceGenerator:
@@ -15,6 +17,7 @@ class VoiceGenerator:
             print("Warning: ElevenLabs API key not found. Please set ELEVENLABS_API_KEY in .env file")
             self.client = None
         else:
+            from elevenlabs import ElevenLabs  # deferred: heavy SDK, only needed with a key
             self.client = ElevenLabs(api_key=self.api_key)
         
         self.output_dir = "generated_audio"
@@ -31,23 +34,23 @@ class VoiceGenerator:
             # Use default voice if none specified
             voice_to_use = voice_id if voice_id else "onwK4e9ZLuTAKqWW03F9"  # Updated voice ID
             
-            # Generate audio
-            audio = self.client.text_to_speech.convert(
-                voice_id=voice_to_use,
-                text=script,
-                model_id="eleven_turbo_v2_5"  # Updated model for free tier
-            )
-            
             # Save audio file
             if not filename:
                 filename = f"{self.output_dir}/philosophy_narration.mp3"
             else:
                 filename = f"{self.output_dir}/{filename}"
             
-            with open(filename, 'wb') as f:
-                for chunk in audio:
-                    if chunk:
-                        f.write(chunk)
+            # Generate audio (the response streams, so hold the slot until it's written)
+            with provider_slot("elevenlabs", model="eleven_turbo_v2_5"):
+                audio = self.client.text_to_speech.convert(
+                    voice_id=voice_to_use,
+                    text=script,
+                    model_id="eleven_turbo_v2_5"  # Updated model for free tier
+                )
+                with open(filename, 'wb') as f:
+                    for chunk in audio:
+                        if chunk:
+                            f.write(chunk)
             
             print(f"Audio generated successfully: {filename}")
             return filename
@@ -113,7 +116,9 @@ class VoiceGenerator:
             }
             
             print("Generating audio with timestamps...")
-            response = requests.post(url, headers=headers, json=payload)
+            with provider_slot("elevenlabs", model="eleven_turbo_v2_5"):
+                # Long scripts take a while to synthesize
+                response = get_session().post(url, headers=headers, json=payload, timeout=(10, 300))
             response.raise_for_status()
             
             result = response.json()